@@ -0,0 +1,393 @@
+"""
+Size-aware admission control and engine routing.
+
+Before any pair enumeration or model building, `estimate_cost` predicts the
+size (variables/constraints), memory and solve time of every engine from the
+guest count, category mix, table count and ToT parameters, all in closed form.
+`admit` then routes the request to the most exact engine that fits the size
+limits and the per-request time budget, or raises `AdmissionError` (413 when
+the instance is too large, 429 when the requested search is too expensive)
+with a cheaper configuration to retry with.
+
+The per-row constants are rough linear surrogates; recalibrate them from
+`python -m backend.benchmarks.bench_optimizer` output on the target machine.
+"""
+
+import os
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional
+
+from .affinity import map_conflicts
+from .models import Affinity, Guest, Table, VenueConfig
+from .optimizer import (
+    _get_category,
+    _is_bride_side,
+    _is_family_category,
+    _is_groom_side,
+    _is_social_group_category,
+    _use_compact_side_mixing,
+)
+
+# Engines admission control can size, from most to least exact
+ROUTED_ENGINES = ("milp", "aggregated", "decomposed", "lns", "heuristic")
+# Races milp, lns and heuristic (portfolio.py); only used when requested by name
+PORTFOLIO_ENGINE = "portfolio"
+# "tot": Tree-of-Thoughts search over weight variants; "pool": one solution-pool solve
+TOT_MODES = ("tot", "pool")
+
+# Number of fixed thought patterns in SeatHarmonyTask.generate_thoughts
+N_THOUGHT_PATTERNS = 7
+
+MILP_SECONDS_PER_ROW = 5e-5
+MILP_BYTES_PER_ROW = 1_000
+AGGREGATED_SECONDS_PER_ROW = 2e-4
+AGGREGATED_BYTES_PER_ROW = 500
+AGGREGATED_TIME_LIMIT = 30.0
+# decompose.DEFAULT_BLOCK_TABLES / DEFAULT_TIME_LIMIT (not imported: decompose needs numpy)
+DECOMPOSED_BLOCK_TABLES = 20
+DECOMPOSED_TIME_LIMIT = 10.0
+# lns.DEFAULT_TABLES_PER_MOVE / DEFAULT_TIME_LIMIT
+LNS_TABLES_PER_MOVE = 3
+LNS_TIME_LIMIT = 20.0
+HEURISTIC_SECONDS_PER_CELL = 2e-7
+HEURISTIC_TIME_LIMIT = 2.0
+# portfolio.DEFAULT_DEADLINE
+PORTFOLIO_DEADLINE = 10.0
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    return float(value) if value else default
+
+
+@dataclass
+class AdmissionLimits:
+    max_guests: int = int(_env_float("SEATHARMONY_MAX_GUESTS", 20_000))
+    max_milp_rows: int = int(_env_float("SEATHARMONY_MAX_MILP_ROWS", 300_000))
+    max_aggregated_rows: int = int(_env_float("SEATHARMONY_MAX_AGGREGATED_ROWS", 1_000_000))
+    max_memory_mb: float = _env_float("SEATHARMONY_MAX_SOLVE_MEMORY_MB", 2_048)
+    request_budget_seconds: float = _env_float("SEATHARMONY_REQUEST_BUDGET_SECONDS", 300)
+
+
+@dataclass
+class EngineCost:
+    vars: int
+    constrs: int
+    memory_mb: float
+    seconds_per_solve: float
+
+    @property
+    def rows(self) -> int:
+        return self.vars + self.constrs
+
+
+@dataclass
+class CostEstimate:
+    n_guests: int
+    n_tables: int
+    pairs: Dict[str, int]
+    n_solves: int
+    # Model rows after household contraction (== n_guests without households)
+    n_units: int = 0
+    engines: Dict[str, EngineCost] = field(default_factory=dict)
+
+    def total_seconds(self, engine: str) -> float:
+        return self.engines[engine].seconds_per_solve * self.n_solves
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        for name in self.engines:
+            data["engines"][name]["total_seconds"] = self.total_seconds(name)
+        return data
+
+
+@dataclass
+class RoutingDecision:
+    engine: str
+    reason: str
+    estimate: CostEstimate
+
+
+class AdmissionError(Exception):
+    """Request rejected before any work started; `detail` includes a suggested cheaper configuration."""
+
+    def __init__(self, status_code: int, message: str, estimate: CostEstimate, suggestion: Optional[Dict[str, Any]]):
+        super().__init__(message)
+        self.status_code = status_code
+        self.detail = {"error": message, "estimate": estimate.to_dict(), "suggestion": suggestion}
+
+
+def count_tot_solves(depth: int, branching: int, n_generate: int, n_evaluate: int) -> int:
+    """Upper bound on apply_thought calls (one solve each) in the server-side ToT BFS."""
+    children = max(0, min(branching, n_generate, N_THOUGHT_PATTERNS))
+    kept = min(children, n_evaluate, branching)
+    frontier, solves = 1, 0
+    for _ in range(depth):
+        solves += frontier * children
+        frontier *= kept
+    return solves
+
+
+def estimate_cost(
+    guests: List[Guest],
+    tables: List[Table],
+    depth: int = 2,
+    branching: int = 4,
+    n_generate: int = 4,
+    n_evaluate: int = 4,
+    mode: str = "tot",
+    affinity: Optional[Affinity] = None,
+    settings: Optional[Dict[str, Any]] = None,
+) -> CostEstimate:
+    """Predict per-engine model size, memory and time from counts only (no pair enumeration)."""
+    n = len(guests)
+    n_tables = len(tables)
+    capacity = max((t.capacity for t in tables), default=0)
+    by_category = Counter(_get_category(g) for g in guests)
+
+    family_pairs = sum(k * (k - 1) // 2 for c, k in by_category.items() if _is_family_category(c))
+    social_pairs = sum(k * (k - 1) // 2 for c, k in by_category.items() if _is_social_group_category(c))
+    groom = sum(k for c, k in by_category.items() if _is_groom_side(c))
+    bride = sum(k for c, k in by_category.items() if _is_bride_side(c))
+    cross_pairs = groom * bride
+    # ToT weights are positive, so "auto" resolves the same way for every solve
+    compact_side = _use_compact_side_mixing(settings or {}, 1.0, groom, bride, capacity)
+    total_pairs = family_pairs + social_pairs + (0 if compact_side else cross_pairs)
+
+    n_solves = 1 if mode == "pool" else count_tot_solves(depth, branching, n_generate, n_evaluate)
+    estimate = CostEstimate(
+        n_guests=n,
+        n_tables=n_tables,
+        pairs={"family": family_pairs, "social_group": social_pairs, "cross_side": cross_pairs},
+        n_solves=n_solves,
+        n_units=n,
+    )
+
+    n_units = n
+    n_rewards = len(affinity.rewards) if affinity else 0
+    if any(g.household_id for g in guests):
+        # Lazy import: needs numpy. Contracted model: one row per household and
+        # one linearization variable per household pair (households.py)
+        from .households import count_party_pairs, has_households
+
+        if has_households(guests):
+            # Affinity rewards are folded into the household pairs
+            n_units, total_pairs = count_party_pairs(guests, tables, affinity, side_mixing=not compact_side)
+            estimate.n_units = n_units
+            n_rewards = 0
+    # At most one clique row per conflict pair and table
+    n_conflicts = len(affinity.conflicts) if affinity else 0
+    estimate.pairs["affinity"] = n_rewards
+    estimate.pairs["conflicts"] = n_conflicts
+
+    # Guest-level MILP: x[g, t] plus one variable and three rows per (pair, table);
+    # affinity rewards need two rows per (pair, table)
+    milp_vars = n_units * n_tables + (total_pairs + n_rewards) * n_tables
+    milp_constrs = n_units + n_tables + (3 * total_pairs + 2 * n_rewards + n_conflicts) * n_tables
+    if compact_side and groom and bride:
+        # Compact side mixing: a (capacity + 1)-way expansion per table instead of cross-side pairs
+        milp_vars += n_tables * (2 * capacity + 1)
+        milp_constrs += n_tables * (2 * capacity + 2)
+    milp_rows = milp_vars + milp_constrs
+    estimate.engines["milp"] = EngineCost(
+        vars=milp_vars,
+        constrs=milp_constrs,
+        memory_mb=milp_rows * MILP_BYTES_PER_ROW / 1e6,
+        seconds_per_solve=milp_rows * MILP_SECONDS_PER_ROW,
+    )
+
+    # Aggregated model: y[c, t], a (capacity + 1)-way expansion per cohesion category
+    # and table, and the side-mixing expansion per table
+    n_categories = len(by_category)
+    cohesion_categories = sum(
+        1 for c in by_category if _is_family_category(c) or _is_social_group_category(c)
+    )
+    expansion = capacity + 1
+    agg_vars = n_categories * n_tables + cohesion_categories * n_tables * expansion + 2 * n_tables * expansion
+    agg_constrs = n_categories + n_tables + 2 * cohesion_categories * n_tables + n_tables * (2 + 2 * expansion)
+    agg_rows = agg_vars + agg_constrs
+    estimate.engines["aggregated"] = EngineCost(
+        vars=agg_vars,
+        constrs=agg_constrs,
+        memory_mb=agg_rows * AGGREGATED_BYTES_PER_ROW / 1e6,
+        seconds_per_solve=min(AGGREGATED_TIME_LIMIT, agg_rows * AGGREGATED_SECONDS_PER_ROW),
+    )
+
+    # Decomposition: one aggregated model per block of tables (see decompose.py), solved
+    # `workers` at a time, within a fixed time budget
+    n_blocks = max(1, -(-n_tables // DECOMPOSED_BLOCK_TABLES))
+    workers = min(n_blocks, os.cpu_count() or 1)
+    block_rows = agg_rows / n_blocks
+    estimate.engines["decomposed"] = EngineCost(
+        vars=int(agg_vars / n_blocks),
+        constrs=int(agg_constrs / n_blocks),
+        memory_mb=block_rows * workers * AGGREGATED_BYTES_PER_ROW / 1e6,
+        seconds_per_solve=min(DECOMPOSED_TIME_LIMIT, agg_rows * AGGREGATED_SECONDS_PER_ROW / workers),
+    )
+
+    # LNS: repeated guest-level sub-MILPs over a few tables, within a fixed time budget
+    sub_tables = min(n_tables, LNS_TABLES_PER_MOVE)
+    sub_guests = min(n, sub_tables * capacity)
+    sub_pairs = sub_guests * (sub_guests - 1) // 2
+    lns_vars = (sub_guests + sub_pairs) * sub_tables
+    lns_constrs = sub_guests + sub_tables + 3 * sub_pairs * sub_tables
+    estimate.engines["lns"] = EngineCost(
+        vars=lns_vars,
+        constrs=lns_constrs,
+        memory_mb=(lns_vars + lns_constrs) * MILP_BYTES_PER_ROW / 1e6 + (n * n_tables * 8) / 1e6,
+        seconds_per_solve=LNS_TIME_LIMIT,
+    )
+
+    # Heuristic: no model; each local-search sweep touches every (guest, guest) and (guest, table) cell
+    cells = n * (n + n_tables)
+    estimate.engines["heuristic"] = EngineCost(
+        vars=0,
+        constrs=0,
+        memory_mb=(n * n_tables * 8 + n * 64) / 1e6,
+        seconds_per_solve=min(HEURISTIC_TIME_LIMIT, cells * HEURISTIC_SECONDS_PER_CELL),
+    )
+
+    # Portfolio: two guest-level MILPs and LNS side by side, until a fixed deadline
+    milp = estimate.engines["milp"]
+    estimate.engines[PORTFOLIO_ENGINE] = EngineCost(
+        vars=milp.vars,
+        constrs=milp.constrs,
+        memory_mb=2 * milp.memory_mb + estimate.engines["lns"].memory_mb,
+        seconds_per_solve=PORTFOLIO_DEADLINE,
+    )
+    return estimate
+
+
+def _fits(estimate: CostEstimate, engine: str, limits: AdmissionLimits) -> bool:
+    cost = estimate.engines[engine]
+    if cost.memory_mb > limits.max_memory_mb:
+        return False
+    if engine in ("milp", PORTFOLIO_ENGINE):
+        return cost.rows <= limits.max_milp_rows
+    if engine == "aggregated":
+        return cost.rows <= limits.max_aggregated_rows
+    return True
+
+
+def _cheaper_tot(
+    estimate: CostEstimate, engine: str, depth: int, branching: int, n_generate: int, n_evaluate: int, budget: float
+) -> Optional[Dict[str, int]]:
+    """Largest (depth, branching) whose predicted run time fits the budget on `engine`."""
+    per_solve = estimate.engines[engine].seconds_per_solve
+    best: Optional[Dict[str, int]] = None
+    best_solves = 0
+    for d in range(depth, 0, -1):
+        for b in range(branching, 0, -1):
+            solves = count_tot_solves(d, b, min(n_generate, b), n_evaluate)
+            if solves * per_solve <= budget and solves > best_solves:
+                best, best_solves = {"depth": d, "branching": b, "n_generate": min(n_generate, b)}, solves
+    return best
+
+
+def admit(
+    guests: List[Guest],
+    tables: List[Table],
+    depth: int = 2,
+    branching: int = 4,
+    n_generate: int = 4,
+    n_evaluate: int = 4,
+    mode: str = "tot",
+    engine: str = "auto",
+    limits: Optional[AdmissionLimits] = None,
+    affinity: Optional[Affinity] = None,
+    settings: Optional[Dict[str, Any]] = None,
+) -> RoutingDecision:
+    """
+    Pick the engine for a request, or raise AdmissionError (ValueError for
+    rules no layout can meet).
+    `engine="auto"` tries milp, aggregated, decomposed, lns, heuristic in that order.
+    """
+    limits = limits or AdmissionLimits()
+    if affinity is not None and affinity.conflicts:
+        # Raises ValueError for a household whose members must sit apart: no layout can keep it together
+        unit_of = {g.id: ("household", g.household_id) if g.household_id else ("guest", g.id) for g in guests}
+        map_conflicts(affinity.conflicts, unit_of)
+    estimate = estimate_cost(guests, tables, depth, branching, n_generate, n_evaluate, mode, affinity, settings)
+
+    if estimate.n_guests > limits.max_guests:
+        raise AdmissionError(
+            413,
+            f"{estimate.n_guests} guests exceeds the limit of {limits.max_guests}; split the event into smaller plans.",
+            estimate,
+            None,
+        )
+
+    all_engines = list(ROUTED_ENGINES)
+    if mode == "pool":
+        # Solution-pool diversity needs the guest-level MILP
+        candidates = ["milp"]
+    elif engine == "auto":
+        candidates = all_engines
+    else:
+        candidates = [engine] if engine in estimate.engines else []
+    # Engine -> instance features it cannot model
+    unsupported: Dict[str, str] = {}
+    if estimate.n_units < estimate.n_guests or estimate.pairs["affinity"] or estimate.pairs["conflicts"]:
+        # The count model cannot keep households together or express guest-level pairs
+        unsupported["aggregated"] = "households or affinity/conflict pairs"
+    if estimate.pairs["affinity"] or estimate.pairs["conflicts"]:
+        # Decomposition keeps households whole but cannot express guest-level pairs
+        unsupported["decomposed"] = "affinity/conflict pairs"
+    if any(t.constraints for t in tables) or (settings or {}).get("requires"):
+        # Lazy import: domains need numpy
+        from .domains import compile_domains
+
+        # Raises DomainError (a ValueError) for pins/eligibility rules no layout can meet
+        venue = VenueConfig(tables=tables, settings=settings or {}, affinity=affinity)
+        if compile_domains(guests, venue) is not None:
+            # Neither count-based engine can restrict single guests to tables
+            for name in ("aggregated", "decomposed"):
+                unsupported.setdefault(name, "table pins or eligibility rules")
+    candidates = [e for e in candidates if e not in unsupported]
+    all_engines = [e for e in all_engines if e not in unsupported]
+    if mode != "pool" and engine in unsupported:
+        fallback = next((e for e in all_engines if _fits(estimate, e, limits)), all_engines[0])
+        raise AdmissionError(
+            400,
+            f"Engine '{engine}' does not support {unsupported[engine]}; use '{fallback}' or 'auto'.",
+            estimate,
+            {"engine": fallback},
+        )
+
+    sized = [e for e in candidates if _fits(estimate, e, limits)]
+    for name in sized:
+        if estimate.total_seconds(name) <= limits.request_budget_seconds:
+            reason = "requested" if engine != "auto" else f"most exact engine within limits ({len(sized)} of {len(candidates)} fit)"
+            return RoutingDecision(engine=name, reason=reason, estimate=estimate)
+
+    if not sized:
+        fallback = next((e for e in all_engines if _fits(estimate, e, limits)), None)
+        suggestion: Optional[Dict[str, Any]] = None
+        if fallback is not None:
+            suggestion = {"engine": fallback}
+            if mode == "pool":
+                suggestion["tot"] = {"mode": "tot"}
+        raise AdmissionError(
+            413,
+            f"Instance too large for engine(s) {candidates} "
+            f"({estimate.n_guests} guests, {estimate.n_tables} tables, {sum(estimate.pairs.values())} guest pairs).",
+            estimate,
+            suggestion,
+        )
+
+    # Every size-feasible engine would exceed the time budget: suggest a smaller search
+    best_engine = sized[-1]
+    suggestion = {"engine": best_engine}
+    tot = _cheaper_tot(estimate, best_engine, depth, branching, n_generate, n_evaluate, limits.request_budget_seconds)
+    if tot is not None and mode != "pool":
+        suggestion["tot"] = tot
+    elif "milp" in sized and estimate.engines["milp"].seconds_per_solve <= limits.request_budget_seconds:
+        suggestion = {"engine": "milp", "tot": {"mode": "pool"}}
+    raise AdmissionError(
+        429,
+        f"Predicted run time {estimate.total_seconds(best_engine):.0f}s for {estimate.n_solves} solves exceeds the "
+        f"{limits.request_budget_seconds:.0f}s request budget.",
+        estimate,
+        suggestion,
+    )
@@ -0,0 +1,168 @@
+"""
+Sparse guest-affinity input.
+
+Requests may carry a sparse (COO or CSR) matrix over the guest list: a
+positive entry rewards seating the two guests together (the value is added to
+the objective, scaled by `weights["affinity"]`, default 1.0); a negative entry
+means "keep apart" and becomes a hard conflict. Only stated pairs generate
+model variables. Conflicts are merged into cliques so that one constraint
+`sum_{g in clique} x[g, t] <= 1` per table replaces all pairwise
+`x[a, t] + x[b, t] <= 1` rows of the clique.
+"""
+
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Set, Tuple
+
+from .models import Affinity
+
+if TYPE_CHECKING:
+    import gurobipy as gp
+
+DEFAULT_AFFINITY_WEIGHT = 1.0
+
+
+def affinity_weight(weights: Dict[str, float]) -> float:
+    # Like relationship_priority, only positive weights add the term
+    weight = weights.get("affinity", DEFAULT_AFFINITY_WEIGHT)
+    return weight if weight > 0 else 0.0
+
+
+def _from_triplets(
+    guest_ids: Sequence[str], row: Sequence[int], col: Sequence[int], data: Sequence[float]
+) -> Affinity:
+    if not (len(row) == len(col) == len(data)):
+        raise ValueError("Affinity row, col and data must have the same length")
+    n = len(guest_ids)
+    # Symmetrize: duplicates (including (i, j) and (j, i)) are summed, as in scipy
+    values: Dict[Tuple[int, int], float] = {}
+    for i, j, v in zip(row, col, data):
+        if not (0 <= i < n and 0 <= j < n):
+            raise ValueError(f"Affinity index ({i}, {j}) out of range for {n} guests")
+        if i == j or v == 0:
+            continue
+        key = (i, j) if i < j else (j, i)
+        values[key] = values.get(key, 0.0) + float(v)
+
+    affinity = Affinity()
+    for (i, j), v in values.items():
+        if v > 0:
+            affinity.rewards.append((guest_ids[i], guest_ids[j], v))
+        elif v < 0:
+            affinity.conflicts.append((guest_ids[i], guest_ids[j]))
+    return affinity
+
+
+def from_coo(guest_ids: Sequence[str], row: Sequence[int], col: Sequence[int], data: Sequence[float]) -> Affinity:
+    """COO triplets over indices into `guest_ids`."""
+    return _from_triplets(guest_ids, row, col, data)
+
+
+def from_csr(
+    guest_ids: Sequence[str], indptr: Sequence[int], indices: Sequence[int], data: Sequence[float]
+) -> Affinity:
+    """CSR arrays over indices into `guest_ids` (len(indptr) == len(guest_ids) + 1)."""
+    if len(indptr) != len(guest_ids) + 1:
+        raise ValueError(f"CSR indptr must have {len(guest_ids) + 1} entries, got {len(indptr)}")
+    if len(indices) != len(data) or (indptr and indptr[-1] != len(indices)):
+        raise ValueError("CSR indices/data do not match indptr")
+    row: List[int] = []
+    for i in range(len(guest_ids)):
+        row.extend([i] * (indptr[i + 1] - indptr[i]))
+    return _from_triplets(guest_ids, row, indices, data)
+
+
+def conflict_cliques(conflicts: Sequence[Tuple[str, str]]) -> List[List[str]]:
+    """
+    Greedy clique edge cover of the conflict graph: every conflict pair is in
+    at least one returned clique, and every clique is pairwise in conflict.
+    """
+    adjacent: Dict[str, Set[str]] = {}
+    for a, b in conflicts:
+        adjacent.setdefault(a, set()).add(b)
+        adjacent.setdefault(b, set()).add(a)
+
+    covered: Set[Tuple[str, str]] = set()
+    cliques: List[List[str]] = []
+    # Dense neighbourhoods first so large "keep apart" groups become single cliques
+    for a, b in sorted(conflicts, key=lambda e: -(len(adjacent[e[0]]) + len(adjacent[e[1]]))):
+        if (a, b) in covered or (b, a) in covered:
+            continue
+        clique = [a, b]
+        candidates = adjacent[a] & adjacent[b]
+        while candidates:
+            nxt = max(candidates, key=lambda g: (len(adjacent[g] & candidates), g))
+            clique.append(nxt)
+            candidates &= adjacent[nxt]
+        for i, u in enumerate(clique):
+            for v in clique[i + 1:]:
+                covered.add((u, v))
+                covered.add((v, u))
+        cliques.append(clique)
+    return cliques
+
+
+def map_conflicts(conflicts: Sequence[Tuple[str, str]], unit_of: Dict[str, str]) -> List[Tuple[str, str]]:
+    """
+    Conflicts between model units (e.g. households). Raises ValueError if both
+    guests of a conflict belong to the same unit.
+    """
+    mapped: Set[Tuple[str, str]] = set()
+    for a, b in conflicts:
+        ua, ub = unit_of[a], unit_of[b]
+        if ua == ub:
+            raise ValueError(f"Guests {a} and {b} must sit apart but are in the same household")
+        mapped.add((ua, ub) if ua < ub else (ub, ua))
+    return sorted(mapped)
+
+
+def has_affinity(affinity: Optional[Affinity]) -> bool:
+    return affinity is not None and bool(affinity.rewards or affinity.conflicts)
+
+
+def restrict_affinity(affinity: Optional[Affinity], guest_ids: Set[str]) -> Optional[Affinity]:
+    """The pairs with both guests in `guest_ids` (e.g. for a sub-problem)."""
+    if not has_affinity(affinity):
+        return None
+    return Affinity(
+        rewards=[(a, b, v) for a, b, v in affinity.rewards if a in guest_ids and b in guest_ids],
+        conflicts=[(a, b) for a, b in affinity.conflicts if a in guest_ids and b in guest_ids],
+    )
+
+
+def add_affinity_terms(
+    model: "gp.Model",
+    x: Dict[Tuple[str, str], "gp.Var"],
+    table_ids: List[str],
+    rewards: Sequence[Tuple[str, str, float]],
+    conflicts: Sequence[Tuple[str, str]],
+    weight: float,
+) -> "gp.LinExpr":
+    """
+    Add reward variables and conflict clique constraints over x[unit, table].
+    Returns the reward part of the objective.
+    """
+    from .optimizer import _gurobi, _is_var, _pair_product
+
+    gp, GRB = _gurobi()
+    obj = gp.LinExpr()
+    if weight > 0:
+        # a[p, t] <= x[u1, t], a[p, t] <= x[u2, t]; the lower bound is not needed
+        # because every coefficient is positive and the model maximizes
+        for p_idx, (u1, u2, value) in enumerate(rewards):
+            for t_id in table_ids:
+                x1, x2 = x[u1, t_id], x[u2, t_id]
+                if not (_is_var(x1) and _is_var(x2)):
+                    # A pinned or ineligible cell (domains.py): no variable needed
+                    obj += weight * value * _pair_product(model, "", x1, x2)
+                    continue
+                a = model.addVar(vtype=GRB.BINARY, name=f"a_{p_idx}_{t_id}")
+                model.addConstr(a <= x1, name=f"a_{p_idx}_{t_id}_leq_x1")
+                model.addConstr(a <= x2, name=f"a_{p_idx}_{t_id}_leq_x2")
+                obj += weight * value * a
+
+    for c_idx, clique in enumerate(conflict_cliques(conflicts)):
+        for t_id in table_ids:
+            cells = [x[u, t_id] for u in clique]
+            n_vars = sum(1 for v in cells if _is_var(v))
+            if n_vars and n_vars + sum(v for v in cells if not _is_var(v)) > 1:
+                model.addConstr(gp.quicksum(cells) <= 1, name=f"conflict_{c_idx}_{t_id}")
+    return obj
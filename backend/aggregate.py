@@ -0,0 +1,203 @@
+"""
+Aggregated (category-count) seating model.
+
+Because the objective only depends on how many guests of each category sit at
+each table (and on table order), the guest-level MILP can be replaced by an
+integer model over y[c, t] = number of category-c guests at table t. Pair
+counts C(y, 2) and the side-mixing product groom_t * bride_t are linearized
+with a binary expansion of the counts, so the model size grows with
+categories x tables x capacity instead of guests^2 x tables.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import gurobipy as gp
+from gurobipy import GRB
+
+from .affinity import has_affinity
+from .domains import has_domain_rules
+from .heuristic import _greedy_construct, generate_layout_heuristic, improve
+from .households import has_households
+from .metrics import PhaseTimer
+from .models import ConstraintSummary, Guest, Layout, VenueConfig
+from .optimizer import _dummy_layout, _make_layout, _model_size, _side_mixing_product, _solver_stats
+from .scoring import ScoringContext, build_context, pair_values, priority_weight, weighted_score
+
+DEFAULT_TIME_LIMIT = 30.0
+
+
+def build_count_model(
+    ctx: ScoringContext,
+    weights: Dict[str, float],
+    supply: Optional[np.ndarray] = None,
+    capacity: Optional[np.ndarray] = None,
+) -> Tuple[gp.Model, Dict[Tuple[int, int], gp.Var]]:
+    """
+    Build the category-count model. `supply` (guests per category) and `capacity`
+    (seats per table) default to the full instance.
+    Returns the model and y[category, table] variables.
+    """
+    supply = np.bincount(ctx.guest_category, minlength=len(ctx.categories)) if supply is None else supply
+    capacity = ctx.capacity if capacity is None else capacity
+    n_tables = len(capacity)
+    categories = [c for c in range(len(ctx.categories)) if supply[c] > 0]
+
+    w_family = weights.get("family_cohesion", 0.0)
+    w_social = weights.get("social_group_cohesion", 0.0)
+    w_side = weights.get("side_mixing", 0.0)
+    w_priority = priority_weight(weights)
+
+    model = gp.Model("SeatHarmonyAggregated")
+    model.setParam('OutputFlag', 0)
+    obj = gp.LinExpr()
+
+    # y[c, t]: number of category-c guests at table t
+    y: Dict[Tuple[int, int], gp.Var] = {}
+    for c in categories:
+        for t in range(n_tables):
+            y[c, t] = model.addVar(vtype=GRB.INTEGER, lb=0, ub=int(min(capacity[t], supply[c])), name=f"y_{c}_{t}")
+
+    # Cohesion: C(y, 2) pairs via binary expansion z[c, t, k] = [y[c, t] == k]
+    for c in categories:
+        pair_weight = w_family * ctx.is_family[c] + w_social * ctx.is_social[c]
+        if pair_weight == 0:
+            continue
+        for t in range(n_tables):
+            upper = int(min(capacity[t], supply[c]))
+            z = [model.addVar(vtype=GRB.BINARY, name=f"z_{c}_{t}_{k}") for k in range(upper + 1)]
+            model.addConstr(gp.quicksum(z) == 1, name=f"z_{c}_{t}_one")
+            model.addConstr(gp.quicksum(k * z[k] for k in range(upper + 1)) == y[c, t], name=f"z_{c}_{t}_link")
+            obj += pair_weight * gp.quicksum((k * (k - 1) // 2) * z[k] for k in range(2, upper + 1))
+
+    # Side mixing: groom_t * bride_t via expansion of groom_t (see optimizer._side_mixing_product)
+    groom_cats = [c for c in categories if ctx.is_groom[c]]
+    bride_cats = [c for c in categories if ctx.is_bride[c]]
+    if w_side != 0 and groom_cats and bride_cats:
+        total_groom = int(sum(supply[c] for c in groom_cats))
+        total_bride = int(sum(supply[c] for c in bride_cats))
+        for t in range(n_tables):
+            groom_t = gp.quicksum(y[c, t] for c in groom_cats)
+            bride_t = gp.quicksum(y[c, t] for c in bride_cats)
+            obj += w_side * _side_mixing_product(
+                model,
+                str(t),
+                groom_t,
+                bride_t,
+                int(min(capacity[t], total_groom)),
+                int(min(capacity[t], total_bride)),
+                lower=w_side < 0,
+            )
+
+    # Relationship priority: linear in the counts
+    if w_priority > 0:
+        closeness = np.zeros(len(ctx.categories))
+        np.maximum.at(closeness, ctx.guest_category, ctx.guest_closeness)
+        for c in categories:
+            if closeness[c] > 0:
+                for t in range(n_tables):
+                    obj += w_priority * closeness[c] * ctx.quality[t] * y[c, t]
+
+    model.setObjective(obj, GRB.MAXIMIZE)
+
+    for c in categories:
+        model.addConstr(gp.quicksum(y[c, t] for t in range(n_tables)) == int(supply[c]), name=f"supply_{c}")
+    for t in range(n_tables):
+        model.addConstr(gp.quicksum(y[c, t] for c in categories) <= int(capacity[t]), name=f"capacity_{t}")
+
+    return model, y
+
+
+def read_counts(ctx: ScoringContext, y: Dict[Tuple[int, int], gp.Var], n_tables: int) -> np.ndarray:
+    """(n_tables, n_categories) integer counts from a solved count model."""
+    counts = np.zeros((n_tables, len(ctx.categories)), dtype=np.int64)
+    for (c, t), var in y.items():
+        counts[t, c] = int(round(var.X))
+    return counts
+
+
+def expand_counts(ctx: ScoringContext, guests: List[Guest], counts: np.ndarray) -> np.ndarray:
+    """
+    Turn per-table category counts into a guest -> table index array.
+    Within a category, more important guests get the earlier (better) tables.
+    """
+    table_of = np.full(ctx.n_guests, -1, dtype=np.int64)
+    importance = np.array([g.importance for g in guests])
+    for c in range(len(ctx.categories)):
+        members = np.flatnonzero(ctx.guest_category == c)
+        if members.size == 0:
+            continue
+        members = members[np.argsort(-importance[members], kind="stable")]
+        slots = np.repeat(np.arange(counts.shape[0]), counts[:, c])
+        table_of[members[: slots.size]] = slots[: members.size]
+    return table_of
+
+
+def _heuristic_counts(ctx: ScoringContext, weights: Dict[str, float]) -> Optional[np.ndarray]:
+    """Per-table category counts of a quick heuristic layout (None if capacity is insufficient)."""
+    if ctx.capacity.sum() < ctx.n_guests:
+        return None
+    table_of = _greedy_construct(ctx, pair_values(ctx, weights), priority_weight(weights))
+    table_of, _ = improve(ctx, weights, table_of, max_passes=5)
+    return ctx.counts(table_of)
+
+
+def generate_layout_aggregated(
+    guests: List[Guest],
+    venue: VenueConfig,
+    weights: Dict[str, float],
+    time_limit: Optional[float] = DEFAULT_TIME_LIMIT,
+) -> Tuple[Layout, ConstraintSummary]:
+    """
+    Solve the category-count model and expand it to a guest-level layout.
+    The model is warm-started from the greedy + local search heuristic.
+    """
+    if not guests or not venue.tables:
+        return _dummy_layout(guests, venue)
+    if has_households(guests) or has_affinity(venue.affinity):
+        # Category counts cannot keep households together or express guest-level pairs
+        print("⚠ Warning: aggregated engine does not support households or explicit affinities; using the heuristic engine")
+        return generate_layout_heuristic(guests, venue, weights)
+    if has_domain_rules(venue):
+        # ... or per-guest table domains
+        print("⚠ Warning: aggregated engine does not support pins or table eligibility rules; using the heuristic engine")
+        return generate_layout_heuristic(guests, venue, weights)
+
+    timer = PhaseTimer()
+    stats: Dict[str, Any] = {"timings": timer.timings, "engine": "aggregated"}
+    ctx = build_context(guests, venue)
+    try:
+        with timer.phase("model_build"):
+            model, y = build_count_model(ctx, weights)
+            model.update()
+        stats["model"] = _model_size(model)
+        if time_limit is not None:
+            model.setParam('TimeLimit', time_limit)
+
+        with timer.phase("warm_start"):
+            start_counts = _heuristic_counts(ctx, weights)
+            if start_counts is not None:
+                for (c, t), var in y.items():
+                    var.Start = int(start_counts[t, c])
+
+        with timer.phase("solve"):
+            model.optimize()
+        stats["solver"] = _solver_stats(model)
+        if model.SolCount == 0:
+            layout, summary = _dummy_layout(guests, venue)
+            layout.stats = stats
+            return layout, summary
+
+        with timer.phase("extraction"):
+            table_of = expand_counts(ctx, guests, read_counts(ctx, y, ctx.n_tables))
+    except Exception as e:
+        stats["error"] = f"{type(e).__name__}: {e}"
+        layout, summary = _dummy_layout(guests, venue)
+        layout.stats = stats
+        return layout, summary
+
+    assignments = {ctx.guest_ids[g]: ctx.table_ids[t] for g, t in enumerate(table_of)}
+    terms = ctx.terms_from_counts(ctx.counts(table_of), table_of)
+    layout, summary = _make_layout("aggregated", assignments, weighted_score(terms, weights), weights)
+    layout.stats = stats
+    return layout, summary
@@ -1,6 +1,11 @@
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from pathlib import Path
+from dataclasses import asdict
+import asyncio
+import contextvars
+import functools
 import os
+import time
 
 # Load .env file early (before any other imports that might use env vars)
 from dotenv import load_dotenv
@@ -14,12 +19,42 @@ elif (Path(__file__).parent / ".env").exists():
     # Fallback to backend/.env
     load_dotenv(Path(__file__).parent / ".env")
 
-from fastapi import FastAPI
+from fastapi import FastAPI, File, HTTPException, Request, UploadFile
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from pydantic import BaseModel, RootModel
 
 from .seat_harmony_task import SeatHarmonyTask, SeatHarmonyState
-from .models import layout_to_dict
+from .batch import DEFAULT_DEADLINE_SECONDS, shutdown_executor, stream_batch
+from .jobs import Dispatcher, get_dispatcher, shutdown_dispatcher
+from .admission import (
+    PORTFOLIO_ENGINE,
+    ROUTED_ENGINES,
+    TOT_MODES,
+    AdmissionError,
+    AdmissionLimits,
+    RoutingDecision,
+    admit,
+)
+from .metrics import LLM_CALLS, REGISTRY, REQUEST_SECONDS, PhaseTimer
+from .affinity import from_coo, from_csr
+from .models import Affinity, Guest, Table, VenueConfig, layout_to_dict
+from .optimizer import generate_diverse_layouts
+from .isolation import WorkerLost, run_isolated, shutdown_isolated_solvers
+from .singleflight import SingleFlight, request_key
+from .solver_pool import (
+    GENERATE,
+    INTERACTIVE,
+    TENANT_HEADER,
+    QueueFull,
+    current_tenant,
+    get_solver_pool,
+    set_tenant,
+    shutdown_solver_pool,
+)
+from .profiling import PROFILE_HEADER, PROFILE_PATH_HEADER, profiled, start_request
+from .warmup import readiness, start_warmup
 
 
 class GuestIn(BaseModel):
@@ -28,6 +63,7 @@ class GuestIn(BaseModel):
     group_id: Optional[str] = None
     importance: int = 0
     tags: List[str] = []
+    household_id: Optional[str] = None
 
 
 class TableIn(BaseModel):
@@ -48,13 +84,142 @@ class TotParams(BaseModel):
     n_generate: int = 4
     n_evaluate: int = 4
     top_k: int = 3
+    # "tot" runs the Tree-of-Thoughts search; "pool" returns top_k diverse
+    # layouts from a single solution-pool solve.
+    mode: str = "tot"
+    min_difference: Optional[int] = None
+
+
+class SparseMatrixIn(BaseModel):
+    """Sparse guest x guest matrix; indices are positions in `guests`."""
+
+    format: str = "coo"  # "coo" (row/col/data) or "csr" (indptr/indices/data)
+    row: List[int] = []
+    col: List[int] = []
+    indptr: List[int] = []
+    indices: List[int] = []
+    data: List[float] = []
+
+
+class InstanceChangeIn(BaseModel):
+    # add_guest / update_guest (guest), add_table / update_table (table), remove_guest / remove_table (id)
+    op: str
+    guest: Optional[GuestIn] = None
+    table: Optional[TableIn] = None
+    id: Optional[str] = None
 
 
 class LayoutRequest(BaseModel):
+    # Either the instance itself, or `session_id` of an uploaded one (POST /api/sessions) plus an optional `patch`
+    guests: List[GuestIn] = []
+    tables: List[TableIn] = []
+    settings: Dict[str, Any] = {}
+    tot: TotParams = TotParams()
+    # "auto" lets admission control pick "milp", "aggregated", "decomposed", "lns" or "heuristic";
+    # "portfolio" races several engines and keeps the best layout at its deadline
+    engine: str = "auto"
+    # Positive entries reward seating two guests together; negative entries keep them apart
+    affinity: Optional[SparseMatrixIn] = None
+    session_id: Optional[str] = None
+    patch: List[InstanceChangeIn] = []
+    # Second stage: also order the guests around each table of the returned layouts
+    seat_assignment: bool = False
+
+
+class SessionCreateRequest(BaseModel):
     guests: List[GuestIn]
     tables: List[TableIn]
     settings: Dict[str, Any] = {}
-    tot: TotParams = TotParams()
+    affinity: Optional[SparseMatrixIn] = None
+
+
+class BatchEventIn(BaseModel):
+    event_id: Optional[str] = None
+    request: LayoutRequest
+    # Seconds from batch submission; defaults to the batch-level deadline
+    deadline_seconds: Optional[float] = None
+
+
+class BatchLayoutRequest(BaseModel):
+    events: List[BatchEventIn]
+    deadline_seconds: float = DEFAULT_DEADLINE_SECONDS
+
+
+class RepairRequest(BaseModel):
+    guests: List[GuestIn] = []
+    tables: List[TableIn] = []
+    settings: Dict[str, Any] = {}
+    weights: Dict[str, float]  # The weights of the layout being edited
+    affinity: Optional[SparseMatrixIn] = None
+    session_id: Optional[str] = None
+    patch: List[InstanceChangeIn] = []
+    assignments: Dict[str, str]  # Current layout: guest_id -> table_id
+    pinned: Dict[str, str] = {}  # Guests the planner placed by hand: guest_id -> table_id
+    budget_ms: float = 80.0
+
+
+class MoveIn(BaseModel):
+    guest_id: str
+    table_id: str
+
+
+class SwapIn(BaseModel):
+    guest_id: str
+    other_guest_id: str
+
+
+class WhatIfRequest(BaseModel):
+    guests: List[GuestIn] = []
+    tables: List[TableIn] = []
+    settings: Dict[str, Any] = {}
+    weights: Dict[str, float]  # The weights of the layout being evaluated
+    affinity: Optional[SparseMatrixIn] = None
+    session_id: Optional[str] = None
+    patch: List[InstanceChangeIn] = []
+    assignments: Dict[str, str]  # guest_id -> table_id
+    moves: List[MoveIn] = []
+    swaps: List[SwapIn] = []
+    # Rank all moves/swaps of one guest, or of the guests at one table
+    rank_guest_id: Optional[str] = None
+    rank_table_id: Optional[str] = None
+    limit: int = 10
+
+
+class InstanceCreateRequest(BaseModel):
+    guests: List[GuestIn]
+    tables: List[TableIn]
+    settings: Dict[str, Any] = {}
+    weights: Dict[str, float]
+    affinity: Optional[SparseMatrixIn] = None
+    # Current best layout (guest_id -> table_id); seated by the heuristic if empty
+    assignments: Dict[str, str] = {}
+
+
+class InstanceChangesRequest(BaseModel):
+    changes: List[InstanceChangeIn]
+    # Version the changes were made against; rejected with 409 if the instance has moved on
+    version: Optional[int] = None
+    budget_ms: float = 80.0
+    # > 0: also re-solve the touched tables with the sub-MILP for up to this long
+    solver_seconds: float = 0.0
+
+
+class FrontierRequest(BaseModel):
+    guests: List[GuestIn] = []
+    tables: List[TableIn] = []
+    settings: Dict[str, Any] = {}
+    affinity: Optional[SparseMatrixIn] = None
+    session_id: Optional[str] = None
+    patch: List[InstanceChangeIn] = []
+    max_points: int = 12
+    time_limit: float = 30.0  # Seconds for the whole frontier, at most the request budget
+
+
+class FrontierQueryRequest(BaseModel):
+    weights: Dict[str, float] = {}
+    # Minimum (unweighted) value per term, e.g. {"family_cohesion": 20}
+    min_terms: Dict[str, float] = {}
+    limit: int = 5
 
 
 class ExplainRequest(BaseModel):
@@ -62,15 +227,21 @@ class ExplainRequest(BaseModel):
 
 
 class ExplainGuestsRequest(BaseModel):
-    guests: List[GuestIn]
-    tables: List[TableIn]
+    guests: List[GuestIn] = []
+    tables: List[TableIn] = []
     layout: Dict[str, Any]  # The layout with assignments
     weights: Dict[str, float]  # The weights used for this layout
     notes: str  # The strategy/thought name (e.g., "traditional_seating")
+    session_id: Optional[str] = None
+    patch: List[InstanceChangeIn] = []
 
 
 app = FastAPI(title="SeatHarmony ToT API")
 
+# Identical concurrent generate / explain-guests requests share one computation
+GENERATE_FLIGHTS = SingleFlight("generate")
+EXPLAIN_GUESTS_FLIGHTS = SingleFlight("explain_guests")
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -80,6 +251,27 @@ app.add_middleware(
 )
 
 
+@app.middleware("http")
+async def timing_middleware(request: Request, call_next):
+    """Record request latency and, for opted-in requests, attach the profile report path."""
+    holder = start_request(request.headers.get(PROFILE_HEADER))
+    set_tenant(request.headers.get(TENANT_HEADER) or (request.client.host if request.client else "anonymous"))
+    start = time.perf_counter()
+    response = await call_next(request)
+    route = request.scope.get("route")
+    path = getattr(route, "path", request.url.path)
+    REQUEST_SECONDS.observe(time.perf_counter() - start, path=path, status=str(response.status_code))
+    if holder is not None and holder.get("path"):
+        response.headers[PROFILE_PATH_HEADER] = holder["path"]
+    return response
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics() -> PlainTextResponse:
+    """Prometheus text exposition of the in-process metrics."""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+
 @app.on_event("startup")
 async def startup_event():
     """Verify API key is available on startup."""
@@ -96,6 +288,47 @@ async def startup_event():
         print("⚠ Warning: No API key found. Set GEMINI_API_KEY or OPENAI_API_KEY in .env file")
         print(f"  (Looked for .env at: {env_file} or {Path(__file__).parent / '.env'})")
 
+    # Solver/ingest/LLM modules are imported lazily; load them in the background
+    start_warmup()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    shutdown_executor()
+    shutdown_dispatcher()
+    shutdown_solver_pool()
+    shutdown_isolated_solvers()
+
+
+def _on_solver_pool(priority: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """
+    Run a sync handler on a solver slot (`solver_pool.py`); the wrapper is a
+    coroutine, so a request waiting for its slot holds no thread. 429 with
+    Retry-After when the priority queue is full.
+    """
+
+    def decorator(fn: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(fn)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            # The request's context (tenant, profiling) goes along to the solver thread
+            task = functools.partial(contextvars.copy_context().run, fn, *args, **kwargs)
+            try:
+                future = get_solver_pool().submit(priority, current_tenant(), task)
+            except QueueFull as e:
+                raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+            return await asyncio.wrap_future(future)
+
+        return wrapper
+
+    return decorator
+
+
+@app.get("/api/ready")
+def ready() -> JSONResponse:
+    """Readiness probe: 200 once the solver stack and guest-list reader are loaded, 503 before."""
+    is_ready, components = readiness()
+    return JSONResponse({"ready": is_ready, "components": components}, status_code=200 if is_ready else 503)
+
 
 def _simple_tot_bfs(
     instance: Dict[str, Any],
@@ -103,12 +336,16 @@ def _simple_tot_bfs(
     branching: int,
     n_generate: int,
     n_evaluate: int,
+    engine: str = "milp",
+    layout_cache: Optional[Any] = None,
+    deadline: Optional[float] = None,
 ) -> List[Tuple[SeatHarmonyState, float]]:
     """
     Server-side version of the lightweight Tree-of-Thoughts-style BFS.
-    Returns a list of (state, value) pairs.
+    Returns a list of (state, value) pairs. With a `deadline` (time.monotonic())
+    every solve is limited to the time left, and no solve starts after it.
     """
-    task = SeatHarmonyTask()
+    task = SeatHarmonyTask(engine=engine, layout_cache=layout_cache, deadline=deadline)
     root = task.get_initial_state(instance)
 
     frontier: List[SeatHarmonyState] = [root]
@@ -120,7 +357,7 @@ def _simple_tot_bfs(
         for state in frontier:
             thoughts = task.generate_thoughts(state, n_generate)[:branching]
             children: List[SeatHarmonyState] = [
-                task.apply_thought(state, t) for t in thoughts
+                task.apply_thought(state, t) for t in thoughts if not task.expired()
             ]
 
             evaluated = task.evaluate_states(children, n_evaluate)
@@ -135,21 +372,323 @@ def _simple_tot_bfs(
 
 
 @app.post("/api/layouts/generate")
-def generate_layouts(req: LayoutRequest) -> Dict[str, Any]:
+async def generate_layouts(req: LayoutRequest) -> Dict[str, Any]:
+    # Preparation scales with the instance: on a thread, so it never blocks the event loop
+    session, key = await run_in_threadpool(_prepare_layout_request, req)
+
+    async def generate() -> Dict[str, Any]:
+        # Admit first: rejected requests never take a queue place or a solver slot
+        affinity, decision = await run_in_threadpool(_admit_layout_request, req)
+        dispatcher = get_dispatcher()
+        if dispatcher is None:
+            return await _solve_layout_request(req, session, decision, affinity)
+        return await _dispatch_layout_request(dispatcher, req)
+
+    return await GENERATE_FLIGHTS.do_async(key, generate)
+
+
+def _prepare_layout_request(req: LayoutRequest) -> Tuple[Optional[Any], str]:
+    """The request's session (its arrays filled in) and its single-flight key."""
+    session = _fill_from_session(req)
+    return session, request_key(req.dict())
+
+
+def _admit_layout_request(req: LayoutRequest) -> Tuple[Optional[Affinity], RoutingDecision]:
+    affinity = _parse_affinity(req.guests, req.affinity)
+    return affinity, _admit(req, None, affinity)
+
+
+@_on_solver_pool(GENERATE)
+@profiled
+def _solve_layout_request(
+    req: LayoutRequest, session: Optional[Any], decision: RoutingDecision, affinity: Optional[Affinity]
+) -> Dict[str, Any]:
+    return run_layout_request(req, session=session, decision=decision, affinity=affinity)
+
+
+async def _dispatch_layout_request(dispatcher: Dispatcher, req: LayoutRequest) -> Dict[str, Any]:
+    """Solve an admitted request on a worker and wait for its result."""
+    timeout = AdmissionLimits().request_budget_seconds
+    # The worker bounds admission and every solve by the budget, so an abandoned job frees its slot
+    future = dispatcher.submit(req.dict(), timeout)
+    try:
+        record = await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail=f"No worker finished the request within {timeout:.0f}s")
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"{type(e).__name__}: {e}")
+    finally:
+        if not future.done():
+            # Timed out (or the client left) while a worker runs it: stop tracking the job
+            dispatcher.abandon(future)
+    if record["status"] != "ok":
+        error = record["error"]
+        raise HTTPException(status_code=error.get("status_code", 500), detail=error["detail"])
+    return record["result"]
+
+
+@app.get("/api/workers")
+def list_workers() -> Dict[str, Any]:
+    """Solver workers advertising capacity on the job queue (404 when layouts are solved in the API process)."""
+    dispatcher = get_dispatcher()
+    if dispatcher is None:
+        raise HTTPException(status_code=404, detail="No job queue configured (SEATHARMONY_QUEUE_URL)")
+    workers = dispatcher.queue.workers()
+    return {
+        "queued": dispatcher.queue.depth(),
+        "slots": sum(w.slots for w in workers),
+        "busy": sum(w.busy for w in workers),
+        "workers": [w.to_dict() for w in workers],
+    }
+
+
+def run_layout_request(
+    req: LayoutRequest,
+    budget_seconds: Optional[float] = None,
+    session: Optional[Any] = None,
+    decision: Optional[RoutingDecision] = None,
+    affinity: Optional[Affinity] = None,
+) -> Dict[str, Any]:
+    """
+    Admission, search and serialization for one request (shared by the single and batch endpoints).
+    `budget_seconds` tightens the admission time budget and bounds the solves, e.g. to a batch
+    event's deadline; a `decision` (with the parsed `affinity`) from an earlier admission skips it.
+    With the request's unpatched `session`, layouts solved by earlier searches on it are reused.
+    """
     instance: Dict[str, Any] = {
         "guests": [g.dict() for g in req.guests],
         "tables": [t.dict() for t in req.tables],
         "settings": req.settings,
+        "affinity": affinity if decision is not None else _parse_affinity(req.guests, req.affinity),
     }
 
-    scored_states = _simple_tot_bfs(
-        instance=instance,
-        depth=req.tot.depth,
-        branching=req.tot.branching,
-        n_generate=req.tot.n_generate,
-        n_evaluate=req.tot.n_evaluate,
+    deadline = None if budget_seconds is None else time.monotonic() + budget_seconds
+    timer = PhaseTimer()
+    if decision is None:
+        with timer.phase("admission"):
+            decision = _admit(req, budget_seconds, instance["affinity"])
+
+    if req.tot.mode == "pool":
+        response = _generate_pool_layouts(instance, req.tot, budget_seconds)
+        response["layouts"] = _feasible_layouts(response["layouts"], instance)
+        if req.seat_assignment:
+            with timer.phase("seat_assignment"):
+                _assign_seats(response["layouts"], instance)
+        response["stats"] = {"timings": timer.timings, **_routing_stats(decision)}
+        return response
+
+    with timer.phase("tot_search"):
+        scored_states = _simple_tot_bfs(
+            instance=instance,
+            depth=req.tot.depth,
+            branching=req.tot.branching,
+            n_generate=req.tot.n_generate,
+            n_evaluate=req.tot.n_evaluate,
+            engine=decision.engine,
+            layout_cache=session.layout_cache(decision.engine) if session is not None else None,
+            deadline=deadline,
+        )
+
+    with timer.phase("serialization"):
+        response = _collect_top_layouts(scored_states, req.tot.top_k)
+    response["layouts"] = _feasible_layouts(response["layouts"], instance)
+    if req.seat_assignment:
+        with timer.phase("seat_assignment"):
+            _assign_seats(response["layouts"], instance)
+    response["stats"] = {**_request_stats(timer, scored_states), **_routing_stats(decision)}
+    return response
+
+
+@app.post("/api/layouts/batch")
+async def generate_layouts_batch(req: BatchLayoutRequest) -> StreamingResponse:
+    """
+    Plan many independent events in one call. Events run in parallel on a process
+    pool; one NDJSON line per event is streamed back as it finishes (status "ok",
+    "error" or "deadline_exceeded"), followed by a summary line.
+    """
+    for e in req.events:
+        _fill_from_session(e.request)
+    events = [
+        {
+            "event_id": e.event_id,
+            "request": e.request.dict(),
+            "deadline_seconds": e.deadline_seconds or req.deadline_seconds,
+        }
+        for e in req.events
+    ]
+    return StreamingResponse(stream_batch(events, current_tenant()), media_type="application/x-ndjson")
+
+
+def _parse_affinity(guests: List[GuestIn], m: Optional[SparseMatrixIn]) -> Optional[Affinity]:
+    if m is None:
+        return None
+    guest_ids = [g.id for g in guests]
+    try:
+        if m.format == "coo":
+            return from_coo(guest_ids, m.row, m.col, m.data)
+        if m.format == "csr":
+            return from_csr(guest_ids, m.indptr, m.indices, m.data)
+        raise ValueError(f"Unknown affinity format '{m.format}' (expected 'coo' or 'csr')")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _affinity_matrix(guests: List[Guest], affinity: Optional[Affinity]) -> Optional[SparseMatrixIn]:
+    """COO matrix over `guests` (the inverse of _parse_affinity); conflicts as -1."""
+    if affinity is None:
+        return None
+    index = {g.id: i for i, g in enumerate(guests)}
+    entries = [(a, b, v) for a, b, v in affinity.rewards] + [(a, b, -1.0) for a, b in affinity.conflicts]
+    return SparseMatrixIn(
+        row=[index[a] for a, _, _ in entries], col=[index[b] for _, b, _ in entries], data=[v for _, _, v in entries]
     )
 
+
+def _instance_changes(changes: List[InstanceChangeIn]) -> List[Any]:
+    # Lazy import: instances needs numpy
+    from .instances import InstanceChange
+
+    return [
+        InstanceChange(
+            op=c.op,
+            guest=Guest(**c.guest.dict()) if c.guest else None,
+            table=Table(**c.table.dict()) if c.table else None,
+            id=c.id,
+        )
+        for c in changes
+    ]
+
+
+def _request_instance(req: Any) -> Tuple[List[Guest], VenueConfig, Optional[Any]]:
+    """
+    Guests and venue of a request: its `session_id` (with `patch` applied) or its own arrays.
+    The session is returned only when its cached derived structures apply (no patch).
+    404 for unknown or expired sessions, 400 for invalid patches.
+    """
+    if req.session_id is None:
+        guests = [Guest(**g.dict()) for g in req.guests]
+        venue = VenueConfig(
+            tables=[Table(**t.dict()) for t in req.tables],
+            settings=getattr(req, "settings", {}),
+            affinity=_parse_affinity(req.guests, getattr(req, "affinity", None)),
+        )
+        return guests, venue, None
+
+    from .sessions import SESSIONS, patched
+
+    try:
+        session = SESSIONS.get(req.session_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown or expired session '{req.session_id}'")
+    if not req.patch:
+        return session.guests, session.venue, session
+    try:
+        guests, venue = patched(session, _instance_changes(req.patch))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return guests, venue, None
+
+
+def _fill_from_session(req: Any) -> Optional[Any]:
+    """Replace a session reference by the (patched) instance arrays, for code that works on the request."""
+    if req.session_id is None:
+        return None
+    guests, venue, session = _request_instance(req)
+    req.guests = [GuestIn(**asdict(g)) for g in guests]
+    req.tables = [TableIn(**asdict(t)) for t in venue.tables]
+    if hasattr(req, "settings"):
+        req.settings = venue.settings
+    if hasattr(req, "affinity"):
+        req.affinity = _affinity_matrix(guests, venue.affinity)
+    req.session_id, req.patch = None, []
+    return session
+
+
+def _admit(
+    req: LayoutRequest, budget_seconds: Optional[float] = None, affinity: Optional[Affinity] = None
+) -> RoutingDecision:
+    """
+    Route the request to an engine before any model is built.
+    Raises 413 (instance too large) / 429 (search too expensive) with a suggested cheaper config.
+    """
+    if req.engine != "auto" and req.engine not in ROUTED_ENGINES + (PORTFOLIO_ENGINE,):
+        raise HTTPException(status_code=400, detail=f"Unknown engine '{req.engine}'")
+    _check_tot(req.tot)
+    try:
+        return admit(
+            guests=[Guest(**g.dict()) for g in req.guests],
+            tables=[Table(**t.dict()) for t in req.tables],
+            depth=req.tot.depth,
+            branching=req.tot.branching,
+            n_generate=req.tot.n_generate,
+            n_evaluate=req.tot.n_evaluate,
+            mode=req.tot.mode,
+            engine=req.engine,
+            limits=_admission_limits(budget_seconds),
+            affinity=affinity,
+            settings=req.settings,
+        )
+    except AdmissionError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _check_tot(tot: TotParams) -> None:
+    """400 for an unknown search mode or search sizes no search can run with."""
+    if tot.mode not in TOT_MODES:
+        raise HTTPException(status_code=400, detail=f"Unknown tot.mode '{tot.mode}'; use one of {list(TOT_MODES)}")
+    for name in ("depth", "branching", "n_generate", "n_evaluate", "top_k"):
+        if getattr(tot, name) < 1:
+            raise HTTPException(status_code=400, detail=f"tot.{name} must be positive")
+
+
+def _admission_limits(budget_seconds: Optional[float]) -> AdmissionLimits:
+    limits = AdmissionLimits()
+    if budget_seconds is not None:
+        limits.request_budget_seconds = min(limits.request_budget_seconds, budget_seconds)
+    return limits
+
+
+def _routing_stats(decision: RoutingDecision) -> Dict[str, Any]:
+    return {
+        "engine": decision.engine,
+        "routing_reason": decision.reason,
+        "estimate": decision.estimate.to_dict(),
+    }
+
+
+def _request_stats(timer: PhaseTimer, scored_states: List[Tuple[SeatHarmonyState, float]]) -> Dict[str, Any]:
+    """
+    Request-level timings: ToT search time is split into time spent inside
+    solves (summed from each layout's own stats) and the remaining ToT overhead.
+    """
+    solver_time = 0.0
+    cache_hits = 0
+    stability_hits = 0
+    for state, _ in scored_states:
+        if state.layout is None:
+            continue
+        if state.layout.stats.get("cache_hit"):
+            cache_hits += 1
+            stability_hits += bool(state.layout.stats.get("stability_hit"))
+            continue
+        solver_time += sum(state.layout.stats.get("timings", {}).values())
+    timings = dict(timer.timings)
+    timings["tot_overhead"] = max(0.0, timings.get("tot_search", 0.0) - solver_time)
+    return {
+        "timings": timings,
+        "solves": len(scored_states) - cache_hits,
+        "cache_hits": cache_hits,
+        # Cache hits at new weights a re-solve provably could not improve on (stability.py)
+        "stability_hits": stability_hits,
+    }
+
+
+def _collect_top_layouts(
+    scored_states: List[Tuple[SeatHarmonyState, float]], top_k: int
+) -> Dict[str, Any]:
+    """Serialize the top_k distinct layouts for the response."""
     # Sort by value and take top_k distinct layouts
     unique_layouts: List[Dict[str, Any]] = []
     seen_ids = set()
@@ -170,12 +709,415 @@ def generate_layouts(req: LayoutRequest) -> Dict[str, Any]:
                 "layout": layout_dict,
             }
         )
-        if len(unique_layouts) >= req.tot.top_k:
+        if len(unique_layouts) >= top_k:
             break
 
     return {"layouts": unique_layouts}
 
 
+def _feasible_layouts(layouts: List[Dict[str, Any]], instance: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Drop placeholder ("dummy") layouts of failed solves; 422 when no solve
+    (including the heuristic fallback) produced a layout.
+    """
+    feasible = [item for item in layouts if item["layout"]["id"] != "dummy"]
+    if feasible or not instance["guests"] or not instance["tables"]:
+        return feasible or layouts
+    stats = layouts[0]["layout"]["stats"] if layouts else {}
+    reason = stats.get("error") or (stats.get("degraded") or {}).get("reason") or "no solver produced a layout"
+    raise HTTPException(status_code=422, detail=f"No feasible layout found: {reason}")
+
+
+def _assign_seats(layouts: List[Dict[str, Any]], instance: Dict[str, Any]) -> None:
+    """Seat order within each table of the serialized layouts, solved per table (seating.py)."""
+    # Lazy import: seating needs numpy
+    from .scoring import build_context
+    from .seating import seat_numbers, seat_tables, seating_stats
+
+    guests = [Guest(**g) for g in instance["guests"]]
+    venue = VenueConfig(
+        tables=[Table(**t) for t in instance["tables"]], settings=instance["settings"], affinity=instance["affinity"]
+    )
+    ctx = build_context(guests, venue)
+    for entry in layouts:
+        layout = entry["layout"]
+        start = time.perf_counter()
+        seatings = seat_tables(guests, venue, layout["assignments"], entry["weights"], ctx)
+        layout["seats"] = seat_numbers(seatings)
+        # A copy: cached layouts share their stats
+        layout["stats"] = {
+            **layout["stats"],
+            "seating": {**seating_stats(guests, seatings), "elapsed": time.perf_counter() - start},
+        }
+
+
+def _generate_pool_layouts(
+    instance: Dict[str, Any], tot: TotParams, time_limit: Optional[float] = None
+) -> Dict[str, Any]:
+    """
+    Diverse top-k from a single model: one solution-pool solve at the base
+    weights instead of a full ToT search over weight variants. Limited to
+    `time_limit`, else the request budget, and run on an isolated solver
+    process like engine solves (`isolation.py`); 503 if it is lost.
+    """
+    budget = AdmissionLimits().request_budget_seconds
+    time_limit = budget if time_limit is None else min(time_limit, budget)
+    task = SeatHarmonyTask()
+    root = task.get_initial_state(instance)
+    job = functools.partial(
+        generate_diverse_layouts,
+        guests=root.guests,
+        venue=root.venue,
+        weights=root.weights,
+        k=tot.top_k,
+        min_difference=tot.min_difference,
+        time_limit=time_limit,
+    )
+    try:
+        results = run_isolated(job, (), time_limit, "the solution pool")
+    except WorkerLost as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    layouts: List[Dict[str, Any]] = []
+    for layout, summary in results:
+        layout.summary = summary
+        layouts.append(
+            {
+                "value": layout.score,
+                "weights": root.weights,
+                "notes": "diverse_pool",
+                "layout": layout_to_dict(layout),
+            }
+        )
+    return {"layouts": layouts}
+
+
+@app.post("/api/layouts/repair")
+@_on_solver_pool(INTERACTIVE)
+@profiled
+def repair_layout_endpoint(req: RepairRequest) -> Dict[str, Any]:
+    """
+    Repair a hand-edited layout: pinned guests stay put, only the affected tables
+    (plus a little free room) are re-optimized. Returns the layout and the score delta.
+    409 if the pins alone are infeasible (overfull table, conflicting guests together).
+    """
+    # Lazy import: repair needs numpy
+    from .repair import RepairError, repair_layout
+
+    start = time.perf_counter()
+    guests, venue, session = _request_instance(req)
+    ctx = session.context() if session is not None else None
+    try:
+        result = repair_layout(
+            guests, venue, req.weights, req.assignments, req.pinned, budget_ms=req.budget_ms, ctx=ctx
+        )
+    except RepairError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {
+        "layout": layout_to_dict(result.layout),
+        "score_before": result.score_before,
+        "score": result.layout.score,
+        "delta": result.delta,
+        "moved": result.moved,
+        "neighborhood": result.neighborhood,
+        "elapsed_ms": (time.perf_counter() - start) * 1000,
+    }
+
+
+@app.post("/api/layouts/what-if")
+@_on_solver_pool(INTERACTIVE)
+@profiled
+def what_if_endpoint(req: WhatIfRequest) -> Dict[str, Any]:
+    """
+    Objective delta per term of candidate moves and swaps on a fixed layout,
+    and the best improving moves/swaps for `rank_guest_id` or `rank_table_id`.
+    """
+    # Lazy import: whatif needs numpy
+    import numpy as np
+
+    from .whatif import build_what_if
+
+    start = time.perf_counter()
+    guests, venue, session = _request_instance(req)
+    ctx = session.context() if session is not None else None
+    try:
+        what_if = build_what_if(guests, venue, req.weights, req.assignments, ctx=ctx)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    ctx = what_if.ctx
+    try:
+        move_guests = np.array([ctx.guest_index[m.guest_id] for m in req.moves], dtype=np.int64)
+        move_tables = np.array([ctx.table_index[m.table_id] for m in req.moves], dtype=np.int64)
+        swap_guests = np.array([ctx.guest_index[s.guest_id] for s in req.swaps], dtype=np.int64)
+        swap_others = np.array([ctx.guest_index[s.other_guest_id] for s in req.swaps], dtype=np.int64)
+        rank_guest = ctx.guest_index[req.rank_guest_id] if req.rank_guest_id is not None else None
+        rank_table = ctx.table_index[req.rank_table_id] if req.rank_table_id is not None else None
+    except KeyError as e:
+        raise HTTPException(status_code=400, detail=f"Unknown guest or table id {e}")
+
+    candidates: List[Dict[str, Any]] = []
+    for batch in (what_if.moves(move_guests, move_tables), what_if.swaps(swap_guests, swap_others)):
+        candidates.extend(what_if.row(batch, k) for k in range(len(batch)))
+    best: List[Dict[str, Any]] = []
+    if rank_guest is not None or rank_table is not None:
+        best = what_if.rank(what_if.neighborhood(guest=rank_guest, table=rank_table), req.limit)
+    return {
+        "candidates": candidates,
+        "best": best,
+        "elapsed_ms": (time.perf_counter() - start) * 1000,
+    }
+
+
+@app.post("/api/instances")
+@_on_solver_pool(INTERACTIVE)
+@profiled
+def create_instance(req: InstanceCreateRequest) -> Dict[str, Any]:
+    """Store an instance and its current layout for incremental updates (POST .../changes)."""
+    # Lazy import: these modules need numpy
+    from .heuristic import generate_layout_heuristic
+    from .instances import STORE
+    from .scoring import score_layout
+
+    guests = [Guest(**g.dict()) for g in req.guests]
+    venue = VenueConfig(
+        tables=[Table(**t.dict()) for t in req.tables],
+        settings=req.settings,
+        affinity=_parse_affinity(req.guests, req.affinity),
+    )
+    assignments = dict(req.assignments)
+    if not assignments:
+        layout, _ = generate_layout_heuristic(guests, venue, req.weights)
+        assignments = layout.assignments
+    score = score_layout(guests, venue, assignments, req.weights)
+    instance = STORE.create(guests, venue, req.weights, assignments, score)
+    return _instance_response(instance)
+
+
+@app.get("/api/instances/{instance_id}")
+def get_instance(instance_id: str) -> Dict[str, Any]:
+    from .instances import STORE
+
+    try:
+        return _instance_response(STORE.get(instance_id))
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown instance '{instance_id}'")
+
+
+@app.delete("/api/instances/{instance_id}")
+def delete_instance(instance_id: str) -> Dict[str, Any]:
+    from .instances import STORE
+
+    try:
+        STORE.delete(instance_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown instance '{instance_id}'")
+    return {"deleted": instance_id}
+
+
+@app.post("/api/instances/{instance_id}/changes")
+@_on_solver_pool(INTERACTIVE)
+@profiled
+def apply_instance_changes(instance_id: str, req: InstanceChangesRequest) -> Dict[str, Any]:
+    """
+    Apply guest/table changes to a stored instance and re-optimize only what
+    they touch. 404 for unknown instances, 400 for invalid changes, 409 if the
+    guests no longer fit or `version` is stale.
+    """
+    from .instances import STORE, VersionConflict, reoptimize
+    from .repair import RepairError
+
+    start = time.perf_counter()
+    try:
+        instance = STORE.get(instance_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown instance '{instance_id}'")
+    if req.version is not None and req.version != instance.version:
+        raise HTTPException(
+            status_code=409, detail=f"Instance is at version {instance.version}, not {req.version}"
+        )
+    changes = _instance_changes(req.changes)
+    try:
+        result = reoptimize(instance, changes, budget_ms=req.budget_ms, solver_seconds=req.solver_seconds)
+        STORE.commit(result.instance, instance.version)
+    except (RepairError, VersionConflict) as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown instance '{instance_id}'")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {
+        "instance_id": instance_id,
+        "version": result.instance.version,
+        "layout": layout_to_dict(result.layout),
+        "score_before": result.score_before,
+        "score": result.layout.score,
+        "delta": result.delta,
+        "moved": result.moved,
+        "neighborhood": result.neighborhood,
+        "stats": result.stats,
+        "elapsed_ms": (time.perf_counter() - start) * 1000,
+    }
+
+
+def _instance_response(instance: Any) -> Dict[str, Any]:
+    return {
+        "instance_id": instance.id,
+        "version": instance.version,
+        "guests": len(instance.guests),
+        "tables": len(instance.venue.tables),
+        "assignments": instance.assignments,
+        "score": instance.score,
+    }
+
+
+@app.post("/api/sessions")
+def create_session(req: SessionCreateRequest) -> Dict[str, Any]:
+    """
+    Upload an instance once; generate/explain/repair/what-if requests then pass its
+    `session_id` (and an optional `patch`) instead of the guest and table arrays.
+    """
+    from .sessions import SESSIONS
+
+    guests = [Guest(**g.dict()) for g in req.guests]
+    venue = VenueConfig(
+        tables=[Table(**t.dict()) for t in req.tables],
+        settings=req.settings,
+        affinity=_parse_affinity(req.guests, req.affinity),
+    )
+    session, created = SESSIONS.create(guests, venue, len(req.json()))
+    return {**session.info(), "created": created}
+
+
+@app.get("/api/sessions/{session_id}")
+def get_session(session_id: str) -> Dict[str, Any]:
+    from .sessions import SESSIONS
+
+    try:
+        return SESSIONS.get(session_id).info()
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown or expired session '{session_id}'")
+
+
+@app.delete("/api/sessions/{session_id}")
+def delete_session(session_id: str) -> Dict[str, Any]:
+    from .sessions import SESSIONS
+
+    try:
+        SESSIONS.delete(session_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown or expired session '{session_id}'")
+    return {"deleted": session_id}
+
+
+@app.post("/api/frontiers")
+async def compute_frontier_endpoint(req: FrontierRequest) -> Dict[str, Any]:
+    """
+    Compute and store a set of Pareto-optimal layouts across the objective terms.
+    Query it with POST /api/frontiers/{frontier_id}/query instead of re-solving.
+    """
+    if req.max_points < 1 or req.time_limit <= 0:
+        raise HTTPException(status_code=400, detail="max_points and time_limit must be positive")
+    # On a thread like generate requests, before taking a solver slot
+    guests, venue = await run_in_threadpool(_admit_frontier_request, req)
+    return await _compute_frontier(guests, venue, req)
+
+
+def _admit_frontier_request(req: FrontierRequest) -> Tuple[List[Guest], VenueConfig]:
+    """The request's instance, admitted as a single MILP solve (413/429 otherwise)."""
+    guests, venue, _ = _request_instance(req)
+    _admit(
+        LayoutRequest(
+            guests=[GuestIn(**asdict(g)) for g in guests],
+            tables=[TableIn(**asdict(t)) for t in venue.tables],
+            settings=venue.settings,
+            engine="milp",
+            tot=TotParams(depth=1, branching=1, n_generate=1, n_evaluate=1),
+        ),
+        None,
+        venue.affinity,
+    )
+    return guests, venue
+
+
+@_on_solver_pool(GENERATE)
+@profiled
+def _compute_frontier(guests: List[Guest], venue: VenueConfig, req: FrontierRequest) -> Dict[str, Any]:
+    """On an isolated, memory-capped solver process like engine solves (`isolation.py`); 503 if it is lost."""
+    # Lazy import: frontier needs numpy and gurobipy
+    from .frontier import FRONTIERS, compute_frontier
+
+    time_limit = min(req.time_limit, AdmissionLimits().request_budget_seconds)
+    try:
+        frontier = run_isolated(compute_frontier, (guests, venue, req.max_points, time_limit), time_limit, "the frontier")
+    except WorkerLost as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    FRONTIERS.add(frontier)
+    return frontier.to_dict()
+
+
+def _stored_frontier(frontier_id: str) -> Any:
+    from .frontier import FRONTIERS
+
+    try:
+        return FRONTIERS.get(frontier_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown or evicted frontier '{frontier_id}'")
+
+
+@app.get("/api/frontiers/{frontier_id}")
+def get_frontier(frontier_id: str) -> Dict[str, Any]:
+    """A stored frontier's points and term values (without assignments)."""
+    return _stored_frontier(frontier_id).to_dict(assignments=False)
+
+
+@app.post("/api/frontiers/{frontier_id}/query")
+def query_frontier(frontier_id: str, req: FrontierQueryRequest) -> Dict[str, Any]:
+    """The stored layouts that meet `min_terms`, best first for `weights`; no solving."""
+    frontier = _stored_frontier(frontier_id)
+    known = set(frontier.points[0].terms) if frontier.points else set()
+    unknown = sorted((set(req.weights) | set(req.min_terms)) - known)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown terms {unknown}")
+    return {"frontier_id": frontier.id, "points": frontier.query(req.weights, req.min_terms, req.limit)}
+
+
+@app.delete("/api/frontiers/{frontier_id}")
+def delete_frontier(frontier_id: str) -> Dict[str, Any]:
+    from .frontier import FRONTIERS
+
+    try:
+        FRONTIERS.delete(frontier_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown or evicted frontier '{frontier_id}'")
+    return {"deleted": frontier_id}
+
+
+@app.post("/api/guests/import")
+def import_guests(file: UploadFile = File(...)) -> Dict[str, Any]:
+    """
+    Import a guest list from an uploaded XLSX or CSV file.
+    The file is streamed in chunks; returns guests in the `GuestIn` shape plus category counts.
+    """
+    # Lazy import: pandas is only needed here
+    from .ingest import read_guest_list
+
+    try:
+        guest_list = read_guest_list(file.file, filename=file.filename)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return {
+        "guests": guest_list.to_dicts(),
+        "count": len(guest_list),
+        "categories": guest_list.category_counts(),
+        "columns": {"name": guest_list.name_column, "category": guest_list.category_column},
+    }
+
+
 @app.post("/api/layouts/explain")
 def explain_layout(req: ExplainRequest) -> Dict[str, Any]:
     """
@@ -230,11 +1172,14 @@ def _explain_guests_batch(
     assignments: Dict[str, str],
     weights: Dict[str, float],
     notes: str,
+    timer: Optional[PhaseTimer] = None,
 ) -> Dict[str, str]:
     """
     Generate explanations for all guests at a table in a single LLM call.
     Returns a dict mapping guest_id -> explanation.
+    The LLM call is timed under the "llm" phase of `timer`.
     """
+    timer = timer or PhaseTimer()
     from tot.models import gpt
     
     # Build table context
@@ -315,7 +1260,9 @@ Now generate ONE natural, concise sentence for each of the {len(table_guests)} g
 
     try:
         # Reduced max_tokens since we're generating one sentence per guest
-        response = gpt(prompt, model="gpt-4", temperature=0.7, max_tokens=400, n=1)[0]
+        with timer.phase("llm"):
+            response = gpt(prompt, model="gpt-4", temperature=0.7, max_tokens=400, n=1)[0]
+        LLM_CALLS.inc(call="explain_guests", outcome="ok")
         
         # Parse the response to extract individual explanations
         explanations = {}
@@ -398,6 +1345,7 @@ Now generate ONE natural, concise sentence for each of the {len(table_guests)} g
         
     except Exception as e:
         # Fallback if LLM call fails
+        LLM_CALLS.inc(call="explain_guests", outcome="error")
         print(f"Error generating explanations: {e}")
         fallback_explanations = {}
         for g in table_guests:
@@ -412,11 +1360,17 @@ Now generate ONE natural, concise sentence for each of the {len(table_guests)} g
 
 
 @app.post("/api/layouts/explain-guests")
+@profiled
 def explain_guests_seating(req: ExplainGuestsRequest) -> Dict[str, Any]:
     """
     Generate explanations for all guests, batched by table.
     Returns a dict mapping guest_id -> explanation.
     """
+    _fill_from_session(req)
+    return EXPLAIN_GUESTS_FLIGHTS.do(request_key(req.dict()), lambda: _explain_guests_seating(req))
+
+
+def _explain_guests_seating(req: ExplainGuestsRequest) -> Dict[str, Any]:
     assignments = req.layout.get("assignments", {})
     all_guests_dict = {g.id: g.dict() for g in req.guests}
     all_tables_dict = {t.id: t.dict() for t in req.tables}
@@ -432,6 +1386,7 @@ def explain_guests_seating(req: ExplainGuestsRequest) -> Dict[str, Any]:
     # Generate explanations for each table (batched)
     all_explanations: Dict[str, str] = {}
     tables_list = list(req.tables)
+    timer = PhaseTimer()
     
     for table_id, table_guests in table_to_guests.items():
         if not table_guests or table_id not in all_tables_dict:
@@ -450,11 +1405,12 @@ def explain_guests_seating(req: ExplainGuestsRequest) -> Dict[str, Any]:
             assignments=assignments,
             weights=req.weights,
             notes=req.notes,
+            timer=timer,
         )
         
         all_explanations.update(table_explanations)
     
-    return {"explanations": all_explanations}
+    return {"explanations": all_explanations, "stats": {"timings": timer.timings}}
 
 
 
@@ -0,0 +1,206 @@
+"""
+Batch planning: many independent layout requests in one call.
+
+Events are scheduled on a process pool sized to the machine (one ToT search
+per worker process, Gurobi threads split between workers), each holding a
+solver slot at the lowest priority (`solver_pool.py`), and results are
+streamed back as newline-delimited JSON in completion order. Every event has a
+deadline; events not started by then are cancelled, and events still running
+are reported as `deadline_exceeded` (their result is discarded; their solves
+are time-limited to the deadline, so the worker is soon free again). A failing
+event only produces an error line for that event. With a job queue configured
+(`jobs.py`), events go to the solver workers instead of the local pool.
+"""
+
+import asyncio
+import functools
+import json
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FuturesTimeout
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional
+
+from .isolation import ISOLATION_ENV, limit_memory
+from .solver_pool import BATCH, QueueFull, get_solver_pool
+
+DEFAULT_DEADLINE_SECONDS = 120.0
+# How often a batch waiting for room in the solver queue retries
+BACKLOG_POLL_SECONDS = 0.25
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def batch_workers() -> int:
+    return int(os.getenv("SEATHARMONY_BATCH_WORKERS") or os.cpu_count() or 1)
+
+
+def _init_worker(solver_threads: int) -> None:
+    """
+    Load the solver stack once per worker, cap Gurobi threads to avoid
+    oversubscription, and cap the worker's memory (`isolation.py`).
+    """
+    # Solver processes solve directly, under their own caps
+    os.environ[ISOLATION_ENV] = "0"
+    memory_mb = limit_memory()
+    try:
+        from .optimizer import _gurobi
+
+        gp, _ = _gurobi()
+        gp.setParam("OutputFlag", 0)
+        gp.setParam("Threads", solver_threads)
+        if memory_mb > 0:
+            gp.setParam("MemLimit", memory_mb / 1024)
+    except Exception as e:
+        print(f"⚠ Warning: batch worker could not initialize Gurobi: {e}")
+
+
+def get_executor() -> ProcessPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            workers = batch_workers()
+            solver_threads = max(1, (os.cpu_count() or 1) // workers)
+            # spawn: the API process holds threads (server, warm-up) that must not be forked
+            _executor = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(solver_threads,),
+            )
+        return _executor
+
+
+def shutdown_executor() -> None:
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+def _run_event(payload: Dict[str, Any], budget_seconds: float) -> Dict[str, Any]:
+    """Worker entry point: run one LayoutRequest, turning HTTP errors into an error record."""
+    # Lazy import to avoid circular deps
+    from fastapi import HTTPException
+
+    from .api import LayoutRequest, run_layout_request
+
+    try:
+        return {"status": "ok", "result": run_layout_request(LayoutRequest(**payload), budget_seconds)}
+    except HTTPException as e:
+        return {"status": "error", "error": {"status_code": e.status_code, "detail": e.detail}}
+
+
+def _line(record: Dict[str, Any]) -> bytes:
+    return (json.dumps(record, default=str) + "\n").encode("utf-8")
+
+
+def _run_local(payload: Dict[str, Any], deadline: float) -> Dict[str, Any]:
+    """
+    Solver slot task: run one event on the process pool, with the time left
+    until its deadline as the budget (admission and every solve's time
+    limit), so an event past its deadline frees its worker process soon after
+    its slot. The slot is given back at the deadline.
+    """
+    remaining = max(deadline - time.monotonic(), 0.01)
+    future = get_executor().submit(_run_event, payload, remaining)
+    try:
+        return future.result(timeout=remaining)
+    except FuturesTimeout:
+        future.cancel()
+        raise
+
+
+async def stream_batch(events: List[Dict[str, Any]], tenant: str = "anonymous") -> AsyncIterator[bytes]:
+    """
+    Run events ({"event_id", "request", "deadline_seconds"}) and yield one
+    NDJSON line per event as it finishes, then a summary line.
+    """
+    start = time.monotonic()
+    # Lazy import to avoid circular deps (jobs -> worker -> batch)
+    from .jobs import get_dispatcher
+
+    dispatcher = get_dispatcher()
+    pool = get_solver_pool() if dispatcher is None else None
+    counts: Dict[str, int] = {}
+    pending: Dict["asyncio.Future[Any]", Dict[str, Any]] = {}
+    # Events not yet queued for a solver slot: a batch waits for room instead of being rejected
+    backlog: Deque[Dict[str, Any]] = deque()
+    for index, event in enumerate(events):
+        deadline_seconds = event.get("deadline_seconds") or DEFAULT_DEADLINE_SECONDS
+        meta = {
+            "index": index,
+            "event_id": event.get("event_id") or str(index),
+            "deadline": start + deadline_seconds,
+            "request": event["request"],
+        }
+        if pool is not None:
+            backlog.append(meta)
+            continue
+        try:
+            future: Future = dispatcher.submit(event["request"], deadline_seconds)
+        except Exception as e:
+            counts["error"] = counts.get("error", 0) + 1
+            yield _line({**_public(meta, start), "status": "error", "error": {"detail": f"{type(e).__name__}: {e}"}})
+            continue
+        meta["future"] = future
+        pending[asyncio.wrap_future(future)] = meta
+
+    while pending or backlog:
+        while backlog:
+            meta = backlog[0]
+            try:
+                future = pool.submit(BATCH, tenant, functools.partial(_run_local, meta["request"], meta["deadline"]))
+            except QueueFull:
+                break
+            backlog.popleft()
+            meta["future"] = future
+            pending[asyncio.wrap_future(future)] = meta
+
+        deadlines = [m["deadline"] for m in pending.values()] + [m["deadline"] for m in backlog]
+        timeout = max(0.0, min(deadlines) - time.monotonic())
+        if backlog:
+            timeout = min(timeout, BACKLOG_POLL_SECONDS)
+        if pending:
+            done, _ = await asyncio.wait(pending.keys(), timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+        else:
+            done = set()
+            await asyncio.sleep(timeout)
+        for waiter in done:
+            meta = pending.pop(waiter)
+            try:
+                record = waiter.result()
+            except Exception as e:
+                # Worker crash or unpicklable result: only this event fails
+                if isinstance(e, BrokenProcessPool):
+                    shutdown_executor()  # the next batch gets a fresh pool
+                record = {"status": "error", "error": {"detail": f"{type(e).__name__}: {e}"}}
+            counts[record["status"]] = counts.get(record["status"], 0) + 1
+            yield _line({**_public(meta, start), **record})
+
+        now = time.monotonic()
+        for waiter, meta in list(pending.items()):
+            if meta["deadline"] > now:
+                continue
+            del pending[waiter]
+            started = not meta["future"].cancel()
+            if started and dispatcher is not None:
+                dispatcher.abandon(meta["future"])
+            counts["deadline_exceeded"] = counts.get("deadline_exceeded", 0) + 1
+            yield _line({**_public(meta, start), "status": "deadline_exceeded", "started": started})
+        for meta in [m for m in backlog if m["deadline"] <= now]:
+            backlog.remove(meta)
+            counts["deadline_exceeded"] = counts.get("deadline_exceeded", 0) + 1
+            yield _line({**_public(meta, start), "status": "deadline_exceeded", "started": False})
+
+    yield _line({"summary": {"events": len(events), **counts, "elapsed": time.monotonic() - start}})
+
+
+def _public(meta: Dict[str, Any], start: float) -> Dict[str, Any]:
+    return {"event_id": meta["event_id"], "index": meta["index"], "elapsed": time.monotonic() - start}
@@ -0,0 +1 @@
+"""Benchmarks for the SeatHarmony backend (run as `python -m backend.benchmarks.<name>`)."""
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark for guest-list ingestion.
+
+Writes a synthetic XLSX and CSV guest list (default 50,000 rows) and compares the
+streaming reader in `backend.ingest` with the previous approach (full
+`pd.read_excel` / `pd.read_csv` followed by `iterrows()`).
+
+Usage (from the project root):
+    python -m backend.benchmarks.bench_ingest --rows 50000
+"""
+
+import argparse
+import random
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+import pandas as pd
+
+from backend.ingest import read_guest_list
+from backend.optimizer import CLOSENESS_RANK
+
+FIRST_NAMES = ["Noa", "Yael", "David", "Sarah", "Omer", "Tamar", "Itai", "Maya", "John", "Emma", "Lior", "Dana"]
+LAST_NAMES = ["Cohen", "Levi", "Mizrahi", "Peretz", "Biton", "Smith", "Johnson", "Friedman", "Katz", "Azulay"]
+
+
+def write_guest_files(rows: int, directory: Path, seed: int = 0) -> Tuple[Path, Path]:
+    """Write the same synthetic guest list as XLSX and CSV (Hebrew headers for the category)."""
+    from openpyxl import Workbook
+
+    rng = random.Random(seed)
+    categories = list(CLOSENESS_RANK.keys())
+    records = [
+        (f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {i}", rng.choice(categories) if rng.random() > 0.02 else None)
+        for i in range(rows)
+    ]
+
+    xlsx_path = directory / "guests.xlsx"
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(["Full Guest Name", "קטגוריה", "Notes"])
+    for name, category in records:
+        sheet.append([name, category, ""])
+    workbook.save(xlsx_path)
+
+    csv_path = directory / "guests.csv"
+    pd.DataFrame(records, columns=["Full Guest Name", "קטגוריה"]).to_csv(csv_path, index=False, encoding="utf-8-sig")
+    return xlsx_path, csv_path
+
+
+def _legacy_read(path: Path) -> int:
+    """The previous reader: whole file into a DataFrame, then iterrows()."""
+    df = pd.read_csv(path, encoding="utf-8-sig") if path.suffix == ".csv" else pd.read_excel(path)
+    count = 0
+    for _, row in df.iterrows():
+        name = str(row["Full Guest Name"]).strip()
+        if name and name.lower() != "nan":
+            count += 1
+    return count
+
+
+def _measure(fn: Callable[[], int]) -> Dict[str, float]:
+    """Time one run, then repeat it under tracemalloc (Python-heap peak only) so tracing doesn't skew the timing."""
+    start = time.perf_counter()
+    count = fn()
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "rows": count,
+        "seconds": elapsed,
+        "rows_per_second": count / elapsed if elapsed > 0 else float("inf"),
+        "peak_mb": peak / 1e6,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--skip-legacy", action="store_true", help="Only time the streaming reader")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        xlsx_path, csv_path = write_guest_files(args.rows, Path(tmp))
+        results: List[Tuple[str, Dict[str, float]]] = []
+        for path in (xlsx_path, csv_path):
+            fmt = path.suffix.lstrip(".")
+            results.append((f"stream/{fmt}", _measure(lambda: len(read_guest_list(path)))))
+            if not args.skip_legacy:
+                results.append((f"legacy/{fmt}", _measure(lambda: _legacy_read(path))))
+
+    print(f"{'reader':<14}{'rows':>10}{'seconds':>10}{'rows/s':>12}{'peak MB':>10}")
+    for label, r in results:
+        print(f"{label:<14}{r['rows']:>10}{r['seconds']:>10.2f}{r['rows_per_second']:>12.0f}{r['peak_mb']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Optimizer benchmark on synthetic weddings.
+
+For each instance size, times pair enumeration, model build, Gurobi solve and
+assignment extraction separately (plus, optionally, a full ToT search), and
+reports model sizes and peak memory. Every size runs in a fresh process so the
+peak RSS figure belongs to that size alone. Pair enumeration builds only the
+pairs the model uses (no cross-side pairs with compact side mixing), and all
+sizes build and solve the model unless `--max-model-guests` says otherwise;
+the largest sizes need a full Gurobi license.
+
+Usage (from the project root):
+    python -m backend.benchmarks.bench_optimizer --sizes 50 100 200 --save main
+    python -m backend.benchmarks.bench_optimizer --compare backend/benchmarks/baselines/main.json
+"""
+
+import argparse
+import json
+import multiprocessing
+import platform
+import resource
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from backend.benchmarks.synthetic import DEFAULT_SIZES, generate_instance, instance_to_models
+
+BASELINE_DIR = Path(__file__).parent / "baselines"
+
+BENCH_WEIGHTS = {
+    "family_cohesion": 0.8,
+    "social_group_cohesion": 0.6,
+    "side_mixing": 0.3,
+    "relationship_priority": 0.7,
+}
+
+PHASES = ["pair_enumeration", "model_build", "solve", "extraction", "tot_search"]
+
+
+def run_case(
+    n_guests: int,
+    seed: int,
+    time_limit: float,
+    max_model_guests: Optional[int],
+    run_tot: bool,
+) -> Dict[str, Any]:
+    """Benchmark one instance size. Runs in a child process."""
+    from backend.optimizer import (
+        _build_model,
+        _enumerate_pairs,
+        _extract_assignments,
+        _side_counts,
+        _use_compact_side_mixing,
+    )
+
+    instance = generate_instance(n_guests, seed=seed)
+    guests, venue = instance_to_models(instance)
+    result: Dict[str, Any] = {
+        "n_guests": n_guests,
+        "n_tables": len(venue.tables),
+        "timings": {},
+        "model": {},
+    }
+    timings = result["timings"]
+
+    # Same choice as optimizer._build_seating_model: compact side mixing needs no cross-side pairs
+    start = time.perf_counter()
+    n_groom, n_bride = _side_counts(guests)
+    compact = _use_compact_side_mixing(
+        venue.settings, BENCH_WEIGHTS["side_mixing"], n_groom, n_bride, max(t.capacity for t in venue.tables)
+    )
+    pairs = _enumerate_pairs(guests, cross_side=not compact)
+    timings["pair_enumeration"] = time.perf_counter() - start
+    result["side_mixing_model"] = "compact" if compact else "pairs"
+    result["pairs"] = {
+        "family": len(pairs[0]),
+        "social_group": len(pairs[1]),
+        "cross_side": len(pairs[2]),
+    }
+
+    if max_model_guests is not None and n_guests > max_model_guests:
+        result["skipped"] = f"model phases skipped above {max_model_guests} guests"
+    else:
+        try:
+            start = time.perf_counter()
+            model, x = _build_model(guests, venue, BENCH_WEIGHTS, pairs)
+            model.update()
+            timings["model_build"] = time.perf_counter() - start
+            result["model"] = {
+                "vars": model.NumVars,
+                "constrs": model.NumConstrs,
+                "nonzeros": model.NumNZs,
+            }
+
+            model.setParam("TimeLimit", time_limit)
+            start = time.perf_counter()
+            model.optimize()
+            timings["solve"] = time.perf_counter() - start
+            result["model"]["status"] = model.status
+            if model.SolCount > 0:
+                result["model"]["objective"] = model.ObjVal
+                result["model"]["mip_gap"] = model.MIPGap
+                start = time.perf_counter()
+                _extract_assignments(x, [g.id for g in guests], [t.id for t in venue.tables])
+                timings["extraction"] = time.perf_counter() - start
+            model.dispose()
+        except Exception as e:
+            result["error"] = f"{type(e).__name__}: {e}"
+
+        if run_tot and "error" not in result:
+            try:
+                from backend.api import _simple_tot_bfs
+
+                start = time.perf_counter()
+                _simple_tot_bfs(instance, depth=2, branching=4, n_generate=4, n_evaluate=4)
+                timings["tot_search"] = time.perf_counter() - start
+            except ImportError as e:
+                result["tot_skipped"] = f"ToT dependencies unavailable: {e}"
+
+    # Peak RSS covers Python objects and Gurobi's native memory alike;
+    # tracemalloc is avoided because it distorts the timings.
+    result["memory"] = {
+        # ru_maxrss is reported in KiB on Linux and bytes on macOS
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1e6 if sys.platform == "darwin" else 1e3),
+    }
+    return result
+
+
+def _run_isolated(*args: Any) -> Dict[str, Any]:
+    ctx = multiprocessing.get_context("spawn")
+    with ctx.Pool(1) as pool:
+        return pool.apply(run_case, args)
+
+
+def _metadata() -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    try:
+        import gurobipy
+
+        gurobi_version = ".".join(str(v) for v in gurobipy.gurobi.version())
+    except ImportError:
+        gurobi_version = None
+    return {
+        "commit": commit,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "gurobi": gurobi_version,
+    }
+
+
+def print_report(results: List[Dict[str, Any]]) -> None:
+    header = f"{'guests':>7}{'tables':>7}" + "".join(f"{p:>18}" for p in PHASES) + f"{'vars':>10}{'constrs':>10}{'rss MB':>9}"
+    print(header)
+    for r in results:
+        row = f"{r['n_guests']:>7}{r['n_tables']:>7}"
+        for phase in PHASES:
+            value = r["timings"].get(phase)
+            row += f"{value:>17.3f}s" if value is not None else f"{'-':>18}"
+        row += f"{r['model'].get('vars', '-'):>10}{r['model'].get('constrs', '-'):>10}"
+        row += f"{r['memory']['peak_rss_mb']:>9.0f}"
+        print(row)
+        for key in ("skipped", "error", "tot_skipped"):
+            if key in r:
+                print(f"{'':>14}{key}: {r[key]}")
+
+
+def compare(results: List[Dict[str, Any]], baseline_path: Path, threshold: float) -> bool:
+    """Print per-phase ratios against a baseline. Returns True if any phase regressed past `threshold`."""
+    baseline = json.loads(baseline_path.read_text())
+    by_size = {r["n_guests"]: r for r in baseline["results"]}
+    regressed = False
+    print(f"\nComparison against {baseline_path} (commit {baseline['meta'].get('commit')}):")
+    for r in results:
+        base = by_size.get(r["n_guests"])
+        if base is None:
+            continue
+        for phase in PHASES:
+            new, old = r["timings"].get(phase), base["timings"].get(phase)
+            if new is None or not old:
+                continue
+            ratio = new / old
+            flag = "  REGRESSION" if ratio > threshold else ""
+            regressed = regressed or bool(flag)
+            print(f"  {r['n_guests']:>6} guests  {phase:<18}{old:>9.3f}s -> {new:>9.3f}s  x{ratio:.2f}{flag}")
+    return regressed
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--time-limit", type=float, default=60.0, help="Gurobi TimeLimit per solve (seconds)")
+    parser.add_argument(
+        "--max-model-guests", type=int, default=None, help="Only time pair enumeration above this size (default: no limit)"
+    )
+    parser.add_argument("--tot", action="store_true", help="Also time a full ToT search (depth=2, branching=4)")
+    parser.add_argument("--save", metavar="NAME", help=f"Write results to {BASELINE_DIR}/NAME.json")
+    parser.add_argument("--compare", type=Path, metavar="PATH", help="Compare against a saved baseline JSON")
+    parser.add_argument("--threshold", type=float, default=1.25, help="Slowdown ratio reported as a regression")
+    args = parser.parse_args(argv)
+
+    results = [
+        _run_isolated(n, args.seed, args.time_limit, args.max_model_guests, args.tot)
+        for n in args.sizes
+    ]
+    print_report(results)
+
+    if args.save:
+        BASELINE_DIR.mkdir(exist_ok=True)
+        path = BASELINE_DIR / f"{args.save}.json"
+        path.write_text(json.dumps({"meta": _metadata(), "results": results}, indent=2))
+        print(f"\nSaved baseline to {path}")
+
+    if args.compare and compare(results, args.compare, args.threshold):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
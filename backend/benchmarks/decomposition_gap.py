@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Optimality gap of the decomposition engine on synthetic weddings.
+
+For each size, solves the instance with the decomposition engine and with a
+monolithic model (the guest-level MILP, or the exact aggregated count model
+for sizes the MILP cannot handle) and reports both objectives, the relative
+gap and run times. Optionally adds households to the instance (MILP reference only).
+
+Usage (from the project root):
+    python -m backend.benchmarks.decomposition_gap --sizes 50 100 200 --block-tables 5
+    python -m backend.benchmarks.decomposition_gap --sizes 30 60 --households
+    python -m backend.benchmarks.decomposition_gap --sizes 500 1000 --reference aggregated --block-tables 20
+"""
+
+import argparse
+import time
+from dataclasses import replace
+from typing import Any, Dict
+
+from backend.benchmarks.bench_optimizer import BENCH_WEIGHTS
+from backend.benchmarks.synthetic import generate_instance, instance_to_models
+
+
+def run_case(n_guests: int, seed: int, reference: str, block_tables: int, households: bool) -> Dict[str, Any]:
+    from backend.decompose import generate_layout_decomposed
+    from backend.engines import get_engine
+
+    guests, venue = instance_to_models(generate_instance(n_guests, seed=seed))
+    if households:
+        # Pairs of consecutive guests in the first half form households
+        guests = [replace(g, household_id=f"h{i // 2}" if i < n_guests // 2 else None) for i, g in enumerate(guests)]
+
+    start = time.perf_counter()
+    ref, _ = get_engine(reference)(guests, venue, BENCH_WEIGHTS)
+    ref_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    dec, _ = generate_layout_decomposed(guests, venue, BENCH_WEIGHTS, block_tables=block_tables)
+    dec_seconds = time.perf_counter() - start
+
+    gap = (ref.score - dec.score) / abs(ref.score) if ref.score else None
+    return {
+        "n_guests": n_guests,
+        "n_tables": len(venue.tables),
+        "blocks": dec.stats.get("decomposition", {}).get("blocks"),
+        "reference": ref.score,
+        "decomposed": dec.score,
+        "gap": gap,
+        "reference_seconds": ref_seconds,
+        "decomposed_seconds": dec_seconds,
+        "error": ref.stats.get("error") or dec.stats.get("error"),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 100, 200])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--reference", choices=["milp", "aggregated"], default="milp")
+    parser.add_argument("--block-tables", type=int, default=5, help="Tables per block (small, to get several blocks)")
+    parser.add_argument("--households", action="store_true")
+    args = parser.parse_args()
+    if args.households and args.reference == "aggregated":
+        parser.error("the aggregated model cannot keep households together; use --reference milp")
+
+    print(f"{'guests':>7}{'tables':>7}{'blocks':>7}{'reference':>12}{'decomposed':>12}{'gap %':>8}{'ref s':>8}{'dec s':>8}")
+    for n in args.sizes:
+        row = run_case(n, args.seed, args.reference, args.block_tables, args.households)
+        gap = f"{100 * row['gap']:.2f}" if row["gap"] is not None else "-"
+        print(
+            f"{row['n_guests']:>7}{row['n_tables']:>7}{row['blocks'] or '-':>7}{row['reference']:>12.2f}"
+            f"{row['decomposed']:>12.2f}{gap:>8}{row['reference_seconds']:>8.2f}{row['decomposed_seconds']:>8.2f}"
+        )
+        if row["error"]:
+            print(f"  error: {row['error']}")
+
+
+if __name__ == "__main__":
+    main()
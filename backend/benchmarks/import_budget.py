@@ -0,0 +1,74 @@
+"""
+Import-time budget for the API module.
+
+Runs `python -X importtime -c "import backend.api"` in a fresh interpreter,
+reports the total and the slowest modules, and exits non-zero if the total
+exceeds the budget or a heavy dependency (solver, dataframe, LLM client) is
+imported eagerly. Heavy modules belong behind lazy imports; see `warmup.py`.
+
+Usage (from the project root):
+    python -m backend.benchmarks.import_budget --budget-ms 1500
+"""
+
+import argparse
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+# Top-level packages that must not be imported by `import backend.api`
+FORBIDDEN = ("gurobipy", "numpy", "pandas", "openpyxl", "openai", "tot.models")
+
+DEFAULT_BUDGET_MS = 1500.0
+
+
+def measure(module: str = "backend.api") -> Dict[str, Tuple[int, int]]:
+    """module -> (self us, cumulative us) from a fresh interpreter's -X importtime output."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr[-2000:]}")
+
+    times: Dict[str, Tuple[int, int]] = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+
+def check(times: Dict[str, Tuple[int, int]], module: str, budget_ms: float) -> List[str]:
+    problems: List[str] = []
+    total_ms = times[module][1] / 1000
+    if total_ms > budget_ms:
+        problems.append(f"import {module} took {total_ms:.0f}ms (budget {budget_ms:.0f}ms)")
+    for name in FORBIDDEN:
+        if name in times:
+            problems.append(f"{name} is imported eagerly ({times[name][1] / 1000:.0f}ms)")
+    return problems
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="backend.api")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--top", type=int, default=15, help="Number of slowest modules to print")
+    args = parser.parse_args()
+
+    times = measure(args.module)
+    print(f"{'module':<50}{'self ms':>10}{'cumul ms':>10}")
+    for name, (self_us, cumulative_us) in sorted(times.items(), key=lambda kv: kv[1][0], reverse=True)[: args.top]:
+        print(f"{name:<50}{self_us / 1000:>10.1f}{cumulative_us / 1000:>10.1f}")
+    print(f"\nimport {args.module}: {times[args.module][1] / 1000:.0f}ms")
+
+    problems = check(times, args.module, args.budget_ms)
+    for problem in problems:
+        print(f"FAIL: {problem}")
+    sys.exit(1 if problems else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Seeded synthetic wedding instances for benchmarking.
+
+Guests are drawn over every category in `CLOSENESS_RANK` with a skewed mix
+(families and friends dominate, "X's Side" guests are rare), a small share of
+uncategorized guests and a few VIPs. Tables are sized with some slack, mostly
+10-seaters plus a couple of larger head tables.
+"""
+
+import math
+import random
+from typing import Any, Dict, List, Optional, Tuple
+
+from backend.models import Guest, Table, VenueConfig
+
+# Relative share of each category in a typical guest list
+CATEGORY_MIX: Dict[str, float] = {
+    "Groom's Family": 0.07,
+    "Bride's Family": 0.08,
+    "Groom's Extended Family": 0.10,
+    "Bride's Extended Family": 0.11,
+    "Family Friends": 0.07,
+    "Groom's Friends": 0.11,
+    "Bride's Friends": 0.12,
+    "Mutual Friends": 0.06,
+    "Groom's Uni Friends": 0.05,
+    "Bride's Uni Friends": 0.05,
+    "Groom's Work Colleagues": 0.07,
+    "Bride's Work Colleagues": 0.07,
+    "Groom's Side": 0.02,
+    "Bride's Side": 0.02,
+}
+
+UNCATEGORIZED_SHARE = 0.01
+VIP_SHARE = 0.03
+
+DEFAULT_SIZES = [50, 100, 200, 500, 1000, 2000]
+
+
+def generate_instance(
+    n_guests: int,
+    seed: int = 0,
+    seats_per_table: int = 10,
+    slack: float = 0.1,
+    category_mix: Optional[Dict[str, float]] = None,
+) -> Dict[str, Any]:
+    """
+    Generate an API-shaped instance ({"guests", "tables", "settings"}).
+    The same (n_guests, seed) always yields the same instance.
+    """
+    rng = random.Random(f"{seed}-{n_guests}")
+    mix = category_mix or CATEGORY_MIX
+    categories = list(mix.keys())
+    shares = [mix[c] for c in categories]
+
+    guests: List[Dict[str, Any]] = []
+    for i in range(n_guests):
+        category = None if rng.random() < UNCATEGORIZED_SHARE else rng.choices(categories, weights=shares)[0]
+        importance = rng.randint(3, 5) if rng.random() < VIP_SHARE else 0
+        guests.append(
+            {
+                "id": f"guest-{i + 1}",
+                "name": f"Guest {i + 1}",
+                "group_id": category,
+                "importance": importance,
+                "tags": [],
+            }
+        )
+
+    n_tables = max(1, math.ceil(n_guests * (1.0 + slack) / seats_per_table))
+    tables: List[Dict[str, Any]] = []
+    for j in range(n_tables):
+        # The first two tables are larger head tables
+        capacity = seats_per_table + 2 if j < 2 else seats_per_table
+        tables.append(
+            {
+                "id": f"table-{j + 1}",
+                "name": f"Table {j + 1}",
+                "capacity": capacity,
+                "zone": "front" if j < 2 else None,
+                "constraints": {},
+            }
+        )
+
+    return {"guests": guests, "tables": tables, "settings": {}}
+
+
+def instance_to_models(instance: Dict[str, Any]) -> Tuple[List[Guest], VenueConfig]:
+    """Convert an API-shaped instance into optimizer dataclasses."""
+    guests = [Guest(**g) for g in instance["guests"]]
+    tables = [Table(**t) for t in instance["tables"]]
+    return guests, VenueConfig(tables=tables, settings=instance.get("settings", {}))
@@ -0,0 +1,299 @@
+"""
+Two-phase hierarchical decomposition for very large events.
+
+Phase 1 (allocation) decides how many guests of each category sit at each
+table. Tables are split into blocks of consecutive tables (best tables
+first); guests, ordered like the greedy construction (closest relationships
+first, same-category guests consecutively, households whole), are dealt to
+the blocks in proportion to block capacity, and each block's category-count
+model (`aggregate.build_count_model`) is solved independently. Phase 2 turns
+each block's counts into concrete guests: households first, then the
+remaining guests of every category by importance. Blocks run in parallel.
+
+An instance with at most `block_tables` tables is a single block, so phase 1
+is the exact aggregated model; the gap to the monolithic model comes from the
+block split and from households that do not match the counts of any table
+(see `benchmarks/decomposition_gap.py`).
+"""
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .affinity import has_affinity
+from .domains import has_domain_rules
+from .heuristic import _greedy_construct, generate_layout_heuristic, improve
+from .households import contract_households, has_households
+from .metrics import PhaseTimer
+from .models import ConstraintSummary, Guest, Layout, Table, VenueConfig
+from .optimizer import _dummy_layout, _make_layout
+from .scoring import ScoringContext, build_context, pair_values, priority_weight, weighted_score
+
+DEFAULT_BLOCK_TABLES = 20
+DEFAULT_TIME_LIMIT = 10.0  # whole run; split between blocks
+MIN_BLOCK_TIME_LIMIT = 0.2
+BLOCK_MIP_GAP = 0.01
+REPAIR_PASSES = 3
+
+
+def split_blocks(
+    ctx: ScoringContext, party_of: np.ndarray, n_parties: int, block_tables: int
+) -> Optional[List[Tuple[np.ndarray, np.ndarray]]]:
+    """
+    Deal parties to blocks of consecutive tables. Returns (guest indices,
+    table indices) per non-empty block, or None if some party fits no block.
+    """
+    n_blocks = -(-ctx.n_tables // block_tables)
+    table_blocks = np.array_split(np.arange(ctx.n_tables), n_blocks)
+    block_capacity = np.array([ctx.capacity[tables].sum() for tables in table_blocks])
+    # Fill each block up to its share of the guests so that slack is spread evenly
+    target = np.minimum(block_capacity, np.ceil(ctx.n_guests * block_capacity / block_capacity.sum())).astype(np.int64)
+
+    # Parties in greedy-construction order of their first member
+    first = np.full(n_parties, ctx.n_guests, dtype=np.int64)
+    np.minimum.at(first, party_of, np.arange(ctx.n_guests))
+    size = np.bincount(party_of, minlength=n_parties)
+    order = np.lexsort((ctx.guest_category[first], -ctx.guest_closeness[first]))
+
+    block_of = np.full(n_parties, -1, dtype=np.int64)
+    load = np.zeros(n_blocks, dtype=np.int64)
+    b = 0
+    for p in order:
+        while b < n_blocks - 1 and load[b] + size[p] > target[b]:
+            b += 1
+        if load[b] + size[p] <= block_capacity[b]:
+            block_of[p] = b
+            load[b] += size[p]
+    for p in np.flatnonzero(block_of < 0):
+        # Leftovers (large households at block borders): first block with room
+        fits = np.flatnonzero(load + size[p] <= block_capacity)
+        if fits.size == 0:
+            return None
+        block_of[p] = fits[0]
+        load[fits[0]] += size[p]
+
+    guest_block = block_of[party_of]
+    return [
+        (np.flatnonzero(guest_block == k), tables)
+        for k, tables in enumerate(table_blocks)
+        if np.any(guest_block == k)
+    ]
+
+
+def assign_guests(
+    ctx: ScoringContext, guests: List[Guest], counts: np.ndarray, party_of: np.ndarray
+) -> Optional[np.ndarray]:
+    """
+    Phase 2: guest -> table index array realizing per-table category counts.
+    Households (largest first) go to the table whose remaining slots match
+    their members best; members without a slot of their own category take a
+    slot of another category (or an unused seat) at that table. Then every
+    category's remaining guests, most important first, take that category's
+    remaining slots in table order, and any guests left over take the slots
+    and seats left over. Returns None if a household fits no table.
+    """
+    slots = counts.copy()
+    free = ctx.capacity - counts.sum(axis=1)  # seats the counts leave empty
+    table_of = np.full(ctx.n_guests, -1, dtype=np.int64)
+    importance = np.array([g.importance for g in guests])
+    size = np.bincount(party_of)
+
+    households = np.flatnonzero(size > 1)
+    for p in households[np.argsort(-size[households], kind="stable")]:
+        members = np.flatnonzero(party_of == p)
+        need = np.bincount(ctx.guest_category[members], minlength=slots.shape[1])
+        room = slots.sum(axis=1) + free >= members.size
+        if not room.any():
+            return None
+        matched = np.minimum(slots, need).sum(axis=1)
+        t = int(np.argmax(np.where(room, matched, -1)))
+        for g in members:
+            c = ctx.guest_category[g]
+            if slots[t, c] > 0:
+                slots[t, c] -= 1
+            elif free[t] > 0:
+                free[t] -= 1
+            else:
+                slots[t, int(np.argmax(slots[t]))] -= 1
+            table_of[g] = t
+
+    for c in range(slots.shape[1]):
+        members = np.flatnonzero((ctx.guest_category == c) & (table_of < 0))
+        if members.size == 0:
+            continue
+        members = members[np.argsort(-importance[members], kind="stable")]
+        seats = np.repeat(np.arange(slots.shape[0]), slots[:, c])[: members.size]
+        table_of[members[: seats.size]] = seats
+        np.subtract.at(slots[:, c], seats, 1)
+
+    rest = np.flatnonzero(table_of < 0)
+    if rest.size:
+        # Categories whose slots were taken by households use what is left behind
+        rest = rest[np.argsort(-importance[rest], kind="stable")]
+        table_of[rest] = np.repeat(np.arange(slots.shape[0]), slots.sum(axis=1) + free)[: rest.size]
+    return table_of
+
+
+def _solve_block(
+    guests: List[Guest],
+    tables: List[Table],
+    quality: np.ndarray,
+    weights: Dict[str, float],
+    time_limit: Optional[float],
+    solver_threads: int,
+) -> Tuple[np.ndarray, Dict[str, Any]]:
+    """Phase 1 and phase 2 for one block. Returns local table indices per guest and block stats."""
+    # Lazy import: the count model needs gurobipy
+    from .aggregate import _heuristic_counts, build_count_model, read_counts
+    from .optimizer import _solver_stats
+
+    # Table quality (and so the priority term) is that of the table in the whole venue
+    ctx = replace(build_context(guests, VenueConfig(tables=tables)), quality=quality)
+    stats: Dict[str, Any] = {"guests": ctx.n_guests, "tables": ctx.n_tables}
+    start_counts = _heuristic_counts(ctx, weights)
+    counts = None
+    try:
+        model, y = build_count_model(ctx, weights)
+        model.setParam('Threads', solver_threads)
+        model.setParam('MIPGap', BLOCK_MIP_GAP)
+        if time_limit is not None:
+            model.setParam('TimeLimit', time_limit)
+        model.update()
+        if start_counts is not None:
+            for (c, t), var in y.items():
+                var.Start = int(start_counts[t, c])
+        model.optimize()
+        stats["solver"] = _solver_stats(model)
+        if model.SolCount > 0:
+            counts = read_counts(ctx, y, ctx.n_tables)
+    except Exception as e:
+        stats["error"] = f"{type(e).__name__}: {e}"
+    if counts is None:
+        # Solver error or no solution: keep the heuristic allocation
+        counts = start_counts
+    if counts is None:
+        raise ValueError("block capacity is smaller than its guests")
+
+    _, party_of = contract_households(guests)
+    table_of = assign_guests(ctx, guests, counts, party_of)
+    if not has_households(guests):
+        return table_of, stats
+
+    # Households may not match the counts of any table: also seat the block with
+    # the household-aware greedy construction, polish both, keep the better one
+    movable = np.bincount(party_of)[party_of] == 1
+    candidates = {
+        "counts": table_of,
+        "greedy": _greedy_construct(ctx, pair_values(ctx, weights), priority_weight(weights), party_of),
+    }
+    best, best_score = None, -np.inf
+    for name, candidate in candidates.items():
+        if candidate is None:
+            continue
+        candidate, _ = improve(ctx, weights, candidate, max_passes=REPAIR_PASSES, movable=movable)
+        score = weighted_score(ctx.terms_from_counts(ctx.counts(candidate), candidate), weights)
+        if score > best_score:
+            best, best_score, stats["assignment"] = candidate, score, name
+    if best is None:
+        raise ValueError("a household fits no table of its block")
+    return best, stats
+
+
+def generate_layout_decomposed(
+    guests: List[Guest],
+    venue: VenueConfig,
+    weights: Dict[str, float],
+    block_tables: int = DEFAULT_BLOCK_TABLES,
+    time_limit: Optional[float] = DEFAULT_TIME_LIMIT,
+    workers: Optional[int] = None,
+) -> Tuple[Layout, ConstraintSummary]:
+    """
+    Category-to-table allocation per block of tables, then guests within
+    categories; same return shape as the MILP.
+    """
+    if not guests or not venue.tables:
+        return _dummy_layout(guests, venue)
+    if has_affinity(venue.affinity):
+        # Category counts cannot express guest-level pairs
+        print("⚠ Warning: decomposed engine does not support explicit affinities; using the heuristic engine")
+        return generate_layout_heuristic(guests, venue, weights)
+    if has_domain_rules(venue):
+        # Blocks are dealt guests by category order, not by table eligibility
+        print("⚠ Warning: decomposed engine does not support pins or table eligibility rules; using the heuristic engine")
+        return generate_layout_heuristic(guests, venue, weights)
+
+    run_start = time.perf_counter()
+    timer = PhaseTimer()
+    stats: Dict[str, Any] = {"timings": timer.timings, "engine": "decomposed"}
+    ctx = build_context(guests, venue)
+    if ctx.capacity.sum() < ctx.n_guests:
+        return _dummy_layout(guests, venue)
+
+    with timer.phase("allocation"):
+        parties, party_of = contract_households(guests)
+        blocks = split_blocks(ctx, party_of, len(parties), max(1, block_tables))
+    if blocks is None:
+        print("⚠ Warning: a household fits no block of tables; using the heuristic engine")
+        return generate_layout_heuristic(guests, venue, weights)
+
+    workers = max(1, min(len(blocks), workers or os.cpu_count() or 1))
+    solver_threads = max(1, (os.cpu_count() or 1) // workers)
+    block_time_limit = None
+    if time_limit is not None:
+        # Blocks run in waves of `workers`
+        block_time_limit = max(MIN_BLOCK_TIME_LIMIT, time_limit / -(-len(blocks) // workers))
+    start = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(
+                    _solve_block,
+                    [guests[g] for g in block_guests],
+                    [venue.tables[t] for t in block_tables_idx],
+                    ctx.quality[block_tables_idx],
+                    weights,
+                    block_time_limit,
+                    solver_threads,
+                )
+                for block_guests, block_tables_idx in blocks
+            ]
+            results = [f.result() for f in futures]
+    except Exception as e:
+        stats["error"] = f"{type(e).__name__}: {e}"
+        layout, summary = _dummy_layout(guests, venue)
+        layout.stats = stats
+        return layout, summary
+    timer.timings["blocks"] = time.perf_counter() - start
+
+    table_of = np.full(ctx.n_guests, -1, dtype=np.int64)
+    for (block_guests, block_tables_idx), (local_table_of, _) in zip(blocks, results):
+        table_of[block_guests] = block_tables_idx[local_table_of]
+
+    if len(blocks) > 1:
+        # Moves and swaps across block borders, in whatever time is left
+        deadline = None if time_limit is None else run_start + time_limit
+        with timer.phase("polish"):
+            table_of, stats["improvements"] = improve(
+                ctx, weights, table_of, deadline=deadline, movable=np.bincount(party_of)[party_of] == 1
+            )
+
+    block_stats = [s for _, s in results]
+    gaps = [s["solver"]["mip_gap"] for s in block_stats if s.get("solver", {}).get("mip_gap") is not None]
+    stats["decomposition"] = {
+        "blocks": len(blocks),
+        "workers": workers,
+        "max_block_gap": max(gaps) if gaps else None,
+        "block_stats": block_stats,
+    }
+    if len(parties) < ctx.n_guests:
+        stats["households"] = {"guests": ctx.n_guests, "units": len(parties)}
+
+    assignments = {ctx.guest_ids[g]: ctx.table_ids[t] for g, t in enumerate(table_of)}
+    terms = ctx.terms_from_counts(ctx.counts(table_of), table_of)
+    layout, summary = _make_layout("decomposed", assignments, weighted_score(terms, weights), weights)
+    layout.stats = stats
+    return layout, summary
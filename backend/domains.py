@@ -0,0 +1,172 @@
+"""
+Per-guest table domains from pins and eligibility rules.
+
+Rules come with the venue:
+- `Table.constraints["pinned"]`: guest ids that must sit at this table (e.g.
+  the couple's parents at the head table);
+- `Table.constraints["features"]`: what a table offers (e.g. "accessible");
+  the table's `zone` counts as one of its features;
+- `Table.constraints["reserved_for"]`: guest tags; only guests with one of
+  them may sit at the table (e.g. ["kid"] for the kids' table);
+- `settings["requires"]`: guest tag -> features; a guest with the tag may only
+  sit at tables with one of the features (e.g. {"wheelchair": ["accessible"],
+  "kid": ["kids"]}).
+
+A household gets the intersection of its members' domains (and the pin of any
+member), and a guest who must sit apart from a pinned guest loses that
+guest's table. Models then create x only for the eligible cells of free
+guests; pinned guests and ineligible cells are constants, so their pair
+variables and rows are never built.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from .households import contract_households
+from .models import Guest, VenueConfig
+
+PINNED_KEY = "pinned"
+FEATURES_KEY = "features"
+RESERVED_KEY = "reserved_for"
+REQUIRES_SETTING = "requires"
+
+
+class DomainError(ValueError):
+    """The pins and eligibility rules leave some guest without a table."""
+
+
+@dataclass
+class Domains:
+    """Allowed tables per model unit (guest or household), by index."""
+
+    allowed: np.ndarray  # (n_units, n_tables) bool
+    fixed: np.ndarray  # (n_units,) pinned table index, -1 if free
+
+    def constant(self, u: int, t: int) -> Optional[float]:
+        """Value of x[u, t] if it is fixed by the domains (pinned or ineligible), else None."""
+        if self.fixed[u] >= 0:
+            return 1.0 if self.fixed[u] == t else 0.0
+        return None if self.allowed[u, t] else 0.0
+
+    def for_parties(self, party_of: np.ndarray, n_parties: int) -> "Domains":
+        """Domains of contracted households (members share one domain)."""
+        first = np.full(n_parties, party_of.size, dtype=np.int64)
+        np.minimum.at(first, party_of, np.arange(party_of.size))
+        return Domains(allowed=self.allowed[first], fixed=self.fixed[first])
+
+    def summary(self) -> Dict[str, Any]:
+        free = self.fixed < 0
+        return {
+            "pinned": int((~free).sum()),
+            "cells": int(self.allowed.size),
+            "free_cells": int(self.allowed[free].sum()),
+        }
+
+
+def has_domain_rules(venue: VenueConfig) -> bool:
+    if venue.settings.get(REQUIRES_SETTING):
+        return True
+    return any(t.constraints.get(k) for t in venue.tables for k in (PINNED_KEY, RESERVED_KEY))
+
+
+def compile_domains(guests: List[Guest], venue: VenueConfig) -> Optional[Domains]:
+    """
+    Per-guest domains, or None if the venue has no pins or eligibility rules.
+    Raises DomainError for unknown or contradictory pins, pins to ineligible
+    tables, overfull pinned tables, guests left without any table and guests
+    outnumbering the seats at the tables they are eligible for.
+    """
+    if not has_domain_rules(venue):
+        return None
+    n_guests, n_tables = len(guests), len(venue.tables)
+    index = {g.id: i for i, g in enumerate(guests)}
+    allowed = np.ones((n_guests, n_tables), dtype=bool)
+    fixed = np.full(n_guests, -1, dtype=np.int64)
+
+    tagged: Dict[str, np.ndarray] = {}
+    for i, g in enumerate(guests):
+        for tag in g.tags:
+            tagged.setdefault(tag, np.zeros(n_guests, dtype=bool))[i] = True
+    nobody = np.zeros(n_guests, dtype=bool)
+    requires: Dict[str, List[str]] = venue.settings.get(REQUIRES_SETTING) or {}
+
+    for t, table in enumerate(venue.tables):
+        features = set(table.constraints.get(FEATURES_KEY, [])) | ({table.zone} if table.zone else set())
+        reserved = table.constraints.get(RESERVED_KEY) or []
+        if reserved:
+            allowed[:, t] &= np.logical_or.reduce([tagged.get(tag, nobody) for tag in reserved])
+        for tag, needed in requires.items():
+            if not features & set(needed):
+                allowed[:, t] &= ~tagged.get(tag, nobody)
+        for g_id in table.constraints.get(PINNED_KEY, []):
+            if g_id not in index:
+                raise DomainError(f"Table {table.id} pins unknown guest {g_id}")
+            g = index[g_id]
+            if fixed[g] >= 0 and fixed[g] != t:
+                raise DomainError(f"Guest {g_id} is pinned to tables {venue.tables[fixed[g]].id} and {table.id}")
+            fixed[g] = t
+
+    # Households: one pin for all members
+    parties, party_of = contract_households(guests)
+    multi = np.flatnonzero(np.bincount(party_of) > 1)
+    households = [np.flatnonzero(party_of == p) for p in multi]
+    for p, members in zip(multi, households):
+        pins = np.unique(fixed[members][fixed[members] >= 0])
+        if pins.size > 1:
+            raise DomainError(f"Household {parties[p].id} is pinned to more than one table")
+        if pins.size:
+            fixed[members] = pins[0]
+
+    pinned = np.flatnonzero(fixed >= 0)
+    bad = pinned[~allowed[pinned, fixed[pinned]]]
+    if bad.size:
+        raise DomainError(f"Guest {guests[bad[0]].id} is pinned to a table they are not eligible for")
+    allowed[pinned] = False
+    allowed[pinned, fixed[pinned]] = True
+
+    # A guest that must sit apart from a pinned guest cannot take the pinned guest's table
+    if venue.affinity is not None:
+        for a, b in venue.affinity.conflicts:
+            ia, ib = index[a], index[b]
+            if fixed[ia] >= 0 and fixed[ia] == fixed[ib]:
+                raise DomainError(f"Guests {a} and {b} must sit apart but are pinned to the same table")
+            if fixed[ia] >= 0:
+                allowed[ib, fixed[ia]] = False
+            if fixed[ib] >= 0:
+                allowed[ia, fixed[ib]] = False
+    # ... and one domain
+    for members in households:
+        allowed[members] = allowed[members].all(axis=0)
+
+    capacity = np.array([t.capacity for t in venue.tables], dtype=np.int64)
+    load = np.bincount(fixed[pinned], minlength=n_tables)
+    if np.any(load > capacity):
+        over = [venue.tables[t].id for t in np.flatnonzero(load > capacity)]
+        raise DomainError(f"Pinned guests exceed the capacity of table(s) {over}")
+    empty = np.flatnonzero(~allowed.any(axis=1))
+    if empty.size:
+        ids = [guests[g].id for g in empty[:5]]
+        raise DomainError(f"No eligible table for guest(s) {ids}{' ...' if empty.size > 5 else ''}")
+    _check_domain_capacity(guests, venue, allowed, capacity)
+    return Domains(allowed=allowed, fixed=fixed)
+
+
+def _check_domain_capacity(guests: List[Guest], venue: VenueConfig, allowed: np.ndarray, capacity: np.ndarray) -> None:
+    """
+    The guests who can only use a set of tables must fit in its seats (Hall's
+    condition, checked for each distinct domain and for all tables together).
+    """
+    sets = np.unique(np.vstack([allowed, np.ones((1, allowed.shape[1]), dtype=bool)]), axis=0)
+    # confined[g, k]: guest g has no eligible table outside set k
+    confined = (allowed.astype(np.int64) @ (~sets).T.astype(np.int64)) == 0
+    demand = confined.sum(axis=0)
+    seats = sets.astype(np.int64) @ capacity
+    over = np.flatnonzero(demand > seats)
+    if over.size:
+        k = over[np.argmax(demand[over] - seats[over])]
+        ids = [venue.tables[t].id for t in np.flatnonzero(sets[k])]
+        raise DomainError(
+            f"{int(demand[k])} guests can only sit at table(s) {ids}, which have {int(seats[k])} seats"
+        )
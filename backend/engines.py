@@ -0,0 +1,96 @@
+"""
+Registry of layout engines.
+
+Every engine has the signature of `generate_layout_for_weights`:
+(guests, venue, weights, time_limit=None) -> (Layout, ConstraintSummary). A
+`time_limit` (seconds) lowers the engine's own limit, e.g. to the time left
+until a batch event's deadline. The ToT task and the API pick an engine by
+name; admission control (`admission.py`) decides which one fits a request.
+"""
+
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .models import ConstraintSummary, Guest, Layout, VenueConfig
+
+EngineFn = Callable[..., Tuple[Layout, ConstraintSummary]]
+
+
+def _capped(default: Optional[float], time_limit: Optional[float]) -> Optional[float]:
+    """The engine's own time limit, lowered to the caller's."""
+    if time_limit is None:
+        return default
+    return time_limit if default is None else min(default, time_limit)
+
+
+def _milp(
+    guests: List[Guest], venue: VenueConfig, weights: Dict[str, float], time_limit: Optional[float] = None
+) -> Tuple[Layout, ConstraintSummary]:
+    from .optimizer import generate_layout_for_weights
+
+    layout, summary = generate_layout_for_weights(guests, venue, weights, time_limit=time_limit)
+    layout.stats.setdefault("engine", "milp")
+    return layout, summary
+
+
+def _aggregated(
+    guests: List[Guest], venue: VenueConfig, weights: Dict[str, float], time_limit: Optional[float] = None
+) -> Tuple[Layout, ConstraintSummary]:
+    from .aggregate import DEFAULT_TIME_LIMIT, generate_layout_aggregated
+
+    return generate_layout_aggregated(guests, venue, weights, time_limit=_capped(DEFAULT_TIME_LIMIT, time_limit))
+
+
+def _decomposed(
+    guests: List[Guest], venue: VenueConfig, weights: Dict[str, float], time_limit: Optional[float] = None
+) -> Tuple[Layout, ConstraintSummary]:
+    from .decompose import DEFAULT_TIME_LIMIT, generate_layout_decomposed
+
+    return generate_layout_decomposed(guests, venue, weights, time_limit=_capped(DEFAULT_TIME_LIMIT, time_limit))
+
+
+def _lns(
+    guests: List[Guest], venue: VenueConfig, weights: Dict[str, float], time_limit: Optional[float] = None
+) -> Tuple[Layout, ConstraintSummary]:
+    from .lns import DEFAULT_TIME_LIMIT, generate_layout_lns
+
+    return generate_layout_lns(guests, venue, weights, time_limit=_capped(DEFAULT_TIME_LIMIT, time_limit))
+
+
+def _heuristic(
+    guests: List[Guest], venue: VenueConfig, weights: Dict[str, float], time_limit: Optional[float] = None
+) -> Tuple[Layout, ConstraintSummary]:
+    from .heuristic import DEFAULT_TIME_LIMIT, generate_layout_heuristic
+
+    return generate_layout_heuristic(guests, venue, weights, time_limit=_capped(DEFAULT_TIME_LIMIT, time_limit))
+
+
+def _portfolio(
+    guests: List[Guest], venue: VenueConfig, weights: Dict[str, float], time_limit: Optional[float] = None
+) -> Tuple[Layout, ConstraintSummary]:
+    from .portfolio import DEFAULT_DEADLINE, generate_layout_portfolio
+
+    return generate_layout_portfolio(guests, venue, weights, deadline=_capped(DEFAULT_DEADLINE, time_limit))
+
+
+# Ordered from most to least exact; "portfolio" races several of them
+ENGINES: Dict[str, EngineFn] = {
+    "milp": _milp,
+    "aggregated": _aggregated,
+    "decomposed": _decomposed,
+    "lns": _lns,
+    "heuristic": _heuristic,
+    "portfolio": _portfolio,
+}
+
+DEFAULT_ENGINE = "milp"
+
+
+def register_engine(name: str, fn: EngineFn) -> None:
+    ENGINES[name] = fn
+
+
+def get_engine(name: str) -> EngineFn:
+    try:
+        return ENGINES[name]
+    except KeyError:
+        raise ValueError(f"Unknown engine '{name}'. Available engines: {sorted(ENGINES)}")
@@ -0,0 +1,350 @@
+"""
+Pareto frontier of layouts across the objective terms.
+
+The ToT search shows trade-offs by re-solving a handful of hand-written
+weight patterns. The frontier engine instead computes a well-spread set of
+Pareto-optimal layouts over family cohesion, social group cohesion, side
+mixing and relationship priority (plus explicit affinities when the
+instance has any), from one MILP built with every term:
+
+1. anchors: each term maximized on its own (the others with a tiny weight,
+   so anchors are not weakly dominated); they fix the ideal and nadir
+   points used to normalize the terms;
+2. adaptive weighted sums: the two points furthest apart (normalized) are
+   bisected in weight space, until `max_points` or the time limit;
+3. epsilon constraints: when a weighted sum finds nothing new between two
+   points, the gap between them is probed directly, requiring each to be
+   beaten on a term where it is worse than the other (this also finds
+   layouts no weighted sum can reach).
+
+Every solve only re-weights the model's objective (`model._terms`, see
+`optimizer._build_model`) or adds and removes the epsilon rows, and is
+warm-started from the nearest known point. Instances with households are
+solved with one (warm-started) weighted-sum model per point instead.
+
+Frontiers are kept in FRONTIERS (in memory, LRU-bounded by
+`SEATHARMONY_MAX_STORED_FRONTIERS`), and `Frontier.query` ranks the stored
+points for any weights or minimum term values without solving again.
+"""
+
+import itertools
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from .households import has_households
+from .metrics import PhaseTimer
+from .models import Guest, VenueConfig
+from .optimizer import (
+    _build_seating_model,
+    _expand_units,
+    _extract_assignments,
+    _gurobi,
+    _is_var,
+    generate_layout_for_weights,
+)
+from .scoring import TERMS, build_context, weighted_score
+
+DEFAULT_MAX_POINTS = 12
+DEFAULT_TIME_LIMIT = 30.0
+DEFAULT_POINT_TIME_LIMIT = 5.0
+# Weight of the other terms when one term is maximized
+ANCHOR_EPS = 1e-3
+# Terms whose range over the anchors is below this are constant on the frontier
+RANGE_EPS = 1e-9
+# Normalized distance below which two points are not bisected any further
+MIN_GAP = 0.05
+DUPLICATE_TOL = 1e-6
+
+
+def max_stored_frontiers() -> int:
+    return int(os.getenv("SEATHARMONY_MAX_STORED_FRONTIERS") or 32)
+
+
+@dataclass
+class FrontierPoint:
+    id: int
+    terms: Dict[str, float]  # realized (unweighted) term values
+    weights: Dict[str, float]  # weights of the solve that found it
+    assignments: Dict[str, str]
+    method: str  # "anchor", "weighted_sum" or "epsilon"
+    # Weight direction over the normalized terms (bisected between points)
+    direction: Dict[str, float] = field(default_factory=dict, repr=False)
+
+    def to_dict(self, assignments: bool = True) -> Dict[str, Any]:
+        data: Dict[str, Any] = {"id": self.id, "terms": self.terms, "weights": self.weights, "method": self.method}
+        if assignments:
+            data["assignments"] = self.assignments
+        return data
+
+
+@dataclass
+class Frontier:
+    id: str
+    objectives: List[str]  # terms that vary across the frontier
+    points: List[FrontierPoint]
+    ideal: Dict[str, float]
+    nadir: Dict[str, float]
+    stats: Dict[str, Any]
+    created: float = field(default_factory=time.time)
+
+    def normalized(self, point: FrontierPoint) -> Dict[str, float]:
+        """Term values scaled to [0, 1] between the nadir and ideal points."""
+        return {
+            k: (point.terms[k] - self.nadir[k]) / max(self.ideal[k] - self.nadir[k], RANGE_EPS) for k in self.objectives
+        }
+
+    def query(
+        self, weights: Optional[Dict[str, float]] = None, min_terms: Optional[Dict[str, float]] = None, limit: int = 5
+    ) -> List[Dict[str, Any]]:
+        """
+        Points with every term at least `min_terms`, best first: by the
+        weighted score for `weights` (as the engines score layouts), else by
+        the sum of normalized terms.
+        """
+        candidates = [
+            p for p in self.points if all(p.terms.get(k, 0.0) >= v for k, v in (min_terms or {}).items())
+        ]
+        if weights:
+            scored = [(weighted_score(p.terms, weights), p) for p in candidates]
+        else:
+            scored = [(sum(self.normalized(p).values()), p) for p in candidates]
+        scored.sort(key=lambda item: item[0], reverse=True)
+        return [
+            {**p.to_dict(), "score": score, "normalized": self.normalized(p)} for score, p in scored[:limit]
+        ]
+
+    def to_dict(self, assignments: bool = True) -> Dict[str, Any]:
+        return {
+            "frontier_id": self.id,
+            "objectives": self.objectives,
+            "ideal": self.ideal,
+            "nadir": self.nadir,
+            "points": [p.to_dict(assignments) for p in self.points],
+            "stats": self.stats,
+        }
+
+
+class FrontierStore:
+    """Thread-safe in-memory LRU store of frontiers."""
+
+    def __init__(self, max_frontiers: Optional[int] = None):
+        self.max_frontiers = max_frontiers or max_stored_frontiers()
+        self._frontiers: "OrderedDict[str, Frontier]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, frontier: Frontier) -> None:
+        with self._lock:
+            self._frontiers[frontier.id] = frontier
+            while len(self._frontiers) > self.max_frontiers:
+                self._frontiers.popitem(last=False)
+
+    def get(self, frontier_id: str) -> Frontier:
+        """Raises KeyError for unknown (or evicted) frontiers."""
+        with self._lock:
+            frontier = self._frontiers[frontier_id]
+            self._frontiers.move_to_end(frontier_id)
+            return frontier
+
+    def delete(self, frontier_id: str) -> None:
+        with self._lock:
+            del self._frontiers[frontier_id]
+
+
+FRONTIERS = FrontierStore()
+
+
+def _all_terms(weights: Dict[str, float]) -> Dict[str, float]:
+    # Absent terms must be 0 here, not their defaults (affinity defaults to on)
+    return {k: weights.get(k, 0.0) for k in TERMS}
+
+
+class _ModelSolver:
+    """One MILP with every term; each solve re-weights it and adds/removes epsilon rows."""
+
+    supports_bounds = True
+
+    def __init__(self, model: Any, x: Dict[Tuple[str, str], Any], units: Dict[str, List[str]], table_ids: List[str]):
+        self.model, self.x, self.units, self.table_ids = model, x, units, table_ids
+        self.terms: Dict[str, Any] = model._terms
+
+    def solve(
+        self,
+        weights: Dict[str, float],
+        time_limit: float,
+        start: Optional[Dict[str, str]],
+        bounds: Optional[Dict[str, float]] = None,
+    ) -> Optional[Dict[str, str]]:
+        gp, GRB = _gurobi()
+        model = self.model
+        obj = gp.LinExpr()
+        for k, w in weights.items():
+            if w and k in self.terms:
+                obj.add(self.terms[k], w)
+        model.setObjective(obj, GRB.MAXIMIZE)
+        rows = [model.addLConstr(self.terms[k], GRB.GREATER_EQUAL, level) for k, level in (bounds or {}).items()]
+        model.setParam('TimeLimit', max(time_limit, 0.01))
+        if start:
+            for u_id, members in self.units.items():
+                for t_id in self.table_ids:
+                    if _is_var(self.x[u_id, t_id]):
+                        self.x[u_id, t_id].Start = 1.0 if start.get(members[0]) == t_id else 0.0
+        try:
+            model.optimize()
+            if model.SolCount == 0:
+                return None
+            return _expand_units(_extract_assignments(self.x, list(self.units), self.table_ids), self.units)
+        finally:
+            if rows:
+                model.remove(rows)
+
+
+class _RebuildSolver:
+    """Weighted sums only, one model per solve (contracted households have no per-term objective)."""
+
+    supports_bounds = False
+
+    def __init__(self, guests: List[Guest], venue: VenueConfig):
+        self.guests, self.venue = guests, venue
+
+    def solve(
+        self,
+        weights: Dict[str, float],
+        time_limit: float,
+        start: Optional[Dict[str, str]],
+        bounds: Optional[Dict[str, float]] = None,
+    ) -> Optional[Dict[str, str]]:
+        layout, _ = generate_layout_for_weights(self.guests, self.venue, weights, time_limit=time_limit, start=start)
+        return None if layout.id == "dummy" else layout.assignments
+
+
+def _dominates(a: Dict[str, float], b: Dict[str, float], objectives: List[str]) -> bool:
+    return all(a[k] >= b[k] - DUPLICATE_TOL for k in objectives) and any(
+        a[k] > b[k] + DUPLICATE_TOL for k in objectives
+    )
+
+
+def compute_frontier(
+    guests: List[Guest],
+    venue: VenueConfig,
+    max_points: int = DEFAULT_MAX_POINTS,
+    time_limit: float = DEFAULT_TIME_LIMIT,
+    point_time_limit: float = DEFAULT_POINT_TIME_LIMIT,
+) -> Frontier:
+    """
+    Up to `max_points` non-dominated layouts within `time_limit` seconds
+    (each solve gets at most `point_time_limit`); the anchors, one per
+    term, are computed even beyond `max_points`. Raises DomainError if the
+    venue's pins and eligibility rules cannot be met.
+    """
+    started = time.perf_counter()
+    timer = PhaseTimer()
+    stats: Dict[str, Any] = {"timings": timer.timings, "solves": 0, "methods": {}}
+    ctx = build_context(guests, venue)
+    objectives = list(TERMS[:4]) + (["affinity"] if ctx.affinity_indices.size else [])
+    table_ids = [t.id for t in venue.tables]
+
+    if has_households(guests):
+        solver: Any = _RebuildSolver(guests, venue)
+    else:
+        model, x, units = _build_seating_model(guests, venue, {k: 1.0 for k in TERMS}, timer, stats)
+        solver = _ModelSolver(model, x, units, table_ids)
+    stats["model_reuse"] = isinstance(solver, _ModelSolver)
+
+    points: List[FrontierPoint] = []
+
+    def remaining() -> float:
+        return time_limit - (time.perf_counter() - started)
+
+    def run(
+        weights: Dict[str, float],
+        direction: Dict[str, float],
+        method: str,
+        start: Optional[Dict[str, str]] = None,
+        bounds: Optional[Dict[str, float]] = None,
+    ) -> Optional[FrontierPoint]:
+        """Solve one scalarization; returns the new point (None if nothing new was found)."""
+        if remaining() <= 0:
+            return None
+        weights = _all_terms(weights)
+        with timer.phase("solve"):
+            assignments = solver.solve(weights, min(point_time_limit, remaining()), start, bounds)
+        stats["solves"] += 1
+        if assignments is None or len(assignments) < len(guests):
+            return None
+        terms = ctx.terms(assignments)
+        if any(all(abs(p.terms[k] - terms[k]) <= DUPLICATE_TOL for k in objectives) for p in points):
+            return None
+        point = FrontierPoint(
+            id=len(points), terms=terms, weights=weights, assignments=assignments, method=method, direction=direction
+        )
+        points.append(point)
+        stats["methods"][method] = stats["methods"].get(method, 0) + 1
+        return point
+
+    for k in objectives:
+        run({o: 1.0 if o == k else ANCHOR_EPS for o in objectives}, {k: 1.0}, "anchor")
+    if not points:
+        raise ValueError("No feasible layout found for the frontier (capacity or time limit)")
+
+    ideal = {k: max(p.terms[k] for p in points) for k in objectives}
+    nadir = {k: min(p.terms[k] for p in points) for k in objectives}
+    active = [k for k in objectives if ideal[k] - nadir[k] > RANGE_EPS]
+
+    def scaled(direction: Dict[str, float]) -> Dict[str, float]:
+        """Weights on the raw terms for a direction over the normalized ones."""
+        return {k: direction.get(k, 0.0) / (ideal[k] - nadir[k]) for k in active}
+
+    def distance(a: FrontierPoint, b: FrontierPoint) -> float:
+        return sum(((a.terms[k] - b.terms[k]) / (ideal[k] - nadir[k])) ** 2 for k in active) ** 0.5
+
+    if active and len(points) < max_points:
+        run(scaled({k: 1.0 / len(active) for k in active}), {k: 1.0 / len(active) for k in active}, "weighted_sum")
+
+    explored: Set[Tuple[int, int]] = set()
+    while active and len(points) < max_points and remaining() > 0:
+        pairs = [
+            (distance(a, b), a, b)
+            for a, b in itertools.combinations(points, 2)
+            if (a.id, b.id) not in explored and distance(a, b) >= MIN_GAP
+        ]
+        if not pairs:
+            break
+        _, a, b = max(pairs, key=lambda item: item[0])
+        explored.add((a.id, b.id))
+
+        mixed = {k: a.direction.get(k, 0.0) + b.direction.get(k, 0.0) for k in active}
+        total = sum(mixed.values()) or 1.0
+        direction = {k: v / total for k, v in mixed.items()}
+        if run(scaled(direction), direction, "weighted_sum", start=a.assignments) is not None:
+            continue
+        if solver.supports_bounds:
+            # Nothing new in that direction: require beating a where b is better and b where a is better
+            gain_b = max(active, key=lambda k: b.terms[k] - a.terms[k])
+            gain_a = max(active, key=lambda k: a.terms[k] - b.terms[k])
+            if gain_a != gain_b:
+                bounds = {
+                    gain_b: (a.terms[gain_b] + b.terms[gain_b]) / 2,
+                    gain_a: (a.terms[gain_a] + b.terms[gain_a]) / 2,
+                }
+                run(scaled(direction), direction, "epsilon", start=a.assignments, bounds=bounds)
+
+    # Time-limited solves can return dominated layouts
+    frontier_points = [p for p in points if not any(_dominates(q.terms, p.terms, active) for q in points)]
+    frontier_points.sort(key=lambda p: tuple(-p.terms[k] for k in active))
+    for i, p in enumerate(frontier_points):
+        p.id = i
+    stats["dominated"] = len(points) - len(frontier_points)
+    stats["elapsed"] = time.perf_counter() - started
+    return Frontier(
+        id=uuid.uuid4().hex,
+        objectives=active,
+        points=frontier_points,
+        ideal={k: max(p.terms[k] for p in frontier_points) for k in active},
+        nadir={k: min(p.terms[k] for p in frontier_points) for k in active},
+        stats=stats,
+    )
@@ -0,0 +1,225 @@
+"""
+Greedy construction + local search seating heuristic.
+
+Used when the MILP would be too large (or Gurobi is unavailable). Guests are
+placed one by one at the table with the best marginal objective gain, then
+improved with best-improvement moves and swaps evaluated in vectorized form
+from per-table category counts (see `scoring.py`).
+"""
+
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .metrics import PhaseTimer
+from .models import ConstraintSummary, Guest, Layout, VenueConfig
+from .affinity import affinity_weight
+from .domains import DomainError, compile_domains
+from .households import contract_households, has_households
+from .optimizer import _dummy_layout, _make_layout
+from .scoring import (
+    PairTables,
+    ScoringContext,
+    build_context,
+    move_deltas,
+    pair_values,
+    priority_weight,
+    swap_deltas,
+    weighted_score,
+)
+
+DEFAULT_TIME_LIMIT = 2.0
+IMPROVEMENT_EPS = 1e-9
+
+
+def _greedy_construct(
+    ctx: ScoringContext,
+    P: np.ndarray,
+    w_priority: float,
+    party_of: Optional[np.ndarray] = None,
+    w_affinity: float = 0.0,
+    allowed: Optional[np.ndarray] = None,
+) -> Optional[np.ndarray]:
+    """
+    Seat guests (closest relationships first) at the table with the largest marginal gain.
+    With `party_of` (see households.py), a household is seated as a whole when its
+    first member comes up. Explicit conflicts are never seated together, and
+    guests only go to tables in their `allowed` row (see domains.py).
+    Returns None if some guest or household fits no table.
+    """
+    table_of = np.full(ctx.n_guests, -1, dtype=np.int64)
+    M = np.zeros((ctx.n_tables, len(ctx.categories)))
+    load = np.zeros(ctx.n_tables, dtype=np.int64)
+    pair_tables = PairTables(ctx, table_of) if ctx.has_pairs else None
+    members_of = None
+    if party_of is not None:
+        members_of = np.split(np.argsort(party_of, kind="stable"), np.cumsum(np.bincount(party_of))[:-1])
+
+    # Guests with the fewest allowed tables and with explicit conflicts first
+    # (most constrained), then closest relationships first; same-category guests consecutively
+    conflict_degree = np.diff(ctx.conflict_indptr) if ctx.conflict_indices.size else np.zeros(ctx.n_guests)
+    domain_size = allowed.sum(axis=1) if allowed is not None else np.zeros(ctx.n_guests)
+    order = np.lexsort((ctx.guest_category, -ctx.guest_closeness, -conflict_degree, domain_size))
+    for g in order:
+        if table_of[g] >= 0:
+            continue
+        group = members_of[party_of[g]] if members_of is not None else np.array([g])
+        cats = ctx.guest_category[group]
+        gain = M[:, cats].sum(axis=1) + w_priority * ctx.guest_closeness[group].sum() * ctx.quality
+        gain[load + group.size > ctx.capacity] = -np.inf
+        if allowed is not None:
+            gain[~allowed[group].all(axis=0)] = -np.inf
+        if pair_tables is not None:
+            gain += w_affinity * pair_tables.AT[group].sum(axis=0)
+            gain[pair_tables.CT[group].sum(axis=0) > 0] = -np.inf
+        t = int(np.argmax(gain))
+        if gain[t] == -np.inf:
+            return None
+        table_of[group] = t
+        load[t] += group.size
+        for member, c in zip(group, cats):
+            M[t, :] += P[c, :]
+            if pair_tables is not None:
+                pair_tables.place(member, -1, t)
+    return table_of
+
+
+def improve(
+    ctx: ScoringContext,
+    weights: Dict[str, float],
+    table_of: np.ndarray,
+    deadline: Optional[float] = None,
+    max_passes: int = 50,
+    movable: Optional[np.ndarray] = None,
+    tables: Optional[np.ndarray] = None,
+    allowed: Optional[np.ndarray] = None,
+) -> Tuple[np.ndarray, int]:
+    """
+    Best-improvement local search over single-guest moves and pairwise swaps.
+    Only guests flagged in `movable` (default: all) are moved, moves only go
+    to tables flagged in `tables` (default: all), and no guest leaves its
+    `allowed` tables (default: all). Returns (table_of, number of applied moves/swaps).
+    """
+    P = pair_values(ctx, weights)
+    w_priority = priority_weight(weights)
+    w_affinity = affinity_weight(weights)
+    table_of = table_of.copy()
+    pair_tables = PairTables(ctx, table_of) if ctx.has_pairs else None
+    counts = ctx.counts(table_of)
+    M = counts @ P
+    load = counts.sum(axis=1)
+    movable = np.ones(ctx.n_guests, dtype=bool) if movable is None else movable
+    candidates = np.flatnonzero(movable)
+
+    applied = 0
+    for _ in range(max_passes):
+        improved = False
+        for g in candidates:
+            if deadline is not None and time.perf_counter() > deadline:
+                return table_of, applied
+            a = table_of[g]
+            c = ctx.guest_category[g]
+
+            moves = move_deltas(ctx, M, P, w_priority, table_of, g, pair_tables, w_affinity)
+            moves[load >= ctx.capacity] = -np.inf
+            if tables is not None:
+                moves[~tables] = -np.inf
+            if allowed is not None:
+                moves[~allowed[g]] = -np.inf
+            best_t = int(np.argmax(moves))
+            best_move = moves[best_t]
+
+            swaps = swap_deltas(ctx, M, P, w_priority, table_of, g, pair_tables, w_affinity)
+            swaps[~movable] = -np.inf
+            if allowed is not None:
+                swaps[~allowed[g, table_of] | ~allowed[:, a]] = -np.inf
+            best_h = int(np.argmax(swaps))
+            best_swap = swaps[best_h]
+
+            if best_move <= IMPROVEMENT_EPS and best_swap <= IMPROVEMENT_EPS:
+                continue
+            improved = True
+            applied += 1
+            if best_move >= best_swap:
+                table_of[g] = best_t
+                load[a] -= 1
+                load[best_t] += 1
+                M[a, :] -= P[c, :]
+                M[best_t, :] += P[c, :]
+                if pair_tables is not None:
+                    pair_tables.place(g, a, best_t)
+            else:
+                b = table_of[best_h]
+                d = ctx.guest_category[best_h]
+                table_of[g], table_of[best_h] = b, a
+                M[a, :] += P[d, :] - P[c, :]
+                M[b, :] += P[c, :] - P[d, :]
+                if pair_tables is not None:
+                    pair_tables.place(g, a, b)
+                    pair_tables.place(best_h, b, a)
+        if not improved:
+            break
+    return table_of, applied
+
+
+def generate_layout_heuristic(
+    guests: List[Guest],
+    venue: VenueConfig,
+    weights: Dict[str, float],
+    time_limit: float = DEFAULT_TIME_LIMIT,
+) -> Tuple[Layout, ConstraintSummary]:
+    """Greedy + local search layout for the given weights; same return shape as the MILP."""
+    if not guests or not venue.tables:
+        return _dummy_layout(guests, venue)
+
+    ctx = build_context(guests, venue)
+    if ctx.capacity.sum() < ctx.n_guests:
+        # Same outcome as an infeasible MILP
+        layout, summary = _dummy_layout(guests, venue)
+        layout.stats = {
+            "engine": "heuristic",
+            "error": f"Infeasible: {ctx.n_guests} guests for {int(ctx.capacity.sum())} seats",
+        }
+        return layout, summary
+
+    stats: Dict[str, Any] = {"engine": "heuristic"}
+    party_of = movable = None
+    if has_households(guests):
+        # Households are placed whole by the construction and never moved by local search
+        parties, party_of = contract_households(guests)
+        movable = np.bincount(party_of)[party_of] == 1
+        stats["households"] = {"guests": ctx.n_guests, "units": len(parties)}
+
+    timer = PhaseTimer()
+    deadline = time.perf_counter() + time_limit
+    try:
+        with timer.phase("domains"):
+            domains = compile_domains(guests, venue)
+    except DomainError as e:
+        stats["error"] = f"{type(e).__name__}: {e}"
+        layout, summary = _dummy_layout(guests, venue)
+        layout.stats = stats
+        return layout, summary
+    allowed = domains.allowed if domains is not None else None
+    if domains is not None:
+        stats["domains"] = domains.summary()
+
+    with timer.phase("construction"):
+        table_of = _greedy_construct(
+            ctx, pair_values(ctx, weights), priority_weight(weights), party_of, affinity_weight(weights), allowed
+        )
+    if table_of is None:
+        stats["error"] = "Infeasible: greedy construction could not seat every guest (capacity, conflicts or eligibility)"
+        layout, summary = _dummy_layout(guests, venue)
+        layout.stats = stats
+        return layout, summary
+    with timer.phase("local_search"):
+        table_of, applied = improve(ctx, weights, table_of, deadline=deadline, movable=movable, allowed=allowed)
+
+    assignments = {ctx.guest_ids[g]: ctx.table_ids[t] for g, t in enumerate(table_of)}
+    terms = ctx.terms_from_counts(ctx.counts(table_of), table_of)
+    layout, summary = _make_layout("heuristic", assignments, weighted_score(terms, weights), weights)
+    stats.update(timings=timer.timings, improvements=applied)
+    layout.stats = stats
+    return layout, summary
@@ -0,0 +1,271 @@
+"""
+Household (must-sit-together) contraction.
+
+Guests sharing a `household_id` are always seated at the same table. Instead
+of adding "same table" constraints, each household is contracted into a single
+weighted super-guest ("party") before modeling: one x[party, table] row, a
+capacity coefficient equal to the party size, and one linearization variable
+per pair of parties whose combined pair value (family + social + side mixing,
+summed over all member pairs) is non-zero. Pairs inside a party are always
+realized and become a constant. The solution is expanded back to guests at
+extraction.
+"""
+
+from dataclasses import dataclass, replace
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .affinity import add_affinity_terms, affinity_weight, has_affinity, map_conflicts
+from .models import Affinity, Guest, Table, VenueConfig
+from .scoring import ScoringContext, build_context, pair_values, priority_weight
+
+if TYPE_CHECKING:
+    import gurobipy as gp
+
+    from .domains import Domains
+
+PartyPairs = Tuple[np.ndarray, np.ndarray, np.ndarray]  # (party i, party j, weighted pair value)
+
+
+@dataclass
+class Party:
+    id: str
+    member_ids: List[str]
+
+    @property
+    def size(self) -> int:
+        return len(self.member_ids)
+
+
+def has_households(guests: List[Guest]) -> bool:
+    """True if at least two guests share a household_id."""
+    seen = set()
+    for g in guests:
+        if g.household_id:
+            if g.household_id in seen:
+                return True
+            seen.add(g.household_id)
+    return False
+
+
+def contract_households(guests: List[Guest]) -> Tuple[List[Party], np.ndarray]:
+    """
+    Group guests into parties (households, or single guests) in order of first
+    appearance. Returns the parties and the party index of every guest.
+    """
+    parties: List[Party] = []
+    by_household: Dict[str, int] = {}
+    party_of = np.empty(len(guests), dtype=np.int64)
+    for i, g in enumerate(guests):
+        if g.household_id and g.household_id in by_household:
+            p = by_household[g.household_id]
+            parties[p].member_ids.append(g.id)
+        else:
+            p = len(parties)
+            # Singletons keep the guest id so x keys match the uncontracted model
+            parties.append(Party(id=f"household:{g.household_id}" if g.household_id else g.id, member_ids=[g.id]))
+            if g.household_id:
+                by_household[g.household_id] = p
+        party_of[i] = p
+    return parties, party_of
+
+
+def party_category_counts(ctx: ScoringContext, party_of: np.ndarray, n_parties: int) -> np.ndarray:
+    """(n_parties, n_categories) member counts."""
+    counts = np.zeros((n_parties, len(ctx.categories)), dtype=np.float64)
+    np.add.at(counts, (party_of, ctx.guest_category), 1)
+    return counts
+
+
+def party_pairs(
+    ctx: ScoringContext,
+    party_of: np.ndarray,
+    n_parties: int,
+    weights: Dict[str, float],
+    affinity: Optional[Affinity] = None,
+) -> Tuple[PartyPairs, float]:
+    """
+    Weighted pair values between parties (only non-zero pairs) and the constant
+    value of the pairs inside parties. Explicit affinity rewards are folded in.
+    """
+    P = pair_values(ctx, weights)
+    N = party_category_counts(ctx, party_of, n_parties)
+    W = N @ P @ N.T
+    # Member pairs inside a party: (N P N^T)_uu counts each cross-category pair
+    # twice and includes self-pairs n_c * P[c, c]
+    internal = float(((np.diag(W) - N @ np.diag(P)) / 2).sum())
+
+    w_affinity = affinity_weight(weights)
+    if has_affinity(affinity) and w_affinity > 0:
+        for a, b, value in affinity.rewards:
+            pa, pb = party_of[ctx.guest_index[a]], party_of[ctx.guest_index[b]]
+            if pa == pb:
+                internal += w_affinity * value
+            else:
+                W[pa, pb] += w_affinity * value
+                W[pb, pa] += w_affinity * value
+
+    i, j = np.triu_indices(n_parties, k=1)
+    values = W[i, j]
+    keep = values != 0
+    return (i[keep], j[keep], values[keep]), internal
+
+
+def count_party_pairs(
+    guests: List[Guest], tables: List[Table], affinity: Optional[Affinity] = None, side_mixing: bool = True
+) -> Tuple[int, int]:
+    """
+    (number of parties, number of party pairs with any pair term) for admission
+    estimates; `side_mixing=False` leaves out side mixing (compact side mixing).
+    Counted without building the party pair matrix: parties with the same set
+    of member categories have a pair term with the same parties, so pairs are
+    counted between these (few) category sets.
+    """
+    ctx = build_context(guests, VenueConfig(tables=tables))
+    parties, party_of = contract_households(guests)
+    ones = {"family_cohesion": 1.0, "social_group_cohesion": 1.0, "side_mixing": 1.0 if side_mixing else 0.0}
+    # All terms count positively, so a pair has a term iff some member categories do
+    related = (pair_values(ctx, ones) > 0).astype(np.int64)
+    present = np.zeros((len(parties), len(ctx.categories)), dtype=bool)
+    present[party_of, ctx.guest_category] = True
+    sets, set_of, sizes = np.unique(present, axis=0, return_inverse=True, return_counts=True)
+    set_of = set_of.reshape(-1)
+    linked = (sets.astype(np.int64) @ related @ sets.T.astype(np.int64)) > 0
+    # Ordered pairs of distinct parties whose category sets are linked
+    n_pairs = (int(sizes @ linked @ sizes) - int(sizes @ np.diag(linked))) // 2
+
+    if has_affinity(affinity) and affinity_weight(ones) > 0:
+        extra = set()
+        for a, b, _ in affinity.rewards:
+            pa, pb = party_of[ctx.guest_index[a]], party_of[ctx.guest_index[b]]
+            if pa != pb and not linked[set_of[pa], set_of[pb]]:
+                extra.add((min(pa, pb), max(pa, pb)))
+        n_pairs += len(extra)
+    return len(parties), n_pairs
+
+
+@dataclass
+class PartyInstance:
+    ctx: ScoringContext
+    parties: List[Party]
+    party_of: np.ndarray
+    pairs: PartyPairs
+    internal: float
+    conflicts: List[Tuple[str, str]]  # between party ids
+    # Per-party (groom-side, bride-side) member counts when side mixing is modeled
+    # compactly; side mixing is then not part of the party pair values
+    side_counts: Optional[Tuple[np.ndarray, np.ndarray]] = None
+    # Per-party table domains (pins and eligibility rules, see domains.py)
+    domains: Optional["Domains"] = None
+
+
+def prepare_parties(
+    guests: List[Guest],
+    venue: VenueConfig,
+    weights: Dict[str, float],
+    quality: Optional[List[float]] = None,
+    domains: Optional["Domains"] = None,
+) -> PartyInstance:
+    """
+    Contraction and party pair enumeration (the counterpart of optimizer._enumerate_pairs).
+    `quality` overrides the per-table quality; `domains` are per guest. Raises
+    ValueError if a conflict pair belongs to one household.
+    """
+    # Lazy import to avoid circular deps
+    from .optimizer import _use_compact_side_mixing
+
+    ctx = build_context(guests, venue)
+    if quality is not None:
+        ctx = replace(ctx, quality=np.asarray(quality, dtype=np.float64))
+    parties, party_of = contract_households(guests)
+    groom = np.bincount(party_of, weights=ctx.is_groom[ctx.guest_category], minlength=len(parties))
+    bride = np.bincount(party_of, weights=ctx.is_bride[ctx.guest_category], minlength=len(parties))
+    side_counts = None
+    if _use_compact_side_mixing(
+        venue.settings, weights.get("side_mixing", 0.0), int(groom.sum()), int(bride.sum()), int(ctx.capacity.max())
+    ):
+        side_counts = (groom, bride)
+        weights = {**weights, "side_mixing": 0.0}
+    pairs, internal = party_pairs(ctx, party_of, len(parties), weights, venue.affinity)
+    conflicts: List[Tuple[str, str]] = []
+    if has_affinity(venue.affinity):
+        unit_of = {g.id: parties[party_of[i]].id for i, g in enumerate(guests)}
+        conflicts = map_conflicts(venue.affinity.conflicts, unit_of)
+    return PartyInstance(
+        ctx=ctx, parties=parties, party_of=party_of, pairs=pairs, internal=internal, conflicts=conflicts,
+        side_counts=side_counts,
+        domains=domains.for_parties(party_of, len(parties)) if domains is not None else None,
+    )
+
+
+def build_party_model(
+    instance: PartyInstance,
+    weights: Dict[str, float],
+) -> Tuple["gp.Model", Dict[Tuple[str, str], "gp.Var"]]:
+    """
+    Build the contracted seating MILP; x is keyed by (party_id, table_id).
+    The objective value equals the guest-level objective.
+    """
+    from .optimizer import _gurobi, _is_var, _pair_product, _removed_cells, _side_mixing_product, _x_cells
+
+    gp, GRB = _gurobi()
+    ctx, parties, party_of = instance.ctx, instance.parties, instance.party_of
+    (pi, pj, pv), internal = instance.pairs, instance.internal
+    table_ids = ctx.table_ids
+    w_priority = priority_weight(weights)
+    closeness = np.bincount(party_of, weights=ctx.guest_closeness, minlength=len(parties))
+
+    model = gp.Model("SeatHarmonyHouseholds")
+    model.setParam('OutputFlag', 0)
+
+    # x[p, t]: party p at table t (constants outside the party's domain)
+    x = _x_cells(model, [party.id for party in parties], table_ids, instance.domains)
+
+    # y[k, t]: both parties of pair k at table t (with its linearization rows)
+    y = {}
+    for k in range(pv.size):
+        p1, p2 = parties[pi[k]].id, parties[pj[k]].id
+        for t_id in table_ids:
+            y[k, t_id] = _pair_product(model, f"y_{k}_{t_id}", x[p1, t_id], x[p2, t_id])
+
+    obj = gp.LinExpr(internal)
+    for k in range(pv.size):
+        for t_id in table_ids:
+            obj += float(pv[k]) * y[k, t_id]
+    if w_priority > 0:
+        for t_idx, t_id in enumerate(table_ids):
+            for p, party in enumerate(parties):
+                if closeness[p] > 0:
+                    obj += w_priority * float(closeness[p]) * float(ctx.quality[t_idx]) * x[party.id, t_id]
+    w_side = weights.get("side_mixing", 0.0)
+    if instance.side_counts is not None and w_side > 0:
+        # Compact side mixing: all groom x bride member pairs at a table, including within a party
+        groom, bride = instance.side_counts
+        for t_idx, t_id in enumerate(table_ids):
+            groom_t = gp.quicksum(int(groom[p]) * x[party.id, t_id] for p, party in enumerate(parties) if groom[p])
+            bride_t = gp.quicksum(int(bride[p]) * x[party.id, t_id] for p, party in enumerate(parties) if bride[p])
+            cap = int(ctx.capacity[t_idx])
+            obj += w_side * _side_mixing_product(
+                model, t_id, groom_t, bride_t, min(cap, int(groom.sum())), min(cap, int(bride.sum()))
+            )
+    # Affinity rewards are already part of the party pair values; add the conflict cliques
+    add_affinity_terms(model, x, table_ids, [], instance.conflicts, 0.0)
+    model.setObjective(obj, GRB.MAXIMIZE)
+
+    for party in parties:
+        cells = [x[party.id, t_id] for t_id in table_ids]
+        if any(_is_var(v) for v in cells):
+            model.addConstr(gp.quicksum(cells) == 1, name=f"party_{party.id}_assignment")
+    for t_idx, t_id in enumerate(table_ids):
+        cells = [(party.size, x[party.id, t_id]) for party in parties]
+        if any(_is_var(v) for _, v in cells):
+            model.addConstr(
+                gp.quicksum(size * v for size, v in cells) <= int(ctx.capacity[t_idx]), name=f"table_{t_id}_capacity"
+            )
+
+    if instance.domains is not None:
+        party_pairs_ids = [(parties[a].id, parties[b].id) for a, b in zip(pi, pj)]
+        model._removed_cells = _removed_cells(x, party_pairs_ids, table_ids)
+    return model, x
+
@@ -0,0 +1,228 @@
+"""
+Streaming guest-list ingestion for Excel (XLSX) and CSV files.
+
+Rows are read in fixed-size chunks (openpyxl read-only mode for XLSX, pandas
+chunked reader for CSV), only the name and category columns are kept, and each
+chunk is cleaned with vectorized pandas string operations. The result is a
+compact `GuestList` (ids, names and integer category codes) instead of a full
+DataFrame or a list of `Guest` objects.
+"""
+
+import zipfile
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import IO, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from .models import Guest
+
+# Column headers recognized in guest lists (Hebrew and English), matched case-insensitively.
+# Name columns are tried in priority order.
+NAME_COLUMN_PRIORITY = ['Full Guest Name', 'Proper Names', 'Name', 'שם', 'Guest Name', 'Guest_Name']
+CATEGORY_COLUMNS = ['category', 'קטגוריה', 'group', 'group_id', 'קבוצה']
+
+DEFAULT_CHUNK_SIZE = 10_000
+
+Source = Union[str, Path, IO[bytes]]
+
+
+@dataclass
+class GuestList:
+    """Compact guest instance: parallel id/name lists and int category codes (-1 = uncategorized)."""
+
+    ids: List[str] = field(default_factory=list)
+    names: List[str] = field(default_factory=list)
+    category_codes: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=np.int32))
+    categories: List[str] = field(default_factory=list)
+    name_column: Optional[str] = None
+    category_column: Optional[str] = None
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def category_of(self, idx: int) -> Optional[str]:
+        code = int(self.category_codes[idx])
+        return self.categories[code] if code >= 0 else None
+
+    def category_counts(self) -> Dict[str, int]:
+        """Number of guests per category ("Uncategorized" for guests without one)."""
+        counts = np.bincount(self.category_codes + 1, minlength=len(self.categories) + 1)
+        result: Dict[str, int] = {}
+        if counts[0]:
+            result["Uncategorized"] = int(counts[0])
+        for code, name in enumerate(self.categories):
+            if counts[code + 1]:
+                result[name] = int(counts[code + 1])
+        return result
+
+    def to_guests(self) -> List[Guest]:
+        return [
+            Guest(id=g_id, name=name, group_id=self.category_of(i), importance=0, tags=[])
+            for i, (g_id, name) in enumerate(zip(self.ids, self.names))
+        ]
+
+    def to_dicts(self) -> List[Dict[str, object]]:
+        """Guests in the API's `GuestIn` shape."""
+        return [
+            {"id": g_id, "name": name, "group_id": self.category_of(i), "importance": 0, "tags": []}
+            for i, (g_id, name) in enumerate(zip(self.ids, self.names))
+        ]
+
+
+def detect_columns(columns: Sequence[object]) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Find the name and category columns among the header cells.
+    Returns (name_column, category_column); either may be None.
+    """
+    by_lower: Dict[str, str] = {}
+    for col in columns:
+        if col is None:
+            continue
+        col_str = str(col).strip()
+        by_lower.setdefault(col_str.lower(), col_str)
+
+    name_col = None
+    for priority_name in NAME_COLUMN_PRIORITY:
+        if priority_name.lower() in by_lower:
+            name_col = by_lower[priority_name.lower()]
+            break
+
+    category_col = None
+    for col in columns:
+        if col is not None and str(col).strip().lower() in CATEGORY_COLUMNS:
+            category_col = str(col).strip()
+            break
+
+    return name_col, category_col
+
+
+def _is_csv(source: Source, filename: Optional[str]) -> bool:
+    name = filename or (str(source) if isinstance(source, (str, Path)) else "")
+    return name.lower().endswith((".csv", ".txt"))
+
+
+def _iter_xlsx_chunks(source: Source, chunk_size: int) -> Iterator[Tuple[List[object], pd.DataFrame]]:
+    """`_read_xlsx_chunks`, raising ValueError for files openpyxl cannot read (corrupt, legacy .xls)."""
+    from openpyxl.utils.exceptions import InvalidFileException
+
+    try:
+        yield from _read_xlsx_chunks(source, chunk_size)
+    # Not a zip archive (.xls), missing archive parts, malformed sheet XML
+    except (zipfile.BadZipFile, KeyError, SyntaxError, InvalidFileException) as e:
+        raise ValueError(
+            f"Could not read the guest list as an XLSX file ({type(e).__name__}: {e}); save .xls files as .xlsx"
+        ) from e
+
+
+def _read_xlsx_chunks(source: Source, chunk_size: int) -> Iterator[Tuple[List[object], pd.DataFrame]]:
+    """Yield (header, chunk) with only the name/category columns, reading the sheet in read-only mode."""
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(source, read_only=True, data_only=True)
+    try:
+        sheet = workbook.worksheets[0]
+        rows = sheet.iter_rows(values_only=True)
+        header = list(next(rows, ()))
+        name_col, category_col = detect_columns(header)
+        if name_col is None:
+            yield header, pd.DataFrame()
+            return
+        stripped = [str(c).strip() if c is not None else None for c in header]
+        keep = [stripped.index(c) for c in (name_col, category_col) if c is not None]
+        columns = [stripped[i] for i in keep]
+
+        buffer: List[Tuple[object, ...]] = []
+        for row in rows:
+            buffer.append(tuple(row[i] if i < len(row) else None for i in keep))
+            if len(buffer) >= chunk_size:
+                yield header, pd.DataFrame.from_records(buffer, columns=columns)
+                buffer = []
+        if buffer:
+            yield header, pd.DataFrame.from_records(buffer, columns=columns)
+    finally:
+        workbook.close()
+
+
+def _iter_csv_chunks(source: Source, chunk_size: int) -> Iterator[Tuple[List[object], pd.DataFrame]]:
+    """Yield (header, chunk) with only the name/category columns from a CSV file."""
+    header_df = pd.read_csv(source, nrows=0, encoding="utf-8-sig")
+    header = list(header_df.columns)
+    if hasattr(source, "seek"):
+        source.seek(0)
+
+    name_col, category_col = detect_columns(header)
+    stripped = {str(c).strip(): c for c in header}
+    usecols = [stripped[c] for c in (name_col, category_col) if c is not None]
+    if name_col is None:
+        yield header, pd.DataFrame()
+        return
+
+    reader = pd.read_csv(source, usecols=usecols, dtype=str, chunksize=chunk_size, encoding="utf-8-sig")
+    for chunk in reader:
+        chunk.columns = [str(c).strip() for c in chunk.columns]
+        yield header, chunk
+
+
+def _clean_text(values: pd.Series) -> pd.Series:
+    """Strip strings and turn empty/"nan" cells into missing values."""
+    text = values.astype("string").str.strip()
+    return text.mask((text == "") | (text.str.lower() == "nan"))
+
+
+def read_guest_list(
+    source: Source,
+    filename: Optional[str] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> GuestList:
+    """
+    Read a guest list from an XLSX or CSV file (path or binary file object).
+    `filename` decides the format for file objects; XLSX is assumed otherwise.
+
+    Raises ValueError if no name column is found or the file cannot be read.
+    """
+    chunks = _iter_csv_chunks(source, chunk_size) if _is_csv(source, filename) else _iter_xlsx_chunks(source, chunk_size)
+
+    result = GuestList()
+    category_lookup: Dict[str, int] = {}
+    code_chunks: List[np.ndarray] = []
+    row_offset = 0
+
+    for header, chunk in chunks:
+        name_col, category_col = detect_columns(header)
+        if name_col is None:
+            raise ValueError(f"Could not find name column in guest list. Available columns: {header}")
+        result.name_column, result.category_column = name_col, category_col
+
+        names = _clean_text(chunk[name_col])
+        valid = names.notna().to_numpy()
+        row_numbers = np.arange(row_offset + 1, row_offset + len(chunk) + 1)[valid]
+        row_offset += len(chunk)
+        names = names[valid]
+        if names.empty:
+            continue
+
+        # Same id scheme as the original Excel reader: guest-<row>-<lower-dashed-name>
+        ids = "guest-" + pd.Series(row_numbers, index=names.index).astype(str) + "-" + names.str.lower().str.replace(" ", "-")
+        result.ids.extend(ids.tolist())
+        result.names.extend(names.tolist())
+
+        if category_col is None:
+            code_chunks.append(np.full(len(names), -1, dtype=np.int32))
+            continue
+
+        categories = _clean_text(chunk[category_col][valid])
+        local_codes, uniques = pd.factorize(categories)
+        global_codes = np.empty(len(uniques), dtype=np.int32)
+        for i, category in enumerate(uniques):
+            if category not in category_lookup:
+                category_lookup[category] = len(result.categories)
+                result.categories.append(category)
+            global_codes[i] = category_lookup[category]
+        codes = np.where(local_codes >= 0, global_codes[np.maximum(local_codes, 0)] if len(uniques) else -1, -1)
+        code_chunks.append(codes.astype(np.int32))
+
+    if code_chunks:
+        result.category_codes = np.concatenate(code_chunks)
+    return result
@@ -0,0 +1,263 @@
+"""
+Stored instances and incremental re-optimization.
+
+An instance (guests, venue, weights) is stored together with its current
+layout. As RSVPs come in, a batch of changes (add / update / remove guests and
+tables) is applied to it: surviving guests keep their seats, guests whose seat
+is gone (removed table, changed household) are unseated, and `repair.py`
+re-seats them and re-optimizes only the tables the changes touched (plus a
+little free room). Optionally the neighborhood is then re-solved with the
+guest-level sub-MILP warm-started from the repaired layout (`lns.repair`).
+Work is proportional to the size of the change, not of the event.
+
+Instances live in memory (per API process), least recently used first out
+once `SEATHARMONY_MAX_STORED_INSTANCES` is reached. Every update bumps the
+instance version; a change batch may name the version it was made against
+and is rejected if the instance has moved on.
+"""
+
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field, replace
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .affinity import restrict_affinity
+from .isolation import run_isolated
+from .lns import IMPROVEMENT_EPS, LNSState, _score, repair
+from .models import Guest, Layout, Table, VenueConfig
+from .optimizer import _make_layout
+from .repair import DEFAULT_BUDGET_MS, RepairResult, repair_layout
+from .scoring import build_context
+
+CHANGE_OPS = ("add_guest", "update_guest", "remove_guest", "add_table", "update_table", "remove_table")
+
+
+class VersionConflict(Exception):
+    """The change batch was made against an older version of the instance."""
+
+
+@dataclass
+class StoredInstance:
+    id: str
+    guests: List[Guest]
+    venue: VenueConfig
+    weights: Dict[str, float]
+    assignments: Dict[str, str]  # guest_id -> table_id
+    score: float
+    version: int = 0
+
+
+@dataclass
+class InstanceChange:
+    op: str  # one of CHANGE_OPS
+    guest: Optional[Guest] = None  # add_guest / update_guest
+    table: Optional[Table] = None  # add_table / update_table
+    id: Optional[str] = None  # remove_guest / remove_table
+
+
+@dataclass
+class DeltaResult:
+    instance: StoredInstance
+    layout: Layout
+    score_before: float  # score of the stored layout before the changes
+    moved: List[str] = field(default_factory=list)
+    neighborhood: List[str] = field(default_factory=list)
+    stats: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def delta(self) -> float:
+        return self.layout.score - self.score_before
+
+
+def max_stored_instances() -> int:
+    return int(os.getenv("SEATHARMONY_MAX_STORED_INSTANCES") or 256)
+
+
+class InstanceStore:
+    """Thread-safe in-memory LRU store of instances."""
+
+    def __init__(self, max_instances: Optional[int] = None):
+        self.max_instances = max_instances or max_stored_instances()
+        self._instances: "OrderedDict[str, StoredInstance]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def create(
+        self, guests: List[Guest], venue: VenueConfig, weights: Dict[str, float], assignments: Dict[str, str], score: float
+    ) -> StoredInstance:
+        instance = StoredInstance(
+            id=uuid.uuid4().hex, guests=guests, venue=venue, weights=weights, assignments=assignments, score=score
+        )
+        with self._lock:
+            self._instances[instance.id] = instance
+            while len(self._instances) > self.max_instances:
+                self._instances.popitem(last=False)
+        return instance
+
+    def get(self, instance_id: str) -> StoredInstance:
+        """Raises KeyError for unknown (or evicted) instances."""
+        with self._lock:
+            instance = self._instances[instance_id]
+            self._instances.move_to_end(instance_id)
+            return instance
+
+    def commit(self, instance: StoredInstance, expected_version: int) -> None:
+        """Store `instance` unless the stored version is no longer `expected_version`."""
+        with self._lock:
+            current = self._instances.get(instance.id)
+            if current is None:
+                raise KeyError(instance.id)
+            if current.version != expected_version:
+                raise VersionConflict(
+                    f"Instance {instance.id} is at version {current.version}, not {expected_version}"
+                )
+            self._instances[instance.id] = instance
+            self._instances.move_to_end(instance.id)
+
+    def delete(self, instance_id: str) -> None:
+        with self._lock:
+            del self._instances[instance_id]
+
+
+STORE = InstanceStore()
+
+
+def apply_changes(
+    instance: StoredInstance, changes: List[InstanceChange]
+) -> Tuple[List[Guest], VenueConfig, Dict[str, str], List[str]]:
+    """
+    Apply a change batch. Returns the new guests, venue and surviving
+    assignments, and the ids of the tables the changes touched. Raises
+    ValueError for unknown ops, unknown ids and duplicate ids.
+    """
+    guests = {g.id: g for g in instance.guests}
+    tables = {t.id: t for t in instance.venue.tables}
+    assignments = dict(instance.assignments)
+    touched = set()
+
+    for change in changes:
+        if change.op not in CHANGE_OPS:
+            raise ValueError(f"Unknown change op '{change.op}' (expected one of {', '.join(CHANGE_OPS)})")
+        if change.op in ("add_guest", "update_guest"):
+            if change.guest is None:
+                raise ValueError(f"{change.op} needs a guest")
+            g = change.guest
+            if (change.op == "add_guest") == (g.id in guests):
+                raise ValueError(f"Guest {g.id} {'already exists' if g.id in guests else 'does not exist'}")
+            if change.op == "update_guest":
+                t_id = assignments.get(g.id)
+                if t_id is not None:
+                    touched.add(t_id)
+                if g.household_id != guests[g.id].household_id:
+                    # Re-seated with the new household
+                    assignments.pop(g.id, None)
+            guests[g.id] = g
+        elif change.op in ("add_table", "update_table"):
+            if change.table is None:
+                raise ValueError(f"{change.op} needs a table")
+            t = change.table
+            if (change.op == "add_table") == (t.id in tables):
+                raise ValueError(f"Table {t.id} {'already exists' if t.id in tables else 'does not exist'}")
+            tables[t.id] = t
+            touched.add(t.id)
+        elif change.op == "remove_guest":
+            if change.id not in guests:
+                raise ValueError(f"Guest {change.id} does not exist")
+            del guests[change.id]
+            t_id = assignments.pop(change.id, None)
+            if t_id is not None:
+                touched.add(t_id)
+        else:  # remove_table
+            if change.id not in tables:
+                raise ValueError(f"Table {change.id} does not exist")
+            del tables[change.id]
+            touched.discard(change.id)
+            assignments = {g_id: t_id for g_id, t_id in assignments.items() if t_id != change.id}
+
+    # A household with an unseated member is re-seated as a whole
+    unseated = {g.household_id for g in guests.values() if g.household_id and g.id not in assignments}
+    for g in guests.values():
+        if g.household_id in unseated and g.id in assignments:
+            touched.add(assignments.pop(g.id))
+
+    new_guests = list(guests.values())
+    affinity = instance.venue.affinity
+    if affinity is not None:
+        affinity = restrict_affinity(affinity, set(guests))
+    venue = replace(instance.venue, tables=list(tables.values()), affinity=affinity)
+    return new_guests, venue, assignments, sorted(touched & set(tables))
+
+
+def _resolve_neighborhood(
+    guests: List[Guest], venue: VenueConfig, weights: Dict[str, float], result: RepairResult, time_limit: float
+) -> Optional[RepairResult]:
+    """Re-solve the neighborhood tables with the sub-MILP; None unless it improves the layout."""
+    ctx = build_context(guests, venue)
+    state = LNSState(
+        ctx=ctx, weights=weights, table_of=ctx.table_of(result.layout.assignments), score=result.layout.score
+    )
+    tables = np.array([ctx.table_index[t_id] for t_id in result.neighborhood], dtype=np.int64)
+    table_of = repair(guests, venue, state, tables, time_limit)
+    if table_of is None:
+        return None
+    score = _score(ctx, table_of, weights)
+    if score <= state.score + IMPROVEMENT_EPS:
+        return None
+    assignments = {ctx.guest_ids[g]: ctx.table_ids[t] for g, t in enumerate(table_of)}
+    layout, _ = _make_layout("repair", assignments, score, weights)
+    before = ctx.table_of(result.layout.assignments)
+    moved = set(result.moved) | {ctx.guest_ids[g] for g in np.flatnonzero(table_of != before)}
+    return replace(result, layout=layout, moved=sorted(moved, key=ctx.guest_index.get))
+
+
+def reoptimize(
+    instance: StoredInstance,
+    changes: List[InstanceChange],
+    budget_ms: float = DEFAULT_BUDGET_MS,
+    solver_seconds: float = 0.0,
+) -> DeltaResult:
+    """
+    Apply `changes` to a stored instance and repair its layout locally within
+    `budget_ms`; with `solver_seconds` > 0 the touched tables are then re-solved
+    with the sub-MILP on an isolated solver worker (`isolation.py`). Returns the
+    updated instance (not yet committed to the store). Raises ValueError for
+    invalid changes and RepairError if the guests no longer fit.
+    """
+    start = time.perf_counter()
+    guests, venue, assignments, touched = apply_changes(instance, changes)
+    result = repair_layout(guests, venue, instance.weights, assignments, {}, budget_ms=budget_ms, touched=touched)
+    stats: Dict[str, Any] = {"changes": len(changes), "repair_ms": (time.perf_counter() - start) * 1000}
+    if solver_seconds > 0 and result.neighborhood:
+        try:
+            # On an isolated solver worker, like engine solves; a lost worker is recorded as the error
+            resolved = run_isolated(
+                _resolve_neighborhood,
+                (guests, venue, instance.weights, result, solver_seconds),
+                solver_seconds,
+                "the neighborhood re-solve",
+            )
+            stats["resolved"] = resolved is not None
+            result = resolved or result
+        except Exception as e:
+            stats["error"] = f"{type(e).__name__}: {e}"
+
+    updated = replace(
+        instance,
+        guests=guests,
+        venue=venue,
+        assignments=result.layout.assignments,
+        score=result.layout.score,
+        version=instance.version + 1,
+    )
+    return DeltaResult(
+        instance=updated,
+        layout=result.layout,
+        score_before=instance.score,
+        moved=result.moved,
+        neighborhood=result.neighborhood,
+        stats=stats,
+    )
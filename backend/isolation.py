@@ -0,0 +1,339 @@
+"""
+Isolated, memory-capped solver processes.
+
+The ToT search runs every engine solve (`engines.py`) in a worker process
+instead of the API process, so a pathological instance that balloons native
+Gurobi memory costs one worker, not the server. Each worker runs one solve
+at a time and is
+
+- capped: its address space by an rlimit (`SEATHARMONY_SOLVER_MEMORY_MB`
+  times ADDRESS_SPACE_FACTOR, for mapped libraries and thread stacks) and
+  Gurobi's own `MemLimit` (`SEATHARMONY_SOLVER_MEMORY_MB`);
+- watched: while a solve runs, the caller checks the worker's resident size
+  and the solve deadline (`SEATHARMONY_SOLVE_TIMEOUT_SECONDS`) every
+  WATCHDOG_SECONDS and kills the worker past either;
+- recycled after `SEATHARMONY_SOLVER_MAX_JOBS` solves, which also bounds
+  heap fragmentation over long uptimes.
+
+A killed or crashed worker is replaced by a fresh one on the next solve, and
+the solve itself degrades to the heuristic engine, as does any engine result
+without a layout (solver failure, `MemLimit` hit). `stats["degraded"]` says
+why. Engines that run their own process pools (portfolio) or no solver
+(heuristic) stay in-process; processes that already are solver workers
+(batch, portfolio, `worker.py`) solve directly under the same caps.
+`SEATHARMONY_ISOLATE_SOLVES=0` turns isolation off. Other solver work (the
+Pareto frontier, pool mode, instance neighborhood re-solves) runs on the same
+workers via `run_isolated`, without the heuristic fallback.
+"""
+
+import multiprocessing
+import os
+import threading
+import time
+from dataclasses import dataclass
+from multiprocessing.connection import Connection
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .engines import get_engine
+from .metrics import SOLVER_WORKER_EXITS
+from .models import ConstraintSummary, Guest, Layout, VenueConfig
+
+ISOLATION_ENV = "SEATHARMONY_ISOLATE_SOLVES"
+ISOLATED_ENGINES = ("milp", "aggregated", "decomposed", "lns")
+ADDRESS_SPACE_FACTOR = 3
+WATCHDOG_SECONDS = 0.2
+RETIRE_TIMEOUT = 5.0
+
+
+def isolation_enabled() -> bool:
+    return os.getenv(ISOLATION_ENV, "1").lower() not in ("0", "false", "no")
+
+
+def solver_memory_mb() -> float:
+    """Per-worker memory cap; 0 disables it."""
+    return float(os.getenv("SEATHARMONY_SOLVER_MEMORY_MB") or 4096)
+
+
+def solve_timeout_seconds() -> float:
+    return float(os.getenv("SEATHARMONY_SOLVE_TIMEOUT_SECONDS") or 300)
+
+
+def solver_max_jobs() -> int:
+    return int(os.getenv("SEATHARMONY_SOLVER_MAX_JOBS") or 50)
+
+
+def isolated_workers() -> int:
+    # Lazy import to avoid circular deps (solver_pool -> metrics)
+    from .solver_pool import solver_slots
+
+    return solver_slots()
+
+
+def limit_memory() -> float:
+    """Cap this process's address space (call in solver processes); returns the cap in MB (0: none)."""
+    memory_mb = solver_memory_mb()
+    if memory_mb <= 0:
+        return 0.0
+    try:
+        import resource
+
+        limit = int(memory_mb * ADDRESS_SPACE_FACTOR * 1024 * 1024)
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    except (ImportError, ValueError, OSError) as e:
+        print(f"⚠ Warning: could not cap solver process memory: {type(e).__name__}: {e}")
+    return memory_mb
+
+
+def _rss_mb(pid: int) -> Optional[float]:
+    """Resident set size from /proc (None where unavailable)."""
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+
+
+def _run_engine(
+    engine: str, guests: List[Guest], venue: VenueConfig, weights: Dict[str, float], time_limit: Optional[float]
+) -> Tuple[Layout, ConstraintSummary]:
+    return get_engine(engine)(guests, venue, weights, time_limit=time_limit)
+
+
+def _worker_main(conn: Connection, solver_threads: int) -> None:
+    """Worker process: run (function, args) jobs until told to stop; functions must be module-level."""
+    # Lazy import to avoid circular deps (batch -> solver_pool -> metrics)
+    from .batch import _init_worker
+
+    _init_worker(solver_threads)
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:
+            return
+        if job is None:
+            return
+        fn, args = job
+        try:
+            reply: Tuple[str, Any] = ("ok", fn(*args))
+        except Exception as e:
+            reply = ("error", e)
+        try:
+            conn.send(reply)
+        except Exception as e:
+            conn.send(("error", RuntimeError(f"{type(e).__name__}: {e}")))
+
+
+class WorkerLost(Exception):
+    """The worker running a solve was killed (memory, deadline) or died."""
+
+
+@dataclass
+class _Worker:
+    process: Any  # multiprocessing.process.BaseProcess
+    conn: Connection
+    jobs: int = 0
+
+    def kill(self) -> None:
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+    def retire(self) -> None:
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+        self.process.join(RETIRE_TIMEOUT)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+
+class IsolatedSolvers:
+    """Up to `workers` solver processes, started on demand; one solve per worker at a time."""
+
+    def __init__(self, workers: int, memory_mb: float, max_jobs: int):
+        self.workers = workers
+        self.memory_mb = memory_mb
+        self.max_jobs = max_jobs
+        self._context = multiprocessing.get_context("spawn")
+        self._idle: List[_Worker] = []
+        self._alive = 0
+        self._cond = threading.Condition()
+
+    def _spawn(self) -> _Worker:
+        solver_threads = max(1, (os.cpu_count() or 1) // self.workers)
+        parent, child = self._context.Pipe()
+        process = self._context.Process(
+            target=_worker_main, args=(child, solver_threads), name="seatharmony-solver", daemon=True
+        )
+        process.start()
+        child.close()
+        return _Worker(process=process, conn=parent)
+
+    def _acquire(self) -> _Worker:
+        with self._cond:
+            while not self._idle and self._alive >= self.workers:
+                self._cond.wait()
+            if self._idle:
+                return self._idle.pop()
+            self._alive += 1
+        try:
+            return self._spawn()
+        except Exception:
+            self._release(None)
+            raise
+
+    def _release(self, worker: Optional[_Worker]) -> None:
+        """Return a healthy worker to the idle list; None when it is gone."""
+        with self._cond:
+            if worker is not None:
+                self._idle.append(worker)
+            else:
+                self._alive -= 1
+            self._cond.notify()
+
+    def _watch(self, worker: _Worker, deadline: float) -> Optional[str]:
+        """Wait for the reply; the reason the worker must be killed, if any."""
+        while not worker.conn.poll(WATCHDOG_SECONDS):
+            if not worker.process.is_alive():
+                return "crash"
+            rss = _rss_mb(worker.process.pid)
+            if self.memory_mb > 0 and rss is not None and rss > self.memory_mb:
+                return "memory"
+            if time.monotonic() > deadline:
+                return "deadline"
+        return None
+
+    def solve(
+        self,
+        engine: str,
+        guests: List[Guest],
+        venue: VenueConfig,
+        weights: Dict[str, float],
+        timeout: float,
+        time_limit: Optional[float] = None,
+    ) -> Tuple[Layout, ConstraintSummary]:
+        """
+        Run one engine solve (with the engine's `time_limit`, see engines.py) on a
+        worker; raises WorkerLost if the worker had to be killed or died.
+        """
+        return self.run(_run_engine, (engine, guests, venue, weights, time_limit), timeout, f"engine '{engine}'")
+
+    def run(self, fn: Callable[..., Any], args: Tuple[Any, ...], timeout: float, label: str) -> Any:
+        """fn(*args) on a worker (fn module-level, args picklable); raises WorkerLost like `solve`."""
+        worker = self._acquire()
+        deadline = time.monotonic() + timeout
+        try:
+            try:
+                worker.conn.send((fn, args))
+                reason = self._watch(worker, deadline)
+                status, payload = worker.conn.recv() if reason is None else (None, None)
+            except (EOFError, OSError):
+                reason = "crash"
+        except BaseException:
+            # E.g. unpicklable arguments, or a reply that cannot be unpickled: the worker's state is unknown
+            SOLVER_WORKER_EXITS.inc(reason="error")
+            worker.kill()
+            self._release(None)
+            raise
+        if reason is None and status == "error" and isinstance(payload, MemoryError):
+            reason = "memory"
+        if reason is not None:
+            SOLVER_WORKER_EXITS.inc(reason=reason)
+            worker.kill()
+            self._release(None)
+            raise WorkerLost(f"solver worker lost ({reason}) while running {label}")
+
+        worker.jobs += 1
+        if worker.jobs >= self.max_jobs:
+            SOLVER_WORKER_EXITS.inc(reason="recycled")
+            worker.retire()
+            self._release(None)
+        else:
+            self._release(worker)
+        if status == "error":
+            raise payload
+        return payload
+
+    def shutdown(self) -> None:
+        with self._cond:
+            idle, self._idle = self._idle, []
+            self._alive -= len(idle)
+        for worker in idle:
+            worker.retire()
+
+
+_solvers: Optional[IsolatedSolvers] = None
+_solvers_lock = threading.Lock()
+
+
+def get_isolated_solvers() -> IsolatedSolvers:
+    global _solvers
+    with _solvers_lock:
+        if _solvers is None:
+            _solvers = IsolatedSolvers(isolated_workers(), solver_memory_mb(), solver_max_jobs())
+        return _solvers
+
+
+def shutdown_isolated_solvers() -> None:
+    global _solvers
+    with _solvers_lock:
+        if _solvers is not None:
+            _solvers.shutdown()
+            _solvers = None
+
+
+def _degraded(
+    guests: List[Guest],
+    venue: VenueConfig,
+    weights: Dict[str, float],
+    engine: str,
+    reason: str,
+    time_limit: Optional[float],
+) -> Tuple[Layout, ConstraintSummary]:
+    print(f"⚠ Warning: {reason}; using the heuristic engine")
+    layout, summary = get_engine("heuristic")(guests, venue, weights, time_limit=time_limit)
+    layout.stats = {**layout.stats, "degraded": {"engine": engine, "reason": reason}}
+    return layout, summary
+
+
+def solve(
+    engine: str,
+    guests: List[Guest],
+    venue: VenueConfig,
+    weights: Dict[str, float],
+    time_limit: Optional[float] = None,
+) -> Tuple[Layout, ConstraintSummary]:
+    """
+    Run `engine` on an isolated worker when enabled (in-process otherwise),
+    falling back to the heuristic engine when the worker is lost or the
+    engine produced no layout. `time_limit` lowers the engine's own limit.
+    """
+    fn = get_engine(engine)
+    if not isolation_enabled() or engine not in ISOLATED_ENGINES:
+        layout, summary = fn(guests, venue, weights, time_limit=time_limit)
+    else:
+        try:
+            layout, summary = get_isolated_solvers().solve(
+                engine, guests, venue, weights, solve_timeout_seconds(), time_limit
+            )
+        except WorkerLost as e:
+            return _degraded(guests, venue, weights, engine, str(e), time_limit)
+    if layout.id == "dummy" and guests and venue.tables and engine != "heuristic":
+        reason = layout.stats.get("error") or (layout.stats.get("solver") or {}).get("status") or "no layout"
+        return _degraded(guests, venue, weights, engine, f"engine '{engine}' found no layout ({reason})", time_limit)
+    return layout, summary
+
+
+def run_isolated(fn: Callable[..., Any], args: Tuple[Any, ...], time_limit: float, label: str) -> Any:
+    """
+    `fn(*args)` on an isolated worker when enabled (in-process otherwise), for
+    solver work limited to `time_limit` seconds. Raises WorkerLost when the
+    worker is lost; there is no fallback. `fn` must be picklable.
+    """
+    if not isolation_enabled():
+        return fn(*args)
+    return get_isolated_solvers().run(fn, args, time_limit + solve_timeout_seconds(), label)
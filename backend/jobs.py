@@ -0,0 +1,540 @@
+"""
+Job queue between the API and the solver workers.
+
+With `SEATHARMONY_QUEUE_URL` set, the API does not solve layouts itself: it
+admits a request (cheap, no model), puts it on the queue and waits for a
+worker (`python -m backend.worker`) to post the result. Workers pull jobs as
+they have free slots and advertise their capacity (slots, busy slots, host)
+with a heartbeat, so compute nodes are added or removed independently of the
+API replicas. Without the variable, layouts are solved in the API process as
+before.
+
+Backends, by URL:
+- `memory://` – in-process queue with an in-process worker (tests, dev);
+- `sqlite:///path/to/jobs.db` – one machine, any number of worker processes;
+- `redis://host:6379/0` – shared queue for several machines (needs `redis`).
+
+A job's payload is one layout request plus its time budget; its result is
+the record of `batch._run_event` ({"status": "ok", "result": ...} or
+{"status": "error", "error": {...}}). Jobs claimed by a worker whose
+heartbeat stopped (crashed, killed) go back on the queue; the dispatcher
+checks every WORKER_TTL seconds.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional
+
+# Seconds between worker heartbeats; a worker is gone after WORKER_TTL without one
+HEARTBEAT_SECONDS = 2.0
+WORKER_TTL = 10.0
+POLL_SECONDS = 0.05
+
+
+@dataclass
+class Job:
+    id: str
+    payload: Dict[str, Any]  # {"request": LayoutRequest dict, "budget_seconds": float or None}
+    status: str = "queued"  # queued / running / done
+    result: Optional[Dict[str, Any]] = None
+    worker_id: Optional[str] = None
+
+
+@dataclass
+class WorkerInfo:
+    id: str
+    host: str
+    pid: int
+    slots: int
+    busy: int = 0
+    heartbeat: float = field(default_factory=time.time)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class JobQueue:
+    """Interface of the queue backends."""
+
+    def submit(self, payload: Dict[str, Any]) -> str:
+        raise NotImplementedError
+
+    def claim(self, worker_id: str, timeout: float) -> Optional[Job]:
+        """Oldest queued job, marked running by `worker_id`; None if none arrived within `timeout`."""
+        raise NotImplementedError
+
+    def finish(self, job_id: str, result: Dict[str, Any]) -> None:
+        raise NotImplementedError
+
+    def get(self, job_id: str) -> Optional[Job]:
+        raise NotImplementedError
+
+    def cancel(self, job_id: str) -> bool:
+        """Drop a job that no worker has claimed yet; False if it is already running or done."""
+        raise NotImplementedError
+
+    def requeue_lost(self) -> List[str]:
+        """Put running jobs whose worker has no live heartbeat back on the queue; their ids."""
+        raise NotImplementedError
+
+    def delete(self, job_id: str) -> None:
+        raise NotImplementedError
+
+    def depth(self) -> int:
+        """Number of queued (unclaimed) jobs."""
+        raise NotImplementedError
+
+    def heartbeat(self, info: WorkerInfo) -> None:
+        raise NotImplementedError
+
+    def remove_worker(self, worker_id: str) -> None:
+        raise NotImplementedError
+
+    def workers(self) -> List[WorkerInfo]:
+        """Workers with a heartbeat in the last WORKER_TTL seconds."""
+        raise NotImplementedError
+
+
+class MemoryQueue(JobQueue):
+    def __init__(self):
+        self._jobs: Dict[str, Job] = {}
+        self._queued: "OrderedDict[str, None]" = OrderedDict()
+        self._workers: Dict[str, WorkerInfo] = {}
+        self._cond = threading.Condition()
+
+    def submit(self, payload: Dict[str, Any]) -> str:
+        job = Job(id=uuid.uuid4().hex, payload=payload)
+        with self._cond:
+            self._jobs[job.id] = job
+            self._queued[job.id] = None
+            self._cond.notify()
+        return job.id
+
+    def claim(self, worker_id: str, timeout: float) -> Optional[Job]:
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._queued, timeout):
+                return None
+            job_id, _ = self._queued.popitem(last=False)
+            job = self._jobs[job_id]
+            job.status, job.worker_id = "running", worker_id
+            return job
+
+    def finish(self, job_id: str, result: Dict[str, Any]) -> None:
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job.status, job.result = "done", result
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._cond:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> bool:
+        with self._cond:
+            if job_id not in self._queued:
+                return False
+            del self._queued[job_id]
+            del self._jobs[job_id]
+            return True
+
+    def requeue_lost(self) -> List[str]:
+        live = {w.id for w in self.workers()}
+        with self._cond:
+            lost = [j.id for j in self._jobs.values() if j.status == "running" and j.worker_id not in live]
+            for job_id in lost:
+                job = self._jobs[job_id]
+                job.status, job.worker_id = "queued", None
+                self._queued[job_id] = None
+                self._queued.move_to_end(job_id, last=False)  # it was first in line before
+            if lost:
+                self._cond.notify(len(lost))
+        return lost
+
+    def delete(self, job_id: str) -> None:
+        with self._cond:
+            self._jobs.pop(job_id, None)
+
+    def depth(self) -> int:
+        with self._cond:
+            return len(self._queued)
+
+    def heartbeat(self, info: WorkerInfo) -> None:
+        with self._cond:
+            self._workers[info.id] = info
+
+    def remove_worker(self, worker_id: str) -> None:
+        with self._cond:
+            self._workers.pop(worker_id, None)
+
+    def workers(self) -> List[WorkerInfo]:
+        now = time.time()
+        with self._cond:
+            return [w for w in self._workers.values() if now - w.heartbeat <= WORKER_TTL]
+
+
+class SQLiteQueue(JobQueue):
+    """Queue in a SQLite file shared by the processes of one machine."""
+
+    def __init__(self, path: str):
+        self._conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs (seq INTEGER PRIMARY KEY AUTOINCREMENT, id TEXT UNIQUE, "
+                "payload TEXT, status TEXT, result TEXT, worker_id TEXT)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, seq)")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS workers (id TEXT PRIMARY KEY, info TEXT, heartbeat REAL)")
+
+    def submit(self, payload: Dict[str, Any]) -> str:
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, payload, status) VALUES (?, ?, 'queued')", (job_id, json.dumps(payload))
+            )
+        return job_id
+
+    def _claim_once(self, worker_id: str) -> Optional[Job]:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT id, payload FROM jobs WHERE status = 'queued' ORDER BY seq LIMIT 1"
+                ).fetchone()
+                if row is not None:
+                    self._conn.execute(
+                        "UPDATE jobs SET status = 'running', worker_id = ? WHERE id = ?", (worker_id, row[0])
+                    )
+            finally:
+                self._conn.execute("COMMIT")
+        if row is None:
+            return None
+        return Job(id=row[0], payload=json.loads(row[1]), status="running", worker_id=worker_id)
+
+    def claim(self, worker_id: str, timeout: float) -> Optional[Job]:
+        deadline = time.monotonic() + timeout
+        while True:
+            job = self._claim_once(worker_id)
+            if job is not None or time.monotonic() >= deadline:
+                return job
+            time.sleep(POLL_SECONDS)
+
+    def finish(self, job_id: str, result: Dict[str, Any]) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = 'done', result = ? WHERE id = ?", (json.dumps(result, default=str), job_id)
+            )
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload, status, result, worker_id FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        result = json.loads(row[2]) if row[2] is not None else None
+        return Job(id=job_id, payload=json.loads(row[0]), status=row[1], result=result, worker_id=row[3])
+
+    def cancel(self, job_id: str) -> bool:
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM jobs WHERE id = ? AND status = 'queued'", (job_id,))
+        return cursor.rowcount > 0
+
+    def requeue_lost(self) -> List[str]:
+        lost = "status = 'running' AND worker_id NOT IN (SELECT id FROM workers WHERE heartbeat >= ?)"
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                since = time.time() - WORKER_TTL
+                rows = self._conn.execute(f"SELECT id FROM jobs WHERE {lost}", (since,)).fetchall()
+                # Back in its original place: the queue is ordered by seq
+                self._conn.execute(f"UPDATE jobs SET status = 'queued', worker_id = NULL WHERE {lost}", (since,))
+            finally:
+                self._conn.execute("COMMIT")
+        return [row[0] for row in rows]
+
+    def delete(self, job_id: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+
+    def depth(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM jobs WHERE status = 'queued'").fetchone()[0]
+
+    def heartbeat(self, info: WorkerInfo) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO workers (id, info, heartbeat) VALUES (?, ?, ?)",
+                (info.id, json.dumps(info.to_dict()), info.heartbeat),
+            )
+
+    def remove_worker(self, worker_id: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM workers WHERE id = ?", (worker_id,))
+
+    def workers(self) -> List[WorkerInfo]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT info FROM workers WHERE heartbeat >= ?", (time.time() - WORKER_TTL,)
+            ).fetchall()
+        return [WorkerInfo(**json.loads(row[0])) for row in rows]
+
+
+class RedisQueue(JobQueue):
+    """
+    Queue in Redis: a list of job ids, one hash per job, one expiring key per
+    worker. Claiming moves a job id atomically (BLMOVE) into the worker's
+    processing list, so a worker that dies right after claiming does not lose
+    the job.
+    """
+
+    def __init__(self, url: str, prefix: str = "seatharmony"):
+        # Lazy import: redis is only needed when this backend is configured
+        import redis
+
+        self._redis = redis.Redis.from_url(url, decode_responses=True)
+        self._prefix = prefix
+
+    def _job_key(self, job_id: str) -> str:
+        return f"{self._prefix}:job:{job_id}"
+
+    def _queue_key(self) -> str:
+        return f"{self._prefix}:queue"
+
+    def _processing_key(self, worker_id: str) -> str:
+        return f"{self._prefix}:processing:{worker_id}"
+
+    def _worker_key(self, worker_id: str) -> str:
+        return f"{self._prefix}:worker:{worker_id}"
+
+    def submit(self, payload: Dict[str, Any]) -> str:
+        job_id = uuid.uuid4().hex
+        pipe = self._redis.pipeline()
+        pipe.hset(self._job_key(job_id), mapping={"payload": json.dumps(payload), "status": "queued"})
+        pipe.lpush(self._queue_key(), job_id)
+        pipe.execute()
+        return job_id
+
+    def claim(self, worker_id: str, timeout: float) -> Optional[Job]:
+        deadline = time.monotonic() + timeout
+        while True:
+            # BLMOVE blocks in whole seconds; 0 would block forever
+            job_id = self._redis.blmove(
+                self._queue_key(),
+                self._processing_key(worker_id),
+                max(1, int(deadline - time.monotonic())),
+                src="RIGHT",
+                dest="LEFT",
+            )
+            if job_id is not None:
+                payload = self._redis.hget(self._job_key(job_id), "payload")
+                if payload is not None:
+                    self._redis.hset(self._job_key(job_id), mapping={"status": "running", "worker_id": worker_id})
+                    return Job(id=job_id, payload=json.loads(payload), status="running", worker_id=worker_id)
+                self._redis.lrem(self._processing_key(worker_id), 0, job_id)  # cancelled meanwhile
+            if time.monotonic() >= deadline:
+                return None
+
+    def finish(self, job_id: str, result: Dict[str, Any]) -> None:
+        worker_id = self._redis.hget(self._job_key(job_id), "worker_id")
+        if worker_id is None:
+            return  # abandoned (the dispatcher deleted it) or requeued meanwhile
+        pipe = self._redis.pipeline()
+        pipe.lrem(self._processing_key(worker_id), 0, job_id)
+        pipe.hset(self._job_key(job_id), mapping={"status": "done", "result": json.dumps(result, default=str)})
+        pipe.execute()
+
+    def get(self, job_id: str) -> Optional[Job]:
+        data = self._redis.hgetall(self._job_key(job_id))
+        if not data:
+            return None
+        result = json.loads(data["result"]) if "result" in data else None
+        return Job(
+            id=job_id,
+            payload=json.loads(data["payload"]),
+            status=data["status"],
+            result=result,
+            worker_id=data.get("worker_id"),
+        )
+
+    def cancel(self, job_id: str) -> bool:
+        if self._redis.lrem(self._queue_key(), 0, job_id) == 0:
+            return False
+        self._redis.delete(self._job_key(job_id))
+        return True
+
+    def requeue_lost(self) -> List[str]:
+        lost: List[str] = []
+        prefix = self._processing_key("")
+        for key in self._redis.scan_iter(match=f"{prefix}*"):
+            worker_id = key[len(prefix):]
+            if self._redis.exists(self._worker_key(worker_id)):
+                continue
+            # Oldest claim first; RPUSH puts it at the consuming end of the queue
+            while (job_id := self._redis.rpop(key)) is not None:
+                if not self._redis.exists(self._job_key(job_id)):
+                    continue  # abandoned by the dispatcher
+                pipe = self._redis.pipeline()
+                pipe.hset(self._job_key(job_id), "status", "queued")
+                pipe.hdel(self._job_key(job_id), "worker_id")
+                pipe.rpush(self._queue_key(), job_id)
+                pipe.execute()
+                lost.append(job_id)
+        return lost
+
+    def delete(self, job_id: str) -> None:
+        self._redis.delete(self._job_key(job_id))
+
+    def depth(self) -> int:
+        return int(self._redis.llen(self._queue_key()))
+
+    def heartbeat(self, info: WorkerInfo) -> None:
+        self._redis.set(self._worker_key(info.id), json.dumps(info.to_dict()), ex=int(WORKER_TTL))
+
+    def remove_worker(self, worker_id: str) -> None:
+        self._redis.delete(self._worker_key(worker_id))
+
+    def workers(self) -> List[WorkerInfo]:
+        keys = list(self._redis.scan_iter(match=f"{self._prefix}:worker:*"))
+        return [WorkerInfo(**json.loads(value)) for value in self._redis.mget(keys) if value] if keys else []
+
+
+def queue_url() -> Optional[str]:
+    return os.getenv("SEATHARMONY_QUEUE_URL") or None
+
+
+def open_queue(url: str) -> JobQueue:
+    if url.startswith("memory://"):
+        return MemoryQueue()
+    if url.startswith("sqlite:///"):
+        return SQLiteQueue(url[len("sqlite:///"):])
+    if url.startswith(("redis://", "rediss://")):
+        return RedisQueue(url)
+    raise ValueError(f"Unsupported queue URL '{url}' (expected memory://, sqlite:///path or redis://host:port/db)")
+
+
+class Dispatcher:
+    """
+    Submits layout jobs and resolves their futures from the queue (one polling
+    thread, which also requeues the jobs of lost workers).
+    """
+
+    def __init__(self, queue: JobQueue):
+        self.queue = queue
+        self._futures: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._next_reclaim = time.monotonic() + WORKER_TTL
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._poll, name="seatharmony-dispatcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, request: Dict[str, Any], budget_seconds: Optional[float]) -> Future:
+        """Future of the job's result record; it is running once a worker claimed the job."""
+        future: Future = Future()
+        job_id = self.queue.submit({"request": request, "budget_seconds": budget_seconds})
+        with self._lock:
+            self._futures[job_id] = future
+        return future
+
+    def abandon(self, future: Future) -> None:
+        """Stop waiting for a submitted job (e.g. past the request's timeout): drop it, queued or running."""
+        with self._lock:
+            job_id = next((j for j, f in self._futures.items() if f is future), None)
+            if job_id is None:
+                return
+            del self._futures[job_id]
+        future.cancel()
+        if not self.queue.cancel(job_id):
+            self.queue.delete(job_id)  # already claimed: the result is discarded
+
+    def _reclaim(self) -> None:
+        if time.monotonic() < self._next_reclaim:
+            return
+        self._next_reclaim = time.monotonic() + WORKER_TTL
+        try:
+            lost = self.queue.requeue_lost()
+        except Exception as e:
+            print(f"⚠ Warning: could not requeue the jobs of lost workers: {type(e).__name__}: {e}")
+            return
+        if lost:
+            print(f"⚠ Warning: requeued {len(lost)} job(s) of lost workers")
+
+    def _poll(self) -> None:
+        while not self._stop.wait(POLL_SECONDS):
+            self._reclaim()
+            with self._lock:
+                watched = list(self._futures.items())
+            for job_id, future in watched:
+                try:
+                    self._check(job_id, future)
+                except Exception as e:
+                    print(f"⚠ Warning: could not poll job {job_id}: {type(e).__name__}: {e}")
+
+    def _check(self, job_id: str, future: Future) -> None:
+        if future.cancelled():
+            if not self.queue.cancel(job_id):
+                self.queue.delete(job_id)  # already claimed: the result is discarded
+            self._forget(job_id)
+            return
+        job = self.queue.get(job_id)
+        if job is None:
+            self._forget(job_id)
+            future.set_exception(RuntimeError(f"Job {job_id} disappeared from the queue"))
+            return
+        if job.status != "queued" and not future.running():
+            if not future.set_running_or_notify_cancel():
+                return  # cancelled meanwhile; cleaned up on the next poll
+        if job.status == "done":
+            self._forget(job_id)
+            self.queue.delete(job_id)
+            future.set_result(job.result)
+
+    def _forget(self, job_id: str) -> None:
+        with self._lock:
+            self._futures.pop(job_id, None)
+
+    def shutdown(self) -> None:
+        self._stop.set()
+
+
+_dispatcher: Optional[Dispatcher] = None
+_local_worker: Optional[Any] = None
+_dispatcher_lock = threading.Lock()
+
+
+def get_dispatcher() -> Optional[Dispatcher]:
+    """The process-wide dispatcher, or None if no queue is configured (solve in-process)."""
+    global _dispatcher, _local_worker
+    url = queue_url()
+    if url is None:
+        return None
+    with _dispatcher_lock:
+        if _dispatcher is None:
+            queue = open_queue(url)
+            if isinstance(queue, MemoryQueue):
+                # Nobody else can reach an in-process queue: serve it from this process
+                from .worker import Worker
+
+                _local_worker = Worker(queue, slots=1, in_process=True)
+                _local_worker.start()
+            _dispatcher = Dispatcher(queue)
+        return _dispatcher
+
+
+def shutdown_dispatcher() -> None:
+    global _dispatcher, _local_worker
+    with _dispatcher_lock:
+        if _dispatcher is not None:
+            _dispatcher.shutdown()
+            _dispatcher = None
+        if _local_worker is not None:
+            _local_worker.stop()
+            _local_worker = None
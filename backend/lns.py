@@ -0,0 +1,269 @@
+"""
+Large Neighborhood Search on top of the MILP.
+
+Starting from any layout (by default the greedy + local search heuristic),
+each iteration lets a destroy operator pick a few tables, frees every guest
+seated there, and re-seats them with the guest-level MILP restricted to those
+tables (`optimizer._build_seating_model` on the sub-instance, warm-started
+from the incumbent). All other guests stay fixed. Because whole tables are
+freed, the fixed guests contribute nothing to the sub-objective, so the
+sub-MILP is the seating problem of the freed guests and tables (with the
+tables' quality in the whole venue). Improvements are accepted; the incumbent
+is kept as arrays between iterations, and only the small sub-model is ever
+built.
+
+Destroy operators are registered in DESTROY_OPERATORS; each takes the search
+state, a random generator and the number of tables to free, and returns
+table indices.
+"""
+
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .affinity import affinity_weight, restrict_affinity
+from .domains import DomainError, compile_domains
+from .heuristic import _greedy_construct, generate_layout_heuristic, improve
+from .households import contract_households, has_households
+from .metrics import PhaseTimer
+from .models import ConstraintSummary, Guest, Layout, VenueConfig
+from .optimizer import (
+    _build_seating_model,
+    _dummy_layout,
+    _expand_units,
+    _extract_assignments,
+    _gurobi,
+    _is_var,
+    _make_layout,
+)
+from .scoring import ScoringContext, build_context, pair_values, priority_weight, weighted_score
+
+DEFAULT_TIME_LIMIT = 20.0
+DEFAULT_SUB_TIME_LIMIT = 2.0
+DEFAULT_TABLES_PER_MOVE = 3
+IMPROVEMENT_EPS = 1e-6
+
+
+@dataclass
+class LNSState:
+    """Incumbent of the search, shared with the destroy operators."""
+
+    ctx: ScoringContext
+    weights: Dict[str, float]
+    table_of: np.ndarray
+    score: float
+    P: np.ndarray = field(init=False)
+
+    def __post_init__(self):
+        self.P = pair_values(self.ctx, self.weights)
+
+    def counts(self) -> np.ndarray:
+        return self.ctx.counts(self.table_of)
+
+
+DestroyOperator = Callable[[LNSState, np.random.Generator, int], np.ndarray]
+
+
+def destroy_random_tables(state: LNSState, rng: np.random.Generator, k: int) -> np.ndarray:
+    """Any k tables."""
+    return rng.choice(state.ctx.n_tables, size=min(k, state.ctx.n_tables), replace=False)
+
+
+def destroy_adjacent_tables(state: LNSState, rng: np.random.Generator, k: int) -> np.ndarray:
+    """k consecutive tables, so guests can trade better and worse seats (relationship priority)."""
+    k = min(k, state.ctx.n_tables)
+    start = int(rng.integers(0, state.ctx.n_tables - k + 1))
+    return np.arange(start, start + k)
+
+
+def destroy_category(state: LNSState, rng: np.random.Generator, k: int) -> np.ndarray:
+    """
+    One category's guests: the k tables holding its smallest fragments, so the
+    category can be regrouped (random tables if it is not fragmented).
+    """
+    counts = state.counts()
+    fragmented = np.flatnonzero((counts > 0).sum(axis=0) > 1)
+    if fragmented.size == 0:
+        return destroy_random_tables(state, rng, k)
+    c = int(rng.choice(fragmented))
+    present = np.flatnonzero(counts[:, c] > 0)
+    tables = present[np.argsort(counts[present, c], kind="stable")][:k]
+    if tables.size < k:
+        others = np.setdiff1d(np.arange(state.ctx.n_tables), tables)
+        tables = np.concatenate([tables, rng.choice(others, size=min(k - tables.size, others.size), replace=False)])
+    return tables
+
+
+DESTROY_OPERATORS: Dict[str, DestroyOperator] = {
+    "random_tables": destroy_random_tables,
+    "adjacent_tables": destroy_adjacent_tables,
+    "category": destroy_category,
+}
+
+
+def register_destroy_operator(name: str, fn: DestroyOperator) -> None:
+    DESTROY_OPERATORS[name] = fn
+
+
+def _score(ctx: ScoringContext, table_of: np.ndarray, weights: Dict[str, float]) -> float:
+    return weighted_score(ctx.terms_from_counts(ctx.counts(table_of), table_of), weights)
+
+
+def repair(
+    guests: List[Guest],
+    venue: VenueConfig,
+    state: LNSState,
+    tables: np.ndarray,
+    time_limit: float,
+) -> Optional[np.ndarray]:
+    """
+    Re-seat all guests at `tables` with the sub-MILP, warm-started from the
+    incumbent. Returns the new table_of (None if the solver found nothing).
+    """
+    _, GRB = _gurobi()
+    ctx = state.ctx
+    free = np.flatnonzero(np.isin(state.table_of, tables))
+    if free.size == 0:
+        return None
+    sub_guests = [guests[g] for g in free]
+    sub_ids = {g.id for g in sub_guests}
+    sub_venue = VenueConfig(
+        tables=[venue.tables[t] for t in tables],
+        settings=venue.settings,
+        affinity=restrict_affinity(venue.affinity, sub_ids),
+    )
+    model, x, units = _build_seating_model(
+        sub_guests, sub_venue, state.weights, PhaseTimer(), {}, quality=list(ctx.quality[tables])
+    )
+    model.setParam('TimeLimit', time_limit)
+    sub_table_ids = [ctx.table_ids[t] for t in tables]
+    for u_id, members in units.items():
+        current = ctx.table_ids[state.table_of[ctx.guest_index[members[0]]]]
+        for t_id in sub_table_ids:
+            if _is_var(x[u_id, t_id]):
+                x[u_id, t_id].Start = 1.0 if t_id == current else 0.0
+    model.optimize()
+    if model.SolCount == 0:
+        return None
+
+    assignments = _expand_units(_extract_assignments(x, list(units), sub_table_ids), units)
+    table_of = state.table_of.copy()
+    for g_id, t_id in assignments.items():
+        table_of[ctx.guest_index[g_id]] = ctx.table_index[t_id]
+    return table_of
+
+
+def _initial_table_of(
+    ctx: ScoringContext,
+    guests: List[Guest],
+    venue: VenueConfig,
+    weights: Dict[str, float],
+    initial: Optional[Dict[str, str]],
+) -> Optional[np.ndarray]:
+    """Raises DomainError if the venue's pins and eligibility rules cannot be met."""
+    domains = compile_domains(guests, venue)
+    if initial is not None:
+        table_of = ctx.table_of(initial)
+        if np.any(table_of < 0):
+            return None
+        if domains is not None and not domains.allowed[np.arange(ctx.n_guests), table_of].all():
+            return None
+        return table_of
+    party_of = movable = None
+    if has_households(guests):
+        _, party_of = contract_households(guests)
+        movable = np.bincount(party_of)[party_of] == 1
+    allowed = domains.allowed if domains is not None else None
+    table_of = _greedy_construct(
+        ctx, pair_values(ctx, weights), priority_weight(weights), party_of, affinity_weight(weights), allowed
+    )
+    if table_of is None:
+        return None
+    table_of, _ = improve(ctx, weights, table_of, max_passes=5, movable=movable, allowed=allowed)
+    return table_of
+
+
+def generate_layout_lns(
+    guests: List[Guest],
+    venue: VenueConfig,
+    weights: Dict[str, float],
+    time_limit: float = DEFAULT_TIME_LIMIT,
+    sub_time_limit: float = DEFAULT_SUB_TIME_LIMIT,
+    tables_per_move: int = DEFAULT_TABLES_PER_MOVE,
+    operators: Optional[List[str]] = None,
+    initial: Optional[Dict[str, str]] = None,
+    seed: int = 0,
+) -> Tuple[Layout, ConstraintSummary]:
+    """
+    LNS within a wall-clock budget, from `initial` assignments (guest_id ->
+    table_id) or the heuristic layout. `operators` names entries of
+    DESTROY_OPERATORS (default: all). stats["lns"]["trace"] has one entry per
+    iteration: elapsed seconds, operator, incumbent score, accepted.
+    """
+    if not guests or not venue.tables:
+        return _dummy_layout(guests, venue)
+
+    start = time.perf_counter()
+    timer = PhaseTimer()
+    stats: Dict[str, Any] = {"timings": timer.timings, "engine": "lns"}
+    ctx = build_context(guests, venue)
+    if ctx.capacity.sum() < ctx.n_guests:
+        return _dummy_layout(guests, venue)
+
+    try:
+        with timer.phase("construction"):
+            table_of = _initial_table_of(ctx, guests, venue, weights, initial)
+    except DomainError as e:
+        stats["error"] = f"{type(e).__name__}: {e}"
+        layout, summary = _dummy_layout(guests, venue)
+        layout.stats = stats
+        return layout, summary
+    if table_of is None:
+        print("⚠ Warning: LNS found no feasible start layout; using the heuristic engine")
+        return generate_layout_heuristic(guests, venue, weights)
+
+    names = operators or list(DESTROY_OPERATORS)
+    rng = np.random.default_rng(seed)
+    state = LNSState(ctx=ctx, weights=weights, table_of=table_of, score=_score(ctx, table_of, weights))
+    operator_stats = {name: {"tries": 0, "improvements": 0} for name in names}
+    trace: List[Dict[str, Any]] = [
+        {"iteration": 0, "elapsed": time.perf_counter() - start, "operator": None, "score": state.score, "accepted": True}
+    ]
+    stats["lns"] = {"start_score": state.score, "trace": trace, "operators": operator_stats}
+
+    deadline = start + time_limit
+    iteration = 0
+    while time.perf_counter() < deadline:
+        iteration += 1
+        name = names[int(rng.integers(len(names)))]
+        tables = np.asarray(DESTROY_OPERATORS[name](state, rng, tables_per_move), dtype=np.int64)
+        remaining = deadline - time.perf_counter()
+        try:
+            with timer.phase("repair"):
+                candidate = repair(guests, venue, state, tables, min(sub_time_limit, max(remaining, 0.01)))
+        except Exception as e:
+            stats["error"] = f"{type(e).__name__}: {e}"
+            break
+        operator_stats[name]["tries"] += 1
+        accepted = False
+        if candidate is not None:
+            score = _score(ctx, candidate, weights)
+            if score > state.score + IMPROVEMENT_EPS:
+                state.table_of, state.score = candidate, score
+                operator_stats[name]["improvements"] += 1
+                accepted = True
+        trace.append({
+            "iteration": iteration,
+            "elapsed": time.perf_counter() - start,
+            "operator": name,
+            "score": state.score,
+            "accepted": accepted,
+        })
+    stats["lns"]["iterations"] = iteration
+
+    assignments = {ctx.guest_ids[g]: ctx.table_ids[t] for g, t in enumerate(state.table_of)}
+    layout, summary = _make_layout("lns", assignments, state.score, weights)
+    layout.stats = stats
+    return layout, summary
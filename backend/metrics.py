@@ -0,0 +1,196 @@
+"""
+Lightweight in-process metrics with Prometheus text exposition.
+
+`PhaseTimer` collects named phase durations for one unit of work (a solve, a
+request) and feeds the process-wide histograms below; `/metrics` in `api.py`
+renders `REGISTRY` in the Prometheus text format.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+LabelValues = Tuple[str, ...]
+
+# Seconds: 1 ms .. 10 min
+DEFAULT_TIME_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0)
+# Model sizes: 100 .. 10M rows/columns
+SIZE_BUCKETS = (1e2, 1e3, 1e4, 1e5, 1e6, 1e7)
+GAP_BUCKETS = (0.0, 1e-4, 1e-3, 0.01, 0.05, 0.1, 0.25, 1.0)
+
+
+def _format_labels(names: Sequence[str], values: LabelValues, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [f'{n}="{v}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = tuple(str(labels.get(n, "")) for n in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        key = tuple(str(labels.get(n, "")) for n in self.labelnames)
+        return self._values.get(key, 0.0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {value}")
+        return lines
+
+
+class Gauge(Counter):
+    def set(self, value: float, **labels: str) -> None:
+        key = tuple(str(labels.get(n, "")) for n in self.labelnames)
+        with self._lock:
+            self._values[key] = value
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        lines[1] = f"# TYPE {self.name} gauge"
+        return lines
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_TIME_BUCKETS,
+    ):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> (bucket counts, sum, count)
+        self._series: Dict[LabelValues, Tuple[List[int], float, int]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(str(labels.get(n, "")) for n in self.labelnames)
+        with self._lock:
+            counts, total, count = self._series.get(key, ([0] * len(self.buckets), 0.0, 0))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            self._series[key] = (counts, total + value, count + 1)
+
+    def count(self, **labels: str) -> int:
+        key = tuple(str(labels.get(n, "")) for n in self.labelnames)
+        return self._series.get(key, ([], 0.0, 0))[2]
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, (counts, total, count) in sorted(self._series.items()):
+                for bound, bucket_count in zip(self.buckets, counts):
+                    lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, ('le', repr(float(bound))))} {bucket_count}")
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, ('le', '+Inf'))} {count}")
+                lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {total}")
+                lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: List[object] = []
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+        metric = Counter(name, help_text, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def gauge(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Gauge:
+        metric = Gauge(name, help_text, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_TIME_BUCKETS,
+    ) -> Histogram:
+        metric = Histogram(name, help_text, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())  # type: ignore[attr-defined]
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+PHASE_SECONDS = REGISTRY.histogram(
+    "seatharmony_phase_seconds",
+    "Time spent per optimization phase (pair_enumeration, model_build, solve, extraction, tot_search, serialization, llm).",
+    labelnames=("phase",),
+)
+REQUEST_SECONDS = REGISTRY.histogram(
+    "seatharmony_request_seconds", "HTTP request latency.", labelnames=("path", "status")
+)
+MODEL_VARS = REGISTRY.histogram("seatharmony_model_vars", "Variables per built MILP.", buckets=SIZE_BUCKETS)
+MODEL_CONSTRS = REGISTRY.histogram("seatharmony_model_constrs", "Constraints per built MILP.", buckets=SIZE_BUCKETS)
+MODEL_NONZEROS = REGISTRY.histogram("seatharmony_model_nonzeros", "Nonzeros per built MILP.", buckets=SIZE_BUCKETS)
+MIP_GAP = REGISTRY.histogram("seatharmony_mip_gap", "Relative MIP gap at the end of each solve.", buckets=GAP_BUCKETS)
+SOLVER_STATUS = REGISTRY.counter("seatharmony_solver_status_total", "Solves by final solver status.", labelnames=("status",))
+CACHE_LOOKUPS = REGISTRY.counter("seatharmony_cache_total", "Cache lookups by cache and result.", labelnames=("cache", "result"))
+PORTFOLIO_WINS = REGISTRY.counter(
+    "seatharmony_portfolio_wins_total", "Portfolio races by winning member.", labelnames=("member",)
+)
+SOLVER_QUEUE_DEPTH = REGISTRY.gauge(
+    "seatharmony_solver_queue_depth", "Requests waiting for a solver slot by priority.", labelnames=("priority",)
+)
+SOLVER_QUEUE_WAIT = REGISTRY.histogram(
+    "seatharmony_solver_queue_wait_seconds", "Time from queueing to a solver slot by priority.", labelnames=("priority",)
+)
+SOLVER_REJECTED = REGISTRY.counter(
+    "seatharmony_solver_rejected_total", "Requests rejected with 429 (solver queue full) by priority.", labelnames=("priority",)
+)
+SOLVER_WORKER_EXITS = REGISTRY.counter(
+    "seatharmony_solver_worker_exits_total",
+    "Isolated solver worker exits by reason (memory, deadline, crash, error, recycled).",
+    labelnames=("reason",),
+)
+COALESCED_REQUESTS = REGISTRY.counter(
+    "seatharmony_coalesced_requests_total",
+    "Requests served by an identical in-flight request's computation.",
+    labelnames=("endpoint",),
+)
+LLM_CALLS = REGISTRY.counter("seatharmony_llm_calls_total", "LLM calls by outcome.", labelnames=("call", "outcome"))
+WARMUP_SECONDS = REGISTRY.gauge("seatharmony_warmup_seconds", "Background import/warm-up time per component.", labelnames=("component",))
+
+
+class PhaseTimer:
+    """Accumulates wall-clock seconds per named phase and reports them to PHASE_SECONDS."""
+
+    def __init__(self):
+        self.timings: Dict[str, float] = {}
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.timings[name] = self.timings.get(name, 0.0) + elapsed
+            PHASE_SECONDS.observe(elapsed, phase=name)
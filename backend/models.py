@@ -1,5 +1,5 @@
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 
 @dataclass
@@ -9,6 +9,8 @@ class Guest:
     group_id: Optional[str] = None
     importance: int = 0
     tags: List[str] = field(default_factory=list)
+    # Guests sharing a household_id (couples, families with kids) always sit together
+    household_id: Optional[str] = None
 
 
 @dataclass
@@ -20,10 +22,19 @@ class Table:
     constraints: Dict[str, Any] = field(default_factory=dict)
 
 
+@dataclass
+class Affinity:
+    """Explicit guest-pair relationships (e.g. from a CRM), by guest id."""
+
+    rewards: List[Tuple[str, str, float]] = field(default_factory=list)  # value > 0: reward for sitting together
+    conflicts: List[Tuple[str, str]] = field(default_factory=list)  # must not share a table
+
+
 @dataclass
 class VenueConfig:
     tables: List[Table]
     settings: Dict[str, Any] = field(default_factory=dict)
+    affinity: Optional[Affinity] = None
 
 
 @dataclass
@@ -42,6 +53,10 @@ class Layout:
     variant_label: Optional[str] = None
     variant_id: Optional[str] = None
     summary: Optional[ConstraintSummary] = None
+    # Run statistics: per-phase timings, model size, solver status/gap, cache hits
+    stats: Dict[str, Any] = field(default_factory=dict)
+    # guest_id -> seat number at their table, when seats were assigned (seating.py)
+    seats: Dict[str, int] = field(default_factory=dict)
 
 
 def guests_from_dicts(data: List[Dict[str, Any]]) -> List[Guest]:
@@ -65,6 +80,8 @@ def layout_to_dict(layout: Layout) -> Dict[str, Any]:
             "violated_soft": layout.summary.violated_soft if layout.summary else {},
             "hard_violations": layout.summary.hard_violations if layout.summary else [],
         },
+        "stats": layout.stats,
+        "seats": layout.seats,
     }
 
 
@@ -1,11 +1,15 @@
-from typing import Dict, List, Tuple, Optional
-
-import numpy as np
-import gurobipy as gp
-from gurobipy import GRB
+import time
+from typing import TYPE_CHECKING, Any, Dict, List, Tuple, Optional
 
+from .affinity import add_affinity_terms, affinity_weight, has_affinity
+from .metrics import MIP_GAP, MODEL_CONSTRS, MODEL_NONZEROS, MODEL_VARS, SOLVER_STATUS, PhaseTimer
 from .models import Guest, Table, VenueConfig, Layout, ConstraintSummary
 
+if TYPE_CHECKING:
+    import gurobipy as gp
+
+    from .domains import Domains
+
 # Category definitions for wedding seating optimization
 IMMEDIATE_FAMILY_CATEGORIES = {"Groom's Family", "Bride's Family"}
 EXTENDED_FAMILY_CATEGORIES = {"Groom's Extended Family", "Bride's Extended Family"}
@@ -77,6 +81,53 @@ def _get_closeness_rank(category: Optional[str]) -> int:
     return CLOSENESS_RANK.get(category, 0) if category else 0
 
 
+def _gurobi():
+    """
+    Import gurobipy on first use. Importing this module (category helpers,
+    fallback layouts) must stay cheap for API cold starts and non-MILP engines.
+    """
+    import gurobipy as gp
+    from gurobipy import GRB
+
+    return gp, GRB
+
+
+# Names of GRB status codes reported in stats/metrics
+_STATUS_NAMES = (
+    "OPTIMAL", "SUBOPTIMAL", "INFEASIBLE", "INF_OR_UNBD", "UNBOUNDED",
+    "TIME_LIMIT", "NODE_LIMIT", "SOLUTION_LIMIT", "INTERRUPTED", "MEM_LIMIT",
+)
+
+
+def _status_name(status: int) -> str:
+    _, GRB = _gurobi()
+    for name in _STATUS_NAMES:
+        if getattr(GRB, name) == status:
+            return name.lower()
+    return str(status)
+
+
+def _model_size(model: "gp.Model") -> Dict[str, int]:
+    """Variables/constraints/nonzeros of a built model; also recorded as metrics."""
+    size = {"vars": model.NumVars, "constrs": model.NumConstrs, "nonzeros": model.NumNZs}
+    MODEL_VARS.observe(size["vars"])
+    MODEL_CONSTRS.observe(size["constrs"])
+    MODEL_NONZEROS.observe(size["nonzeros"])
+    return size
+
+
+def _solver_stats(model: "gp.Model") -> Dict[str, Any]:
+    """Final status, runtime and MIP gap of an optimized model; also recorded as metrics."""
+    status = _status_name(model.status)
+    stats: Dict[str, Any] = {"status": status, "runtime": model.Runtime, "mip_gap": None, "obj_bound": None}
+    if model.SolCount > 0:
+        stats["mip_gap"] = model.MIPGap
+        stats["obj_bound"] = model.ObjBound
+        MIP_GAP.observe(model.MIPGap)
+    SOLVER_STATUS.inc(status=status)
+    return stats
+
+
 def _dummy_layout(guests: List[Guest], venue: VenueConfig) -> Tuple[Layout, ConstraintSummary]:
     """
     Fallback layout generator when optimization fails.
@@ -104,35 +155,17 @@ def _dummy_layout(guests: List[Guest], venue: VenueConfig) -> Tuple[Layout, Cons
     return layout, summary
 
 
-def generate_layout_for_weights(
-    guests: List[Guest], venue: VenueConfig, weights: Dict[str, float]
-) -> Tuple[Layout, ConstraintSummary]:
-    """
-    Generate a single layout for a given set of objective weights.
-    Uses Gurobi MILP solver for optimization.
-    """
-    if not guests or not venue.tables:
-        return _dummy_layout(guests, venue)
-
-    tables: List[Table] = venue.tables
-    guest_ids = [g.id for g in guests]
-    table_ids = [t.id for t in tables]
-    n_guests = len(guest_ids)
-    n_tables = len(table_ids)
+PairList = List[Tuple[str, str]]
 
-    # Index mappings
-    guest_idx = {g: i for i, g in enumerate(guest_ids)}
-    table_idx = {t: i for i, t in enumerate(table_ids)}
-    guests_by_id = {g.id: g for g in guests}
-    table_by_id = {t.id: t for t in tables}
+SIDE_MIXING_MODELS = ("auto", "pairs", "compact")
 
-    # Get new wedding-specific hyperparameters
-    family_cohesion_weight = weights.get("family_cohesion", 0.0)
-    social_group_cohesion_weight = weights.get("social_group_cohesion", 0.0)
-    side_mixing_weight = weights.get("side_mixing", 0.0)
-    relationship_priority_weight = weights.get("relationship_priority", 0.0)
 
-    # Identify pairs for linearization based on categories
+def _enumerate_pairs(guests: List[Guest], cross_side: bool = True) -> Tuple[PairList, PairList, PairList]:
+    """
+    Identify the guest pairs that need linearization variables.
+    Returns (family_pairs, social_group_pairs, cross_side_pairs); cross-side
+    pairs are skipped with `cross_side=False` (compact side mixing).
+    """
     # Family cohesion pairs: guests from family categories at same table
     family_pairs = []
     for i, g1 in enumerate(guests):
@@ -160,7 +193,7 @@ def generate_layout_for_weights(
     # Side mixing pairs: guests from different sides (groom vs bride) at same table
     # This encourages mixing but we'll penalize separation, so we track cross-side pairs
     cross_side_pairs = []
-    for i, g1 in enumerate(guests):
+    for i, g1 in enumerate(guests if cross_side else []):
         cat1 = _get_category(g1)
         if cat1 in NEUTRAL_CATEGORIES:
             continue  # Neutral categories can mix with anyone
@@ -173,133 +206,351 @@ def generate_layout_for_weights(
                (_is_bride_side(cat1) and _is_groom_side(cat2)):
                 cross_side_pairs.append((g1.id, g2.id))
 
-    # Conflict pairs: removed - not used in current implementation
-    conflict_pairs = []
+    return family_pairs, social_group_pairs, cross_side_pairs
 
-    # Create Gurobi model
-    try:
-        model = gp.Model("SeatHarmony")
-        model.setParam('OutputFlag', 0)  # Suppress Gurobi output
-        
-        # Create binary variables
-        # x[g, t]: guest g at table t
-        x = {}
-        for g_id in guest_ids:
-            for t_id in table_ids:
-                x[g_id, t_id] = model.addVar(vtype=GRB.BINARY, name=f"x_{g_id}_{t_id}")
-        
-        # f[p, t]: both guests of family pair p at table t
-        f = {}
-        for p_idx in range(len(family_pairs)):
-            for t_id in table_ids:
-                f[p_idx, t_id] = model.addVar(vtype=GRB.BINARY, name=f"f_{p_idx}_{t_id}")
-        
-        # s[p, t]: both guests of social group pair p at table t
-        s = {}
-        for p_idx in range(len(social_group_pairs)):
-            for t_id in table_ids:
-                s[p_idx, t_id] = model.addVar(vtype=GRB.BINARY, name=f"s_{p_idx}_{t_id}")
-        
-        # c[p, t]: both guests of cross-side pair p at table t
-        c = {}
-        for p_idx in range(len(cross_side_pairs)):
-            for t_id in table_ids:
-                c[p_idx, t_id] = model.addVar(vtype=GRB.BINARY, name=f"c_{p_idx}_{t_id}")
-        
-        # Conflict variables removed - not used in current implementation
-        
-        model.update()
-        
-        # Build objective: MAXIMIZE
-        #   family_cohesion * sum(f) + social_group_cohesion * sum(s) + 
-        #   side_mixing * sum(c) + relationship_priority * priority_expr - conflict_penalty * sum(w)
-        obj = gp.LinExpr()
-        
+
+def _side_counts(guests: List[Guest]) -> Tuple[int, int]:
+    """(groom-side, bride-side) guest counts."""
+    categories = [_get_category(g) for g in guests]
+    return sum(1 for c in categories if _is_groom_side(c)), sum(1 for c in categories if _is_bride_side(c))
+
+
+def _use_compact_side_mixing(
+    settings: Dict[str, Any], weight: float, n_groom: int, n_bride: int, max_capacity: int
+) -> bool:
+    """
+    Whether side mixing is modeled from per-table side counts instead of one
+    linearization variable per cross-side pair (n_groom * n_bride of them).
+    settings["side_mixing_model"] is "pairs", "compact" or "auto" (default:
+    compact once there are more cross-side pairs than seats at a table). The
+    compact form only bounds the product from above, so a negative weight
+    always uses pairs.
+    """
+    mode = settings.get("side_mixing_model", "auto")
+    if mode not in SIDE_MIXING_MODELS:
+        raise ValueError(f"Unknown side_mixing_model {mode!r}; expected one of {', '.join(SIDE_MIXING_MODELS)}")
+    if mode == "pairs" or weight < 0:
+        return False
+    return mode == "compact" or weight == 0 or n_groom * n_bride > max_capacity
+
+
+def _side_mixing_product(
+    model: "gp.Model",
+    name: str,
+    groom_t: "gp.LinExpr",
+    bride_t: "gp.LinExpr",
+    groom_upper: int,
+    bride_upper: int,
+    lower: bool = False,
+) -> "gp.LinExpr":
+    """
+    Linearize groom_t * bride_t for one table: one-hot expansion
+    u[k] = [groom_t == k] and m[k] = u[k] * bride_t, bounded above (enough
+    when the product is maximized). `lower` also bounds m[k] from below, as a
+    negative weight needs. Adds O(capacity) variables and rows regardless of
+    the number of guests.
+    """
+    gp, GRB = _gurobi()
+    u = [model.addVar(vtype=GRB.BINARY, name=f"u_{name}_{k}") for k in range(groom_upper + 1)]
+    m = {k: model.addVar(lb=0, ub=bride_upper, name=f"m_{name}_{k}") for k in range(1, groom_upper + 1)}
+    model.addConstr(gp.quicksum(u) == 1, name=f"u_{name}_one")
+    model.addConstr(gp.quicksum(k * u[k] for k in range(groom_upper + 1)) == groom_t, name=f"u_{name}_link")
+    for k in range(1, groom_upper + 1):
+        model.addConstr(m[k] <= bride_upper * u[k], name=f"m_{name}_{k}_u")
+        model.addConstr(m[k] <= bride_t, name=f"m_{name}_{k}_bride")
+        if lower:
+            model.addConstr(m[k] >= bride_t - bride_upper * (1 - u[k]), name=f"m_{name}_{k}_lower")
+    return gp.quicksum(k * m[k] for k in range(1, groom_upper + 1))
+
+
+def _is_var(x: Any) -> bool:
+    """False for cells of x that domains fixed to a constant (see domains.py)."""
+    return not isinstance(x, float)
+
+
+def _pair_product(model: "gp.Model", name: str, x1: Any, x2: Any) -> Any:
+    """
+    Linearize x1 * x2 (both at one table): y <= x1, y <= x2, y >= x1 + x2 - 1.
+    Constant cells (pinned or ineligible) need no variable: the product is 0,
+    1 or the other cell.
+    """
+    if not _is_var(x1):
+        return x2 if x1 else 0.0
+    if not _is_var(x2):
+        return x1 if x2 else 0.0
+    _, GRB = _gurobi()
+    y = model.addVar(vtype=GRB.BINARY, name=name)
+    model.addConstr(y <= x1, name=f"{name}_leq_x1")
+    model.addConstr(y <= x2, name=f"{name}_leq_x2")
+    model.addConstr(y >= x1 + x2 - 1, name=f"{name}_geq_x1_x2")
+    return y
+
+
+def _x_cells(
+    model: "gp.Model", unit_ids: List[str], table_ids: List[str], domains: Optional["Domains"] = None
+) -> Dict[Tuple[str, str], Any]:
+    """
+    x[unit_id, table_id]: unit at table. With `domains`, pinned and ineligible
+    cells are the constants 1.0 / 0.0 instead of variables.
+    """
+    _, GRB = _gurobi()
+    x = {}
+    for u, u_id in enumerate(unit_ids):
+        for t, t_id in enumerate(table_ids):
+            constant = domains.constant(u, t) if domains is not None else None
+            if constant is None:
+                x[u_id, t_id] = model.addVar(vtype=GRB.BINARY, name=f"x_{u_id}_{t_id}")
+            else:
+                x[u_id, t_id] = constant
+    return x
+
+
+def _removed_cells(x: Dict[Tuple[str, str], Any], pairs: PairList, table_ids: List[str]) -> Dict[str, int]:
+    """How many x cells, and (pair, table) cells with variable and rows, the domains removed."""
+    return {
+        "x": sum(1 for v in x.values() if not _is_var(v)),
+        "pairs": sum(
+            1 for u1, u2 in pairs for t_id in table_ids if not (_is_var(x[u1, t_id]) and _is_var(x[u2, t_id]))
+        ),
+    }
+
+
+def _build_model(
+    guests: List[Guest],
+    venue: VenueConfig,
+    weights: Dict[str, float],
+    pairs: Tuple[PairList, PairList, PairList],
+    quality: Optional[List[float]] = None,
+    domains: Optional["Domains"] = None,
+) -> Tuple["gp.Model", Dict[Tuple[str, str], "gp.Var"]]:
+    """
+    Build the seating MILP for the given weights and pair sets.
+    `quality` overrides the per-table quality 1 / (1 + table index), e.g. for
+    a subset of a venue's tables. With `domains`, x has constants for pinned
+    and ineligible cells and no pair variables or rows are built on them.
+    Returns the (not yet optimized) model and the x[guest_id, table_id] variables.
+    """
+    gp, GRB = _gurobi()
+    tables: List[Table] = venue.tables
+    guest_ids = [g.id for g in guests]
+    table_ids = [t.id for t in tables]
+    table_by_id = {t.id: t for t in tables}
+    family_pairs, social_group_pairs, cross_side_pairs = pairs
+
+    # Get new wedding-specific hyperparameters
+    family_cohesion_weight = weights.get("family_cohesion", 0.0)
+    social_group_cohesion_weight = weights.get("social_group_cohesion", 0.0)
+    side_mixing_weight = weights.get("side_mixing", 0.0)
+    relationship_priority_weight = weights.get("relationship_priority", 0.0)
+
+    model = gp.Model("SeatHarmony")
+    model.setParam('OutputFlag', 0)  # Suppress Gurobi output
+
+    # Create binary variables
+    # x[g, t]: guest g at table t
+    x = _x_cells(model, guest_ids, table_ids, domains)
+
+    # f[p, t]: both guests of family pair p at table t (with its linearization rows)
+    f = {}
+    for p_idx, (g1_id, g2_id) in enumerate(family_pairs):
+        for t_id in table_ids:
+            f[p_idx, t_id] = _pair_product(model, f"f_{p_idx}_{t_id}", x[g1_id, t_id], x[g2_id, t_id])
+
+    # s[p, t]: both guests of social group pair p at table t
+    s = {}
+    for p_idx, (g1_id, g2_id) in enumerate(social_group_pairs):
+        for t_id in table_ids:
+            s[p_idx, t_id] = _pair_product(model, f"s_{p_idx}_{t_id}", x[g1_id, t_id], x[g2_id, t_id])
+
+    n_groom, n_bride = _side_counts(guests)
+    compact_side_mixing = _use_compact_side_mixing(
+        venue.settings, side_mixing_weight, n_groom, n_bride, max((t.capacity for t in tables), default=0)
+    )
+    if compact_side_mixing:
+        cross_side_pairs = []
+
+    # c[p, t]: both guests of cross-side pair p at table t
+    c = {}
+    for p_idx, (g1_id, g2_id) in enumerate(cross_side_pairs):
+        for t_id in table_ids:
+            c[p_idx, t_id] = _pair_product(model, f"c_{p_idx}_{t_id}", x[g1_id, t_id], x[g2_id, t_id])
+
+    model.update()
+
+    # Build objective: MAXIMIZE
+    #   family_cohesion * sum(f) + social_group_cohesion * sum(s) +
+    #   side_mixing * sum(c) + relationship_priority * priority_expr
+    # The unweighted terms are kept on the model (model._terms) so they can be
+    # re-weighted or constrained without a rebuild (see frontier.py).
+    terms: Dict[str, Any] = {
         # Family cohesion: reward f variables
-        for p_idx in range(len(family_pairs)):
-            for t_id in table_ids:
-                obj += family_cohesion_weight * f[p_idx, t_id]
-        
+        "family_cohesion": gp.quicksum(f.values()),
         # Social group cohesion: reward s variables
-        for p_idx in range(len(social_group_pairs)):
-            for t_id in table_ids:
-                obj += social_group_cohesion_weight * s[p_idx, t_id]
-        
+        "social_group_cohesion": gp.quicksum(s.values()),
         # Side mixing: reward c variables - encourages cross-side pairs
-        for p_idx in range(len(cross_side_pairs)):
-            for t_id in table_ids:
-                obj += side_mixing_weight * c[p_idx, t_id]
-        
-        # Relationship priority: prefer guests with higher closeness rank at better tables
-        if table_ids and relationship_priority_weight > 0:
-            for t_idx, t_id in enumerate(table_ids):
-                table_quality = 1.0 / (1.0 + t_idx)  # Higher quality for lower index
-                for g in guests:
-                    category = _get_category(g)
-                    closeness = _get_closeness_rank(category)
-                    if closeness > 0:
-                        # Reward placing high-closeness guests at high-quality tables
-                        obj += relationship_priority_weight * closeness * table_quality * x[g.id, t_id]
-        
-        # Conflict penalty removed - not used in current implementation
-        
-        model.setObjective(obj, GRB.MAXIMIZE)
-        
-        # Constraint 1: Each guest sits at exactly one table
-        # sum_t x[g, t] = 1 for each guest g
-        for g_id in guest_ids:
-            model.addConstr(gp.quicksum(x[g_id, t_id] for t_id in table_ids) == 1, name=f"guest_{g_id}_assignment")
-        
-        # Constraint 2: Table capacity
-        # sum_g x[g, t] <= capacity[t] for each table t
+        "side_mixing": gp.quicksum(c.values()),
+        "relationship_priority": gp.LinExpr(),
+    }
+
+    # Compact side mixing: the cross-side pairs at a table are groom_t * bride_t
+    if compact_side_mixing and side_mixing_weight > 0 and n_groom and n_bride:
+        groom_ids = [g.id for g in guests if _is_groom_side(_get_category(g))]
+        bride_ids = [g.id for g in guests if _is_bride_side(_get_category(g))]
         for t_id in table_ids:
             cap = table_by_id[t_id].capacity
-            model.addConstr(gp.quicksum(x[g_id, t_id] for g_id in guest_ids) <= cap, name=f"table_{t_id}_capacity")
-        
-        # Constraint 3: Linearization for family pairs
-        # f[p, t] <= x[g1, t], f[p, t] <= x[g2, t], f[p, t] >= x[g1, t] + x[g2, t] - 1
-        for p_idx, (g1_id, g2_id) in enumerate(family_pairs):
-            for t_id in table_ids:
-                model.addConstr(f[p_idx, t_id] <= x[g1_id, t_id], name=f"f_{p_idx}_{t_id}_leq_x1")
-                model.addConstr(f[p_idx, t_id] <= x[g2_id, t_id], name=f"f_{p_idx}_{t_id}_leq_x2")
-                model.addConstr(f[p_idx, t_id] >= x[g1_id, t_id] + x[g2_id, t_id] - 1, name=f"f_{p_idx}_{t_id}_geq_x1_x2")
-        
-        # Constraint 4: Linearization for social group pairs
-        # s[p, t] <= x[g1, t], s[p, t] <= x[g2, t], s[p, t] >= x[g1, t] + x[g2, t] - 1
-        for p_idx, (g1_id, g2_id) in enumerate(social_group_pairs):
-            for t_id in table_ids:
-                model.addConstr(s[p_idx, t_id] <= x[g1_id, t_id], name=f"s_{p_idx}_{t_id}_leq_x1")
-                model.addConstr(s[p_idx, t_id] <= x[g2_id, t_id], name=f"s_{p_idx}_{t_id}_leq_x2")
-                model.addConstr(s[p_idx, t_id] >= x[g1_id, t_id] + x[g2_id, t_id] - 1, name=f"s_{p_idx}_{t_id}_geq_x1_x2")
-        
-        # Constraint 5: Linearization for cross-side pairs
-        # c[p, t] <= x[g1, t], c[p, t] <= x[g2, t], c[p, t] >= x[g1, t] + x[g2, t] - 1
-        for p_idx, (g1_id, g2_id) in enumerate(cross_side_pairs):
-            for t_id in table_ids:
-                model.addConstr(c[p_idx, t_id] <= x[g1_id, t_id], name=f"c_{p_idx}_{t_id}_leq_x1")
-                model.addConstr(c[p_idx, t_id] <= x[g2_id, t_id], name=f"c_{p_idx}_{t_id}_leq_x2")
-                model.addConstr(c[p_idx, t_id] >= x[g1_id, t_id] + x[g2_id, t_id] - 1, name=f"c_{p_idx}_{t_id}_geq_x1_x2")
-        
-        # Optimize
-        model.optimize()
-        
-        # Check if solution is optimal or feasible
-        if model.status not in [GRB.OPTIMAL, GRB.SUBOPTIMAL]:
-            return _dummy_layout(guests, venue)
-        
-        # Extract assignments from solution
-        assignments: Dict[str, str] = {}
-        for g_id in guest_ids:
-            for t_id in table_ids:
-                if x[g_id, t_id].x > 0.5:
-                    assignments[g_id] = t_id
-                    break
-        
-        # Get objective value
-        obj_value = model.ObjVal
-        
-    except Exception as e:
-        return _dummy_layout(guests, venue)
+            groom_t = gp.quicksum(x[g_id, t_id] for g_id in groom_ids)
+            bride_t = gp.quicksum(x[g_id, t_id] for g_id in bride_ids)
+            terms["side_mixing"] += _side_mixing_product(
+                model, t_id, groom_t, bride_t, min(cap, n_groom), min(cap, n_bride)
+            )
+
+    # Relationship priority: prefer guests with higher closeness rank at better tables
+    if table_ids and relationship_priority_weight > 0:
+        for t_idx, t_id in enumerate(table_ids):
+            table_quality = 1.0 / (1.0 + t_idx) if quality is None else quality[t_idx]  # Higher quality for lower index
+            for g in guests:
+                category = _get_category(g)
+                closeness = _get_closeness_rank(category)
+                if closeness > 0:
+                    # Reward placing high-closeness guests at high-quality tables
+                    terms["relationship_priority"] += closeness * table_quality * x[g.id, t_id]
+
+    obj = (
+        family_cohesion_weight * terms["family_cohesion"]
+        + social_group_cohesion_weight * terms["social_group_cohesion"]
+        + side_mixing_weight * terms["side_mixing"]
+        + relationship_priority_weight * terms["relationship_priority"]
+    )
+
+    # Explicit affinities/conflicts: only stated pairs add variables or rows
+    if has_affinity(venue.affinity):
+        w_affinity = affinity_weight(weights)
+        terms["affinity"] = add_affinity_terms(
+            model, x, table_ids, venue.affinity.rewards, venue.affinity.conflicts, 1.0 if w_affinity > 0 else 0.0
+        )
+        obj += w_affinity * terms["affinity"]
+    model._terms = terms
+
+    model.setObjective(obj, GRB.MAXIMIZE)
+
+    # Constraint 1: Each guest sits at exactly one table
+    # sum_t x[g, t] = 1 for each guest g (pinned guests are already seated)
+    for g_id in guest_ids:
+        cells = [x[g_id, t_id] for t_id in table_ids]
+        if any(_is_var(v) for v in cells):
+            model.addConstr(gp.quicksum(cells) == 1, name=f"guest_{g_id}_assignment")
+
+    # Constraint 2: Table capacity
+    # sum_g x[g, t] <= capacity[t] for each table t (pinned guests take seats as constants)
+    for t_id in table_ids:
+        cap = table_by_id[t_id].capacity
+        cells = [x[g_id, t_id] for g_id in guest_ids]
+        if any(_is_var(v) for v in cells):
+            model.addConstr(gp.quicksum(cells) <= cap, name=f"table_{t_id}_capacity")
+
+    # Pair linearizations (y <= x1, y <= x2, y >= x1 + x2 - 1) were added with f, s and c
+    if domains is not None:
+        model._removed_cells = _removed_cells(x, family_pairs + social_group_pairs + cross_side_pairs, table_ids)
+    return model, x
+
+
+# Model unit id (guest id, or party id for a contracted household) -> member guest ids
+Units = Dict[str, List[str]]
+
+
+def _build_seating_model(
+    guests: List[Guest],
+    venue: VenueConfig,
+    weights: Dict[str, float],
+    timer: PhaseTimer,
+    stats: Dict[str, Any],
+    quality: Optional[List[float]] = None,
+) -> Tuple["gp.Model", Dict[Tuple[str, str], "gp.Var"], Units]:
+    """
+    Pair enumeration and model build. Guests sharing a `household_id` are
+    contracted into weighted super-guests (see households.py), so x is keyed by
+    (unit_id, table_id). `quality` overrides the per-table quality (see _build_model).
+    Pins and table eligibility rules (see domains.py) are compiled into
+    per-unit table domains first; x cells outside them are constants.
+    """
+    domains = None
+    if any(t.constraints for t in venue.tables) or venue.settings.get("requires"):
+        # Lazy import: domains need numpy
+        from .domains import compile_domains
+
+        with timer.phase("domains"):
+            domains = compile_domains(guests, venue)
+
+    if any(g.household_id for g in guests):
+        # Lazy import: contraction needs numpy
+        from .households import build_party_model, has_households, prepare_parties
+
+        if has_households(guests):
+            with timer.phase("pair_enumeration"):
+                instance = prepare_parties(guests, venue, weights, quality, domains)
+            with timer.phase("model_build"):
+                model, x = build_party_model(instance, weights)
+                model.update()
+            stats["households"] = {"guests": len(guests), "units": len(instance.parties)}
+            stats["side_mixing_model"] = "compact" if instance.side_counts is not None else "pairs"
+            _domain_stats(stats, model, domains)
+            return model, x, {p.id: p.member_ids for p in instance.parties}
+
+    with timer.phase("pair_enumeration"):
+        n_groom, n_bride = _side_counts(guests)
+        compact = _use_compact_side_mixing(
+            venue.settings, weights.get("side_mixing", 0.0), n_groom, n_bride,
+            max((t.capacity for t in venue.tables), default=0),
+        )
+        pairs = _enumerate_pairs(guests, cross_side=not compact)
+    with timer.phase("model_build"):
+        model, x = _build_model(guests, venue, weights, pairs, quality, domains)
+        model.update()
+    stats["side_mixing_model"] = "compact" if compact else "pairs"
+    _domain_stats(stats, model, domains)
+    return model, x, {g.id: [g.id] for g in guests}
+
+
+def _domain_stats(stats: Dict[str, Any], model: "gp.Model", domains: Optional["Domains"]) -> None:
+    """How much the domains shrank the model: constant x cells and (pair, table) cells never built."""
+    if domains is not None:
+        stats["domains"] = {**domains.summary(), "removed_cells": getattr(model, "_removed_cells", None)}
+
+
+def _expand_units(unit_assignments: Dict[str, str], units: Units) -> Dict[str, str]:
+    return {g_id: t_id for u_id, t_id in unit_assignments.items() for g_id in units[u_id]}
+
+
+def _extract_assignments(
+    x: Dict[Tuple[str, str], "gp.Var"],
+    guest_ids: List[str],
+    table_ids: List[str],
+    solution_number: Optional[int] = None,
+) -> Dict[str, str]:
+    """
+    Read guest -> table assignments from a solved model.
+    With `solution_number` set, reads that solution from the pool (Xn) instead of X.
+    """
+    assignments: Dict[str, str] = {}
+    for g_id in guest_ids:
+        for t_id in table_ids:
+            value = x[g_id, t_id]
+            if _is_var(value):
+                value = value.x if solution_number is None else value.Xn
+            if value > 0.5:
+                assignments[g_id] = t_id
+                break
+    return assignments
+
+
+def _make_layout(
+    layout_id: str, assignments: Dict[str, str], score: float, weights: Dict[str, float]
+) -> Tuple[Layout, ConstraintSummary]:
+    """Wrap solver output into a Layout with an empty constraint summary."""
+    family_cohesion_weight = weights.get("family_cohesion", 0.0)
+    social_group_cohesion_weight = weights.get("social_group_cohesion", 0.0)
+    side_mixing_weight = weights.get("side_mixing", 0.0)
+    relationship_priority_weight = weights.get("relationship_priority", 0.0)
 
     summary = ConstraintSummary(
         satisfied_soft={},
@@ -308,9 +559,9 @@ def generate_layout_for_weights(
     )
 
     layout = Layout(
-        id="opt",
+        id=layout_id,
         assignments=assignments,
-        score=obj_value,
+        score=score,
         objective_breakdown={
             "family_cohesion": float(family_cohesion_weight) if family_cohesion_weight else 0.0,
             "social_group_cohesion": float(social_group_cohesion_weight) if social_group_cohesion_weight else 0.0,
@@ -321,5 +572,167 @@ def generate_layout_for_weights(
         variant_id=None,
         summary=summary,
     )
-
     return layout, summary
+
+
+def generate_layout_for_weights(
+    guests: List[Guest],
+    venue: VenueConfig,
+    weights: Dict[str, float],
+    time_limit: Optional[float] = None,
+    params: Optional[Dict[str, Any]] = None,
+    start: Optional[Dict[str, str]] = None,
+) -> Tuple[Layout, ConstraintSummary]:
+    """
+    Generate a single layout for a given set of objective weights.
+    Uses Gurobi MILP solver for optimization. `params` are extra Gurobi
+    parameters and `start` (guest_id -> table_id) a warm start; with
+    `time_limit` the best solution found in time is returned.
+    """
+    if not guests or not venue.tables:
+        return _dummy_layout(guests, venue)
+
+    table_ids = [t.id for t in venue.tables]
+    timer = PhaseTimer()
+    stats: Dict[str, Any] = {"timings": timer.timings}
+
+    # Identify pairs for linearization, then create and solve the Gurobi model
+    try:
+        _, GRB = _gurobi()
+        model, x, units = _build_seating_model(guests, venue, weights, timer, stats)
+        stats["model"] = _model_size(model)
+        if time_limit is not None:
+            model.setParam('TimeLimit', max(time_limit, 0.01))
+        for name, value in (params or {}).items():
+            model.setParam(name, value)
+        if start:
+            for u_id, members in units.items():
+                for t_id in table_ids:
+                    if _is_var(x[u_id, t_id]):
+                        x[u_id, t_id].Start = 1.0 if start.get(members[0]) == t_id else 0.0
+
+        with timer.phase("solve"):
+            model.optimize()
+        stats["solver"] = _solver_stats(model)
+
+        # Check if solution is optimal or feasible
+        if model.SolCount == 0 or model.status not in [GRB.OPTIMAL, GRB.SUBOPTIMAL, GRB.TIME_LIMIT]:
+            return _with_stats(_dummy_layout(guests, venue), stats)
+
+        with timer.phase("extraction"):
+            assignments = _expand_units(_extract_assignments(x, list(units), table_ids), units)
+        obj_value = model.ObjVal
+
+    except Exception as e:
+        stats["error"] = f"{type(e).__name__}: {e}"
+        return _with_stats(_dummy_layout(guests, venue), stats)
+
+    return _with_stats(_make_layout("opt", assignments, obj_value, weights), stats)
+
+
+def _with_stats(result: Tuple[Layout, ConstraintSummary], stats: Dict[str, Any]) -> Tuple[Layout, ConstraintSummary]:
+    result[0].stats = stats
+    return result
+
+
+def _assignment_distance(a: Dict[str, str], b: Dict[str, str]) -> int:
+    """Number of guests seated at a different table in `a` than in `b`."""
+    return sum(1 for g_id, t_id in a.items() if b.get(g_id) != t_id)
+
+
+def generate_diverse_layouts(
+    guests: List[Guest],
+    venue: VenueConfig,
+    weights: Dict[str, float],
+    k: int,
+    min_difference: Optional[int] = None,
+    max_rounds: int = 5,
+    time_limit: Optional[float] = None,
+) -> List[Tuple[Layout, ConstraintSummary]]:
+    """
+    Generate up to k high-quality, mutually different layouts from one model.
+    `time_limit` bounds all rounds together.
+
+    The model is built once and solved with Gurobi's solution pool; pool
+    solutions are picked greedily so that every pair of returned layouts seats at
+    least `min_difference` guests at different tables. If the pool does not hold
+    enough diverse solutions, no-good cuts excluding the neighborhood of every
+    picked layout are added and the same model is re-optimized.
+    """
+    if not guests or not venue.tables or k <= 0:
+        return [_dummy_layout(guests, venue)]
+
+    guest_ids = [g.id for g in guests]
+    table_ids = [t.id for t in venue.tables]
+    n_guests = len(guest_ids)
+    if min_difference is None:
+        # Default: at least 10% of the guests must move between any two layouts
+        min_difference = max(1, n_guests // 10)
+    min_difference = max(1, min(min_difference, n_guests))
+
+    timer = PhaseTimer()
+    stats: Dict[str, Any] = {"timings": timer.timings}
+
+    selected: List[Tuple[Dict[str, str], float]] = []
+    deadline = None if time_limit is None else time.perf_counter() + time_limit
+    try:
+        gp, GRB = _gurobi()
+        model, x, units = _build_seating_model(guests, venue, weights, timer, stats)
+        stats["model"] = _model_size(model)
+        # Systematic pool search: keep the best solutions found, not just the incumbent
+        model.setParam('PoolSearchMode', 2)
+        model.setParam('PoolSolutions', max(4 * k, 10))
+
+        cut_count = 0
+        for _ in range(max_rounds):
+            if deadline is not None:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                model.setParam('TimeLimit', max(remaining, 0.01))
+            with timer.phase("solve"):
+                model.optimize()
+            stats["solver"] = _solver_stats(model)
+            if model.status not in [GRB.OPTIMAL, GRB.SUBOPTIMAL, GRB.TIME_LIMIT] or model.SolCount == 0:
+                break
+
+            # Pool solutions are ordered best-first; pick greedily by distance
+            for sol_idx in range(model.SolCount):
+                model.setParam('SolutionNumber', sol_idx)
+                with timer.phase("extraction"):
+                    candidate = _expand_units(
+                        _extract_assignments(x, list(units), table_ids, solution_number=sol_idx), units
+                    )
+                if len(candidate) != n_guests:
+                    continue
+                if all(_assignment_distance(candidate, prev) >= min_difference for prev, _ in selected):
+                    selected.append((candidate, model.PoolObjVal))
+                    if len(selected) >= k:
+                        break
+            if len(selected) >= k:
+                break
+
+            # No-good cuts: every future solution must move at least
+            # `min_difference` guests away from each picked layout (a unit counts
+            # as its number of guests).
+            for prev, _ in selected[cut_count:]:
+                model.addConstr(
+                    gp.quicksum(len(members) * x[u_id, prev[members[0]]] for u_id, members in units.items())
+                    <= n_guests - min_difference,
+                    name=f"nogood_{cut_count}",
+                )
+                cut_count += 1
+
+    except Exception as e:
+        stats["error"] = f"{type(e).__name__}: {e}"
+
+    if not selected:
+        return [_with_stats(_dummy_layout(guests, venue), stats)]
+
+    results: List[Tuple[Layout, ConstraintSummary]] = []
+    for rank, (assignments, score) in enumerate(selected):
+        layout, summary = _make_layout(f"pool-{rank + 1}", assignments, score, weights)
+        layout.variant_id = str(rank + 1)
+        layout.stats = stats
+        results.append((layout, summary))
+    return results
@@ -0,0 +1,215 @@
+"""
+Portfolio racing under a latency deadline.
+
+Different instances favor different engines: the MILP wins on small events,
+the heuristic and LNS on large ones. A portfolio run first builds the
+heuristic layout in-process as the shared incumbent, then races the other
+members concurrently on a process pool, each with the incumbent as its start
+(warm start for the MILP, start layout for LNS) and the time left until the
+deadline as its own time limit. Whatever has finished at the deadline is
+compared on the same score (`scoring.py`); members still running are
+abandoned and their results discarded.
+
+`stats["portfolio"]` reports every member's outcome and the winner, and
+`seatharmony_portfolio_wins_total{member=...}` counts wins per member so that
+routing can learn which engine suits which instances.
+
+Members are registered in PORTFOLIO_MEMBERS; each takes (guests, venue,
+weights, time_limit, start) and returns (Layout, ConstraintSummary). They run
+in worker processes, so they must be module-level functions.
+"""
+
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .batch import _init_worker
+from .heuristic import generate_layout_heuristic
+from .metrics import PORTFOLIO_WINS, PhaseTimer
+from .models import ConstraintSummary, Guest, Layout, VenueConfig
+from .optimizer import _dummy_layout
+from .scoring import build_context, weighted_score
+
+DEFAULT_DEADLINE = 10.0
+# Time kept back from each member's limit for model build, pickling and process hand-off
+MEMBER_TIME_MARGIN = 0.5
+
+MemberFn = Callable[
+    [List[Guest], VenueConfig, Dict[str, float], float, Optional[Dict[str, str]]], Tuple[Layout, ConstraintSummary]
+]
+
+
+def _milp(
+    guests: List[Guest], venue: VenueConfig, weights: Dict[str, float], time_limit: float, start: Optional[Dict[str, str]]
+) -> Tuple[Layout, ConstraintSummary]:
+    from .optimizer import generate_layout_for_weights
+
+    return generate_layout_for_weights(guests, venue, weights, time_limit=time_limit, start=start)
+
+
+def _milp_feasibility(
+    guests: List[Guest], venue: VenueConfig, weights: Dict[str, float], time_limit: float, start: Optional[Dict[str, str]]
+) -> Tuple[Layout, ConstraintSummary]:
+    """MILP tuned for finding good solutions early rather than proving optimality."""
+    from .optimizer import generate_layout_for_weights
+
+    params = {"MIPFocus": 1, "Heuristics": 0.5}
+    return generate_layout_for_weights(guests, venue, weights, time_limit=time_limit, params=params, start=start)
+
+
+def _lns(
+    guests: List[Guest], venue: VenueConfig, weights: Dict[str, float], time_limit: float, start: Optional[Dict[str, str]]
+) -> Tuple[Layout, ConstraintSummary]:
+    from .lns import generate_layout_lns
+
+    return generate_layout_lns(guests, venue, weights, time_limit=time_limit, initial=start)
+
+
+PORTFOLIO_MEMBERS: Dict[str, MemberFn] = {
+    "milp": _milp,
+    "milp_feasibility": _milp_feasibility,
+    "lns": _lns,
+}
+
+
+def register_portfolio_member(name: str, fn: MemberFn) -> None:
+    PORTFOLIO_MEMBERS[name] = fn
+
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def portfolio_workers() -> int:
+    return int(os.getenv("SEATHARMONY_PORTFOLIO_WORKERS") or len(PORTFOLIO_MEMBERS))
+
+
+def get_executor() -> ProcessPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            workers = portfolio_workers()
+            solver_threads = max(1, (os.cpu_count() or 1) // workers)
+            # spawn: the API process holds threads (server, warm-up) that must not be forked
+            _executor = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(solver_threads,),
+            )
+        return _executor
+
+
+def shutdown_executor() -> None:
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+def _run_member(
+    fn: MemberFn,
+    guests: List[Guest],
+    venue: VenueConfig,
+    weights: Dict[str, float],
+    deadline_at: float,
+    start: Optional[Dict[str, str]],
+) -> Tuple[Layout, ConstraintSummary]:
+    """Worker entry point; the time limit counts from when the member actually starts (wall clock)."""
+    return fn(guests, venue, weights, max(deadline_at - time.time() - MEMBER_TIME_MARGIN, 0.01), start)
+
+
+def generate_layout_portfolio(
+    guests: List[Guest],
+    venue: VenueConfig,
+    weights: Dict[str, float],
+    deadline: float = DEFAULT_DEADLINE,
+    members: Optional[List[str]] = None,
+) -> Tuple[Layout, ConstraintSummary]:
+    """
+    Race `members` (names in PORTFOLIO_MEMBERS, default: all) from the
+    heuristic incumbent and return the best layout found within `deadline`
+    seconds.
+    """
+    if not guests or not venue.tables:
+        return _dummy_layout(guests, venue)
+
+    started = time.perf_counter()
+    timer = PhaseTimer()
+    names = members or list(PORTFOLIO_MEMBERS)
+    for name in names:
+        if name not in PORTFOLIO_MEMBERS:
+            raise ValueError(f"Unknown portfolio member '{name}'. Available members: {sorted(PORTFOLIO_MEMBERS)}")
+
+    ctx = build_context(guests, venue)
+
+    def score(layout: Layout) -> Optional[float]:
+        """Score on the common scale, None for failed (dummy) layouts."""
+        if layout.id == "dummy":
+            return None
+        table_of = ctx.table_of(layout.assignments)
+        if np.any(table_of < 0):
+            return None
+        return weighted_score(ctx.terms_from_counts(ctx.counts(table_of), table_of), weights)
+
+    with timer.phase("incumbent"):
+        incumbent = generate_layout_heuristic(guests, venue, weights)
+    results: Dict[str, Dict[str, Any]] = {
+        "heuristic": {"status": "ok", "score": score(incumbent[0]), "seconds": time.perf_counter() - started}
+    }
+    layouts = {"heuristic": incumbent}
+    start = incumbent[0].assignments if results["heuristic"]["score"] is not None else None
+
+    remaining = deadline - (time.perf_counter() - started)
+    deadline_at = time.time() + remaining
+    pending: Dict[Future, str] = {}
+    if remaining > MEMBER_TIME_MARGIN:
+        with timer.phase("race"):
+            try:
+                executor = get_executor()
+                for name in names:
+                    pending[executor.submit(_run_member, PORTFOLIO_MEMBERS[name], guests, venue, weights, deadline_at, start)] = name
+            except Exception as e:
+                print(f"⚠ Warning: portfolio could not start its members ({type(e).__name__}: {e}); using the heuristic layout")
+            while pending:
+                remaining = started + deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                done, _ = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = pending.pop(future)
+                    record: Dict[str, Any] = {"seconds": time.perf_counter() - started}
+                    try:
+                        layouts[name] = future.result()
+                        record.update(status="ok", score=score(layouts[name][0]))
+                        if layouts[name][0].stats.get("error"):
+                            record["error"] = layouts[name][0].stats["error"]
+                    except Exception as e:
+                        if isinstance(e, BrokenProcessPool):
+                            shutdown_executor()  # the next race gets a fresh pool
+                        record.update(status="error", score=None, error=f"{type(e).__name__}: {e}")
+                    results[name] = record
+    for future, name in pending.items():
+        # Still queued members are cancelled; running ones finish within their own time limit
+        results[name] = {"status": "deadline_exceeded", "score": None, "started": not future.cancel()}
+
+    scored = [(r["score"], name) for name, r in results.items() if r["score"] is not None]
+    # Ties go to the member that finished first
+    winner = max(scored, key=lambda item: item[0])[1] if scored else "heuristic"
+    PORTFOLIO_WINS.inc(member=winner)
+
+    layout, summary = layouts[winner]
+    layout.stats = {
+        **layout.stats,
+        "engine": "portfolio",
+        "timings": {**layout.stats.get("timings", {}), **timer.timings},
+        "portfolio": {"winner": winner, "deadline": deadline, "members": results},
+    }
+    return layout, summary
@@ -0,0 +1,90 @@
+"""
+Opt-in per-request profiling.
+
+When the server runs with SEATHARMONY_PROFILING=1, a request carrying the
+`X-Profile` header ("cprofile" or "pyinstrument") is profiled: handlers decorated
+with `@profiled` run under the chosen profiler and the report is written to
+SEATHARMONY_PROFILE_DIR. The middleware returns its path in `X-Profile-Path`.
+"""
+
+import contextvars
+import functools
+import os
+import tempfile
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+PROFILE_HEADER = "x-profile"
+PROFILE_PATH_HEADER = "X-Profile-Path"
+
+# Set by the middleware for profiled requests; handlers fill in "path".
+_current_request: contextvars.ContextVar[Optional[Dict[str, Any]]] = contextvars.ContextVar(
+    "seatharmony_profile_request", default=None
+)
+
+
+def profiling_enabled() -> bool:
+    return os.getenv("SEATHARMONY_PROFILING", "").lower() in ("1", "true", "yes")
+
+
+def profile_dir() -> Path:
+    path = Path(os.getenv("SEATHARMONY_PROFILE_DIR") or Path(tempfile.gettempdir()) / "seatharmony-profiles")
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def start_request(header_value: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Called by the middleware; returns the holder to read the report path from, or None."""
+    if not header_value or not profiling_enabled():
+        return None
+    engine = "pyinstrument" if header_value.strip().lower() == "pyinstrument" else "cprofile"
+    holder: Dict[str, Any] = {"engine": engine, "path": None}
+    _current_request.set(holder)
+    return holder
+
+
+def _run_cprofile(fn: Callable[..., Any], args: Any, kwargs: Any, stem: str) -> Any:
+    import cProfile
+
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(fn, *args, **kwargs)
+    finally:
+        path = profile_dir() / f"{stem}.prof"
+        profiler.dump_stats(str(path))
+        _current_request.get()["path"] = str(path)  # type: ignore[index]
+
+
+def _run_pyinstrument(fn: Callable[..., Any], args: Any, kwargs: Any, stem: str) -> Any:
+    try:
+        from pyinstrument import Profiler  # type: ignore
+    except ImportError:
+        return _run_cprofile(fn, args, kwargs, stem)
+
+    profiler = Profiler()
+    profiler.start()
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        profiler.stop()
+        path = profile_dir() / f"{stem}.html"
+        path.write_text(profiler.output_html())
+        _current_request.get()["path"] = str(path)  # type: ignore[index]
+
+
+def profiled(fn: Callable[..., Any]) -> Callable[..., Any]:
+    """Profile a (sync) request handler when the current request asked for it."""
+
+    @functools.wraps(fn)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        holder = _current_request.get()
+        if holder is None:
+            return fn(*args, **kwargs)
+        stem = f"{fn.__name__}-{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        if holder["engine"] == "pyinstrument":
+            return _run_pyinstrument(fn, args, kwargs, stem)
+        return _run_cprofile(fn, args, kwargs, stem)
+
+    return wrapper
@@ -0,0 +1,256 @@
+"""
+Interactive repair of an edited layout.
+
+After a planner drags guests between tables, only a small neighborhood is
+re-optimized: the tables of the pinned guests (where they were and where they
+are now), overflowing tables, and the tables with the most free seats as
+overflow room. Pinned guests (and their households) stay where the planner put
+them, and guests pinned by the venue (`domains.py`) stay at their table; no
+guest is moved to a table they are not eligible for. Overflow, conflicts and
+ineligible seats are resolved first by moving unpinned guests (or whole
+households) out at the smallest loss, unseated guests are seated, and
+then the vectorized local search (`heuristic.improve`) runs on the
+neighborhood until a deadline.
+Guests outside the neighborhood never move.
+"""
+
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .affinity import affinity_weight
+from .domains import compile_domains
+from .heuristic import improve
+from .households import contract_households
+from .models import Guest, Layout, VenueConfig
+from .optimizer import _make_layout
+from .scoring import PairTables, ScoringContext, build_context, pair_values, priority_weight, weighted_score
+
+DEFAULT_BUDGET_MS = 80.0
+DEFAULT_ROOM_TABLES = 2
+
+
+class RepairError(ValueError):
+    """The pinned assignments alone cannot be made feasible."""
+
+
+@dataclass
+class RepairResult:
+    layout: Layout
+    score_before: float
+    moved: List[str] = field(default_factory=list)
+    neighborhood: List[str] = field(default_factory=list)
+
+    @property
+    def delta(self) -> float:
+        return self.layout.score - self.score_before
+
+
+def _score(ctx: ScoringContext, table_of: np.ndarray, weights: Dict[str, float]) -> float:
+    return weighted_score(ctx.terms_from_counts(ctx.counts(table_of), table_of), weights)
+
+
+def _neighborhood(
+    ctx: ScoringContext,
+    before: np.ndarray,
+    table_of: np.ndarray,
+    pinned: np.ndarray,
+    room_tables: int,
+    touched: np.ndarray,
+) -> np.ndarray:
+    """Tables touched by the edit, overflowing tables, and the `room_tables` emptiest other tables."""
+    touched = touched.copy()
+    for t in (before[pinned], table_of[pinned]):
+        touched[t[t >= 0]] = True
+    load = np.bincount(table_of[table_of >= 0], minlength=ctx.n_tables)
+    touched |= load > ctx.capacity
+    free = np.where(touched, -1, ctx.capacity - load)
+    touched[np.argsort(-free, kind="stable")[:room_tables]] = True
+    touched &= (ctx.capacity > 0)
+    return touched
+
+
+class _Seating:
+    """Incremental state of the repair: table per guest, M = counts @ P, affinity/conflict tables."""
+
+    def __init__(
+        self, ctx: ScoringContext, weights: Dict[str, float], table_of: np.ndarray, allowed: Optional[np.ndarray] = None
+    ):
+        self.ctx = ctx
+        self.table_of = table_of
+        self.allowed = allowed  # (n_guests, n_tables) eligible tables, None: all
+        self.P = pair_values(ctx, weights)
+        self.w_priority = priority_weight(weights)
+        self.w_affinity = affinity_weight(weights)
+        self.M = ctx.counts(table_of) @ self.P
+        self.pair_tables = PairTables(ctx, table_of) if ctx.has_pairs else None
+
+    def load(self) -> np.ndarray:
+        return np.bincount(self.table_of[self.table_of >= 0], minlength=self.ctx.n_tables)
+
+    def gains(self, members: np.ndarray) -> np.ndarray:
+        """Objective change of moving (or seating) a household to each table; -inf on conflicts."""
+        ctx, P = self.ctx, self.P
+        a = self.table_of[members[0]]
+        cats = ctx.guest_category[members]
+        gain = self.M[:, cats].sum(axis=1) + self.w_priority * ctx.guest_closeness[members].sum() * ctx.quality
+        if self.pair_tables is not None:
+            gain += self.w_affinity * self.pair_tables.AT[members].sum(axis=0)
+            gain[self.pair_tables.CT[members].sum(axis=0) > 0] = -np.inf
+        if a >= 0:
+            # Leaving table a loses the pairs with everyone else there (pairs inside the household stay)
+            n = np.bincount(cats, minlength=P.shape[0])
+            inside = (n @ P @ n - np.diag(P)[cats].sum()) / 2
+            lost = self.M[a, cats].sum() - np.diag(P)[cats].sum() - 2 * inside
+            gain -= lost + self.w_priority * ctx.guest_closeness[members].sum() * ctx.quality[a]
+            if self.pair_tables is not None:
+                outside = self.pair_tables.AT[members, a].sum()
+                for m in members:
+                    outside -= self.pair_tables.rows(m)[0][members].sum()
+                gain -= self.w_affinity * outside
+            gain[a] = -np.inf
+        return gain
+
+    def move(self, members: np.ndarray, t: int) -> None:
+        for m in members:
+            a = self.table_of[m]
+            c = self.ctx.guest_category[m]
+            if a >= 0:
+                self.M[a, :] -= self.P[c, :]
+            self.M[t, :] += self.P[c, :]
+            if self.pair_tables is not None:
+                self.pair_tables.place(m, a, t)
+            self.table_of[m] = t
+
+    def best_table(self, members: np.ndarray, tables: np.ndarray) -> Tuple[int, float]:
+        """Best table in `tables` with room for the household and eligible for all its members (-1 if none)."""
+        ok = tables & (self.load() + members.size <= self.ctx.capacity)
+        if self.allowed is not None:
+            ok &= self.allowed[members].all(axis=0)
+        gain = np.where(ok, self.gains(members), -np.inf)
+        t = int(np.argmax(gain))
+        return (t, float(gain[t])) if gain[t] > -np.inf else (-1, -np.inf)
+
+    def violations(self) -> np.ndarray:
+        """Seated guests at an overfull or ineligible table, or next to someone they must sit apart from."""
+        seated = self.table_of >= 0
+        t = np.maximum(self.table_of, 0)
+        bad = seated & (self.load()[t] > self.ctx.capacity[t])
+        if self.allowed is not None:
+            bad |= seated & ~self.allowed[np.arange(self.ctx.n_guests), t]
+        if self.pair_tables is not None:
+            bad |= seated & (self.pair_tables.CT[np.arange(self.ctx.n_guests), t] > 0)
+        return bad
+
+
+def _grow(ctx: ScoringContext, load: np.ndarray, tables: np.ndarray, message: str) -> None:
+    """Add the emptiest table outside the neighborhood; RepairError if none has a free seat."""
+    free = np.where(tables, -1, ctx.capacity - load)
+    t = int(np.argmax(free))
+    if free[t] <= 0:
+        raise RepairError(message)
+    tables[t] = True
+
+
+def repair_layout(
+    guests: List[Guest],
+    venue: VenueConfig,
+    weights: Dict[str, float],
+    assignments: Dict[str, str],
+    pinned: Dict[str, str],
+    budget_ms: float = DEFAULT_BUDGET_MS,
+    room_tables: int = DEFAULT_ROOM_TABLES,
+    touched: Optional[List[str]] = None,
+    ctx: Optional[ScoringContext] = None,
+) -> RepairResult:
+    """
+    Apply `pinned` (guest_id -> table_id) to `assignments` and repair the
+    neighborhood within `budget_ms`. Members of a pinned guest's household are
+    pinned to the same table, and so are guests the venue pins; `touched` adds
+    table ids to the neighborhood. `ctx` is the instance's scoring context if
+    already built (e.g. by a session). Raises RepairError if the pins overfill
+    a table, seat conflicting guests together or put a guest at a table they
+    are not eligible for, and ValueError for unknown ids (DomainError for
+    contradictory venue rules).
+    """
+    deadline = time.perf_counter() + budget_ms / 1000
+    ctx = ctx or build_context(guests, venue)
+    domains = compile_domains(guests, venue)
+    allowed = domains.allowed if domains is not None else None
+    for g_id, t_id in pinned.items():
+        if g_id not in ctx.guest_index or t_id not in ctx.table_index:
+            raise ValueError(f"Unknown pinned assignment {g_id} -> {t_id}")
+
+    before = ctx.table_of(assignments)
+    score_before = _score(ctx, before, weights)
+    table_of = before.copy()
+    is_pinned = np.zeros(ctx.n_guests, dtype=bool)
+    parties, party_of = contract_households(guests)
+    for g_id, t_id in pinned.items():
+        household = party_of == party_of[ctx.guest_index[g_id]]
+        table_of[household] = ctx.table_index[t_id]
+        is_pinned |= household
+    if domains is not None:
+        ineligible = np.flatnonzero(is_pinned & ~allowed[np.arange(ctx.n_guests), np.maximum(table_of, 0)])
+        if ineligible.size:
+            g = ineligible[0]
+            raise RepairError(f"Guest {ctx.guest_ids[g]} may not sit at table {ctx.table_ids[table_of[g]]}")
+        # Venue pins hold like the planner's
+        venue_pinned = domains.fixed >= 0
+        table_of[venue_pinned] = domains.fixed[venue_pinned]
+        is_pinned |= venue_pinned
+
+    pinned_load = np.bincount(table_of[is_pinned], minlength=ctx.n_tables)
+    if np.any(pinned_load > ctx.capacity):
+        over = [ctx.table_ids[t] for t in np.flatnonzero(pinned_load > ctx.capacity)]
+        raise RepairError(f"Pinned guests exceed the capacity of table(s) {over}")
+
+    extra = np.zeros(ctx.n_tables, dtype=bool)
+    for t_id in touched or []:
+        if t_id not in ctx.table_index:
+            raise ValueError(f"Unknown table {t_id}")
+        extra[ctx.table_index[t_id]] = True
+
+    seating = _Seating(ctx, weights, table_of, allowed)
+    tables = _neighborhood(ctx, before, table_of, is_pinned, room_tables, extra)
+    members_of = [np.array([ctx.guest_index[g_id] for g_id in p.member_ids]) for p in parties]
+
+    # Overflow and conflicts: move unpinned households/guests out, the one losing least first
+    while True:
+        bad = seating.violations() & ~is_pinned
+        candidates = np.unique(party_of[bad])
+        if candidates.size == 0:
+            break
+        best = [seating.best_table(members_of[p], tables) for p in candidates]
+        i = int(np.argmax([gain for _, gain in best]))
+        if best[i][0] < 0:
+            _grow(ctx, seating.load(), tables, "No free seat left to resolve the edit")
+            continue
+        seating.move(members_of[candidates[i]], best[i][0])
+
+    # Guests missing from `assignments`
+    for p in np.unique(party_of[table_of < 0]):
+        t, _ = seating.best_table(members_of[p], tables)
+        while t < 0:
+            _grow(ctx, seating.load(), tables, f"No free seat for guest(s) {parties[p].member_ids}")
+            t, _ = seating.best_table(members_of[p], tables)
+        seating.move(members_of[p], t)
+
+    if np.any(seating.violations()):
+        raise RepairError("Pinned guests are seated together with guests they must sit apart from")
+
+    # Local search on the neighborhood; households stay where they are now
+    movable = (np.bincount(party_of)[party_of] == 1) & ~is_pinned & tables[table_of]
+    table_of, _ = improve(ctx, weights, table_of, deadline=deadline, movable=movable, tables=tables, allowed=allowed)
+
+    new_assignments = {ctx.guest_ids[g]: ctx.table_ids[t] for g, t in enumerate(table_of)}
+    layout, _ = _make_layout("repair", new_assignments, _score(ctx, table_of, weights), weights)
+    moved = [ctx.guest_ids[g] for g in np.flatnonzero(table_of != before)]
+    return RepairResult(
+        layout=layout,
+        score_before=score_before,
+        moved=moved,
+        neighborhood=[ctx.table_ids[t] for t in np.flatnonzero(tables)],
+    )
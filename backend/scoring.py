@@ -0,0 +1,290 @@
+"""
+Vectorized evaluation of the seating objective for a fixed layout.
+
+The MILP objective in `optimizer.py` depends only on per-table category counts
+and on table order, so a layout's realized value per objective term can be
+computed from a (tables x categories) count matrix. Engines that do not read
+the score from Gurobi (heuristics, aggregated models, repairs) use this module
+so that all scores are comparable.
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .affinity import affinity_weight
+from .models import Guest, VenueConfig
+from .optimizer import (
+    _get_category,
+    _get_closeness_rank,
+    _is_bride_side,
+    _is_family_category,
+    _is_groom_side,
+    _is_social_group_category,
+)
+
+TERMS = ("family_cohesion", "social_group_cohesion", "side_mixing", "relationship_priority", "affinity")
+
+_EMPTY_INT = np.zeros(0, dtype=np.int64)
+
+
+@dataclass
+class ScoringContext:
+    """Index arrays for one (guests, venue) instance. Category code 0 is "uncategorized"."""
+
+    guest_ids: List[str]
+    guest_index: Dict[str, int]
+    table_ids: List[str]
+    table_index: Dict[str, int]
+    categories: List[Optional[str]]
+    guest_category: np.ndarray  # (n_guests,) category code
+    guest_closeness: np.ndarray  # (n_guests,) closeness rank
+    capacity: np.ndarray  # (n_tables,)
+    quality: np.ndarray  # (n_tables,) 1 / (1 + table index)
+    is_family: np.ndarray  # (n_categories,) bool
+    is_social: np.ndarray  # (n_categories,) bool
+    is_groom: np.ndarray  # (n_categories,) bool
+    is_bride: np.ndarray  # (n_categories,) bool
+    # Explicit pairs (affinity.py) as symmetric CSR adjacency over guest indices
+    affinity_indptr: np.ndarray = field(default_factory=lambda: _EMPTY_INT)
+    affinity_indices: np.ndarray = field(default_factory=lambda: _EMPTY_INT)
+    affinity_values: np.ndarray = field(default_factory=lambda: np.zeros(0))
+    conflict_indptr: np.ndarray = field(default_factory=lambda: _EMPTY_INT)
+    conflict_indices: np.ndarray = field(default_factory=lambda: _EMPTY_INT)
+
+    @property
+    def n_guests(self) -> int:
+        return len(self.guest_ids)
+
+    @property
+    def n_tables(self) -> int:
+        return len(self.table_ids)
+
+    @property
+    def has_pairs(self) -> bool:
+        return self.affinity_indices.size > 0 or self.conflict_indices.size > 0
+
+    def table_of(self, assignments: Dict[str, str]) -> np.ndarray:
+        """Table index per guest (-1 for unassigned or unknown tables)."""
+        table_of = np.full(self.n_guests, -1, dtype=np.int64)
+        for g_id, t_id in assignments.items():
+            g = self.guest_index.get(g_id)
+            t = self.table_index.get(t_id)
+            if g is not None and t is not None:
+                table_of[g] = t
+        return table_of
+
+    def counts(self, table_of: np.ndarray) -> np.ndarray:
+        """(n_tables, n_categories) number of seated guests per table and category."""
+        counts = np.zeros((self.n_tables, len(self.categories)), dtype=np.int64)
+        seated = table_of >= 0
+        np.add.at(counts, (table_of[seated], self.guest_category[seated]), 1)
+        return counts
+
+    def terms_from_counts(self, counts: np.ndarray, table_of: np.ndarray) -> Dict[str, float]:
+        """Realized (unweighted) value of each objective term."""
+        pairs = counts * (counts - 1) // 2
+        groom = counts[:, self.is_groom].sum(axis=1)
+        bride = counts[:, self.is_bride].sum(axis=1)
+        seated = table_of >= 0
+        priority = float(np.dot(self.guest_closeness[seated], self.quality[table_of[seated]]))
+        affinity = 0.0
+        if self.affinity_indices.size:
+            rows = np.repeat(np.arange(self.n_guests), np.diff(self.affinity_indptr))
+            together = (table_of[rows] == table_of[self.affinity_indices]) & (table_of[rows] >= 0)
+            # Each pair is stored in both directions
+            affinity = float(self.affinity_values[together].sum()) / 2
+        return {
+            "family_cohesion": float(pairs[:, self.is_family].sum()),
+            "social_group_cohesion": float(pairs[:, self.is_social].sum()),
+            "side_mixing": float(np.dot(groom, bride)),
+            "relationship_priority": priority,
+            "affinity": affinity,
+        }
+
+    def terms(self, assignments: Dict[str, str]) -> Dict[str, float]:
+        table_of = self.table_of(assignments)
+        return self.terms_from_counts(self.counts(table_of), table_of)
+
+
+def build_context(guests: List[Guest], venue: VenueConfig) -> ScoringContext:
+    categories: List[Optional[str]] = [None]
+    category_code: Dict[Optional[str], int] = {None: 0}
+    guest_category = np.zeros(len(guests), dtype=np.int64)
+    guest_closeness = np.zeros(len(guests), dtype=np.float64)
+    for i, g in enumerate(guests):
+        category = _get_category(g)
+        if category not in category_code:
+            category_code[category] = len(categories)
+            categories.append(category)
+        guest_category[i] = category_code[category]
+        guest_closeness[i] = _get_closeness_rank(category)
+
+    table_ids = [t.id for t in venue.tables]
+    ctx = ScoringContext(
+        guest_ids=[g.id for g in guests],
+        guest_index={g.id: i for i, g in enumerate(guests)},
+        table_ids=table_ids,
+        table_index={t_id: i for i, t_id in enumerate(table_ids)},
+        categories=categories,
+        guest_category=guest_category,
+        guest_closeness=guest_closeness,
+        capacity=np.array([t.capacity for t in venue.tables], dtype=np.int64),
+        quality=1.0 / (1.0 + np.arange(len(table_ids), dtype=np.float64)),
+        is_family=np.array([_is_family_category(c) for c in categories], dtype=bool),
+        is_social=np.array([_is_social_group_category(c) for c in categories], dtype=bool),
+        is_groom=np.array([_is_groom_side(c) for c in categories], dtype=bool),
+        is_bride=np.array([_is_bride_side(c) for c in categories], dtype=bool),
+    )
+    if venue.affinity is not None:
+        index = ctx.guest_index
+        rewards = [(index[a], index[b], v) for a, b, v in venue.affinity.rewards]
+        conflicts = [(index[a], index[b], 1.0) for a, b in venue.affinity.conflicts]
+        ctx.affinity_indptr, ctx.affinity_indices, ctx.affinity_values = _symmetric_csr(len(guests), rewards)
+        ctx.conflict_indptr, ctx.conflict_indices, _ = _symmetric_csr(len(guests), conflicts)
+    return ctx
+
+
+def _symmetric_csr(n: int, pairs: List[Tuple[int, int, float]]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    rows = np.array([i for i, j, _ in pairs] + [j for i, j, _ in pairs], dtype=np.int64)
+    cols = np.array([j for i, j, _ in pairs] + [i for i, j, _ in pairs], dtype=np.int64)
+    values = np.array([v for _, _, v in pairs] * 2, dtype=np.float64)
+    order = np.argsort(rows, kind="stable")
+    indptr = np.concatenate(([0], np.cumsum(np.bincount(rows, minlength=n)))).astype(np.int64)
+    return indptr, cols[order], values[order]
+
+
+class PairTables:
+    """
+    Per guest and table, the affinity to (AT) and number of conflicts with (CT)
+    the guests currently seated there. Maintained incrementally by local search.
+    """
+
+    def __init__(self, ctx: ScoringContext, table_of: np.ndarray):
+        self.ctx = ctx
+        self.AT = np.zeros((ctx.n_guests, ctx.n_tables))
+        self.CT = np.zeros((ctx.n_guests, ctx.n_tables), dtype=np.int64)
+        for g in np.flatnonzero(table_of >= 0):
+            self.place(g, -1, table_of[g])
+
+    def place(self, g: int, old: int, new: int) -> None:
+        """Guest g moves from table `old` to `new` (-1: unseated)."""
+        ctx = self.ctx
+        nbrs = ctx.affinity_indices[ctx.affinity_indptr[g]:ctx.affinity_indptr[g + 1]]
+        values = ctx.affinity_values[ctx.affinity_indptr[g]:ctx.affinity_indptr[g + 1]]
+        conflicts = ctx.conflict_indices[ctx.conflict_indptr[g]:ctx.conflict_indptr[g + 1]]
+        if old >= 0:
+            np.subtract.at(self.AT, (nbrs, old), values)
+            np.subtract.at(self.CT, (conflicts, old), 1)
+        if new >= 0:
+            np.add.at(self.AT, (nbrs, new), values)
+            np.add.at(self.CT, (conflicts, new), 1)
+
+    def rows(self, g: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Dense affinity and conflict rows of guest g over all guests."""
+        ctx = self.ctx
+        affinity = np.zeros(ctx.n_guests)
+        conflict = np.zeros(ctx.n_guests, dtype=np.int64)
+        lo, hi = ctx.affinity_indptr[g], ctx.affinity_indptr[g + 1]
+        affinity[ctx.affinity_indices[lo:hi]] = ctx.affinity_values[lo:hi]
+        conflict[ctx.conflict_indices[ctx.conflict_indptr[g]:ctx.conflict_indptr[g + 1]]] = 1
+        return affinity, conflict
+
+
+def term_pair_values(ctx: ScoringContext) -> Dict[str, np.ndarray]:
+    """
+    Per pairwise term, a (n_categories x n_categories) matrix P with P[c, d] = value
+    gained when a category-c and a category-d guest share a table.
+    """
+    return {
+        "family_cohesion": np.diag(ctx.is_family).astype(np.float64),
+        "social_group_cohesion": np.diag(ctx.is_social).astype(np.float64),
+        "side_mixing": (np.outer(ctx.is_groom, ctx.is_bride) | np.outer(ctx.is_bride, ctx.is_groom)).astype(np.float64),
+    }
+
+
+def priority_weight(weights: Dict[str, float]) -> float:
+    # The MILP only adds the priority term for positive weights
+    weight = weights.get("relationship_priority", 0.0)
+    return weight if weight > 0 else 0.0
+
+
+def pair_values(ctx: ScoringContext, weights: Dict[str, float]) -> np.ndarray:
+    """Weighted sum of `term_pair_values`."""
+    total = np.zeros((len(ctx.categories), len(ctx.categories)))
+    for term, matrix in term_pair_values(ctx).items():
+        total += weights.get(term, 0.0) * matrix
+    return total
+
+
+def move_deltas(
+    ctx: ScoringContext,
+    M: np.ndarray,
+    P: np.ndarray,
+    w_priority: float,
+    table_of: np.ndarray,
+    g: int,
+    pair_tables: Optional[PairTables] = None,
+    w_affinity: float = 0.0,
+) -> np.ndarray:
+    """
+    Objective change of moving guest g to each table (0 for its own table,
+    -inf where g would join a conflicting guest).
+    M = counts @ P is the value of adding a guest of each category to each table.
+    """
+    c = ctx.guest_category[g]
+    a = table_of[g]
+    delta = M[:, c] - M[a, c] + P[c, c] + w_priority * ctx.guest_closeness[g] * (ctx.quality - ctx.quality[a])
+    if pair_tables is not None:
+        delta += w_affinity * (pair_tables.AT[g] - pair_tables.AT[g, a])
+        delta[pair_tables.CT[g] > 0] = -np.inf
+    delta[a] = 0.0
+    return delta
+
+
+def swap_deltas(
+    ctx: ScoringContext,
+    M: np.ndarray,
+    P: np.ndarray,
+    w_priority: float,
+    table_of: np.ndarray,
+    g: int,
+    pair_tables: Optional[PairTables] = None,
+    w_affinity: float = 0.0,
+) -> np.ndarray:
+    """
+    Objective change of swapping guest g with every guest (0 for guests at g's
+    table, -inf for swaps that would seat conflicting guests together).
+    """
+    c = ctx.guest_category[g]
+    a = table_of[g]
+    d = ctx.guest_category
+    b = table_of
+    delta = (
+        M[b, c] - P[c, d] - M[a, c] + P[c, c]
+        + M[a, d] - P[d, c] - M[b, d] + P[d, d]
+        + w_priority * (ctx.guest_closeness[g] - ctx.guest_closeness) * (ctx.quality[b] - ctx.quality[a])
+    )
+    if pair_tables is not None:
+        AT, CT = pair_tables.AT, pair_tables.CT
+        idx = np.arange(ctx.n_guests)
+        affinity, conflict = pair_tables.rows(g)
+        # g and h trade places; a g-h pair is apart before and after the swap
+        delta += w_affinity * (AT[g, b] - AT[g, a] + AT[idx, a] - AT[idx, b] - 2 * affinity)
+        delta[(CT[g, b] - conflict > 0) | (CT[idx, a] - conflict > 0)] = -np.inf
+    delta[b == a] = 0.0
+    return delta
+
+
+def weighted_score(terms: Dict[str, float], weights: Dict[str, float]) -> float:
+    """Objective value as the MILP computes it: sum of weight * term."""
+    score = priority_weight(weights) * terms.get("relationship_priority", 0.0)
+    score += affinity_weight(weights) * terms.get("affinity", 0.0)
+    for term in TERMS[:3]:
+        score += weights.get(term, 0.0) * terms.get(term, 0.0)
+    return score
+
+
+def score_layout(guests: List[Guest], venue: VenueConfig, assignments: Dict[str, str], weights: Dict[str, float]) -> float:
+    return weighted_score(build_context(guests, venue).terms(assignments), weights)
@@ -1,9 +1,17 @@
-from dataclasses import dataclass
+import time
+from dataclasses import dataclass, replace
 from typing import Any, Dict, List, Optional, Tuple
 
-from tot.tasks.base import Task  # type: ignore
+try:
+    from tot.tasks.base import Task  # type: ignore
+except ImportError:
+    # tot is only needed to drive the task from the upstream ToT harness;
+    # the API's own BFS and the optimizer engines work without it.
+    Task = object  # type: ignore
 
+from .metrics import CACHE_LOOKUPS
 from .models import Guest, Table, VenueConfig, Layout, ConstraintSummary
+from .sessions import LayoutCache
 
 
 @dataclass
@@ -25,7 +33,16 @@ class SeatHarmonyTask(Task):
     Applying a thought modifies weights and triggers a (re-)optimization to obtain a layout.
     """
 
-    def __init__(self, base_weights: Optional[Dict[str, float]] = None):
+    def __init__(
+        self,
+        base_weights: Optional[Dict[str, float]] = None,
+        engine: str = "milp",
+        layout_cache: Optional[LayoutCache] = None,
+        deadline: Optional[float] = None,
+    ):
+        self.engine = engine  # name in engines.ENGINES used by apply_thought
+        # time.monotonic() by which solves must end (e.g. a batch event's deadline); None: engine defaults
+        self.deadline = deadline
         self.base_weights = base_weights or {
             "family_cohesion": 0.5,
             "social_group_cohesion": 0.5,
@@ -33,6 +50,14 @@ class SeatHarmonyTask(Task):
             "relationship_priority": 0.5,
         }
         self.value_cache = {}
+        # Solved layouts keyed by weight vector: several thoughts (e.g. "traditional_seating"
+        # or an emphasis already capped at 1.0) land on weights that were solved before.
+        # A session (sessions.py) passes its own cache, shared across requests.
+        self.shared_cache = layout_cache is not None
+        self.layout_cache = layout_cache if layout_cache is not None else LayoutCache()
+        # Built on the first solve (stability.py): skips re-solves no new weights can profit from
+        self.ctx: Optional[Any] = None
+        self.stability: Optional[Any] = None
         self.steps = 2  # Depth of ToT search
         self.stops = ['\n'] * 2
 
@@ -41,7 +66,9 @@ class SeatHarmonyTask(Task):
     def get_initial_state(self, instance: Dict[str, Any]) -> SeatHarmonyState:
         guests = [Guest(**g) for g in instance.get("guests", [])]
         tables = [Table(**t) for t in instance.get("tables", [])]
-        venue = VenueConfig(tables=tables, settings=instance.get("settings", {}))
+        venue = VenueConfig(
+            tables=tables, settings=instance.get("settings", {}), affinity=instance.get("affinity")
+        )
         return SeatHarmonyState(guests=guests, venue=venue, weights=self.base_weights.copy())
 
     def generate_thoughts(self, state: SeatHarmonyState, n_generate: int) -> List[str]:
@@ -104,14 +131,16 @@ class SeatHarmonyTask(Task):
             new_weights["side_mixing"] = 0.7
             new_weights["relationship_priority"] = 0.6
 
-        # Lazy import to avoid circular deps
-        from .optimizer import generate_layout_for_weights
-
-        layout, summary = generate_layout_for_weights(
-            guests=state.guests, venue=state.venue, weights=new_weights
-        )
-        updated_layout = layout
-        updated_layout.summary = summary
+        cache_key = tuple(sorted(new_weights.items()))
+        cached = self.layout_cache.get(cache_key)
+        if cached is not None:
+            CACHE_LOOKUPS.inc(cache="layout", result="hit")
+            updated_layout = replace(cached, stats={**cached.stats, "cache_hit": True})
+        else:
+            CACHE_LOOKUPS.inc(cache="layout", result="miss")
+            updated_layout = self._solve(state, new_weights)
+            if not self.shared_cache or self._reusable(updated_layout):
+                self.layout_cache[cache_key] = updated_layout
 
         return SeatHarmonyState(
             guests=state.guests,
@@ -121,6 +150,50 @@ class SeatHarmonyTask(Task):
             notes=thought,
         )
 
+    def _reusable(self, layout: Layout) -> bool:
+        """Whether later requests may reuse the layout: what a re-solve with the engine's own limits would give."""
+        if layout.id == "dummy" or "degraded" in layout.stats:
+            return False
+        # A solve cut short by this search's deadline only counts if it still proved optimality
+        return self.deadline is None or (layout.stats.get("solver") or {}).get("status") == "optimal"
+
+    def expired(self) -> bool:
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+    def _solve(self, state: SeatHarmonyState, weights: Dict[str, float]) -> Layout:
+        """
+        Solve for `weights`, unless a layout already solved (in this cache) provably
+        scores within the stability tolerance of anything a re-solve could find.
+        """
+        # Lazy import: stability and scoring need numpy
+        from .isolation import solve
+        from .scoring import build_context
+        from .stability import StabilityIndex, record_terms
+
+        if self.stability is None:
+            self.ctx = build_context(state.guests, state.venue)
+            self.stability = StabilityIndex(self.ctx)
+        solved = [layout for layout in self.layout_cache.values() if not layout.stats.get("stability_hit")]
+        covering = self.stability.covering(weights, solved)
+        if covering is not None:
+            layout, score = covering
+            return replace(
+                layout,
+                score=score,
+                objective_breakdown={k: float(weights.get(k, 0.0)) for k in layout.objective_breakdown},
+                stats={**layout.stats, "cache_hit": True, "stability_hit": True},
+            )
+
+        # On an isolated, memory-capped solver process (heuristic fallback if it is lost)
+        time_limit = None if self.deadline is None else max(self.deadline - time.monotonic(), 0.01)
+        layout, summary = solve(self.engine, state.guests, state.venue, weights, time_limit)
+        layout.summary = summary
+        layout.stats["cache_hit"] = False
+        if layout.id != "dummy":
+            record_terms(layout, self.ctx, weights)
+            layout.stats["stability_coverage"] = self.stability.coverage(layout, solved + [layout])
+        return layout
+
     def evaluate_states(
         self, states: List[SeatHarmonyState], n_evaluate: int
     ) -> List[Tuple[SeatHarmonyState, float]]:
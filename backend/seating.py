@@ -0,0 +1,222 @@
+"""
+Seat-level assignment within tables (optional second stage).
+
+The engines only decide who sits at which table. Given that assignment, this
+stage orders each table's guests around it, so that adjacent guests are
+worth the most: members of a household (couples, families with kids) side by
+side first, then explicit affinities and the same pair values the table stage
+optimizes (family, social group, side mixing under the layout's weights).
+
+Tables are independent, so each is solved on its own (in parallel threads),
+without enlarging the main model:
+
+- up to EXACT_MAX_GUESTS guests: exact dynamic program over subsets
+  (Held-Karp) for the best cycle, or the best path when the table has empty
+  seats (they sit between the path's ends);
+- larger tables: nearest-neighbor order improved by 2-opt moves.
+
+Seats are numbered clockwise from 0 per table.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .affinity import affinity_weight
+from .models import Guest, VenueConfig
+from .scoring import ScoringContext, build_context, pair_values
+
+EXACT_MAX_GUESTS = 12
+MAX_TWO_OPT_ROUNDS = 200
+IMPROVEMENT_EPS = 1e-9
+
+
+@dataclass
+class TableSeating:
+    table_id: str
+    capacity: int
+    order: List[str]  # guest ids clockwise from seat 0; seats past them are empty
+    value: float  # sum of the values of adjacent pairs
+    method: str  # "exact", "local_search" or "trivial"
+
+
+def neighbor_values(
+    ctx: ScoringContext, members: np.ndarray, guests: List[Guest], weights: Dict[str, float]
+) -> np.ndarray:
+    """
+    (n, n) value of seating two of the table's guests side by side. Household
+    pairs get more than all other adjacencies of the table together can.
+    """
+    codes = ctx.guest_category[members]
+    values = pair_values(ctx, weights)[np.ix_(codes, codes)]
+    w_affinity = affinity_weight(weights)
+    if w_affinity > 0 and ctx.affinity_indices.size:
+        position = {int(g): i for i, g in enumerate(members)}
+        for i, g in enumerate(members):
+            lo, hi = ctx.affinity_indptr[g], ctx.affinity_indptr[g + 1]
+            for other, value in zip(ctx.affinity_indices[lo:hi], ctx.affinity_values[lo:hi]):
+                j = position.get(int(other))
+                if j is not None:
+                    values[i, j] += w_affinity * value
+    np.fill_diagonal(values, 0.0)
+    households = [guests[g].household_id for g in members]
+    same = np.array([[a is not None and a == b for b in households] for a in households], dtype=bool)
+    np.fill_diagonal(same, False)
+    if same.any():
+        values[same] += 1.0 + len(members) * max(float(values.max()), 0.0)
+    return values
+
+
+@lru_cache(maxsize=None)
+def _subsets_by_size(k: int) -> List[np.ndarray]:
+    """Bit masks over k nodes grouped by number of set bits."""
+    masks = np.arange(1 << k)
+    sizes = np.array([bin(m).count("1") for m in range(1 << k)])
+    return [masks[sizes == s] for s in range(k + 1)]
+
+
+def _best_cycle(W: np.ndarray) -> Tuple[List[int], float]:
+    """Maximum-value Hamiltonian cycle over W's nodes (Held-Karp from node 0); needs at least 3 nodes."""
+    k = len(W) - 1
+    bits = 1 << np.arange(k)
+    inner = W[1:, 1:]
+    dp = np.full((1 << k, k), -np.inf)
+    dp[bits, np.arange(k)] = W[0, 1:]
+    for masks in _subsets_by_size(k)[1:k]:
+        # Best value of each path over `masks` extended by each node not in it
+        extended = (dp[masks][:, :, None] + inner[None]).max(axis=1)
+        rows, nodes = np.nonzero((masks[:, None] & bits[None]) == 0)
+        np.maximum.at(dp, (masks[rows] | bits[nodes], nodes), extended[rows, nodes])
+
+    full = (1 << k) - 1
+    closing = dp[full] + W[1:, 0]
+    last = int(np.argmax(closing))
+    value = float(closing[last])
+    path = [last]
+    mask = full
+    while mask != bits[last]:
+        mask ^= int(bits[last])
+        candidates = np.where((mask & bits) != 0, dp[mask] + inner[:, last], -np.inf)
+        last = int(np.argmax(candidates))
+        path.append(last)
+    return [0] + [i + 1 for i in reversed(path)], value
+
+
+def _cycle_value(W: np.ndarray, order: List[int]) -> float:
+    return float(W[order, np.roll(order, -1)].sum())
+
+
+def _local_search_cycle(W: np.ndarray) -> Tuple[List[int], float]:
+    """Nearest-neighbor cycle from node 0, improved by 2-opt moves (for tables too large for the DP)."""
+    n = len(W)
+    order = [0]
+    free = set(range(1, n))
+    while free:
+        last = order[-1]
+        nxt = max(free, key=lambda j: W[last, j])
+        order.append(nxt)
+        free.remove(nxt)
+    tour = np.array(order)
+    for _ in range(MAX_TWO_OPT_ROUNDS):
+        # Replace edges (a, b) and (c, d) by (a, c) and (b, d), i.e. reverse b..c
+        a, b = tour, np.roll(tour, -1)
+        gain = W[a[:, None], a[None, :]] + W[b[:, None], b[None, :]] - W[a, b][:, None] - W[a, b][None, :]
+        gain = np.triu(gain, k=2)
+        gain[0, n - 1] = 0.0  # the same two edges
+        i, j = np.unravel_index(int(np.argmax(gain)), gain.shape)
+        if gain[i, j] <= IMPROVEMENT_EPS:
+            break
+        tour[i + 1 : j + 1] = tour[i + 1 : j + 1][::-1].copy()
+    order = tour.tolist()
+    return order, _cycle_value(W, order)
+
+
+def order_table(values: np.ndarray, closed: bool) -> Tuple[List[int], float, str]:
+    """
+    Seat order (indices into `values`) maximizing the adjacency value: a cycle
+    when `closed` (a full table), else a path (empty seats between its ends).
+    """
+    n = len(values)
+    if n <= 2:
+        return list(range(n)), float(values[0, 1]) if n == 2 else 0.0, "trivial"
+    if closed:
+        W = values
+    else:
+        # A node worth nothing next to anyone stands for the empty seats: cutting the cycle there gives the path
+        W = np.zeros((n + 1, n + 1))
+        W[1:, 1:] = values
+    if n <= EXACT_MAX_GUESTS:
+        cycle, value = _best_cycle(W)
+        method = "exact"
+    else:
+        cycle, value = _local_search_cycle(W)
+        method = "local_search"
+    if closed:
+        return cycle, value, method
+    start = cycle.index(0)
+    return [i - 1 for i in cycle[start + 1 :] + cycle[:start]], value, method
+
+
+def seat_tables(
+    guests: List[Guest],
+    venue: VenueConfig,
+    assignments: Dict[str, str],
+    weights: Dict[str, float],
+    ctx: Optional[ScoringContext] = None,
+    max_workers: Optional[int] = None,
+) -> List[TableSeating]:
+    """Seat order of every table with guests, solved independently per table."""
+    ctx = ctx if ctx is not None else build_context(guests, venue)
+    table_of = ctx.table_of(assignments)
+    tables = [t for t in range(ctx.n_tables) if (table_of == t).any()]
+
+    def solve(t: int) -> TableSeating:
+        members = np.flatnonzero(table_of == t)
+        values = neighbor_values(ctx, members, guests, weights)
+        order, value, method = order_table(values, closed=len(members) >= ctx.capacity[t])
+        return TableSeating(
+            table_id=ctx.table_ids[t],
+            capacity=int(ctx.capacity[t]),
+            order=[ctx.guest_ids[members[i]] for i in order],
+            value=value,
+            method=method,
+        )
+
+    if not tables:
+        return []
+    workers = max_workers or min(len(tables), os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="seatharmony-seating") as pool:
+        return list(pool.map(solve, tables))
+
+
+def seat_numbers(seatings: List[TableSeating]) -> Dict[str, int]:
+    """guest_id -> seat number at their table."""
+    return {g_id: seat for s in seatings for seat, g_id in enumerate(s.order)}
+
+
+def seating_stats(guests: List[Guest], seatings: List[TableSeating]) -> Dict[str, Any]:
+    """Methods used and how many couples (two-guest households) sit side by side."""
+    position = {g_id: (s.table_id, seat, s.capacity) for s in seatings for seat, g_id in enumerate(s.order)}
+    members: Dict[str, List[str]] = {}
+    for g in guests:
+        if g.household_id is not None and g.id in position:
+            members.setdefault(g.household_id, []).append(g.id)
+    couples = [ids for ids in members.values() if len(ids) == 2]
+    adjacent = 0
+    for a, b in couples:
+        (table_a, seat_a, n), (table_b, seat_b, _) = position[a], position[b]
+        adjacent += table_a == table_b and (seat_a - seat_b) % n in (1, n - 1)
+    methods: Dict[str, int] = {}
+    for s in seatings:
+        methods[s.method] = methods.get(s.method, 0) + 1
+    return {
+        "tables": len(seatings),
+        "methods": methods,
+        "value": sum(s.value for s in seatings),
+        "couples": len(couples),
+        "couples_adjacent": adjacent,
+    }
@@ -0,0 +1,212 @@
+"""
+Server-side instance sessions.
+
+A client uploads an instance (guests, tables, settings, affinity) once and
+gets a session id and content hash; generate, explain, repair and what-if
+requests then carry `session_id` instead of the guest and table arrays,
+optionally with a small `patch` (the change ops of `instances.py`) applied
+for that request only. Uploading the same content again returns the
+existing session.
+
+A session keeps its parsed instance and, built on first use, the structures
+derived from it: the scoring context (category codes, pair indices) for
+repair and what-if, and the layouts already solved per engine and weight
+vector, shared by every ToT search on the session (only layouts a re-solve
+would reproduce: no placeholder, degraded or deadline-truncated ones).
+Patched requests use the parsed instance only.
+
+Sessions live in memory (per API process) and are evicted after
+`SEATHARMONY_SESSION_TTL_SECONDS` without use, or least recently used first
+once their estimated size exceeds `SEATHARMONY_SESSION_MEMORY_MB`.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from .models import Guest, Layout, VenueConfig
+
+if TYPE_CHECKING:
+    from .instances import InstanceChange
+    from .scoring import ScoringContext
+
+# Rough per-object sizes for the memory estimate
+BYTES_PER_INPUT_BYTE = 4  # parsed dataclasses vs. their JSON
+BYTES_PER_LAYOUT_GUEST = 150
+
+WeightKey = Tuple[Tuple[str, float], ...]
+
+
+class LayoutCache:
+    """
+    Solved layouts by weight vector (see SeatHarmonyTask.layout_cache). A
+    session's cache is shared by concurrent searches on different solver
+    threads, so every access holds a lock and `values()` is a snapshot.
+    """
+
+    def __init__(self) -> None:
+        self._layouts: Dict[WeightKey, Layout] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: WeightKey) -> Optional[Layout]:
+        with self._lock:
+            return self._layouts.get(key)
+
+    def __setitem__(self, key: WeightKey, layout: Layout) -> None:
+        with self._lock:
+            self._layouts[key] = layout
+
+    def values(self) -> List[Layout]:
+        with self._lock:
+            return list(self._layouts.values())
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._layouts)
+
+
+def session_ttl_seconds() -> float:
+    return float(os.getenv("SEATHARMONY_SESSION_TTL_SECONDS") or 3600)
+
+
+def session_memory_bytes() -> int:
+    return int(float(os.getenv("SEATHARMONY_SESSION_MEMORY_MB") or 512) * 1e6)
+
+
+def content_hash(guests: List[Guest], venue: VenueConfig) -> str:
+    """SHA-256 of the canonical JSON of the instance."""
+    data = {
+        "guests": [asdict(g) for g in guests],
+        "tables": [asdict(t) for t in venue.tables],
+        "settings": venue.settings,
+        "affinity": asdict(venue.affinity) if venue.affinity is not None else None,
+    }
+    return hashlib.sha256(json.dumps(data, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+@dataclass
+class Session:
+    id: str
+    content_hash: str
+    guests: List[Guest]
+    venue: VenueConfig
+    input_bytes: int
+    created: float = field(default_factory=time.time)
+    last_used: float = field(default_factory=time.time)
+    # engine -> ToT layout cache (see SeatHarmonyTask.layout_cache)
+    layouts: Dict[str, LayoutCache] = field(default_factory=dict)
+    _context: Optional["ScoringContext"] = field(default=None, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def context(self) -> "ScoringContext":
+        if self._context is None:
+            # Lazy import: scoring needs numpy
+            from .scoring import build_context
+
+            self._context = build_context(self.guests, self.venue)
+        return self._context
+
+    def layout_cache(self, engine: str) -> LayoutCache:
+        with self._lock:
+            return self.layouts.setdefault(engine, LayoutCache())
+
+    def layout_caches(self) -> Dict[str, LayoutCache]:
+        with self._lock:
+            return dict(self.layouts)
+
+    def approx_bytes(self) -> int:
+        size = self.input_bytes * BYTES_PER_INPUT_BYTE
+        size += sum(len(cache) for cache in self.layout_caches().values()) * len(self.guests) * BYTES_PER_LAYOUT_GUEST
+        if self._context is not None:
+            size += sum(getattr(v, "nbytes", 0) for v in vars(self._context).values())
+        return size
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "session_id": self.id,
+            "content_hash": self.content_hash,
+            "guests": len(self.guests),
+            "tables": len(self.venue.tables),
+            "cached_layouts": {engine: len(cache) for engine, cache in self.layout_caches().items()},
+            "approx_bytes": self.approx_bytes(),
+            "expires_in": max(0.0, self.last_used + session_ttl_seconds() - time.time()),
+        }
+
+
+class SessionStore:
+    """Thread-safe in-memory sessions with TTL and a memory cap (LRU)."""
+
+    def __init__(self, ttl_seconds: Optional[float] = None, max_bytes: Optional[int] = None):
+        self.ttl_seconds = ttl_seconds or session_ttl_seconds()
+        self.max_bytes = max_bytes or session_memory_bytes()
+        self._sessions: "OrderedDict[str, Session]" = OrderedDict()
+        self._by_hash: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def create(self, guests: List[Guest], venue: VenueConfig, input_bytes: int) -> Tuple[Session, bool]:
+        """(session, created); an existing session with the same content is reused."""
+        digest = content_hash(guests, venue)
+        with self._lock:
+            self._evict()
+            existing = self._by_hash.get(digest)
+            if existing is not None:
+                return self._touch(existing), False
+            session = Session(
+                id=uuid.uuid4().hex, content_hash=digest, guests=guests, venue=venue, input_bytes=input_bytes
+            )
+            self._sessions[session.id] = session
+            self._by_hash[digest] = session.id
+            self._evict()
+            return session, True
+
+    def get(self, session_id: str) -> Session:
+        """Raises KeyError for unknown, expired or evicted sessions."""
+        with self._lock:
+            self._evict()
+            return self._touch(session_id)
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            session = self._sessions.pop(session_id)
+            self._by_hash.pop(session.content_hash, None)
+
+    def _touch(self, session_id: str) -> Session:
+        session = self._sessions[session_id]
+        session.last_used = time.time()
+        self._sessions.move_to_end(session_id)
+        return session
+
+    def _evict(self) -> None:
+        """Drop expired sessions, then least recently used ones over the memory cap (keeping the newest)."""
+        now = time.time()
+        for session_id, session in list(self._sessions.items()):
+            if now - session.last_used > self.ttl_seconds:
+                self._drop(session_id)
+        total = sum(s.approx_bytes() for s in self._sessions.values())
+        while total > self.max_bytes and len(self._sessions) > 1:
+            session_id = next(iter(self._sessions))
+            total -= self._sessions[session_id].approx_bytes()
+            self._drop(session_id)
+
+    def _drop(self, session_id: str) -> None:
+        session = self._sessions.pop(session_id)
+        self._by_hash.pop(session.content_hash, None)
+
+
+SESSIONS = SessionStore()
+
+
+def patched(session: Session, changes: List["InstanceChange"]) -> Tuple[List[Guest], VenueConfig]:
+    """The session's instance with `changes` applied (the session itself is unchanged)."""
+    # Lazy import: instances needs numpy
+    from .instances import StoredInstance, apply_changes
+
+    shell = StoredInstance(id=session.id, guests=session.guests, venue=session.venue, weights={}, assignments={}, score=0.0)
+    guests, venue, _, _ = apply_changes(shell, changes)
+    return guests, venue
@@ -0,0 +1,99 @@
+"""
+Single-flight coalescing of identical in-flight requests.
+
+A double-clicked "Generate", or several co-planners opening the same event,
+sends the same request several times at once. The first caller with a given
+key (the canonical hash of the instance and parameters) runs the
+computation; callers arriving with the same key while it is running wait for
+it and get the same result, or the same exception. Nothing is kept once the
+computation finishes: this is not a cache, later identical requests run
+again. `do_async` is the same for coroutines: waiting callers hold no thread,
+and a caller that is cancelled (e.g. its client disconnected) leaves the
+computation and the other callers alone, even when it started it.
+
+`seatharmony_coalesced_requests_total{endpoint=...}` counts the requests
+that were served by another request's computation.
+"""
+
+import asyncio
+import hashlib
+import json
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, TypeVar
+
+from .metrics import COALESCED_REQUESTS
+
+T = TypeVar("T")
+
+
+def request_key(payload: Dict[str, Any]) -> str:
+    """SHA-256 of the canonical JSON of a request payload."""
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+class SingleFlight:
+    """Runs at most one computation per key at a time; concurrent callers share it."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, fn: Callable[[], T]) -> T:
+        future, leader = self._join(key)
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            self._finish(key)
+            _settle(future, exception=e)
+            raise
+        self._finish(key)
+        _settle(future, result=result)
+        return result
+
+    async def do_async(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        future, leader = self._join(key)
+        if leader:
+            # Its own task: cancelling the leading request does not cancel the computation its followers wait for
+            task = asyncio.ensure_future(fn())
+            task.add_done_callback(lambda done: self._settle_task(key, future, done))
+        # Shielded: a cancelled caller must not cancel the shared future of the others
+        return await asyncio.shield(asyncio.wrap_future(future))
+
+    def _settle_task(self, key: str, future: Future, task: "asyncio.Future[T]") -> None:
+        self._finish(key)
+        if task.cancelled():
+            future.cancel()
+        elif task.exception() is not None:
+            _settle(future, exception=task.exception())
+        else:
+            _settle(future, result=task.result())
+
+    def _join(self, key: str) -> Tuple[Future, bool]:
+        """The key's in-flight future, and whether this caller leads (runs) the computation."""
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+        if not leader:
+            COALESCED_REQUESTS.inc(endpoint=self.name)
+        return future, leader
+
+    def _finish(self, key: str) -> None:
+        with self._lock:
+            del self._calls[key]
+
+
+def _settle(future: Future, result: Any = None, exception: Optional[BaseException] = None) -> None:
+    """Complete the shared future, unless it already is (e.g. cancelled)."""
+    if future.done():
+        return
+    if exception is not None:
+        future.set_exception(exception)
+    else:
+        future.set_result(result)
@@ -0,0 +1,210 @@
+"""
+Dedicated solver executor with a bounded priority queue.
+
+Solver work (ToT searches, repairs, what-if scoring, batch events) runs on a
+fixed number of solver slots instead of the server's request threadpool, so
+a burst of large requests cannot starve cheap endpoints. Work waits in one
+queue per priority class, served strictly in order
+
+    interactive (repair, what-if, instance changes) > generate > batch
+
+and, within a class, round-robin across tenants (`X-Tenant-ID`, else the
+client address), so one planner's burst does not delay everyone else's.
+
+Queues are bounded per class (`SEATHARMONY_SOLVER_QUEUE_SIZE`) and per tenant
+within a class (`SEATHARMONY_SOLVER_TENANT_QUEUE_SIZE`). A full queue rejects
+immediately with `QueueFull`, which the API turns into 429 with a
+`Retry-After` estimated from recent run times. Queue depth, wait time and
+rejections are exported as metrics.
+"""
+
+import contextvars
+import math
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from .metrics import SOLVER_QUEUE_DEPTH, SOLVER_QUEUE_WAIT, SOLVER_REJECTED
+
+TENANT_HEADER = "x-tenant-id"
+
+INTERACTIVE = "interactive"
+GENERATE = "generate"
+BATCH = "batch"
+PRIORITIES = (INTERACTIVE, GENERATE, BATCH)
+
+# Smoothing of the run time estimate behind Retry-After
+RUN_SECONDS_ALPHA = 0.2
+INITIAL_RUN_SECONDS = 5.0
+
+
+# Set by the middleware for every request
+_current_tenant: contextvars.ContextVar[str] = contextvars.ContextVar("seatharmony_tenant", default="anonymous")
+
+
+def set_tenant(tenant: str) -> None:
+    _current_tenant.set(tenant)
+
+
+def current_tenant() -> str:
+    return _current_tenant.get()
+
+
+def solver_slots() -> int:
+    return int(os.getenv("SEATHARMONY_SOLVER_SLOTS") or os.cpu_count() or 1)
+
+
+def solver_queue_size() -> int:
+    return int(os.getenv("SEATHARMONY_SOLVER_QUEUE_SIZE") or 16)
+
+
+def solver_tenant_queue_size() -> int:
+    return int(os.getenv("SEATHARMONY_SOLVER_TENANT_QUEUE_SIZE") or max(1, solver_queue_size() // 2))
+
+
+class QueueFull(Exception):
+    """The priority class (or the tenant's share of it) has no room; retry after `retry_after` seconds."""
+
+    def __init__(self, priority: str, retry_after: int):
+        super().__init__(f"Solver queue full for {priority} requests; retry in {retry_after}s")
+        self.priority = priority
+        self.retry_after = retry_after
+
+
+@dataclass
+class _Task:
+    fn: Callable[[], Any]
+    priority: str
+    tenant: str
+    future: Future = field(default_factory=Future)
+    enqueued: float = field(default_factory=time.monotonic)
+
+
+class SolverPool:
+    """`slots` threads serving per-class, per-tenant queues."""
+
+    def __init__(self, slots: int, queue_size: int, tenant_queue_size: int):
+        self.slots = slots
+        self.queue_size = queue_size
+        self.tenant_queue_size = tenant_queue_size
+        # priority -> tenant -> queued tasks; tenants rotate to the back when served
+        self._queues: Dict[str, "OrderedDict[str, Deque[_Task]]"] = {p: OrderedDict() for p in PRIORITIES}
+        self._depth: Dict[str, int] = {p: 0 for p in PRIORITIES}
+        self._run_seconds = INITIAL_RUN_SECONDS
+        self._cond = threading.Condition()
+        self._threads: List[threading.Thread] = []
+        self._stopped = False
+
+    def submit(self, priority: str, tenant: str, fn: Callable[[], Any]) -> Future:
+        """Queue `fn`; raises QueueFull when the class or the tenant's share of it is full."""
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority '{priority}'. Available priorities: {list(PRIORITIES)}")
+        with self._cond:
+            tenant_queue = self._queues[priority].get(tenant)
+            if self._depth[priority] >= self.queue_size or (
+                tenant_queue is not None and len(tenant_queue) >= self.tenant_queue_size
+            ):
+                SOLVER_REJECTED.inc(priority=priority)
+                raise QueueFull(priority, self._retry_after(priority))
+            if not self._threads:
+                self._start()
+            task = _Task(fn=fn, priority=priority, tenant=tenant)
+            self._queues[priority].setdefault(tenant, deque()).append(task)
+            self._set_depth(priority, self._depth[priority] + 1)
+            self._cond.notify()
+        return task.future
+
+    def depth(self, priority: Optional[str] = None) -> int:
+        with self._cond:
+            return self._depth[priority] if priority else sum(self._depth.values())
+
+    def shutdown(self) -> None:
+        """Stop the slots after their current task; queued work is cancelled."""
+        with self._cond:
+            self._stopped = True
+            for priority, tenants in self._queues.items():
+                for queue in tenants.values():
+                    for task in queue:
+                        task.future.cancel()
+                tenants.clear()
+                self._set_depth(priority, 0)
+            self._cond.notify_all()
+
+    def _retry_after(self, priority: str) -> int:
+        """Seconds until the work queued at or above `priority` should have drained."""
+        ahead = 0
+        for p in PRIORITIES:
+            ahead += self._depth[p]
+            if p == priority:
+                break
+        return max(1, math.ceil(self._run_seconds * (ahead + 1) / self.slots))
+
+    def _set_depth(self, priority: str, depth: int) -> None:
+        self._depth[priority] = depth
+        SOLVER_QUEUE_DEPTH.set(depth, priority=priority)
+
+    def _start(self) -> None:
+        for i in range(self.slots):
+            thread = threading.Thread(target=self._serve, name=f"seatharmony-solver-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _next(self) -> Optional[_Task]:
+        """Highest priority class first, then the tenant at the front of its rotation (lock held)."""
+        for priority in PRIORITIES:
+            tenants = self._queues[priority]
+            if not tenants:
+                continue
+            tenant, queue = next(iter(tenants.items()))
+            task = queue.popleft()
+            del tenants[tenant]
+            if queue:
+                tenants[tenant] = queue
+            self._set_depth(priority, self._depth[priority] - 1)
+            return task
+        return None
+
+    def _serve(self) -> None:
+        while True:
+            with self._cond:
+                task = self._next()
+                while task is None:
+                    if self._stopped:
+                        return
+                    self._cond.wait()
+                    task = self._next()
+            if not task.future.set_running_or_notify_cancel():
+                continue
+            started = time.monotonic()
+            SOLVER_QUEUE_WAIT.observe(started - task.enqueued, priority=task.priority)
+            try:
+                task.future.set_result(task.fn())
+            except BaseException as e:
+                task.future.set_exception(e)
+            with self._cond:
+                elapsed = time.monotonic() - started
+                self._run_seconds += RUN_SECONDS_ALPHA * (elapsed - self._run_seconds)
+
+
+_pool: Optional[SolverPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_solver_pool() -> SolverPool:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = SolverPool(solver_slots(), solver_queue_size(), solver_tenant_queue_size())
+        return _pool
+
+
+def shutdown_solver_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown()
+            _pool = None
@@ -0,0 +1,164 @@
+"""
+Weight-space stability regions of solved layouts.
+
+A layout's score under any weight vector is the dot product of the (effective)
+weights with its realized, unweighted term values (`scoring.py`), so once a
+layout is solved its value for every other weight vector is known without
+solving. What a re-solve at weights w could reach at best is bounded by any
+solved point j with a proof bound (the solver's ObjBound at w_j, exact engines
+only) and closed-form per-term upper bounds T_k (e.g. every family at one table
+as far as table capacities allow): for every alpha >= 0,
+
+    best(w) <= alpha * bound_j + sum_k max(0, w_k - alpha * w_j,k) * T_k
+
+since all terms are non-negative. When a stored layout's value at w is within
+`tolerance` (relative, like a MIP gap) of the smallest such bound, a re-solve
+cannot improve on it and the ToT search reuses the layout instead
+(`SeatHarmonyTask.apply_thought`). Both sides scale with w, so the weights a
+layout provably covers form a cone; its size is reported as the share of
+sampled weight directions covered.
+"""
+
+import os
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .affinity import affinity_weight
+from .models import Layout
+from .scoring import TERMS, ScoringContext, priority_weight
+
+# Engines whose solver bound holds for the whole instance
+EXACT_ENGINES = ("milp", "aggregated")
+# Gurobi stops at a 1e-4 relative gap by default; a solved layout must cover its own weights
+DEFAULT_TOLERANCE = 1e-3
+COVERAGE_SAMPLES = 256
+COVERAGE_SEED = 0
+
+
+def stability_tolerance() -> float:
+    """Relative gap within which a stored layout is reused; 0 disables reuse."""
+    return float(os.getenv("SEATHARMONY_STABILITY_TOLERANCE") or DEFAULT_TOLERANCE)
+
+
+def term_weights(weights: Dict[str, float]) -> np.ndarray:
+    """Weights as `weighted_score` applies them, in TERMS order."""
+    return np.array(
+        [
+            weights.get("family_cohesion", 0.0),
+            weights.get("social_group_cohesion", 0.0),
+            weights.get("side_mixing", 0.0),
+            priority_weight(weights),
+            affinity_weight(weights),
+        ]
+    )
+
+
+def _max_pairs(members: int, capacity: np.ndarray) -> int:
+    """Most pairs of `members` guests seated together: fill the largest tables first."""
+    pairs = 0
+    for seats in sorted(capacity.tolist(), reverse=True):
+        if members <= 0:
+            break
+        m = min(seats, members)
+        pairs += m * (m - 1) // 2
+        members -= m
+    return pairs
+
+
+def term_upper_bounds(ctx: ScoringContext) -> np.ndarray:
+    """Per term, its largest value in any layout (each term maximized on its own, relaxed), in TERMS order."""
+    sizes = np.bincount(ctx.guest_category, minlength=len(ctx.categories))
+    family = sum(_max_pairs(int(sizes[c]), ctx.capacity) for c in np.flatnonzero(ctx.is_family))
+    social = sum(_max_pairs(int(sizes[c]), ctx.capacity) for c in np.flatnonzero(ctx.is_social))
+    groom, bride = int(sizes[ctx.is_groom].sum()), int(sizes[ctx.is_bride].sum())
+    side = min(groom * bride, int((ctx.capacity // 2 * (ctx.capacity - ctx.capacity // 2)).sum()))
+    # Closest guests at the best tables (rearrangement inequality)
+    seats = np.sort(np.repeat(ctx.quality, ctx.capacity))[::-1]
+    closeness = np.sort(ctx.guest_closeness)[::-1][: seats.size]
+    priority = float(np.dot(closeness, seats[: closeness.size]))
+    affinity = float(np.clip(ctx.affinity_values, 0.0, None).sum()) / 2
+    return np.array([family, social, side, priority, affinity], dtype=np.float64)
+
+
+def record_terms(layout: Layout, ctx: ScoringContext, weights: Dict[str, float]) -> None:
+    """Store the realized term values of a layout solved at `weights` (and, for exact engines, its proof bound)."""
+    layout.stats["terms"] = ctx.terms(layout.assignments)
+    solver = layout.stats.get("solver") or {}
+    if (
+        layout.stats.get("engine") in EXACT_ENGINES
+        and "degraded" not in layout.stats
+        and solver.get("obj_bound") is not None
+    ):
+        layout.stats["weights"] = dict(weights)
+        layout.stats["bound"] = solver["obj_bound"]
+
+
+class StabilityIndex:
+    """Decides from the layouts solved so far whether a re-solve at new weights can improve on them."""
+
+    def __init__(self, ctx: ScoringContext, tolerance: Optional[float] = None):
+        self.term_bounds = term_upper_bounds(ctx)
+        self.tolerance = stability_tolerance() if tolerance is None else tolerance
+        self._directions: Optional[np.ndarray] = None
+
+    def upper_bounds(self, directions: np.ndarray, solved: List[Tuple[Dict[str, float], float]]) -> np.ndarray:
+        """Bound on the best score for each row of `directions` (effective weights), from (weights, bound) points."""
+        T = self.term_bounds
+        best = np.clip(directions, 0.0, None) @ T  # alpha = 0: the per-term bounds alone
+        for weights, bound in solved:
+            w = term_weights(weights)
+            positive = w > 0
+            if not positive.any():
+                continue
+            # The bound is convex and piecewise linear in alpha: its minimum is at a breakpoint
+            alphas = directions[:, positive] / w[positive]
+            residual = np.clip(directions[:, None, :] - alphas[:, :, None] * w, 0.0, None) @ T
+            best = np.minimum(best, (alphas * bound + residual).min(axis=1))
+        return best
+
+    def _covered(self, values: np.ndarray, bounds: np.ndarray) -> np.ndarray:
+        return bounds - values <= self.tolerance * np.abs(values) + 1e-9
+
+    def covering(self, weights: Dict[str, float], layouts: Iterable[Layout]) -> Optional[Tuple[Layout, float]]:
+        """The stored layout no re-solve at `weights` can beat by more than the tolerance, with its score there."""
+        if self.tolerance <= 0:
+            return None
+        stored = [layout for layout in layouts if "terms" in layout.stats]
+        if not stored:
+            return None
+        v = term_weights(weights)
+        scores = [float(np.dot(v, [layout.stats["terms"][k] for k in TERMS])) for layout in stored]
+        i = int(np.argmax(scores))
+        bound = self.upper_bounds(v[None, :], _solved(stored))[0]
+        if not self._covered(np.array([scores[i]]), np.array([bound]))[0]:
+            return None
+        return stored[i], scores[i]
+
+    def coverage(self, layout: Layout, layouts: Iterable[Layout]) -> float:
+        """Share of weight directions (over the terms that can be non-zero) at which `layout` provably is best."""
+        if "terms" not in layout.stats:
+            return 0.0
+        directions = self._sample_directions()
+        bounds = self.upper_bounds(directions, _solved(layouts))
+        values = directions @ np.array([layout.stats["terms"][k] for k in TERMS])
+        return float(self._covered(values, bounds).mean())
+
+    def _sample_directions(self) -> np.ndarray:
+        if self._directions is None:
+            # Uniform on the simplex of the terms that can be non-zero (the others never change a score)
+            active = self.term_bounds > 0
+            self._directions = np.zeros((COVERAGE_SAMPLES, len(TERMS)))
+            if active.any():
+                rng = np.random.default_rng(COVERAGE_SEED)
+                self._directions[:, active] = rng.dirichlet(np.ones(int(active.sum())), COVERAGE_SAMPLES)
+        return self._directions
+
+
+def _solved(layouts: Iterable[Layout]) -> List[Tuple[Dict[str, float], float]]:
+    """(weights, proof bound) of the layouts solved by exact engines."""
+    return [
+        (layout.stats["weights"], layout.stats["bound"])
+        for layout in layouts
+        if "bound" in layout.stats and "weights" in layout.stats
+    ]
@@ -0,0 +1,132 @@
+"""
+Tests for admission control: closed-form cost estimates, engine routing, and
+the 413/429 rejections with their cheaper suggestions. No solver is needed.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+from fastapi import HTTPException
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.admission import AdmissionError, AdmissionLimits, admit, count_tot_solves, estimate_cost
+from backend.api import GuestIn, LayoutRequest, TableIn, TotParams, _admit
+from backend.models import Guest, Table
+
+# 4 + 3 family guests, 2 friends and one uncategorized guest; 6 on the groom's side, 3 on the bride's
+CATEGORIES = ["Groom's Family"] * 4 + ["Bride's Family"] * 3 + ["Groom's Friends"] * 2 + [None]
+
+
+def instance():
+    guests = [Guest(id=f"g{i}", name=f"Guest {i}", group_id=c) for i, c in enumerate(CATEGORIES)]
+    tables = [Table(id=f"t{t}", name=f"Table {t}", capacity=4) for t in range(3)]
+    return guests, tables
+
+
+def test_count_tot_solves():
+    assert count_tot_solves(2, 4, 4, 4) == 4 + 16
+    # Children per state are capped by n_generate, the kept ones by n_evaluate
+    assert count_tot_solves(1, 3, 5, 2) == 3
+    assert count_tot_solves(3, 2, 2, 1) == 2 + 2 + 2
+    assert count_tot_solves(2, 9, 9, 9) == 7 + 49  # at most N_THOUGHT_PATTERNS thoughts
+
+
+def test_estimate_counts_pairs_and_model_rows():
+    guests, tables = instance()
+    estimate = estimate_cost(guests, tables, settings={"side_mixing_model": "pairs"})
+    assert (estimate.n_guests, estimate.n_tables, estimate.n_units, estimate.n_solves) == (10, 3, 10, 20)
+    assert estimate.pairs == {"family": 6 + 3, "social_group": 1, "cross_side": 6 * 3, "affinity": 0, "conflicts": 0}
+    # x[g, t] plus one variable and three rows per (pair, table)
+    milp = estimate.engines["milp"]
+    assert (milp.vars, milp.constrs) == (10 * 3 + 28 * 3, 10 + 3 + 3 * 28 * 3)
+    assert estimate.total_seconds("milp") == pytest.approx(20 * milp.seconds_per_solve)
+
+    # Compact side mixing replaces the 18 cross-side pairs by a per-table expansion
+    compact = estimate_cost(guests, tables).engines["milp"]
+    assert (compact.vars, compact.constrs) == (10 * 3 + 10 * 3 + 3 * 9, 10 + 3 + 3 * 10 * 3 + 3 * 10)
+    # A solution pool is one solve
+    assert estimate_cost(guests, tables, mode="pool").n_solves == 1
+
+
+def test_auto_routes_to_the_most_exact_engine_that_fits():
+    guests, tables = instance()
+    decision = admit(guests, tables)
+    assert decision.engine == "milp"
+    assert decision.reason.startswith("most exact engine within limits")
+    # Too many MILP rows: the count model is next
+    assert admit(guests, tables, limits=AdmissionLimits(max_milp_rows=10)).engine == "aggregated"
+
+
+def test_too_many_guests_is_413_without_a_suggestion():
+    guests, tables = instance()
+    with pytest.raises(AdmissionError) as rejected:
+        admit(guests, tables, limits=AdmissionLimits(max_guests=5))
+    assert rejected.value.status_code == 413
+    assert rejected.value.detail["suggestion"] is None
+
+
+@pytest.mark.parametrize(
+    "mode, suggestion",
+    [("tot", {"engine": "aggregated"}), ("pool", {"engine": "aggregated", "tot": {"mode": "tot"}})],
+)
+def test_too_large_for_the_engine_is_413_with_one_that_fits(mode, suggestion):
+    guests, tables = instance()
+    with pytest.raises(AdmissionError) as rejected:
+        admit(guests, tables, mode=mode, engine="milp", limits=AdmissionLimits(max_milp_rows=10))
+    assert rejected.value.status_code == 413
+    assert rejected.value.detail["suggestion"] == suggestion
+    assert rejected.value.detail["estimate"]["n_guests"] == 10
+
+
+def test_too_expensive_search_is_429_with_a_smaller_one():
+    guests, tables = instance()
+    per_solve = estimate_cost(guests, tables).engines["milp"].seconds_per_solve
+    # Room for four solves: depth 1 with all four branches beats depth 2 with one
+    limits = AdmissionLimits(request_budget_seconds=4.5 * per_solve)
+    with pytest.raises(AdmissionError) as rejected:
+        admit(guests, tables, engine="milp", limits=limits)
+    assert rejected.value.status_code == 429
+    assert rejected.value.detail["suggestion"] == {
+        "engine": "milp",
+        "tot": {"depth": 1, "branching": 4, "n_generate": 4},
+    }
+    # The suggested search is admitted
+    assert admit(guests, tables, depth=1, branching=4, n_generate=4, engine="milp", limits=limits).engine == "milp"
+
+
+def layout_request(engine: str = "auto", **tot) -> LayoutRequest:
+    guests, tables = instance()
+    return LayoutRequest(
+        guests=[GuestIn(id=g.id, name=g.name, group_id=g.group_id) for g in guests],
+        tables=[TableIn(id=t.id, name=t.name, capacity=t.capacity) for t in tables],
+        engine=engine,
+        tot=TotParams(**tot),
+    )
+
+
+def test_api_maps_rejections_to_http_errors():
+    assert _admit(layout_request()).engine == "milp"
+    with pytest.raises(HTTPException) as rejected:
+        _admit(layout_request(engine="milp"), budget_seconds=1e-6)
+    assert rejected.value.status_code == 429
+    assert "suggestion" in rejected.value.detail
+
+
+@pytest.mark.parametrize(
+    "tot, detail",
+    [
+        ({"mode": "beam"}, "Unknown tot.mode 'beam'"),
+        ({"depth": 0}, "tot.depth must be positive"),
+        ({"branching": -1}, "tot.branching must be positive"),
+        ({"n_generate": 0}, "tot.n_generate must be positive"),
+        ({"top_k": 0}, "tot.top_k must be positive"),
+    ],
+)
+def test_invalid_search_parameters_are_400(tot, detail):
+    with pytest.raises(HTTPException) as rejected:
+        _admit(layout_request(**tot))
+    assert rejected.value.status_code == 400
+    assert rejected.value.detail.startswith(detail)
@@ -0,0 +1,205 @@
+"""
+Tests for table domains (pins and eligibility rules) and sparse affinity input.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.affinity import from_coo, from_csr
+from backend.domains import DomainError, compile_domains
+from backend.households import contract_households, count_party_pairs, party_pairs
+from backend.models import Affinity, Guest, Table, VenueConfig
+from backend.optimizer import CLOSENESS_RANK
+from backend.scoring import build_context
+
+
+def make_guests(n: int = 6, **overrides) -> list:
+    """Guests g0..g{n-1}; `overrides` maps a guest id to extra Guest fields."""
+    return [Guest(id=f"g{i}", name=f"Guest {i}", **overrides.get(f"g{i}", {})) for i in range(n)]
+
+
+def make_venue(*constraints, capacity: int = 4, **kwargs) -> VenueConfig:
+    """One table per `constraints` dict, t0..t{k-1}."""
+    tables = [Table(id=f"t{i}", name=f"Table {i}", capacity=capacity, constraints=c) for i, c in enumerate(constraints)]
+    return VenueConfig(tables=tables, **kwargs)
+
+
+# --- compile_domains -------------------------------------------------------
+
+
+def test_no_rules_gives_no_domains():
+    assert compile_domains(make_guests(), make_venue({}, {})) is None
+
+
+def test_pins_and_eligibility():
+    guests = make_guests(g1={"tags": ["kid"]}, g2={"tags": ["wheelchair"]})
+    venue = make_venue(
+        {"pinned": ["g0"], "features": ["accessible"]},
+        {"reserved_for": ["kid"]},
+        {},
+        settings={"requires": {"wheelchair": ["accessible"]}},
+    )
+    domains = compile_domains(guests, venue)
+    assert domains.fixed.tolist() == [0, -1, -1, -1, -1, -1]
+    assert domains.allowed[0].tolist() == [True, False, False]
+    assert domains.allowed[1].tolist() == [True, True, True]  # the kid may sit anywhere
+    assert domains.allowed[2].tolist() == [True, False, False]  # only t0 is accessible
+    assert domains.allowed[3].tolist() == [True, False, True]  # t1 is reserved for kids
+    assert domains.constant(0, 0) == 1.0 and domains.constant(0, 1) == 0.0
+    assert domains.constant(3, 1) == 0.0 and domains.constant(3, 2) is None
+
+
+def test_zone_counts_as_feature():
+    guests = make_guests(g0={"tags": ["wheelchair"]})
+    venue = make_venue({}, {}, settings={"requires": {"wheelchair": ["ground"]}})
+    venue.tables[1].zone = "ground"
+    assert compile_domains(guests, venue).allowed[0].tolist() == [False, True]
+
+
+def test_household_shares_pin_and_domain():
+    guests = make_guests(g0={"household_id": "h"}, g1={"household_id": "h", "tags": ["wheelchair"]})
+    venue = make_venue(
+        {}, {"features": ["accessible"]}, {"pinned": ["g0"], "features": ["accessible"]},
+        settings={"requires": {"wheelchair": ["accessible"]}},
+    )
+    domains = compile_domains(guests, venue)
+    assert domains.fixed[:2].tolist() == [2, 2]
+    assert domains.allowed[0].tolist() == domains.allowed[1].tolist() == [False, False, True]
+
+
+def test_conflict_with_pinned_guest_removes_table():
+    venue = make_venue({"pinned": ["g0"]}, {}, affinity=Affinity(conflicts=[("g0", "g1")]))
+    assert compile_domains(make_guests(), venue).allowed[1].tolist() == [False, True]
+
+
+@pytest.mark.parametrize(
+    "guests, venue, message",
+    [
+        (make_guests(), make_venue({"pinned": ["nobody"]}), "unknown guest"),
+        (make_guests(), make_venue({"pinned": ["g0"]}, {"pinned": ["g0"]}), "pinned to tables"),
+        (
+            make_guests(g0={"household_id": "h"}, g1={"household_id": "h"}),
+            make_venue({"pinned": ["g0"]}, {"pinned": ["g1"]}),
+            "more than one table",
+        ),
+        (make_guests(), make_venue({"pinned": ["g0"], "reserved_for": ["kid"]}, {}), "not eligible"),
+        (
+            make_guests(),
+            make_venue({"pinned": ["g0", "g1"]}, {}, affinity=Affinity(conflicts=[("g0", "g1")])),
+            "must sit apart",
+        ),
+        (make_guests(), make_venue({"pinned": ["g0", "g1", "g2"]}, {}, capacity=2), "exceed the capacity"),
+        (make_guests(), make_venue({"reserved_for": ["kid"]}), "No eligible table"),
+    ],
+)
+def test_contradictory_rules_raise(guests, venue, message):
+    with pytest.raises(DomainError, match=message):
+        compile_domains(guests, venue)
+
+
+def test_domain_capacity_is_checked():
+    # Three wheelchair users, but the only accessible table seats two
+    guests = make_guests(3, **{f"g{i}": {"tags": ["wheelchair"]} for i in range(3)})
+    venue = make_venue({"features": ["accessible"]}, {}, capacity=2, settings={"requires": {"wheelchair": ["accessible"]}})
+    with pytest.raises(DomainError, match=r"3 guests can only sit at table\(s\) \['t0'\], which have 2 seats"):
+        compile_domains(guests, venue)
+
+
+def test_total_capacity_is_checked():
+    with pytest.raises(DomainError, match="6 guests can only sit at table"):
+        compile_domains(make_guests(6), make_venue({"reserved_for": []}, {"pinned": ["g0"]}, capacity=2))
+
+
+def test_for_parties_takes_the_household_domain():
+    guests = make_guests(g1={"household_id": "h"}, g3={"household_id": "h", "tags": ["kid"]}, g4={"tags": ["kid"]})
+    venue = make_venue({"reserved_for": ["kid"]}, {}, {"pinned": ["g2"]})
+    domains = compile_domains(guests, venue)
+    parties, party_of = contract_households(guests)
+    contracted = domains.for_parties(party_of, len(parties))
+    assert [p.id for p in parties] == ["g0", "household:h", "g2", "g4", "g5"]
+    assert contracted.allowed.shape == (5, 3)
+    for p, party in enumerate(parties):
+        g = int(party.member_ids[0][1:])
+        assert contracted.allowed[p].tolist() == domains.allowed[g].tolist()
+        assert contracted.fixed[p] == domains.fixed[g]
+    # The household's adult needs the kid's table; the kid needs to sit with the adult
+    assert contracted.allowed[1].tolist() == [False, True, True]
+    assert contracted.fixed.tolist() == [-1, -1, 2, -1, -1]
+
+
+# --- households ------------------------------------------------------------
+
+
+def test_contract_households_keeps_first_appearance_order():
+    guests = make_guests(
+        g0={"household_id": "a"}, g2={"household_id": "b"}, g3={"household_id": "a"}, g4={"household_id": "c"}
+    )
+    parties, party_of = contract_households(guests)
+    assert [p.id for p in parties] == ["household:a", "g1", "household:b", "household:c", "g5"]
+    assert [p.member_ids for p in parties] == [["g0", "g3"], ["g1"], ["g2"], ["g4"], ["g5"]]
+    assert [p.size for p in parties] == [2, 1, 1, 1, 1]
+    assert party_of.tolist() == [0, 1, 2, 0, 3, 4]
+
+
+@pytest.mark.parametrize("side_mixing", [True, False])
+@pytest.mark.parametrize("seed", range(5))
+def test_count_party_pairs_matches_the_pair_matrix(seed, side_mixing):
+    rng = np.random.default_rng(seed)
+    groups = list(CLOSENESS_RANK) + [None]
+    n = 40
+    guests = [
+        Guest(
+            id=f"g{i}",
+            name=f"Guest {i}",
+            group_id=groups[rng.integers(len(groups))],
+            household_id=f"h{rng.integers(15)}" if rng.random() < 0.6 else None,
+        )
+        for i in range(n)
+    ]
+    affinity = Affinity(rewards=[(f"g{a}", f"g{b}", 1.0) for a, b in rng.integers(n, size=(8, 2)) if a != b])
+    tables = [Table(id="t0", name="Table 0", capacity=10)]
+
+    ctx = build_context(guests, VenueConfig(tables=tables))
+    parties, party_of = contract_households(guests)
+    ones = {"family_cohesion": 1.0, "social_group_cohesion": 1.0, "side_mixing": 1.0 if side_mixing else 0.0}
+    (i, _, _), _ = party_pairs(ctx, party_of, len(parties), ones, affinity)
+    assert count_party_pairs(guests, tables, affinity, side_mixing) == (len(parties), int(i.size))
+
+
+# --- sparse affinity input -------------------------------------------------
+
+
+def test_coo_is_symmetrized_and_split_by_sign():
+    ids = ["a", "b", "c", "d"]
+    affinity = from_coo(ids, row=[0, 1, 2, 3, 3, 2], col=[1, 0, 3, 2, 3, 1], data=[2.0, 1.5, -1.0, 0.5, 9.0, 0.0])
+    assert sorted(affinity.rewards) == [("a", "b", 3.5)]  # (0, 1) and (1, 0) are summed
+    assert affinity.conflicts == [("c", "d")]  # -1.0 + 0.5 < 0; diagonal and zero entries are dropped
+
+
+def test_csr_matches_coo():
+    ids = ["a", "b", "c"]
+    # Row 0: (0, 1) = 1, (0, 2) = -2; row 1: empty; row 2: (2, 1) = 4
+    csr = from_csr(ids, indptr=[0, 2, 2, 3], indices=[1, 2, 1], data=[1.0, -2.0, 4.0])
+    coo = from_coo(ids, row=[0, 0, 2], col=[1, 2, 1], data=[1.0, -2.0, 4.0])
+    assert sorted(csr.rewards) == sorted(coo.rewards) == [("a", "b", 1.0), ("b", "c", 4.0)]
+    assert csr.conflicts == coo.conflicts == [("a", "c")]
+
+
+@pytest.mark.parametrize(
+    "parse, message",
+    [
+        (lambda ids: from_coo(ids, [0, 1], [1], [1.0]), "same length"),
+        (lambda ids: from_coo(ids, [0], [3], [1.0]), "out of range"),
+        (lambda ids: from_csr(ids, [0, 1], [1], [1.0]), "indptr must have 4 entries"),
+        (lambda ids: from_csr(ids, [0, 1, 1, 2], [1], [1.0]), "do not match"),
+    ],
+)
+def test_malformed_sparse_input_raises(parse, message):
+    with pytest.raises(ValueError, match=message):
+        parse(["a", "b", "c"])
@@ -0,0 +1,27 @@
+"""
+Tests for the API module's import-time budget (`benchmarks/import_budget.py`):
+`import backend.api` stays within the budget and imports no heavy dependency.
+"""
+
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.benchmarks.import_budget import DEFAULT_BUDGET_MS, check, measure
+
+
+def test_api_import_is_within_the_budget(monkeypatch):
+    # The fresh interpreter imports `backend` from the project root
+    monkeypatch.chdir(Path(__file__).parent.parent)
+    times = measure("backend.api")
+    assert check(times, "backend.api", DEFAULT_BUDGET_MS) == []
+
+
+def test_check_reports_slow_and_eager_imports():
+    times = {"backend.api": (1000, 2_000_000), "numpy": (500, 90_000)}
+    assert check(times, "backend.api", 1500.0) == [
+        "import backend.api took 2000ms (budget 1500ms)",
+        "numpy is imported eagerly (90ms)",
+    ]
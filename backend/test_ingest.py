@@ -0,0 +1,125 @@
+"""
+Tests for guest-list ingestion: column detection, ids and category codes
+across chunk boundaries, CSV and XLSX sources, and unreadable files.
+"""
+
+import io
+import sys
+import zipfile
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.ingest import detect_columns, read_guest_list
+
+HEADER = ["Table", " Full Guest Name ", "Category"]
+ROWS = [
+    (1, "Dana Levi", "Bride's Family"),
+    (1, "  ", "Bride's Family"),  # no name: skipped, but still counts as a row
+    (2, "Avi Cohen", "Groom's Friends"),
+    (2, "Noa Bar", None),
+    (3, "Yossi Mor", "Bride's Family"),
+    (3, "Tal Gal", "groom's friends "),
+    (4, "Eli Ben", "Mutual Friends"),
+]
+
+
+def csv_file(header=HEADER, rows=ROWS) -> io.BytesIO:
+    lines = [",".join(str(c).strip() for c in header)]
+    lines += [",".join("" if c is None else str(c) for c in row) for row in rows]
+    return io.BytesIO("\n".join(lines).encode("utf-8-sig"))
+
+
+def xlsx_file(header=HEADER, rows=ROWS) -> io.BytesIO:
+    from openpyxl import Workbook
+
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(header)
+    for row in rows:
+        sheet.append(list(row))
+    data = io.BytesIO()
+    workbook.save(data)
+    data.seek(0)
+    return data
+
+
+def test_detect_columns():
+    # Name columns by priority, both case-insensitively and ignoring surrounding spaces
+    assert detect_columns(["name", None, " Full Guest Name", "group"]) == ("Full Guest Name", "group")
+    assert detect_columns(["שם", "קטגוריה"]) == ("שם", "קטגוריה")
+    assert detect_columns(["Guest_Name"]) == ("Guest_Name", None)
+    assert detect_columns(["Table", "Seat"]) == (None, None)
+
+
+@pytest.mark.parametrize("source, filename", [(csv_file, "guests.csv"), (xlsx_file, "guests.xlsx")])
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 100])
+def test_guest_lists_read_the_same_in_any_chunk_size(source, filename, chunk_size):
+    guests = read_guest_list(source(), filename=filename, chunk_size=chunk_size)
+    assert (guests.name_column, guests.category_column) == ("Full Guest Name", "Category")
+    assert guests.names == ["Dana Levi", "Avi Cohen", "Noa Bar", "Yossi Mor", "Tal Gal", "Eli Ben"]
+    # Ids keep the file's row numbers, including the skipped row
+    assert guests.ids[:3] == ["guest-1-dana-levi", "guest-3-avi-cohen", "guest-4-noa-bar"]
+    # Category codes are global: the same category gets one code in every chunk
+    assert guests.categories == ["Bride's Family", "Groom's Friends", "groom's friends", "Mutual Friends"]
+    assert guests.category_codes.tolist() == [0, 1, -1, 0, 2, 3]
+    assert guests.category_counts() == {
+        "Uncategorized": 1,
+        "Bride's Family": 2,
+        "Groom's Friends": 1,
+        "groom's friends": 1,
+        "Mutual Friends": 1,
+    }
+    assert guests.to_dicts()[3] == {
+        "id": "guest-5-yossi-mor",
+        "name": "Yossi Mor",
+        "group_id": "Bride's Family",
+        "importance": 0,
+        "tags": [],
+    }
+
+
+@pytest.mark.parametrize("source, filename", [(csv_file, "guests.csv"), (xlsx_file, "guests.xlsx")])
+def test_lists_without_categories_are_uncategorized(source, filename):
+    guests = read_guest_list(source(["Name"], [("A",), ("B",)]), filename=filename, chunk_size=1)
+    assert guests.category_column is None
+    assert guests.category_codes.tolist() == [-1, -1]
+    assert guests.category_counts() == {"Uncategorized": 2}
+
+
+@pytest.mark.parametrize("source, filename", [(csv_file, "guests.csv"), (xlsx_file, "guests.xlsx")])
+def test_lists_without_a_name_column_are_rejected(source, filename):
+    with pytest.raises(ValueError, match="Could not find name column"):
+        read_guest_list(source(["Table", "Category"], [(1, "x")]), filename=filename)
+
+
+def archive_without_a_workbook() -> io.BytesIO:
+    data = io.BytesIO()
+    with zipfile.ZipFile(data, "w") as archive:
+        archive.writestr("notes.txt", "not a workbook")
+    data.seek(0)
+    return data
+
+
+@pytest.mark.parametrize(
+    "data, filename, error",
+    [
+        (io.BytesIO(b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1legacy"), "guests.xls", "BadZipFile"),
+        (io.BytesIO(b"PK\x03\x04truncated"), "guests.xlsx", "BadZipFile"),
+        (archive_without_a_workbook(), "guests.xlsx", "KeyError"),
+    ],
+)
+def test_unreadable_files_are_value_errors(data, filename, error):
+    # The import endpoint turns ValueError into a 400
+    with pytest.raises(ValueError, match=f"Could not read the guest list as an XLSX file \\({error}"):
+        read_guest_list(data, filename=filename)
+
+
+def test_legacy_xls_paths_are_value_errors(tmp_path):
+    path = tmp_path / "guests.xls"
+    path.write_bytes(b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1legacy")
+    with pytest.raises(ValueError, match="InvalidFileException"):
+        read_guest_list(path)
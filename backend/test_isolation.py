@@ -0,0 +1,176 @@
+"""
+Tests for isolated solver workers: replies and errors, killing and replacing
+lost workers, recycling, and the heuristic fallback of engine solves.
+Worker jobs are the module-level functions below (they must be picklable).
+"""
+
+import os
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend import isolation
+from backend.engines import ENGINES
+from backend.isolation import IsolatedSolvers, WorkerLost
+from backend.models import ConstraintSummary, Guest, Layout, Table, VenueConfig
+
+TIMEOUT = 30.0
+
+
+class UnpicklableError(Exception):
+    """Pickles fine, but unpickling calls __init__ with one argument and fails."""
+
+    def __init__(self, message: str, code: int):
+        super().__init__(message)
+        self.code = code
+
+
+def pid() -> int:
+    return os.getpid()
+
+
+def sleep_for(seconds: float) -> float:
+    time.sleep(seconds)
+    return seconds
+
+
+def allocate(mb: int) -> int:
+    block = bytearray(mb * 1024 * 1024)
+    block[:: 4096] = b"x" * len(block[:: 4096])  # touch every page
+    time.sleep(TIMEOUT)
+    return len(block)
+
+
+def fail(message: str) -> None:
+    raise ValueError(message)
+
+
+def fail_unpicklably() -> None:
+    raise UnpicklableError("bad reply", 7)
+
+
+def crash(*args) -> None:
+    os._exit(3)
+
+
+@pytest.fixture
+def solvers():
+    solvers = IsolatedSolvers(workers=1, memory_mb=0, max_jobs=10)
+    yield solvers
+    solvers.shutdown()
+
+
+def idle_pids(solvers: IsolatedSolvers) -> list:
+    return [w.process.pid for w in solvers._idle]
+
+
+def test_replies_and_errors_keep_the_worker(solvers):
+    first = solvers.run(pid, (), TIMEOUT, "pid")
+    assert first != os.getpid()
+    with pytest.raises(ValueError, match="infeasible"):
+        solvers.run(fail, ("infeasible",), TIMEOUT, "fail")
+    assert solvers.run(pid, (), TIMEOUT, "pid") == first
+    assert solvers._alive == 1 and idle_pids(solvers) == [first]
+
+
+@pytest.mark.parametrize(
+    "fn, args, timeout, reason",
+    [(sleep_for, (TIMEOUT,), 0.5, "deadline"), (crash, (), TIMEOUT, "crash")],
+)
+def test_lost_workers_are_killed_and_replaced(solvers, fn, args, timeout, reason):
+    first = solvers.run(pid, (), TIMEOUT, "pid")
+    worker = solvers._idle[0]
+    with pytest.raises(WorkerLost, match=f"lost \\({reason}\\) while running the job"):
+        solvers.run(fn, args, timeout, "the job")
+    assert not worker.process.is_alive()
+    assert solvers._alive == 0 and solvers._idle == []
+    assert solvers.run(pid, (), TIMEOUT, "pid") not in (first, None)
+
+
+def test_workers_over_the_memory_cap_are_killed():
+    solvers = IsolatedSolvers(workers=1, memory_mb=300, max_jobs=10)
+    try:
+        with pytest.raises(WorkerLost, match=r"lost \(memory\)"):
+            solvers.run(allocate, (600,), TIMEOUT, "allocate")
+        assert solvers._alive == 0
+    finally:
+        solvers.shutdown()
+
+
+@pytest.mark.parametrize(
+    "fn, args, error",
+    [(fail_unpicklably, (), TypeError), (sleep_for, (lambda: 0,), Exception)],
+)
+def test_unexpected_errors_do_not_leak_the_worker(solvers, fn, args, error):
+    # An unpicklable reply (TypeError in recv) or unpicklable arguments (in send)
+    solvers.run(pid, (), TIMEOUT, "pid")
+    worker = solvers._idle[0]
+    with pytest.raises(error):
+        solvers.run(fn, args, TIMEOUT, "the job")
+    assert not worker.process.is_alive()
+    assert solvers._alive == 0 and solvers._idle == []
+    # The slot is free again: this would block forever if the worker had leaked
+    assert solvers.run(sleep_for, (0.0,), TIMEOUT, "sleep") == 0.0
+
+
+def test_workers_are_recycled_after_max_jobs():
+    solvers = IsolatedSolvers(workers=1, memory_mb=0, max_jobs=2)
+    try:
+        pids = [solvers.run(pid, (), TIMEOUT, "pid") for _ in range(5)]
+        assert pids[0] == pids[1] != pids[2] == pids[3] != pids[4]
+        assert solvers._alive == 1
+    finally:
+        solvers.shutdown()
+
+
+def tiny_instance():
+    guests = [Guest(id=f"g{i}", name=f"Guest {i}", group_id="Groom's Family") for i in range(6)]
+    return guests, VenueConfig(tables=[Table(id=f"t{t}", name=f"Table {t}", capacity=4) for t in range(2)])
+
+
+def test_lost_worker_degrades_to_the_heuristic(monkeypatch):
+    monkeypatch.setenv(isolation.ISOLATION_ENV, "1")
+    # The worker dies during the engine solve
+    monkeypatch.setattr(isolation, "_run_engine", crash)
+    isolation.shutdown_isolated_solvers()
+    try:
+        guests, venue = tiny_instance()
+        layout, _ = isolation.solve("milp", guests, venue, {"family_cohesion": 1.0})
+    finally:
+        isolation.shutdown_isolated_solvers()
+    assert layout.id != "dummy"
+    assert sorted(layout.assignments) == [g.id for g in guests]
+    assert layout.stats["degraded"]["engine"] == "milp"
+    assert layout.stats["degraded"]["reason"] == "solver worker lost (crash) while running engine 'milp'"
+
+
+def test_engine_without_a_layout_degrades_to_the_heuristic(monkeypatch):
+    def no_layout(guests, venue, weights, time_limit=None):
+        return Layout(id="dummy", assignments={}, score=0.0, stats={"error": "Infeasible"}), ConstraintSummary()
+
+    monkeypatch.setitem(ENGINES, "test-no-layout", no_layout)
+    guests, venue = tiny_instance()
+    layout, _ = isolation.solve("test-no-layout", guests, venue, {"family_cohesion": 1.0})
+    assert layout.id != "dummy"
+    assert layout.stats["degraded"] == {
+        "engine": "test-no-layout",
+        "reason": "engine 'test-no-layout' found no layout (Infeasible)",
+    }
+
+
+def test_run_isolated_uses_a_worker_only_when_enabled(monkeypatch):
+    monkeypatch.setenv(isolation.ISOLATION_ENV, "0")
+    assert isolation.run_isolated(pid, (), TIMEOUT, "pid") == os.getpid()
+    monkeypatch.setenv(isolation.ISOLATION_ENV, "1")
+    isolation.shutdown_isolated_solvers()
+    try:
+        assert isolation.run_isolated(pid, (), TIMEOUT, "pid") != os.getpid()
+        with pytest.raises(WorkerLost, match=r"lost \(crash\) while running the pool"):
+            isolation.run_isolated(crash, (), TIMEOUT, "the pool")
+    finally:
+        isolation.shutdown_isolated_solvers()
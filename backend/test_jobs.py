@@ -0,0 +1,128 @@
+"""
+Tests for the job queue backends (memory, SQLite) and the dispatcher: claim
+order, results, cancellation, requeueing the jobs of workers whose heartbeat
+stopped, and abandoned jobs.
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.jobs import WORKER_TTL, Dispatcher, MemoryQueue, SQLiteQueue, WorkerInfo, open_queue
+
+TIMEOUT = 10.0
+OK = {"status": "ok", "result": {"layouts": []}}
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def queue(request, tmp_path):
+    if request.param == "memory":
+        return MemoryQueue()
+    return open_queue(f"sqlite:///{tmp_path / 'jobs.db'}")
+
+
+def beat(queue, worker_id: str, age: float = 0.0) -> None:
+    """Record a heartbeat of `worker_id`, `age` seconds ago."""
+    queue.heartbeat(WorkerInfo(id=worker_id, host="test", pid=0, slots=1, heartbeat=time.time() - age))
+
+
+def payload(i: int) -> dict:
+    return {"request": {"event": i}, "budget_seconds": None}
+
+
+def test_open_queue_by_url(tmp_path):
+    assert isinstance(open_queue("memory://"), MemoryQueue)
+    assert isinstance(open_queue(f"sqlite:///{tmp_path / 'jobs.db'}"), SQLiteQueue)
+    with pytest.raises(ValueError, match="Unsupported queue URL"):
+        open_queue("amqp://localhost")
+
+
+def test_jobs_are_claimed_in_order_and_finished(queue):
+    ids = [queue.submit(payload(i)) for i in range(3)]
+    assert queue.depth() == 3
+    claimed = [queue.claim("w1", TIMEOUT) for _ in range(3)]
+    assert [job.id for job in claimed] == ids
+    assert [job.payload for job in claimed] == [payload(i) for i in range(3)]
+    assert all(job.status == "running" and job.worker_id == "w1" for job in claimed)
+    assert queue.depth() == 0
+    # Nothing left: claim gives up after its timeout
+    assert queue.claim("w1", 0.1) is None
+
+    queue.finish(ids[0], OK)
+    job = queue.get(ids[0])
+    assert (job.status, job.result, job.worker_id) == ("done", OK, "w1")
+    assert queue.get(ids[1]).status == "running"
+    queue.delete(ids[0])
+    assert queue.get(ids[0]) is None
+
+
+def test_only_queued_jobs_can_be_cancelled(queue):
+    running, queued = queue.submit(payload(0)), queue.submit(payload(1))
+    assert queue.claim("w1", TIMEOUT).id == running
+    assert not queue.cancel(running)
+    assert queue.cancel(queued)
+    assert queue.get(queued) is None and queue.depth() == 0
+    assert not queue.cancel(queued)
+    assert queue.get(running).status == "running"
+
+
+def test_jobs_of_workers_without_a_heartbeat_are_requeued_first(queue):
+    ids = [queue.submit(payload(i)) for i in range(3)]
+    beat(queue, "live")
+    beat(queue, "lost", age=WORKER_TTL + 1)  # missed its heartbeats
+    assert queue.claim("lost", TIMEOUT).id == ids[0]
+    assert queue.claim("live", TIMEOUT).id == ids[1]
+    assert [w.id for w in queue.workers()] == ["live"]
+
+    assert queue.requeue_lost() == [ids[0]]
+    job = queue.get(ids[0])
+    assert (job.status, job.worker_id) == ("queued", None)
+    assert queue.get(ids[1]).status == "running"
+    # Back in its original place, ahead of the job submitted after it
+    assert [queue.claim("live", TIMEOUT).id for _ in range(2)] == [ids[0], ids[2]]
+    assert queue.requeue_lost() == []
+
+    # A worker that stopped for good (no heartbeat at all) loses its jobs too
+    beat(queue, "live")
+    queue.remove_worker("live")
+    assert sorted(queue.requeue_lost()) == sorted(ids)
+
+
+@pytest.fixture
+def dispatcher(queue):
+    dispatcher = Dispatcher(queue)
+    yield dispatcher
+    dispatcher.shutdown()
+
+
+def test_dispatcher_resolves_finished_jobs(dispatcher):
+    future = dispatcher.submit({"event": 0}, 30.0)
+    job = dispatcher.queue.claim("w1", TIMEOUT)
+    assert job.payload == {"request": {"event": 0}, "budget_seconds": 30.0}
+    dispatcher.queue.finish(job.id, OK)
+    assert future.result(TIMEOUT) == OK
+    # The result is collected once: nothing is left on the queue
+    assert dispatcher.queue.get(job.id) is None
+
+
+def test_abandoned_jobs_leave_the_queue(dispatcher):
+    queue = dispatcher.queue
+    running = dispatcher.submit({"event": 0}, None)
+    queued = dispatcher.submit({"event": 1}, None)
+    job = queue.claim("w1", TIMEOUT)
+    assert job.payload["request"] == {"event": 0}
+
+    dispatcher.abandon(queued)
+    assert queued.cancelled()
+    assert queue.depth() == 0
+    # A running job is dropped too, and its worker's result is discarded
+    dispatcher.abandon(running)
+    assert queue.get(job.id) is None
+    queue.finish(job.id, OK)
+    assert queue.get(job.id) is None
+    assert dispatcher._futures == {}
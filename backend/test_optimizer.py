@@ -5,76 +5,23 @@ Reads guests from Excel and runs the optimizer with the new wedding-specific hyp
 """
 
 import sys
-import pandas as pd
 from pathlib import Path
 from typing import List, Dict
 
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from backend.ingest import read_guest_list
 from backend.models import Guest, Table, VenueConfig
 from backend.optimizer import generate_layout_for_weights
 
 
 def read_guests_from_excel(file_path: str) -> List[Guest]:
     """Read guests from Excel file. Expects 'Name' and 'Category' columns."""
-    df = pd.read_excel(file_path)
-    
-    # Find name and category columns (case-insensitive)
-    # Try "Full Guest Name" first, then "Proper Names", then "Name"
-    name_col = None
-    category_col = None
-    
-    # Priority order for name columns
-    name_priority = ['Full Guest Name', 'Proper Names', 'Name', 'שם', 'Guest Name', 'Guest_Name']
-    
-    for col in df.columns:
-        col_str = str(col).strip()
-        col_lower = col_str.lower()
-        
-        # Check name columns in priority order
-        if name_col is None:
-            for priority_name in name_priority:
-                if col_lower == priority_name.lower():
-                    name_col = col
-                    break
-        
-        # Check category columns
-        if category_col is None:
-            if col_lower in ['category', 'קטגוריה', 'group', 'group_id', 'קבוצה']:
-                category_col = col
-    
-    if name_col is None:
-        raise ValueError(f"Could not find name column in Excel file. Available columns: {list(df.columns)}")
-    if category_col is None:
+    guest_list = read_guest_list(file_path)
+    if guest_list.category_column is None:
         print(f"Warning: Could not find 'Category' column. Using 'Uncategorized' for all guests.")
-        category_col = None
-    
-    guests = []
-    for idx, row in df.iterrows():
-        name = str(row[name_col]).strip()
-        if pd.isna(name) or name == '' or name.lower() == 'nan':
-            continue
-        
-        category = None
-        if category_col:
-            cat_val = row[category_col]
-            if not pd.isna(cat_val):
-                category = str(cat_val).strip()
-                if category.lower() == 'nan' or category == '':
-                    category = None
-        
-        guest_id = f"guest-{idx + 1}-{name.lower().replace(' ', '-')}"
-        guest = Guest(
-            id=guest_id,
-            name=name,
-            group_id=category,
-            importance=0,
-            tags=[],
-        )
-        guests.append(guest)
-    
-    return guests
+    return guest_list.to_guests()
 
 
 def create_default_tables(guest_count: int, seats_per_table: int = 10) -> List[Table]:
@@ -138,7 +85,8 @@ def main():
     if len(sys.argv) < 2:
         print("Usage: python test_optimizer.py <path_to_excel_file>")
         print("\nExample:")
-        print('  python test_optimizer.py "/Users/shahafwieder/Library/CloudStorage/OneDrive-Technion/לימודים/שנה 4/סמסטר ז/Ofek Bernstein\'s files - מערכות נבונות אינטראקטיביות/Prototype/example.xlsx"')
+        print('  python test_optimizer.py guests.xlsx')
+        print('\nFor synthetic instances see: python -m backend.benchmarks.bench_optimizer')
         sys.exit(1)
     
     excel_path = sys.argv[1]
@@ -0,0 +1,91 @@
+"""
+Tests for table eligibility in interactive repair and what-if scoring.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.models import Guest, Table, VenueConfig
+from backend.repair import RepairError, repair_layout
+from backend.whatif import build_what_if
+
+WEIGHTS = {"family_cohesion": 1.0, "social_group_cohesion": 0.5, "side_mixing": 0.2, "relationship_priority": 0.5}
+
+
+def make_event():
+    """
+    Kids k0..k2 and adults a0..a5 at three tables of four seats: t0 is the
+    kids' table and a0 is pinned to t2 by the venue.
+    """
+    guests = [Guest(id=f"k{i}", name=f"Kid {i}", group_id="Bride's Family", tags=["kid"]) for i in range(3)]
+    guests += [Guest(id=f"a{i}", name=f"Adult {i}", group_id="Groom's Family") for i in range(6)]
+    venue = VenueConfig(
+        tables=[
+            Table(id="t0", name="Kids", capacity=4, constraints={"reserved_for": ["kid"]}),
+            Table(id="t1", name="Table 1", capacity=4),
+            Table(id="t2", name="Table 2", capacity=4, constraints={"pinned": ["a0"]}),
+        ]
+    )
+    assignments = {"k0": "t0", "k1": "t0", "k2": "t1", "a0": "t2", "a1": "t1", "a2": "t1", "a3": "t2", "a4": "t2", "a5": "t1"}
+    return guests, venue, assignments
+
+
+def eligible(assignments) -> bool:
+    return all(g.startswith("k") for g, t in assignments.items() if t == "t0")
+
+
+def test_repair_rejects_pin_to_ineligible_table():
+    guests, venue, assignments = make_event()
+    with pytest.raises(RepairError, match="Guest a1 may not sit at table t0"):
+        repair_layout(guests, venue, WEIGHTS, assignments, pinned={"a1": "t0"})
+
+
+def test_repair_keeps_guests_at_eligible_tables():
+    guests, venue, assignments = make_event()
+    # k2 joins the full table t2; someone has to leave, and adults may not go to t0
+    result = repair_layout(guests, venue, WEIGHTS, assignments, pinned={"k2": "t2"}, budget_ms=1000)
+    seated = result.layout.assignments
+    assert seated["k2"] == "t2"
+    assert seated["a0"] == "t2"
+    assert eligible(seated)
+    for t in ("t0", "t1", "t2"):
+        assert sum(v == t for v in seated.values()) <= 4
+
+
+def test_repair_restores_venue_pins_and_moves_ineligible_guests():
+    guests, venue, assignments = make_event()
+    # The edited layout moved the venue-pinned a0 and seated an adult at the kids' table
+    assignments.update(a0="t1", a5="t0", a2="t2")
+    result = repair_layout(guests, venue, WEIGHTS, assignments, pinned={}, budget_ms=1000)
+    seated = result.layout.assignments
+    assert seated["a0"] == "t2"
+    assert eligible(seated)
+
+
+def test_what_if_marks_ineligible_moves_and_swaps():
+    guests, venue, assignments = make_event()
+    what_if = build_what_if(guests, venue, WEIGHTS, assignments)
+    ctx = what_if.ctx
+    a1, k0, k2, t0 = ctx.guest_index["a1"], ctx.guest_index["k0"], ctx.guest_index["k2"], ctx.table_index["t0"]
+
+    moves = what_if.moves(np.array([a1, k2]), np.array([t0, t0]))
+    assert moves.reason.tolist() == ["ineligible", ""]
+    # a1 would take k0's seat at the kids' table; k2 and k0 are both kids
+    swaps = what_if.swaps(np.array([a1, k2]), np.array([k0, k0]))
+    assert swaps.reason.tolist() == ["ineligible", ""]
+
+    ranked = what_if.rank(what_if.neighborhood(table=t0), limit=100)
+    for row in ranked:
+        after = dict(assignments)
+        if row["kind"] == "move":
+            after[row["guest_id"]] = row["table_id"]
+        else:
+            g, h = row["guest_id"], row["other_guest_id"]
+            after[g], after[h] = assignments[h], assignments[g]
+        assert eligible(after)
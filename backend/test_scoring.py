@@ -0,0 +1,102 @@
+"""
+Tests for the vectorized move/swap deltas against full re-scoring of the layout.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.affinity import affinity_weight
+from backend.models import Affinity, Guest, Table, VenueConfig
+from backend.scoring import (
+    PairTables,
+    build_context,
+    move_deltas,
+    pair_values,
+    priority_weight,
+    swap_deltas,
+    weighted_score,
+)
+
+GROUPS = ["Groom's Family", "Bride's Family", "Groom's Friends", "Bride's Work Colleagues", "Mutual Friends", None]
+WEIGHTS = {
+    "family_cohesion": 1.0,
+    "social_group_cohesion": 0.7,
+    "side_mixing": -0.3,
+    "relationship_priority": 0.5,
+    "affinity": 0.8,
+}
+
+
+def make_instance(seed: int, with_pairs: bool):
+    """14 guests at 4 tables of 5 seats, seated at random; explicit pairs only between different tables."""
+    rng = np.random.default_rng(seed)
+    guests = [Guest(id=f"g{i}", name=f"Guest {i}", group_id=GROUPS[i % len(GROUPS)]) for i in range(14)]
+    table_of = rng.permutation(np.repeat(np.arange(4), 5))[:14]
+    affinity = None
+    if with_pairs:
+        pairs = [(i, j) for i in range(14) for j in range(i + 1, 14)]
+        rng.shuffle(pairs)
+        rewards = [(f"g{i}", f"g{j}", float(rng.uniform(0.5, 3.0))) for i, j in pairs[:12]]
+        conflicts = [(f"g{i}", f"g{j}") for i, j in pairs[12:30] if table_of[i] != table_of[j]][:5]
+        affinity = Affinity(rewards=rewards, conflicts=conflicts)
+    venue = VenueConfig(tables=[Table(id=f"t{t}", name=f"Table {t}", capacity=5) for t in range(4)], affinity=affinity)
+    return build_context(guests, venue), table_of
+
+
+def full_score(ctx, table_of) -> float:
+    return weighted_score(ctx.terms_from_counts(ctx.counts(table_of), table_of), WEIGHTS)
+
+
+def conflicted(ctx, table_of) -> bool:
+    if not ctx.conflict_indices.size:
+        return False
+    rows = np.repeat(np.arange(ctx.n_guests), np.diff(ctx.conflict_indptr))
+    return bool(np.any(table_of[rows] == table_of[ctx.conflict_indices]))
+
+
+@pytest.mark.parametrize("with_pairs", [False, True])
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_move_and_swap_deltas_match_rescoring(seed, with_pairs):
+    ctx, table_of = make_instance(seed, with_pairs)
+    P = pair_values(ctx, WEIGHTS)
+    M = ctx.counts(table_of) @ P
+    pair_tables = PairTables(ctx, table_of) if ctx.has_pairs else None
+    w_priority, w_affinity = priority_weight(WEIGHTS), affinity_weight(WEIGHTS)
+    base = full_score(ctx, table_of)
+    assert with_pairs == ctx.has_pairs
+
+    for g in range(ctx.n_guests):
+        moves = move_deltas(ctx, M, P, w_priority, table_of, g, pair_tables, w_affinity)
+        for t in range(ctx.n_tables):
+            after = table_of.copy()
+            after[g] = t
+            if conflicted(ctx, after):
+                assert moves[t] == -np.inf
+            else:
+                assert moves[t] == pytest.approx(full_score(ctx, after) - base, abs=1e-9)
+
+        swaps = swap_deltas(ctx, M, P, w_priority, table_of, g, pair_tables, w_affinity)
+        for h in range(ctx.n_guests):
+            after = table_of.copy()
+            after[g], after[h] = table_of[h], table_of[g]
+            if conflicted(ctx, after):
+                assert swaps[h] == -np.inf
+            else:
+                assert swaps[h] == pytest.approx(full_score(ctx, after) - base, abs=1e-9)
+
+
+def test_pair_tables_follow_moves():
+    ctx, table_of = make_instance(3, with_pairs=True)
+    pair_tables = PairTables(ctx, table_of)
+    for g, t in [(0, 2), (5, 0), (0, 1), (9, 3)]:
+        pair_tables.place(g, table_of[g], t)
+        table_of[g] = t
+    fresh = PairTables(ctx, table_of)
+    np.testing.assert_allclose(pair_tables.AT, fresh.AT)
+    np.testing.assert_array_equal(pair_tables.CT, fresh.CT)
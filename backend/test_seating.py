@@ -0,0 +1,87 @@
+"""
+Tests for seat-level assignment: the exact orders match a brute force over
+all permutations, larger tables get a valid order, and couples sit side by side.
+"""
+
+import itertools
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.models import Guest, Table, VenueConfig
+from backend.seating import EXACT_MAX_GUESTS, order_table, seat_numbers, seat_tables, seating_stats
+
+GROUPS = ["Groom's Family", "Bride's Family", "Groom's Friends", "Bride's Friends", "Mutual Friends"]
+
+
+def random_values(n: int, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    values = rng.uniform(-1, 1, (n, n))
+    values = values + values.T
+    np.fill_diagonal(values, 0.0)
+    return values
+
+
+def adjacency_values(values: np.ndarray, orders: np.ndarray, closed: bool) -> np.ndarray:
+    """Value of each order (one per row): its adjacent pairs, plus last-first when `closed`."""
+    total = values[orders[:, :-1], orders[:, 1:]].sum(axis=1)
+    return total + values[orders[:, -1], orders[:, 0]] if closed else total
+
+
+@pytest.mark.parametrize("closed", [True, False])
+@pytest.mark.parametrize("n", range(3, 9))
+def test_exact_orders_match_brute_force(n, closed):
+    for seed in range(3):
+        values = random_values(n, seed)
+        order, value, method = order_table(values, closed)
+        assert method == "exact"
+        assert sorted(order) == list(range(n))
+        best = adjacency_values(values, np.array(list(itertools.permutations(range(n)))), closed).max()
+        assert value == pytest.approx(best)
+        assert adjacency_values(values, np.array([order]), closed)[0] == pytest.approx(value)
+
+
+@pytest.mark.parametrize("closed", [True, False])
+def test_large_tables_get_a_valid_local_search_order(closed):
+    n = EXACT_MAX_GUESTS + 2
+    values = random_values(n, 0)
+    order, value, method = order_table(values, closed)
+    assert method == "local_search"
+    assert sorted(order) == list(range(n))
+    assert adjacency_values(values, np.array([order]), closed)[0] == pytest.approx(value)
+
+
+def test_tables_of_one_or_two_are_trivial():
+    assert order_table(np.zeros((1, 1)), closed=False) == ([0], 0.0, "trivial")
+    assert order_table(np.array([[0.0, 2.0], [2.0, 0.0]]), closed=True) == ([0, 1], 2.0, "trivial")
+
+
+def test_couples_sit_side_by_side():
+    # Six couples, each split across categories and sides, so only the household keeps them together
+    guests = [
+        Guest(id=f"g{2 * c + k}", name=f"Guest {2 * c + k}", group_id=GROUPS[(c + 2 * k) % len(GROUPS)], household_id=f"h{c}")
+        for c in range(6)
+        for k in range(2)
+    ]
+    # A single guest too, without a household
+    guests.append(Guest(id="g12", name="Guest 12", group_id="Groom's Family"))
+    venue = VenueConfig(tables=[Table(id=f"t{t}", name=f"Table {t}", capacity=8) for t in range(2)])
+    # A full table (a cycle) and one with empty seats (a path)
+    assignments = {g.id: "t0" if i < 8 else "t1" for i, g in enumerate(guests)}
+    weights = {"family_cohesion": 1.0, "social_group_cohesion": 1.0, "side_mixing": -1.0}
+
+    seatings = seat_tables(guests, venue, assignments, weights)
+    assert [(s.table_id, len(s.order), s.method) for s in seatings] == [("t0", 8, "exact"), ("t1", 5, "exact")]
+    stats = seating_stats(guests, seatings)
+    assert stats["couples"] == 6 and stats["couples_adjacent"] == 6
+
+    seats = seat_numbers(seatings)
+    assert sorted(seats) == sorted(g.id for g in guests)
+    for c in range(6):
+        a, b = seats[f"g{2 * c}"], seats[f"g{2 * c + 1}"]
+        assert (a - b) % 8 in (1, 7)
@@ -0,0 +1,168 @@
+"""
+Tests for the in-memory session store: content reuse, TTL expiry,
+least-recently-used eviction over the memory cap, and the layout caches
+shared by concurrent searches.
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend import isolation
+from backend.models import ConstraintSummary, Guest, Layout, Table, VenueConfig
+from backend.seat_harmony_task import SeatHarmonyTask
+from backend.sessions import BYTES_PER_INPUT_BYTE, BYTES_PER_LAYOUT_GUEST, LayoutCache, SessionStore
+
+INPUT_BYTES = 100
+SESSION_BYTES = INPUT_BYTES * BYTES_PER_INPUT_BYTE
+
+
+def instance(name: str):
+    guests = [Guest(id=f"{name}-{i}", name=f"Guest {i}") for i in range(4)]
+    return guests, VenueConfig(tables=[Table(id="t0", name="Table 0", capacity=4)])
+
+
+def create(store: SessionStore, name: str):
+    session, _ = store.create(*instance(name), input_bytes=INPUT_BYTES)
+    return session
+
+
+def test_same_content_reuses_the_session():
+    store = SessionStore(ttl_seconds=60, max_bytes=10**6)
+    first, created = store.create(*instance("a"), input_bytes=INPUT_BYTES)
+    again, created_again = store.create(*instance("a"), input_bytes=INPUT_BYTES)
+    assert created and not created_again
+    assert again is first
+    assert store.get(first.id) is first
+
+
+def test_idle_sessions_expire():
+    store = SessionStore(ttl_seconds=60, max_bytes=10**6)
+    idle, active = create(store, "idle"), create(store, "active")
+    idle.last_used -= 61
+    active.last_used -= 59
+    with pytest.raises(KeyError):
+        store.get(idle.id)
+    assert store.get(active.id) is active
+    # The expired content can be uploaded again as a new session
+    fresh, created = store.create(*instance("idle"), input_bytes=INPUT_BYTES)
+    assert created and fresh.id != idle.id
+
+
+def test_least_recently_used_sessions_go_first_over_the_cap():
+    store = SessionStore(ttl_seconds=60, max_bytes=2 * SESSION_BYTES)
+    a, b = create(store, "a"), create(store, "b")
+    store.get(a.id)  # b is now the least recently used
+    c = create(store, "c")
+    with pytest.raises(KeyError):
+        store.get(b.id)
+    assert store.get(a.id) is a and store.get(c.id) is c
+
+
+def test_cached_layouts_count_towards_the_cap():
+    store = SessionStore(ttl_seconds=60, max_bytes=2 * SESSION_BYTES + BYTES_PER_LAYOUT_GUEST * 4)
+    a, b = create(store, "a"), create(store, "b")
+    cache = b.layout_cache("milp")
+    for i in range(2):
+        cache[(("family_cohesion", float(i)),)] = Layout(id=f"l{i}", assignments={}, score=0.0)
+    assert b.approx_bytes() == SESSION_BYTES + 2 * 4 * BYTES_PER_LAYOUT_GUEST
+    # Over the cap now: the next access drops the least recently used session, a
+    store.get(b.id)
+    with pytest.raises(KeyError):
+        store.get(a.id)
+    assert b.info()["cached_layouts"] == {"milp": 2}
+
+
+def test_newest_session_is_kept_even_over_the_cap():
+    store = SessionStore(ttl_seconds=60, max_bytes=SESSION_BYTES // 2)
+    a = create(store, "a")
+    assert store.get(a.id) is a
+    b = create(store, "b")
+    with pytest.raises(KeyError):
+        store.get(a.id)
+    assert store.get(b.id) is b
+
+
+def test_delete():
+    store = SessionStore(ttl_seconds=60, max_bytes=10**6)
+    a = create(store, "a")
+    store.delete(a.id)
+    with pytest.raises(KeyError):
+        store.get(a.id)
+    assert store.create(*instance("a"), input_bytes=INPUT_BYTES)[1]
+
+
+def test_layout_caches_are_safe_to_share_across_threads():
+    store = SessionStore(ttl_seconds=60, max_bytes=10**9)
+    session = create(store, "a")
+    layout = Layout(id="l", assignments={}, score=0.0)
+    errors = []
+    done = threading.Event()
+
+    def solve(engine):
+        # A ToT search storing layouts while other searches read the cache
+        try:
+            cache = session.layout_cache(engine)
+            for i in range(20000):
+                cache[(("family_cohesion", float(i)),)] = layout
+                session.layout_cache(f"{engine}-{i % 50}")
+        except Exception as e:
+            errors.append(e)
+        finally:
+            done.set()
+
+    def read():
+        try:
+            while not done.is_set():
+                session.info()
+                for cache in session.layout_caches().values():
+                    assert all(v is layout for v in cache.values())
+                store.get(session.id)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=solve, args=("milp",)), threading.Thread(target=read), threading.Thread(target=read)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(60)
+    assert errors == []
+    assert len(session.layout_cache("milp")) == 20000
+
+
+@pytest.mark.parametrize(
+    "layout_id, stats, deadline, stored",
+    [
+        ("opt", {"solver": {"status": "optimal"}}, None, True),
+        ("heuristic", {}, None, True),
+        ("dummy", {}, None, False),
+        ("heuristic", {"degraded": "worker lost"}, None, False),
+        ("opt", {"solver": {"status": "time_limit"}}, 60.0, False),
+        ("heuristic", {}, 60.0, False),
+        ("opt", {"solver": {"status": "optimal"}}, 60.0, True),
+    ],
+)
+def test_session_caches_keep_only_reusable_layouts(monkeypatch, layout_id, stats, deadline, stored):
+    def solve(engine, guests, venue, weights, time_limit=None):
+        layout = Layout(id=layout_id, assignments={g.id: "t0" for g in guests}, score=1.0, stats=dict(stats))
+        return layout, ConstraintSummary()
+
+    monkeypatch.setattr(isolation, "solve", solve)
+    guests, venue = instance("a")
+    payload = {"guests": [vars(g) for g in guests], "tables": [vars(t) for t in venue.tables]}
+    deadline = None if deadline is None else time.monotonic() + deadline
+
+    shared = LayoutCache()
+    task = SeatHarmonyTask(layout_cache=shared, deadline=deadline)
+    task.apply_thought(task.get_initial_state(payload), "balance_all")
+    assert len(shared) == int(stored)
+    # A search's own cache keeps everything: it ends with the request
+    task = SeatHarmonyTask(deadline=deadline)
+    task.apply_thought(task.get_initial_state(payload), "balance_all")
+    assert len(task.layout_cache) == 1
@@ -0,0 +1,151 @@
+"""
+Tests for single-flight coalescing: concurrent callers share one computation,
+its result or its exception, and nothing is kept once it finishes.
+"""
+
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.metrics import COALESCED_REQUESTS
+from backend.singleflight import SingleFlight, request_key
+
+FOLLOWERS = 3
+
+
+def wait_for_followers(flight: SingleFlight, count: int) -> None:
+    """Block until `count` callers have joined the running computation."""
+    deadline = time.monotonic() + 10
+    while COALESCED_REQUESTS.value(endpoint=flight.name) < count:
+        assert time.monotonic() < deadline, "followers did not join"
+        time.sleep(0.01)
+
+
+def call_concurrently(flight: SingleFlight, fn) -> list:
+    """One leader running `fn` and FOLLOWERS callers with the same key; (result or exception) per caller."""
+    outcomes = [None] * (FOLLOWERS + 1)
+
+    def call(i):
+        try:
+            outcomes[i] = flight.do("key", fn)
+        except Exception as e:
+            outcomes[i] = e
+
+    leader = threading.Thread(target=call, args=(0,))
+    leader.start()
+    while "key" not in flight._calls:
+        time.sleep(0.001)
+    followers = [threading.Thread(target=call, args=(i,)) for i in range(1, FOLLOWERS + 1)]
+    for thread in followers:
+        thread.start()
+    for thread in [leader] + followers:
+        thread.join(10)
+    return outcomes
+
+
+def test_concurrent_callers_share_the_result():
+    flight = SingleFlight("test-result")
+    runs = []
+
+    def compute():
+        runs.append(1)
+        wait_for_followers(flight, FOLLOWERS)
+        return {"layouts": 3}
+
+    outcomes = call_concurrently(flight, compute)
+    assert len(runs) == 1
+    assert outcomes == [{"layouts": 3}] * (FOLLOWERS + 1)
+    assert all(o is outcomes[0] for o in outcomes)
+
+
+def test_concurrent_callers_share_the_exception():
+    flight = SingleFlight("test-exception")
+    runs = []
+
+    def compute():
+        runs.append(1)
+        wait_for_followers(flight, FOLLOWERS)
+        raise ValueError("infeasible instance")
+
+    outcomes = call_concurrently(flight, compute)
+    assert len(runs) == 1
+    assert all(isinstance(o, ValueError) and str(o) == "infeasible instance" for o in outcomes)
+    # Nothing is cached: the next call runs again
+    assert flight.do("key", lambda: "again") == "again"
+    assert flight._calls == {}
+
+
+def test_async_callers_share_the_exception():
+    flight = SingleFlight("test-async")
+    runs = []
+
+    async def compute():
+        runs.append(1)
+        while COALESCED_REQUESTS.value(endpoint=flight.name) < FOLLOWERS:
+            await asyncio.sleep(0.001)
+        raise ValueError("infeasible instance")
+
+    async def main():
+        return await asyncio.gather(*(flight.do_async("key", compute) for _ in range(FOLLOWERS + 1)), return_exceptions=True)
+
+    outcomes = asyncio.run(main())
+    assert len(runs) == 1
+    assert all(isinstance(o, ValueError) and str(o) == "infeasible instance" for o in outcomes)
+    assert flight._calls == {}
+
+
+def test_request_key_is_canonical():
+    assert request_key({"a": 1, "b": [1, 2]}) == request_key({"b": [1, 2], "a": 1})
+    assert request_key({"a": 1}) != request_key({"a": 2})
+
+
+def test_sequential_calls_are_not_coalesced():
+    flight = SingleFlight("test-sequential")
+    assert [flight.do("key", lambda i=i: i) for i in range(3)] == [0, 1, 2]
+    assert COALESCED_REQUESTS.value(endpoint=flight.name) == 0
+
+
+def test_distinct_keys_run_independently():
+    flight = SingleFlight("test-keys")
+    # A computation may itself use the flight under another key without waiting on itself
+    assert flight.do("outer", lambda: flight.do("inner", lambda: "done")) == "done"
+
+
+def run_with_cancelled_caller(cancelled: int) -> list:
+    """Leader and FOLLOWERS async callers of one computation; caller `cancelled` (0: the leader) is cancelled mid-way."""
+    flight = SingleFlight(f"test-cancel-{cancelled}")
+    runs = []
+
+    async def compute():
+        runs.append(1)
+        await asyncio.sleep(0.05)
+        return "layouts"
+
+    async def main():
+        tasks = [asyncio.ensure_future(flight.do_async("key", compute)) for _ in range(FOLLOWERS + 1)]
+        while COALESCED_REQUESTS.value(endpoint=flight.name) < FOLLOWERS:
+            await asyncio.sleep(0.001)
+        tasks[cancelled].cancel()
+        return await asyncio.gather(*tasks, return_exceptions=True)
+
+    outcomes = asyncio.run(main())
+    assert len(runs) == 1
+    assert flight._calls == {}
+    return outcomes
+
+
+def test_cancelled_follower_leaves_the_others_alone():
+    outcomes = run_with_cancelled_caller(2)
+    assert isinstance(outcomes[2], asyncio.CancelledError)
+    assert outcomes[:2] + outcomes[3:] == ["layouts"] * FOLLOWERS
+
+
+def test_cancelled_leader_does_not_cancel_its_followers():
+    outcomes = run_with_cancelled_caller(0)
+    assert isinstance(outcomes[0], asyncio.CancelledError)
+    assert outcomes[1:] == ["layouts"] * FOLLOWERS
@@ -0,0 +1,123 @@
+"""
+Tests for the solver pool: strict priority order, per-tenant round-robin and
+the Retry-After estimate of rejected work.
+"""
+
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.solver_pool import BATCH, GENERATE, INITIAL_RUN_SECONDS, INTERACTIVE, QueueFull, SolverPool
+
+
+@pytest.fixture
+def pool():
+    pool = SolverPool(slots=1, queue_size=8, tenant_queue_size=8)
+    yield pool
+    pool.shutdown()
+
+
+def occupy(pool: SolverPool) -> threading.Event:
+    """Keep one of the pool's slots busy until the returned event is set."""
+    started, release = threading.Event(), threading.Event()
+
+    def block():
+        started.set()
+        release.wait(10)
+
+    pool.submit(BATCH, "blocker", block)
+    assert started.wait(10)
+    return release
+
+
+def run_order(pool: SolverPool, tasks) -> list:
+    """Queue (priority, tenant, label) tasks behind a busy slot and return the labels in execution order."""
+    release = occupy(pool)
+    order = []
+    futures = [pool.submit(priority, tenant, lambda label=label: order.append(label)) for priority, tenant, label in tasks]
+    release.set()
+    for future in futures:
+        future.result(10)
+    return order
+
+
+def test_priority_classes_are_served_strictly_in_order(pool):
+    order = run_order(
+        pool,
+        [
+            (BATCH, "a", "batch-1"),
+            (GENERATE, "a", "generate-1"),
+            (BATCH, "b", "batch-2"),
+            (INTERACTIVE, "c", "interactive-1"),
+            (GENERATE, "b", "generate-2"),
+            (INTERACTIVE, "a", "interactive-2"),
+        ],
+    )
+    assert order == ["interactive-1", "interactive-2", "generate-1", "generate-2", "batch-1", "batch-2"]
+
+
+def test_tenants_are_served_round_robin_within_a_class(pool):
+    # Tenant a's burst arrives first; b and c still get every other slot
+    order = run_order(
+        pool,
+        [(GENERATE, tenant, label) for tenant, label in [("a", "a1"), ("a", "a2"), ("a", "a3"), ("b", "b1"), ("c", "c1"), ("b", "b2")]],
+    )
+    assert order == ["a1", "b1", "c1", "a2", "b2", "a3"]
+
+
+def test_failures_reach_the_caller(pool):
+    def fail():
+        raise RuntimeError("solver crashed")
+
+    with pytest.raises(RuntimeError, match="solver crashed"):
+        pool.submit(INTERACTIVE, "a", fail).result(10)
+
+
+def test_unknown_priority_is_rejected(pool):
+    with pytest.raises(ValueError, match="Unknown priority"):
+        pool.submit("urgent", "a", lambda: None)
+
+
+def test_queue_full_retry_after_counts_work_ahead():
+    pool = SolverPool(slots=1, queue_size=2, tenant_queue_size=1)
+    release = occupy(pool)
+    try:
+        pool.submit(GENERATE, "a", lambda: None)
+        # The tenant's share is full: one queued generate task ahead, plus this one
+        with pytest.raises(QueueFull) as tenant_full:
+            pool.submit(GENERATE, "a", lambda: None)
+        assert tenant_full.value.priority == GENERATE
+        assert tenant_full.value.retry_after == 2 * INITIAL_RUN_SECONDS
+
+        pool.submit(GENERATE, "b", lambda: None)
+        pool.submit(INTERACTIVE, "c", lambda: None)
+        # The class is full: one interactive and two generate tasks ahead
+        with pytest.raises(QueueFull) as class_full:
+            pool.submit(GENERATE, "c", lambda: None)
+        assert class_full.value.retry_after == 4 * INITIAL_RUN_SECONDS
+        assert "retry in 20s" in str(class_full.value)
+        # Batch work is never full because of other classes, but waits for all of them
+        pool.submit(BATCH, "c", lambda: None)
+        assert pool.depth() == 4
+    finally:
+        release.set()
+        pool.shutdown()
+
+
+def test_retry_after_is_shared_by_the_slots():
+    pool = SolverPool(slots=4, queue_size=1, tenant_queue_size=1)
+    releases = [occupy(pool) for _ in range(4)]
+    try:
+        pool.submit(INTERACTIVE, "a", lambda: None)
+        with pytest.raises(QueueFull) as full:
+            pool.submit(INTERACTIVE, "b", lambda: None)
+        assert full.value.retry_after == 3  # ceil(2 tasks * 5 s / 4 slots)
+    finally:
+        for release in releases:
+            release.set()
+        pool.shutdown()
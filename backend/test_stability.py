@@ -0,0 +1,140 @@
+"""
+Tests for weight-space stability: a stored layout reused at new weights is
+never beaten by a re-solve there by more than the tolerance, and the coverage
+sampler agrees with `covering`.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.models import Guest, Layout, Table, VenueConfig
+from backend.scoring import TERMS, build_context, weighted_score
+from backend.stability import COVERAGE_SAMPLES, StabilityIndex, record_terms, term_upper_bounds, term_weights
+
+GROUPS = ["Groom's Family", "Bride's Family", "Groom's Friends", "Bride's Friends", "Mutual Friends"]
+BASE_WEIGHTS = {"family_cohesion": 1.0, "social_group_cohesion": 0.5, "side_mixing": 0.3, "relationship_priority": 0.2}
+TOLERANCE = 1e-3
+
+
+def tiny_instance():
+    """10 guests at three tables of four seats (small enough for a size-limited Gurobi license)."""
+    guests = [Guest(id=f"g{i}", name=f"Guest {i}", group_id=GROUPS[i % len(GROUPS)]) for i in range(10)]
+    venue = VenueConfig(tables=[Table(id=f"t{t}", name=f"Table {t}", capacity=4) for t in range(3)])
+    return guests, venue
+
+
+def perturbed(weights, rng, spread: float = 0.5):
+    return {k: v * float(rng.uniform(1 - spread, 1 + spread)) for k, v in weights.items()}
+
+
+def solve(guests, venue, weights, ctx) -> Layout:
+    from backend.engines import get_engine
+
+    layout, _ = get_engine("milp")(guests, venue, weights)
+    assert layout.id != "dummy"
+    record_terms(layout, ctx, weights)
+    return layout
+
+
+def random_layout(ctx, rng) -> Layout:
+    seats = rng.permutation(np.repeat(np.arange(ctx.n_tables), ctx.capacity))[: ctx.n_guests]
+    layout = Layout(id="random", assignments={g: ctx.table_ids[t] for g, t in zip(ctx.guest_ids, seats)}, score=0.0)
+    layout.stats["terms"] = ctx.terms(layout.assignments)
+    return layout
+
+
+def test_term_upper_bounds_hold_for_any_layout():
+    guests, venue = tiny_instance()
+    ctx = build_context(guests, venue)
+    bounds = term_upper_bounds(ctx)
+    rng = np.random.default_rng(0)
+    for _ in range(200):
+        terms = random_layout(ctx, rng).stats["terms"]
+        assert np.all(np.array([terms[k] for k in TERMS]) <= bounds + 1e-9)
+
+
+def test_covering_is_never_beaten_by_more_than_the_tolerance():
+    pytest.importorskip("gurobipy")
+    guests, venue = tiny_instance()
+    ctx = build_context(guests, venue)
+    index = StabilityIndex(ctx, tolerance=TOLERANCE)
+    rng = np.random.default_rng(0)
+    stored = [solve(guests, venue, w, ctx) for w in [BASE_WEIGHTS] + [perturbed(BASE_WEIGHTS, rng) for _ in range(3)]]
+
+    # Every solved layout covers its own weights, and any positive multiple of them
+    for layout in stored:
+        hit = index.covering(layout.stats["weights"], stored)
+        assert hit is not None and hit[1] == pytest.approx(layout.score, rel=TOLERANCE)
+        assert index.covering({k: 3 * v for k, v in layout.stats["weights"].items()}, stored) is not None
+
+    hits = 0
+    for spread in (0.05, 0.2, 0.5):
+        for _ in range(4):
+            weights = perturbed(BASE_WEIGHTS, rng, spread)
+            hit = index.covering(weights, stored)
+            if hit is None:
+                continue
+            hits += 1
+            layout, score = hit
+            assert score == pytest.approx(weighted_score(layout.stats["terms"], weights))
+            best = solve(guests, venue, weights, ctx).score
+            assert best <= score + TOLERANCE * abs(score) + 1e-6
+    assert hits > 0
+
+
+def test_layouts_without_a_proof_bound_rely_on_term_bounds_only():
+    guests, venue = tiny_instance()
+    ctx = build_context(guests, venue)
+    index = StabilityIndex(ctx, tolerance=TOLERANCE)
+    layout = random_layout(ctx, np.random.default_rng(1))
+    assert "bound" not in layout.stats
+    # A random layout is far from the per-term bounds at mixed weights ...
+    assert index.covering(BASE_WEIGHTS, [layout]) is None
+    # ... and disabling reuse never covers anything
+    assert StabilityIndex(ctx, tolerance=0.0).covering(BASE_WEIGHTS, [layout]) is None
+
+
+def test_upper_bounds_are_tightest_at_the_solved_weights():
+    guests, venue = tiny_instance()
+    ctx = build_context(guests, venue)
+    index = StabilityIndex(ctx)
+    w = term_weights(BASE_WEIGHTS)
+    per_term = float(np.clip(w, 0, None) @ index.term_bounds)
+    # With a solved point (weights, bound), the bound at those weights (and multiples) is the solver's
+    bounds = index.upper_bounds(np.vstack([w, 2 * w]), [(BASE_WEIGHTS, 0.5 * per_term)])
+    np.testing.assert_allclose(bounds, [0.5 * per_term, per_term])
+    # Without one, only the per-term bounds apply
+    np.testing.assert_allclose(index.upper_bounds(w[None, :], []), [per_term])
+
+
+def test_coverage_samples_the_simplex_of_active_terms():
+    pytest.importorskip("gurobipy")
+    guests, venue = tiny_instance()
+    ctx = build_context(guests, venue)
+    index = StabilityIndex(ctx, tolerance=TOLERANCE)
+    directions = index._sample_directions()
+    assert directions is index._sample_directions()
+    assert directions.shape == (COVERAGE_SAMPLES, len(TERMS))
+    assert np.all(directions >= 0)
+    np.testing.assert_allclose(directions.sum(axis=1), 1.0)
+    # No affinity in this instance: its term can never be non-zero and is not sampled
+    inactive = index.term_bounds == 0
+    assert inactive.tolist() == [k == "affinity" for k in TERMS]
+    assert np.all(directions[:, inactive] == 0)
+    # Deterministic: another index over the same instance samples the same directions
+    np.testing.assert_array_equal(directions, StabilityIndex(ctx)._sample_directions())
+
+    layout = solve(guests, venue, BASE_WEIGHTS, ctx)
+    coverage = index.coverage(layout, [layout])
+    # The share of sampled directions at which `covering` would reuse the layout
+    covered = [index.covering(dict(zip(TERMS, d)), [layout]) is not None for d in directions]
+    assert coverage == pytest.approx(np.mean(covered))
+    assert 0 < coverage < 1
+    assert index.coverage(random_layout(ctx, np.random.default_rng(2)), [layout]) < coverage
+    assert index.coverage(Layout(id="unscored", assignments={}, score=0.0), [layout]) == 0.0
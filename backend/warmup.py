@@ -0,0 +1,79 @@
+"""
+Background warm-up of heavy dependencies.
+
+`backend.api` imports only light modules so the server starts accepting
+connections quickly; the solver stack (gurobipy, numpy), the guest-list reader
+(pandas) and the LLM client (`tot.models`) are imported on first use. At
+startup `start_warmup()` loads them in a background thread, and
+`GET /api/ready` reports ready once every required component is loaded, so a
+load balancer only routes traffic to warm instances.
+"""
+
+import importlib
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .metrics import WARMUP_SECONDS
+
+# component -> modules to import (relative to this package unless absolute)
+COMPONENTS: Dict[str, List[str]] = {
+    "solver": [".optimizer", ".engines", ".scoring", ".heuristic", ".aggregate"],
+    "ingest": [".ingest"],
+    "llm": ["tot.models"],
+}
+# Components the service cannot serve layouts without; "llm" only affects explanations
+REQUIRED = ("solver", "ingest")
+
+_state: Dict[str, str] = {name: "pending" for name in COMPONENTS}
+_lock = threading.Lock()
+_thread: Optional[threading.Thread] = None
+
+
+def _check_solver_license() -> None:
+    """Create (and drop) an empty model so the Gurobi license check happens now, not on the first request."""
+    from .optimizer import _gurobi
+
+    gp, _ = _gurobi()
+    gp.Model("warmup").dispose()
+
+
+# Extra checks run after a component's modules are imported
+_CHECKS: Dict[str, Callable[[], None]] = {"solver": _check_solver_license}
+
+
+def _load(name: str) -> None:
+    start = time.perf_counter()
+    try:
+        for module in COMPONENTS[name]:
+            importlib.import_module(module, __package__)
+        if name in _CHECKS:
+            _CHECKS[name]()
+        status = "ready"
+    except Exception as e:
+        status = f"error: {type(e).__name__}: {e}"
+    WARMUP_SECONDS.set(time.perf_counter() - start, component=name)
+    with _lock:
+        _state[name] = status
+
+
+def _run() -> None:
+    for name in COMPONENTS:
+        _load(name)
+
+
+def start_warmup() -> None:
+    """Start loading all components in a daemon thread (idempotent)."""
+    global _thread
+    with _lock:
+        if _thread is not None:
+            return
+        _thread = threading.Thread(target=_run, name="seatharmony-warmup", daemon=True)
+    _thread.start()
+
+
+def readiness() -> Tuple[bool, Dict[str, str]]:
+    """(ready, component states). Ready once all REQUIRED components loaded without error."""
+    with _lock:
+        state = dict(_state)
+    return all(state[name] == "ready" for name in REQUIRED), state
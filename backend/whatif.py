@@ -0,0 +1,209 @@
+"""
+"What-if" scoring of candidate moves and swaps on a fixed layout.
+
+Every objective term except explicit affinity depends only on per-table
+category counts, so the change of each term for moving guest g (category c)
+from table a to table t is M[t, c] - M[a, c] + P[c, c] with M = counts @ P for
+that term's pair matrix P; swaps combine two such moves minus the pair they
+share. Whole batches of candidates are evaluated as array operations, and all
+moves and swaps of one guest (or of the guests at one table) can be ranked.
+
+A candidate is infeasible if it overfills a table, seats guests that must sit
+apart together, puts a guest at a table they are not eligible for (venue pins
+and reservations, `domains.py`), or splits a household (use the repair
+endpoint to move a household as a whole).
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .domains import compile_domains
+from .households import contract_households
+from .models import Guest, VenueConfig
+from .scoring import TERMS, PairTables, ScoringContext, build_context, term_pair_values, weighted_score
+
+DEFAULT_RANK_LIMIT = 10
+
+
+@dataclass
+class CandidateBatch:
+    """Per candidate: guest(s), target table, objective delta per term, weighted delta, feasibility."""
+
+    kind: str  # "move" or "swap"
+    guest: np.ndarray
+    other: np.ndarray  # target table (moves) or the other guest (swaps)
+    terms: Dict[str, np.ndarray]
+    delta: np.ndarray
+    # "" if feasible, else "capacity" / "conflict" / "ineligible" / "household" / "unseated" / "same_table"
+    reason: np.ndarray
+
+    @property
+    def feasible(self) -> np.ndarray:
+        return self.reason == ""
+
+    def __len__(self) -> int:
+        return self.guest.size
+
+
+def _pair_lookup(
+    n: int, indptr: np.ndarray, indices: np.ndarray, values: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Sorted keys g * n + h and values of a symmetric CSR matrix, for vectorized pair lookups."""
+    keys = np.repeat(np.arange(n), np.diff(indptr)) * n + indices
+    order = np.argsort(keys, kind="stable")
+    return keys[order], values[order]
+
+
+def _pair_values(lookup: Tuple[np.ndarray, np.ndarray], queries: np.ndarray) -> np.ndarray:
+    """Value of each queried pair key (0 if absent)."""
+    keys, values = lookup
+    if keys.size == 0:
+        return np.zeros(queries.size)
+    pos = np.minimum(np.searchsorted(keys, queries), keys.size - 1)
+    return np.where(keys[pos] == queries, values[pos], 0.0)
+
+
+class WhatIf:
+    """Term deltas of moves and swaps against one layout (table index per guest, -1 if unseated)."""
+
+    def __init__(
+        self,
+        ctx: ScoringContext,
+        table_of: np.ndarray,
+        weights: Dict[str, float],
+        party_of: np.ndarray,
+        allowed: Optional[np.ndarray] = None,
+    ):
+        self.ctx = ctx
+        self.table_of = table_of
+        self.weights = weights
+        self.allowed = allowed  # (n_guests, n_tables) eligible tables, None: all
+        counts = ctx.counts(table_of)
+        self.P = term_pair_values(ctx)
+        self.M = {term: counts @ P for term, P in self.P.items()}
+        self.load = counts.sum(axis=1)
+        self.in_household = np.bincount(party_of)[party_of] > 1
+        self.pair_tables = PairTables(ctx, table_of) if ctx.has_pairs else None
+        if self.pair_tables is not None:
+            self.affinity_pairs = _pair_lookup(ctx.n_guests, ctx.affinity_indptr, ctx.affinity_indices, ctx.affinity_values)
+            self.conflict_pairs = _pair_lookup(
+                ctx.n_guests, ctx.conflict_indptr, ctx.conflict_indices, np.ones(ctx.conflict_indices.size)
+            )
+
+    def moves(self, g: np.ndarray, t: np.ndarray) -> CandidateBatch:
+        ctx, table_of = self.ctx, self.table_of
+        g, t = np.asarray(g, dtype=np.int64), np.asarray(t, dtype=np.int64)
+        c = ctx.guest_category[g]
+        a = table_of[g]
+        seated = a >= 0
+        a0 = np.maximum(a, 0)
+        terms: Dict[str, np.ndarray] = {}
+        for term, M in self.M.items():
+            terms[term] = M[t, c] - np.where(seated, M[a0, c] - self.P[term][c, c], 0.0)
+        quality_before = np.where(seated, ctx.quality[a0], 0.0)
+        terms["relationship_priority"] = ctx.guest_closeness[g] * (ctx.quality[t] - quality_before)
+        terms["affinity"] = np.zeros(g.size)
+
+        reason = np.full(g.size, "", dtype=object)
+        if self.pair_tables is not None:
+            AT, CT = self.pair_tables.AT, self.pair_tables.CT
+            terms["affinity"] = AT[g, t] - np.where(seated, AT[g, a0], 0.0)
+            reason[CT[g, t] > 0] = "conflict"
+        reason[self.load[t] + 1 > ctx.capacity[t]] = "capacity"
+        if self.allowed is not None:
+            reason[~self.allowed[g, t]] = "ineligible"
+        reason[self.in_household[g]] = "household"
+        reason[t == a] = "same_table"
+        for term in terms.values():
+            term[t == a] = 0.0
+        return CandidateBatch("move", g, t, terms, weighted_score(terms, self.weights), reason)
+
+    def swaps(self, g: np.ndarray, h: np.ndarray) -> CandidateBatch:
+        ctx, table_of = self.ctx, self.table_of
+        g, h = np.asarray(g, dtype=np.int64), np.asarray(h, dtype=np.int64)
+        c, d = ctx.guest_category[g], ctx.guest_category[h]
+        a, b = table_of[g], table_of[h]
+        seated = (a >= 0) & (b >= 0)
+        a, b = np.maximum(a, 0), np.maximum(b, 0)
+        terms: Dict[str, np.ndarray] = {}
+        for term, M in self.M.items():
+            P = self.P[term]
+            terms[term] = M[b, c] - P[c, d] - M[a, c] + P[c, c] + M[a, d] - P[d, c] - M[b, d] + P[d, d]
+        closeness = ctx.guest_closeness[g] - ctx.guest_closeness[h]
+        terms["relationship_priority"] = closeness * (ctx.quality[b] - ctx.quality[a])
+        terms["affinity"] = np.zeros(g.size)
+
+        reason = np.full(g.size, "", dtype=object)
+        if self.pair_tables is not None:
+            AT, CT = self.pair_tables.AT, self.pair_tables.CT
+            # g and h trade places; a g-h pair is apart before and after the swap
+            affinity = _pair_values(self.affinity_pairs, g * ctx.n_guests + h)
+            conflict = _pair_values(self.conflict_pairs, g * ctx.n_guests + h)
+            terms["affinity"] = AT[g, b] - AT[g, a] + AT[h, a] - AT[h, b] - 2 * affinity
+            reason[(CT[g, b] - conflict > 0) | (CT[h, a] - conflict > 0)] = "conflict"
+        if self.allowed is not None:
+            reason[~self.allowed[g, b] | ~self.allowed[h, a]] = "ineligible"
+        reason[self.in_household[g] | self.in_household[h]] = "household"
+        reason[~seated] = "unseated"
+        reason[seated & (a == b)] = "same_table"
+        for term in terms.values():
+            term[~seated | (a == b)] = 0.0
+        return CandidateBatch("swap", g, h, terms, weighted_score(terms, self.weights), reason)
+
+    def neighborhood(self, guest: Optional[int] = None, table: Optional[int] = None) -> List[CandidateBatch]:
+        """All moves and swaps of `guest`, or of the guests at `table` and into it."""
+        ctx, table_of = self.ctx, self.table_of
+        all_tables = np.arange(ctx.n_tables)
+        all_guests = np.arange(ctx.n_guests)
+        if guest is not None:
+            g = np.full(ctx.n_tables, guest)
+            return [self.moves(g, all_tables), self.swaps(np.full(ctx.n_guests, guest), all_guests)]
+        at = np.flatnonzero(table_of == table)
+        others = np.flatnonzero(table_of != table)
+        return [
+            self.moves(np.repeat(at, ctx.n_tables), np.tile(all_tables, at.size)),
+            self.moves(others, np.full(others.size, table)),
+            self.swaps(np.repeat(at, others.size), np.tile(others, at.size)),
+        ]
+
+    def row(self, batch: CandidateBatch, k: int) -> Dict[str, object]:
+        """Candidate k of a batch, by guest and table ids."""
+        ctx = self.ctx
+        row: Dict[str, object] = {"kind": batch.kind, "guest_id": ctx.guest_ids[batch.guest[k]]}
+        if batch.kind == "move":
+            row["table_id"] = ctx.table_ids[batch.other[k]]
+        else:
+            row["other_guest_id"] = ctx.guest_ids[batch.other[k]]
+        row.update(
+            terms={term: float(batch.terms[term][k]) for term in TERMS},
+            delta=float(batch.delta[k]),
+            feasible=batch.reason[k] == "",
+            reason=batch.reason[k] or None,
+        )
+        return row
+
+    def rank(self, batches: List[CandidateBatch], limit: int = DEFAULT_RANK_LIMIT) -> List[Dict[str, object]]:
+        """The `limit` feasible candidates with the largest positive weighted delta."""
+        ranked = []
+        for batch in batches:
+            keep = np.flatnonzero(batch.feasible & (batch.delta > 0))
+            ranked.extend((float(batch.delta[k]), batch, int(k)) for k in keep)
+        ranked.sort(key=lambda item: -item[0])
+        return [self.row(batch, k) for _, batch, k in ranked[:limit]]
+
+
+def build_what_if(
+    guests: List[Guest],
+    venue: VenueConfig,
+    weights: Dict[str, float],
+    assignments: Dict[str, str],
+    ctx: Optional[ScoringContext] = None,
+) -> WhatIf:
+    """What-if scorer for a layout; raises DomainError for contradictory venue rules."""
+    ctx = ctx or build_context(guests, venue)
+    _, party_of = contract_households(guests)
+    domains = compile_domains(guests, venue)
+    allowed = domains.allowed if domains is not None else None
+    return WhatIf(ctx, ctx.table_of(assignments), weights, party_of, allowed)
@@ -0,0 +1,145 @@
+"""
+Solver worker service: pulls layout jobs from the queue (`jobs.py`).
+
+    SEATHARMONY_QUEUE_URL=sqlite:////var/lib/seatharmony/jobs.db python -m backend.worker --slots 4
+
+Each worker runs up to `slots` jobs at once on a process pool (Gurobi threads
+split between the slots, as in `batch.py`), claims a new job whenever a slot
+is free, and sends a heartbeat with its slots and busy slots every
+`jobs.HEARTBEAT_SECONDS`. Add workers (on any machine that reaches the queue)
+to add capacity; the API replicas do not change.
+"""
+
+import argparse
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+from .batch import _init_worker, _run_event
+from .jobs import HEARTBEAT_SECONDS, Job, JobQueue, WorkerInfo, open_queue, queue_url
+
+CLAIM_TIMEOUT = 1.0
+
+
+def default_slots() -> int:
+    return int(os.getenv("SEATHARMONY_WORKER_SLOTS") or os.cpu_count() or 1)
+
+
+class Worker:
+    """Claims jobs while it has free slots and posts their result records."""
+
+    def __init__(self, queue: JobQueue, slots: int, in_process: bool = False):
+        self.queue = queue
+        self.info = WorkerInfo(id=uuid.uuid4().hex, host=socket.gethostname(), pid=os.getpid(), slots=slots)
+        self._in_process = in_process
+        self._free = threading.Semaphore(slots)
+        self._busy_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads = []
+        self._executor: Optional[Executor] = None
+
+    def _make_executor(self) -> Executor:
+        if self._in_process:
+            return ThreadPoolExecutor(max_workers=self.info.slots, thread_name_prefix="seatharmony-job")
+        solver_threads = max(1, (os.cpu_count() or 1) // self.info.slots)
+        return ProcessPoolExecutor(
+            max_workers=self.info.slots,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(solver_threads,),
+        )
+
+    def _set_busy(self, delta: int) -> None:
+        with self._busy_lock:
+            self.info.busy += delta
+
+    def _heartbeat(self) -> None:
+        while True:
+            try:
+                with self._busy_lock:
+                    self.info.heartbeat = time.time()
+                self.queue.heartbeat(self.info)
+            except Exception as e:
+                print(f"⚠ Warning: worker heartbeat failed: {type(e).__name__}: {e}")
+            if self._stop.wait(HEARTBEAT_SECONDS):
+                return
+
+    def _done(self, job: Job, future: Future) -> None:
+        try:
+            record: Dict[str, Any] = future.result()
+        except Exception as e:
+            record = {"status": "error", "error": {"detail": f"{type(e).__name__}: {e}"}}
+        try:
+            self.queue.finish(job.id, record)
+        except Exception as e:
+            print(f"⚠ Warning: could not post the result of job {job.id}: {type(e).__name__}: {e}")
+        self._set_busy(-1)
+        self._free.release()
+
+    def _claim_loop(self) -> None:
+        while not self._stop.is_set():
+            if not self._free.acquire(timeout=CLAIM_TIMEOUT):
+                continue
+            try:
+                job = self.queue.claim(self.info.id, CLAIM_TIMEOUT)
+            except Exception as e:
+                print(f"⚠ Warning: worker could not claim a job: {type(e).__name__}: {e}")
+                job = None
+            if job is None:
+                self._free.release()
+                continue
+            self._set_busy(1)
+            future = self._executor.submit(_run_event, job.payload["request"], job.payload.get("budget_seconds"))
+            future.add_done_callback(lambda f, job=job: self._done(job, f))
+
+    def start(self) -> None:
+        """Serve in background threads."""
+        self._executor = self._make_executor()
+        # Live before the first claim, or the dispatcher would requeue the job as lost
+        self.queue.heartbeat(self.info)
+        for target, name in ((self._heartbeat, "heartbeat"), (self._claim_loop, "claim")):
+            thread = threading.Thread(target=target, name=f"seatharmony-worker-{name}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self) -> None:
+        """Stop claiming, let running jobs finish, and leave the worker list."""
+        self._stop.set()
+        for thread in self._threads:
+            thread.join()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+        self.queue.remove_worker(self.info.id)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="SeatHarmony solver worker")
+    parser.add_argument("--queue", default=queue_url(), help="queue URL (default: $SEATHARMONY_QUEUE_URL)")
+    parser.add_argument("--slots", type=int, default=default_slots(), help="jobs run at once")
+    args = parser.parse_args()
+    if not args.queue:
+        parser.error("no queue configured: pass --queue or set SEATHARMONY_QUEUE_URL")
+    if args.queue.startswith("memory://"):
+        parser.error("memory:// queues are served by the API process itself")
+
+    worker = Worker(open_queue(args.queue), args.slots)
+    worker.start()
+    print(f"Worker {worker.info.id} on {worker.info.host}: {args.slots} slot(s), queue {args.queue}")
+    stopped = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stopped.set())
+    try:
+        stopped.wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        worker.stop()
+
+
+if __name__ == "__main__":
+    main()
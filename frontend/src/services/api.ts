@@ -12,11 +12,70 @@ import {
   DEFAULT_TOT_PARAMS,
   ExplainGuestsRequest,
   GuestExplanationsResponse,
+  RepairRequest,
+  RepairResponse,
+  WhatIfRequest,
+  WhatIfResponse,
+  InstanceCreateRequest,
+  InstanceInfo,
+  InstanceChangesRequest,
+  InstanceChangesResponse,
+  SessionCreateRequest,
+  SessionInfo,
+  FrontierRequest,
+  FrontierResponse,
+  FrontierQueryRequest,
+  FrontierPoint,
 } from '../types/models';
 
 // Base URL from environment or default to localhost
 const API_BASE_URL = import.meta.env.VITE_API_BASE_URL || 'http://localhost:8000';
 
+// Uploaded instances (POST /api/sessions) by content, most recently used last
+const MAX_CACHED_SESSIONS = 4;
+const sessionIds = new Map<string, string>();
+
+async function sessionFor(instance: SessionCreateRequest): Promise<string> {
+  const key = JSON.stringify(instance);
+  let sessionId = sessionIds.get(key);
+  if (sessionId === undefined) {
+    sessionId = (await createSession(instance)).session_id;
+  }
+  sessionIds.delete(key);
+  sessionIds.set(key, sessionId);
+  if (sessionIds.size > MAX_CACHED_SESSIONS) {
+    sessionIds.delete(sessionIds.keys().next().value as string);
+  }
+  return sessionId;
+}
+
+/**
+ * POST a request against the session holding `instance` (uploaded on first use),
+ * so repeated requests on the same guests and tables skip re-sending and re-parsing them.
+ * An expired or evicted session (404) is uploaded again once.
+ */
+async function postWithSession(
+  path: string,
+  body: LayoutRequest | ExplainGuestsRequest,
+  instance: SessionCreateRequest
+): Promise<Response> {
+  for (let attempt = 0; ; attempt++) {
+    // A caller-managed session is sent as is
+    const sessionId = body.session_id ?? (await sessionFor(instance));
+    const response = await fetch(`${API_BASE_URL}${path}`, {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json',
+      },
+      body: JSON.stringify({ ...body, guests: [], tables: [], session_id: sessionId }),
+    });
+    if (body.session_id || response.status !== 404 || attempt > 0) {
+      return response;
+    }
+    sessionIds.delete(JSON.stringify(instance));
+  }
+}
+
 /**
  * Generate optimized seating layouts using ToT algorithm
  */
@@ -33,13 +92,7 @@ export async function generateLayouts(
     tot: totParams,
   };
 
-  const response = await fetch(`${API_BASE_URL}/api/layouts/generate`, {
-    method: 'POST',
-    headers: {
-      'Content-Type': 'application/json',
-    },
-    body: JSON.stringify(request),
-  });
+  const response = await postWithSession('/api/layouts/generate', request, { guests, tables, settings });
 
   if (!response.ok) {
     const errorText = await response.text();
@@ -77,7 +130,24 @@ export async function explainLayout(
 export async function explainGuestsSeating(
   request: ExplainGuestsRequest
 ): Promise<GuestExplanationsResponse> {
-  const response = await fetch(`${API_BASE_URL}/api/layouts/explain-guests`, {
+  const { guests, tables } = request;
+  const response = await postWithSession('/api/layouts/explain-guests', request, { guests, tables });
+
+  if (!response.ok) {
+    const errorText = await response.text();
+    throw new Error(`Failed to explain guests: ${response.status} - ${errorText}`);
+  }
+
+  return response.json();
+}
+
+/**
+ * Repair a layout after guests were moved by hand (pinned guests stay put)
+ */
+export async function repairLayout(
+  request: RepairRequest
+): Promise<RepairResponse> {
+  const response = await fetch(`${API_BASE_URL}/api/layouts/repair`, {
     method: 'POST',
     headers: {
       'Content-Type': 'application/json',
@@ -87,7 +157,141 @@ export async function explainGuestsSeating(
 
   if (!response.ok) {
     const errorText = await response.text();
-    throw new Error(`Failed to explain guests: ${response.status} - ${errorText}`);
+    throw new Error(`Failed to repair layout: ${response.status} - ${errorText}`);
+  }
+
+  return response.json();
+}
+
+/**
+ * Score candidate moves/swaps on a layout and rank the best ones for a guest or table
+ */
+export async function whatIf(
+  request: WhatIfRequest
+): Promise<WhatIfResponse> {
+  const response = await fetch(`${API_BASE_URL}/api/layouts/what-if`, {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+    },
+    body: JSON.stringify(request),
+  });
+
+  if (!response.ok) {
+    const errorText = await response.text();
+    throw new Error(`Failed to evaluate moves: ${response.status} - ${errorText}`);
+  }
+
+  return response.json();
+}
+
+/**
+ * Store an instance and its current layout for incremental updates
+ */
+export async function createInstance(
+  request: InstanceCreateRequest
+): Promise<InstanceInfo> {
+  const response = await fetch(`${API_BASE_URL}/api/instances`, {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+    },
+    body: JSON.stringify(request),
+  });
+
+  if (!response.ok) {
+    const errorText = await response.text();
+    throw new Error(`Failed to create instance: ${response.status} - ${errorText}`);
+  }
+
+  return response.json();
+}
+
+/**
+ * Apply guest/table changes (RSVPs) to a stored instance and re-optimize locally
+ */
+export async function applyInstanceChanges(
+  instanceId: string,
+  request: InstanceChangesRequest
+): Promise<InstanceChangesResponse> {
+  const response = await fetch(`${API_BASE_URL}/api/instances/${instanceId}/changes`, {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+    },
+    body: JSON.stringify(request),
+  });
+
+  if (!response.ok) {
+    const errorText = await response.text();
+    throw new Error(`Failed to apply changes: ${response.status} - ${errorText}`);
+  }
+
+  return response.json();
+}
+
+/**
+ * Upload an instance once; later requests pass the returned session_id instead of guests/tables
+ */
+export async function createSession(
+  request: SessionCreateRequest
+): Promise<SessionInfo> {
+  const response = await fetch(`${API_BASE_URL}/api/sessions`, {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+    },
+    body: JSON.stringify(request),
+  });
+
+  if (!response.ok) {
+    const errorText = await response.text();
+    throw new Error(`Failed to create session: ${response.status} - ${errorText}`);
+  }
+
+  return response.json();
+}
+
+/**
+ * Compute and store Pareto-optimal layouts across the objective terms
+ */
+export async function computeFrontier(
+  request: FrontierRequest
+): Promise<FrontierResponse> {
+  const response = await fetch(`${API_BASE_URL}/api/frontiers`, {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+    },
+    body: JSON.stringify(request),
+  });
+
+  if (!response.ok) {
+    const errorText = await response.text();
+    throw new Error(`Failed to compute frontier: ${response.status} - ${errorText}`);
+  }
+
+  return response.json();
+}
+
+/**
+ * Rank the layouts of a stored frontier for new weights or minimum term values (no re-solve)
+ */
+export async function queryFrontier(
+  frontierId: string,
+  request: FrontierQueryRequest
+): Promise<{ frontier_id: string; points: FrontierPoint[] }> {
+  const response = await fetch(`${API_BASE_URL}/api/frontiers/${frontierId}/query`, {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+    },
+    body: JSON.stringify(request),
+  });
+
+  if (!response.ok) {
+    const errorText = await response.text();
+    throw new Error(`Failed to query frontier: ${response.status} - ${errorText}`);
   }
 
   return response.json();
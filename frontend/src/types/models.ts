@@ -10,6 +10,7 @@ export interface Guest {
   group_id: string | null;  // Category from Excel - used for clustering
   importance: number;       // 0 = normal, higher = VIP
   tags: string[];           // Optional tags like "vegetarian", "wheelchair"
+  household_id?: string | null;  // Guests sharing a household always sit together
 }
 
 // Matches backend TableIn Pydantic model
@@ -18,7 +19,7 @@ export interface Table {
   name: string;
   capacity: number;
   zone: string | null;      // e.g., "front", "back", "dance_floor"
-  constraints: Record<string, any>;
+  constraints: Record<string, any>;  // e.g., pinned: guest ids, features: ["accessible"], reserved_for: ["kid"]
 }
 
 // Matches backend TotParams Pydantic model
@@ -28,6 +29,18 @@ export interface TotParams {
   n_generate: number;
   n_evaluate: number;
   top_k: number;
+  mode?: 'tot' | 'pool';          // 'pool' = diverse top_k from a single solve
+  min_difference?: number | null; // Min. guests that differ between 'pool' layouts
+}
+
+// Sparse guest-pair matrix over guest indices; value > 0 rewards sitting together, < 0 keeps apart
+export interface SparseMatrix {
+  format?: 'coo' | 'csr';
+  row?: number[];      // coo
+  col?: number[];      // coo
+  indptr?: number[];   // csr
+  indices?: number[];  // csr
+  data: number[];
 }
 
 // Matches backend LayoutRequest Pydantic model
@@ -36,6 +49,11 @@ export interface LayoutRequest {
   tables: Table[];
   settings: Record<string, any>;
   tot: TotParams;
+  engine?: 'auto' | 'milp' | 'aggregated' | 'decomposed' | 'lns' | 'heuristic' | 'portfolio';
+  affinity?: SparseMatrix | null;
+  session_id?: string;        // uploaded instance (POST /api/sessions) instead of guests/tables
+  patch?: InstanceChange[];   // applied to the session's instance for this request only
+  seat_assignment?: boolean;  // also order the guests around each table (layout.seats)
 }
 
 // Constraint summary from optimization
@@ -54,6 +72,8 @@ export interface Layout {
   variant_label: string | null;
   variant_id: string | null;
   summary: ConstraintSummary | null;
+  stats?: Record<string, any>;  // Phase timings, model size, solver status/gap/bound, cache hit, realized terms, stability coverage
+  seats?: Record<string, number>;  // guest_id -> seat number (clockwise from 0) at their table, with seat_assignment
 }
 
 // ToT layout result with metadata
@@ -69,6 +89,168 @@ export interface LayoutResponse {
   layouts: TotLayout[];
 }
 
+// Request for /api/layouts/repair (after the planner moves guests by hand)
+export interface RepairRequest {
+  guests: Guest[];
+  tables: Table[];
+  settings?: Record<string, any>;
+  weights: Record<string, number>;
+  affinity?: SparseMatrix | null;
+  assignments: Record<string, string>; // current layout: guest_id -> table_id
+  pinned: Record<string, string>;      // guests placed by hand: guest_id -> table_id
+  budget_ms?: number;
+  session_id?: string;        // uploaded instance (POST /api/sessions) instead of guests/tables
+  patch?: InstanceChange[];   // applied to the session's instance for this request only
+}
+
+// Response from /api/layouts/repair
+export interface RepairResponse {
+  layout: Layout;
+  score_before: number;
+  score: number;
+  delta: number;
+  moved: string[];         // guest ids whose table changed
+  neighborhood: string[];  // table ids that were re-optimized
+  elapsed_ms: number;
+}
+
+// Request for /api/layouts/what-if: candidate moves/swaps on a fixed layout
+export interface WhatIfRequest {
+  guests: Guest[];
+  tables: Table[];
+  settings?: Record<string, any>;
+  weights: Record<string, number>;
+  affinity?: SparseMatrix | null;
+  assignments: Record<string, string>; // guest_id -> table_id
+  moves?: { guest_id: string; table_id: string }[];
+  swaps?: { guest_id: string; other_guest_id: string }[];
+  rank_guest_id?: string;  // rank all moves/swaps of this guest...
+  rank_table_id?: string;  // ...or of the guests at this table
+  session_id?: string;        // uploaded instance (POST /api/sessions) instead of guests/tables
+  patch?: InstanceChange[];   // applied to the session's instance for this request only
+  limit?: number;
+}
+
+// One evaluated move or swap
+export interface WhatIfCandidate {
+  kind: 'move' | 'swap';
+  guest_id: string;
+  table_id?: string;        // moves
+  other_guest_id?: string;  // swaps
+  terms: Record<string, number>;  // objective delta per term (unweighted)
+  delta: number;                  // weighted objective delta
+  feasible: boolean;
+  reason: 'capacity' | 'conflict' | 'ineligible' | 'household' | 'unseated' | 'same_table' | null;
+}
+
+// Response from /api/layouts/what-if
+export interface WhatIfResponse {
+  candidates: WhatIfCandidate[];  // in request order: moves, then swaps
+  best: WhatIfCandidate[];        // best improving feasible candidates (when ranking)
+  elapsed_ms: number;
+}
+
+// Request for POST /api/instances: an instance stored for incremental updates
+export interface InstanceCreateRequest {
+  guests: Guest[];
+  tables: Table[];
+  settings?: Record<string, any>;
+  weights: Record<string, number>;
+  affinity?: SparseMatrix | null;
+  assignments?: Record<string, string>; // current best layout; seated by the heuristic if empty
+}
+
+// Stored instance (POST /api/instances, GET /api/instances/{id})
+export interface InstanceInfo {
+  instance_id: string;
+  version: number;
+  guests: number;
+  tables: number;
+  assignments: Record<string, string>;
+  score: number;
+}
+
+// One guest/table change; `guest` for add_guest/update_guest, `table` for
+// add_table/update_table, `id` for remove_guest/remove_table
+export interface InstanceChange {
+  op: 'add_guest' | 'update_guest' | 'remove_guest' | 'add_table' | 'update_table' | 'remove_table';
+  guest?: Guest;
+  table?: Table;
+  id?: string;
+}
+
+// Request for POST /api/instances/{id}/changes
+export interface InstanceChangesRequest {
+  changes: InstanceChange[];
+  version?: number;        // rejected with 409 if the instance has moved on
+  budget_ms?: number;
+  solver_seconds?: number; // > 0: also re-solve the touched tables with the MILP
+}
+
+// Response from POST /api/instances/{id}/changes
+export interface InstanceChangesResponse extends RepairResponse {
+  instance_id: string;
+  version: number;
+  stats: Record<string, any>;
+}
+
+// Request for POST /api/sessions: an instance uploaded once and referenced by session_id
+export interface SessionCreateRequest {
+  guests: Guest[];
+  tables: Table[];
+  settings?: Record<string, any>;
+  affinity?: SparseMatrix | null;
+}
+
+// Session (POST /api/sessions, GET /api/sessions/{id})
+export interface SessionInfo {
+  session_id: string;
+  content_hash: string;
+  guests: number;
+  tables: number;
+  cached_layouts: Record<string, number>; // engine -> solved layouts kept warm
+  approx_bytes: number;
+  expires_in: number;                     // seconds without use until eviction
+}
+
+// Request for a Pareto frontier (POST /api/frontiers)
+export interface FrontierRequest {
+  guests?: Guest[];
+  tables?: Table[];
+  settings?: Record<string, any>;
+  affinity?: SparseMatrix | null;
+  session_id?: string;
+  patch?: InstanceChange[];   // applied to the session's instance for this request only
+  max_points?: number;
+  time_limit?: number;        // seconds for the whole frontier
+}
+
+export interface FrontierPoint {
+  id: number;
+  terms: Record<string, number>;    // unweighted term values
+  weights: Record<string, number>;  // weights of the solve that found it
+  method: 'anchor' | 'weighted_sum' | 'epsilon';
+  assignments?: Record<string, string>;  // guest_id -> table_id
+  score?: number;                        // query results only
+  normalized?: Record<string, number>;   // query results only: 0 (nadir) .. 1 (ideal)
+}
+
+export interface FrontierResponse {
+  frontier_id: string;
+  objectives: string[];             // terms that vary across the frontier
+  ideal: Record<string, number>;
+  nadir: Record<string, number>;
+  points: FrontierPoint[];
+  stats: Record<string, any>;
+}
+
+// POST /api/frontiers/{id}/query: ranks stored points, no solving
+export interface FrontierQueryRequest {
+  weights?: Record<string, number>;
+  min_terms?: Record<string, number>;
+  limit?: number;
+}
+
 // Request for guest explanations
 export interface ExplainGuestsRequest {
   guests: Guest[];
@@ -76,6 +258,8 @@ export interface ExplainGuestsRequest {
   layout: Layout;
   weights: Record<string, number>;
   notes: string;
+  session_id?: string;        // uploaded instance (POST /api/sessions) instead of guests/tables
+  patch?: InstanceChange[];   // applied to the session's instance for this request only
 }
 
 // Response from /api/layouts/explain-guests